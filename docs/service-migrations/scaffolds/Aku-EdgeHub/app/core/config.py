@@ -2,6 +2,9 @@
 
 from __future__ import annotations
 
+import socket
+import uuid
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -22,6 +25,11 @@ class Settings(BaseSettings):
     # Operating mode
     operating_mode: str = Field("online", pattern="^(online|offline)$")
 
+    # Hub identity reported to SuperHub; defaults to a stable ID derived from the hostname
+    hub_id: uuid.UUID = Field(
+        default_factory=lambda: uuid.uuid5(uuid.NAMESPACE_DNS, socket.gethostname())
+    )
+
     # SQLite
     database_url: str = "sqlite+aiosqlite:///./edge_hub.db"
     db_echo: bool = False
@@ -36,5 +44,42 @@ class Settings(BaseSettings):
     akuai_api_key: str = "changeme"
     infer_timeout_seconds: float = 60.0
 
+    # SuperHub (regional analytics upload)
+    superhub_base_url: str = "https://superhub.example.com"
+    superhub_api_key: str = "changeme"
+    analytics_upload_timeout_seconds: float = 30.0
+    analytics_batch_size: int = Field(1000, ge=1, le=1000)  # SuperHub caps batches at 1,000
+    analytics_drain_interval_seconds: float = Field(60.0, gt=0)
+
+    # Upstream bandwidth limiter (shared by relay, sync and bulk transfers)
+    bandwidth_limit_kbps: float | None = Field(None, gt=0)  # unset = metered, not throttled
+    bandwidth_burst_kb: int = Field(64, ge=1)
+    bandwidth_chunk_kb: int = Field(16, ge=1)
+    bandwidth_bulk_reserve_kb: int = Field(16, ge=0)
+    bandwidth_usage_flush_seconds: float = Field(60.0, gt=0)
+
+    # Energy monitor (INA3221 firmware JSON stream)
+    energy_source_path: str | None = None  # e.g. /dev/ttyACM0, or a file / FIFO stand-in
+    energy_batch_size: int = Field(60, ge=1)
+    energy_flush_seconds: float = Field(5.0, gt=0)
+    energy_raw_retention_hours: int = Field(24, ge=1)
+    energy_minute_retention_days: int = Field(14, ge=1)
+    energy_hour_retention_days: int = Field(365, ge=1)
+
+    # Energy-budget scheduler for heavy background I/O
+    scheduler_tick_seconds: float = Field(10.0, gt=0)
+    scheduler_telemetry_window_seconds: int = Field(60, ge=1)
+    scheduler_budget_capacity_wh: float = Field(50.0, gt=0)
+    scheduler_max_heavy_jobs: int = Field(2, ge=1)
+
+    # Device watchdog heartbeat (firmware/device-watchdog expects "PING\n" over UART)
+    watchdog_device_path: str | None = None  # e.g. /dev/ttyAMA0, or a file stand-in
+    watchdog_heartbeat_seconds: float = Field(30.0, gt=0)
+    watchdog_lag_sample_seconds: float = Field(0.5, gt=0)
+    watchdog_max_loop_lag_ms: float = Field(1000.0, gt=0)
+    watchdog_max_db_rtt_ms: float = Field(2000.0, gt=0)
+    watchdog_max_stuck_tasks: int = Field(0, ge=0)
+    watchdog_stuck_task_factor: float = Field(3.0, gt=1)
+
 
 settings = Settings()
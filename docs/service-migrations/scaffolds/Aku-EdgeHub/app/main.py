@@ -2,18 +2,53 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
 from app.db.session_sqlite import init_db
-from app.routers import devices, edge
+from app.routers import analytics, devices, edge, energy, network
+from app.services.analytics_spool import drainer
+from app.services.bandwidth import limiter
+from app.services.energy import EnergyIngester
+from app.services.scheduler import scheduler
+from app.services.watchdog import monitor
 
 logging.basicConfig(level=settings.log_level.upper())
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Startup / shutdown hook — schema bootstrap, background ingesters, drains, heartbeat."""
+    logger.info("EdgeHub starting — mode=%s", settings.operating_mode)
+    await init_db()
+
+    background: list[asyncio.Task[None]] = [
+        asyncio.create_task(scheduler.run(), name="energy-scheduler"),
+        asyncio.create_task(monitor.run(), name="watchdog-heartbeat"),
+        asyncio.create_task(drainer.run(), name="analytics-drainer"),
+        asyncio.create_task(limiter.run(), name="network-usage-flush"),
+    ]
+    if settings.energy_source_path:
+        ingester = EnergyIngester(settings.energy_source_path)
+        background.append(asyncio.create_task(ingester.run(), name="energy-ingester"))
+
+    yield
+
+    for task in background:
+        task.cancel()
+    for task in background:
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
 app = FastAPI(
     title="Aku-EdgeHub",
     description="Offline edge server — local SQLite store, dual online/offline modes.",
@@ -21,6 +56,7 @@ app = FastAPI(
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     openapi_url="/api/openapi.json",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -32,14 +68,11 @@ app.add_middleware(
 
 app.include_router(edge.router)
 app.include_router(devices.router)
+app.include_router(energy.router)
+app.include_router(analytics.router)
+app.include_router(network.router)
 
 
 @app.get("/health", tags=["ops"])
 async def health() -> dict[str, str]:
     return {"status": "ok", "service": "Aku-EdgeHub"}
-
-
-@app.on_event("startup")
-async def on_startup() -> None:
-    logger.info("EdgeHub starting — mode=%s", settings.operating_mode)
-    await init_db()
@@ -0,0 +1,52 @@
+"""Analytics router — spool learner events locally for batched upload to SuperHub."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session_sqlite import get_db
+from app.schemas.analytics import (
+    AnalyticsEmitRequest,
+    AnalyticsEmitResponse,
+    AnalyticsSpoolStatus,
+)
+from app.services import analytics_spool as spool_svc
+from app.services.analytics_spool import drainer
+
+router = APIRouter(prefix="/api/v1/analytics", tags=["analytics"])
+
+
+# ---------------------------------------------------------------------------
+# POST /api/v1/analytics/events
+# ---------------------------------------------------------------------------
+
+
+@router.post(
+    "/events",
+    response_model=AnalyticsEmitResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Spool analytics events for upload to SuperHub",
+)
+async def emit_events(
+    body: AnalyticsEmitRequest,
+    db: AsyncSession = Depends(get_db),
+) -> AnalyticsEmitResponse:
+    accepted = await spool_svc.spool_events(db, body.events)
+    await db.commit()
+    depth, _ = await spool_svc.spool_depth(db)
+    return AnalyticsEmitResponse(accepted=accepted, spool_depth=depth)
+
+
+# ---------------------------------------------------------------------------
+# GET /api/v1/analytics/spool
+# ---------------------------------------------------------------------------
+
+
+@router.get(
+    "/spool",
+    response_model=AnalyticsSpoolStatus,
+    summary="Spool depth and drain rate",
+)
+async def get_spool_status(db: AsyncSession = Depends(get_db)) -> AnalyticsSpoolStatus:
+    return AnalyticsSpoolStatus(**await drainer.status(db))
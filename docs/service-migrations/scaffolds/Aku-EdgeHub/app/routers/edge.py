@@ -20,8 +20,10 @@ from app.schemas.edge import (
     OperatingMode,
     SyncTriggerRequest,
     SyncTriggerResponse,
+    WatchdogHealth,
 )
 from app.services import sync as sync_svc
+from app.services.watchdog import monitor
 
 router = APIRouter(prefix="/api/v1", tags=["edge"])
 
@@ -48,10 +50,12 @@ async def offline_health(db: AsyncSession = Depends(get_db)) -> OfflineHealthRes
     except Exception:
         pass
 
+    watchdog = WatchdogHealth(**monitor.status())
     return OfflineHealthResponse(
-        status="ok",
+        status="ok" if watchdog.healthy else "degraded",
         mode=_operating_mode(),
         db_reachable=db_reachable,
+        watchdog=watchdog,
         timestamp=datetime.now(timezone.utc),
     )
 
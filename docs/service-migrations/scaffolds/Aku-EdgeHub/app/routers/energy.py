@@ -0,0 +1,109 @@
+"""Energy router — query downsampled energy-monitor rollups from SQLite."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session_sqlite import get_db
+from app.schemas.energy import (
+    EnergyBudgetStatus,
+    EnergyResolution,
+    EnergyRollup,
+    EnergyRollupResponse,
+    MetricStats,
+)
+from app.services import energy as energy_svc
+from app.services.scheduler import scheduler
+
+router = APIRouter(prefix="/api/v1/energy", tags=["energy"])
+
+_RESOLUTION_SECONDS = {
+    EnergyResolution.minute: energy_svc.MINUTE,
+    EnergyResolution.hour: energy_svc.HOUR,
+}
+
+
+def _to_rollup(row: dict[str, object]) -> EnergyRollup:
+    samples = int(row["samples"])
+    stats = {
+        m: MetricStats(
+            min=row[f"{m}_min"] / 1000,
+            avg=round(row[f"{m}_sum"] / samples / 1000, 3),
+            max=row[f"{m}_max"] / 1000,
+        )
+        for m in energy_svc.METRICS
+    }
+    return EnergyRollup(
+        bucket_start=datetime.fromtimestamp(int(row["bucket"]), tz=timezone.utc),
+        samples=samples,
+        **stats,
+    )
+
+
+def _aware(value: datetime | None) -> datetime | None:
+    """Naive query timestamps are taken as UTC, like the stored buckets."""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+# ---------------------------------------------------------------------------
+# GET /api/v1/energy
+# ---------------------------------------------------------------------------
+
+
+@router.get(
+    "",
+    response_model=EnergyRollupResponse,
+    summary="Energy telemetry rollups (1 min / 1 h min/avg/max)",
+)
+async def get_energy_rollups(
+    resolution: EnergyResolution = Query(EnergyResolution.minute),
+    since: datetime | None = Query(
+        None, description="Window start (UTC); defaults to `limit` buckets back"
+    ),
+    until: datetime | None = Query(
+        None, description="Window end (UTC, exclusive); defaults to now"
+    ),
+    limit: int = Query(1440, ge=1, le=10_000, description="Maximum buckets returned"),
+    db: AsyncSession = Depends(get_db),
+) -> EnergyRollupResponse:
+    step = _RESOLUTION_SECONDS[resolution]
+    until = _aware(until) or datetime.now(timezone.utc)
+    since = _aware(since) or until - timedelta(seconds=step * limit)
+    if since >= until:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="'since' must be earlier than 'until'",
+        )
+
+    rows = await energy_svc.query_rollups(
+        db,
+        resolution=step,
+        since=int(since.timestamp()),
+        until=int(until.timestamp()),
+        limit=limit,
+    )
+    return EnergyRollupResponse(
+        resolution=resolution,
+        since=since,
+        until=until,
+        items=[_to_rollup(row) for row in rows],
+    )
+
+
+# ---------------------------------------------------------------------------
+# GET /api/v1/energy/budget
+# ---------------------------------------------------------------------------
+
+
+@router.get(
+    "/budget",
+    response_model=EnergyBudgetStatus,
+    summary="Energy budget and background job scheduler state",
+)
+async def get_energy_budget() -> EnergyBudgetStatus:
+    return EnergyBudgetStatus(**scheduler.status())
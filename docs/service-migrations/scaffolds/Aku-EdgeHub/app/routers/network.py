@@ -0,0 +1,48 @@
+"""Network router — upstream bandwidth usage per day and traffic class."""
+
+from __future__ import annotations
+
+from datetime import date
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session_sqlite import get_db
+from app.schemas.network import NetworkUsageDay, NetworkUsageResponse
+from app.services import bandwidth as bandwidth_svc
+from app.services.bandwidth import limiter
+
+router = APIRouter(prefix="/api/v1/network", tags=["network"])
+
+
+# ---------------------------------------------------------------------------
+# GET /api/v1/network/usage
+# ---------------------------------------------------------------------------
+
+
+@router.get(
+    "/usage",
+    response_model=NetworkUsageResponse,
+    summary="Upstream bytes per day and traffic class",
+)
+async def get_network_usage(
+    days: int = Query(7, ge=1, le=366, description="Number of UTC days to return"),
+    db: AsyncSession = Depends(get_db),
+) -> NetworkUsageResponse:
+    await limiter.flush_usage(db)  # include traffic since the last periodic flush
+    rows = await bandwidth_svc.query_usage(db, days)
+    return NetworkUsageResponse(
+        limit_kbps=settings.bandwidth_limit_kbps,
+        burst_bytes=limiter.burst_bytes,
+        waiting=limiter.waiting(),
+        items=[
+            NetworkUsageDay(
+                day=date.fromisoformat(row["day"]),
+                traffic_class=row["traffic_class"],
+                bytes_up=row["bytes_up"],
+                bytes_down=row["bytes_down"],
+            )
+            for row in rows
+        ],
+    )
@@ -0,0 +1,63 @@
+"""Pydantic v2 schemas for the local analytics spool (mirrors SuperHub's AnalyticsEvent)."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from enum import StrEnum
+from uuid import UUID, uuid4
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class AnalyticsEventType(StrEnum):
+    SESSION_START = "SESSION_START"
+    SESSION_END = "SESSION_END"
+    CONTENT_VIEW = "CONTENT_VIEW"
+    ASSESSMENT_SUBMIT = "ASSESSMENT_SUBMIT"
+    MODEL_INFERENCE = "MODEL_INFERENCE"
+
+
+class AnalyticsEventIn(BaseModel):
+    """One analytics event; ``hub_id`` is stamped by EdgeHub when spooled."""
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    event_id: UUID = Field(default_factory=uuid4, description="Idempotency key at SuperHub")
+    learner_id: UUID = Field(..., description="Anonymised learner identifier")
+    event_type: AnalyticsEventType
+    occurred_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    content_id: UUID | None = None
+    session_id: UUID | None = None
+    duration_seconds: float | None = Field(None, ge=0.0)
+    metadata: dict[str, str | int | float | bool] = Field(default_factory=dict)
+
+
+class AnalyticsEmitRequest(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    events: list[AnalyticsEventIn] = Field(..., min_length=1, max_length=1000)
+
+
+class AnalyticsEmitResponse(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    accepted: int
+    spool_depth: int
+
+
+class AnalyticsSpoolStatus(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    depth: int = Field(..., description="Events spooled and not yet acknowledged by SuperHub")
+    oldest_enqueued_at: datetime | None = None
+    draining: bool
+    drained_total: int = Field(..., description="Events acknowledged since startup")
+    dead_letter_depth: int = Field(
+        ..., description="Events SuperHub refused to store, kept in analytics_dead_letter"
+    )
+    last_drain_at: datetime | None = None
+    last_drain_events: int
+    last_drain_rate_eps: float | None = Field(
+        None, description="Events per second achieved by the last drain"
+    )
+    last_error: str | None = None
@@ -18,12 +18,36 @@ class OperatingMode(StrEnum):
 # ---------------------------------------------------------------------------
 
 
+class LoopLagPercentiles(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+
+class WatchdogHealth(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    healthy: bool = Field(..., description="False while the device-watchdog heartbeat is withheld")
+    loop_lag_ms: LoopLagPercentiles = Field(
+        ..., description="Event-loop lag over the recent sample window"
+    )
+    db_rtt_ms: float | None = Field(None, description="Last SQLite round-trip; null if it failed")
+    stuck_tasks: int = Field(..., description="Background jobs running far past their estimate")
+    heartbeat_device: str | None = Field(None, description="UART device (or stand-in) for PING")
+    last_heartbeat_at: datetime | None = None
+    problems: list[str] = Field(default_factory=list)
+
+
 class OfflineHealthResponse(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
 
     status: str = "ok"
     mode: OperatingMode
     db_reachable: bool
+    watchdog: WatchdogHealth | None = None
     timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
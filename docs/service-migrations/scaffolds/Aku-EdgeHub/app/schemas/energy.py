@@ -0,0 +1,58 @@
+"""Pydantic v2 schemas for energy-monitor telemetry rollups."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from enum import StrEnum
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class EnergyResolution(StrEnum):
+    minute = "1m"
+    hour = "1h"
+
+
+class MetricStats(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    min: float
+    avg: float
+    max: float
+
+
+class EnergyRollup(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    bucket_start: datetime = Field(..., description="UTC start of the rollup bucket")
+    samples: int = Field(..., description="Number of 1 Hz readings folded into the bucket")
+    solar_v: MetricStats
+    solar_a: MetricStats
+    wind_v: MetricStats
+    wind_a: MetricStats
+    load_v: MetricStats
+    load_a: MetricStats
+
+
+class EnergyRollupResponse(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    resolution: EnergyResolution
+    since: datetime
+    until: datetime
+    items: list[EnergyRollup]
+
+
+class EnergyBudgetStatus(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    constrained: bool = Field(
+        ..., description="False when no fresh telemetry exists and heavy jobs run unconstrained"
+    )
+    net_power_w: float | None = Field(None, description="Recent solar + wind − load power")
+    credit_wh: float = Field(..., description="Harvested surplus available to heavy jobs")
+    capacity_wh: float
+    pending: list[str]
+    running: list[str]
+    completed: int
+    failed: int
@@ -0,0 +1,38 @@
+"""Pydantic v2 schemas for upstream bandwidth metering."""
+
+from __future__ import annotations
+
+from datetime import date
+from enum import StrEnum
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class TrafficClass(StrEnum):
+    """Upstream traffic classes, highest priority first."""
+
+    relay = "relay"  # interactive inference relay
+    sync = "sync"  # content / cloud sync control traffic
+    bulk = "bulk"  # downloads and spool uploads
+
+
+class NetworkUsageDay(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    day: date = Field(..., description="UTC calendar day")
+    traffic_class: TrafficClass
+    bytes_up: int
+    bytes_down: int
+
+
+class NetworkUsageResponse(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    limit_kbps: float | None = Field(
+        None, description="Shared upstream budget in kbit/s; null when unthrottled"
+    )
+    burst_bytes: int
+    waiting: dict[TrafficClass, int] = Field(
+        ..., description="Transfer chunks currently queued for tokens, per class"
+    )
+    items: list[NetworkUsageDay]
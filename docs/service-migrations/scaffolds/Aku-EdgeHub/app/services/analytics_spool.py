@@ -0,0 +1,334 @@
+"""Durable analytics spool — local SQLite queue drained in batches to SuperHub.
+
+Events are appended to ``analytics_spool`` as the exact JSON body SuperHub
+expects, so an upload is a string join plus gzip — nothing is re-validated or
+re-serialised on the way out.  The drainer ships the oldest
+``ANALYTICS_BATCH_SIZE`` rows per request (SuperHub caps batches at 1,000) and
+deletes them only after a 2xx acknowledgement.  A crash between the ack and the
+delete re-sends that batch, which SuperHub skips by ``event_id``: delivery is
+at-least-once and no event is dropped while the hub is offline.
+
+SuperHub acknowledges a batch with 200 but refuses to store events whose
+``occurred_at`` is outside its window (about 30 days back, 1 hour ahead), e.g.
+after a longer outage or with a drifting clock on a board without an RTC.  It
+lists them in ``rejected_event_ids``; those rows are moved to
+``analytics_dead_letter`` in the same transaction as the acknowledgement,
+never deleted.  A batch that reports errors without naming them is kept whole.
+
+Uploads are submitted to the energy-aware scheduler as a heavy job, so a spool
+that built up over weeks offline drains during surplus power, and travel as
+``bulk`` traffic through the shared bandwidth limiter.  Each job stops starting
+batches once its estimated duration is nearly used up, and the drainer submits
+a fresh job until the spool is empty.  A large backlog is therefore a series of
+jobs that each fit their estimate, which is what the scheduler's energy
+accounting and the watchdog's stuck-task check both assume.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import gzip
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any
+from uuid import UUID
+
+import httpx
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.session_sqlite import AsyncSessionLocal
+from app.schemas.analytics import AnalyticsEventIn
+from app.schemas.network import TrafficClass
+from app.services.bandwidth import limiter
+from app.services.scheduler import EnergyAwareScheduler
+from app.services.scheduler import scheduler as default_scheduler
+
+logger = logging.getLogger(__name__)
+
+_AGGREGATE_ENDPOINT = "/api/v1/analytics/aggregate"
+_DRAIN_JOB = "analytics-drain"
+_DRAIN_POWER_W = 6.0  # Wi-Fi uplink + CPU for gzip
+_DRAIN_DURATION_S = 120.0
+_GZIP_LEVEL = 6  # level 9 costs ~3x the CPU for a few % smaller bodies
+
+# AUTOINCREMENT keeps seq strictly increasing, so rows are only ever removed
+# from the head and the depth is MAX(seq) - MIN(seq) + 1 without a table scan.
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS analytics_spool (
+    seq         INTEGER PRIMARY KEY AUTOINCREMENT,
+    enqueued_at INTEGER NOT NULL,
+    body        TEXT    NOT NULL
+)
+"""
+
+_CREATE_DEAD_LETTER = """
+CREATE TABLE IF NOT EXISTS analytics_dead_letter (
+    seq         INTEGER PRIMARY KEY,
+    enqueued_at INTEGER NOT NULL,
+    body        TEXT    NOT NULL,
+    reason      TEXT    NOT NULL,
+    failed_at   INTEGER NOT NULL
+)
+"""
+
+_schema_ready = False
+
+
+async def ensure_schema(db: AsyncSession) -> None:
+    global _schema_ready
+    if _schema_ready:
+        return
+    await db.execute(text(_CREATE_TABLE))
+    await db.execute(text(_CREATE_DEAD_LETTER))
+    await db.commit()
+    _schema_ready = True
+
+
+def encode_event(event: AnalyticsEventIn, hub_id: UUID) -> str:
+    """Serialise one event in SuperHub's ``AnalyticsEvent`` shape."""
+    body = event.model_dump(mode="json")
+    body["hub_id"] = str(hub_id)
+    return json.dumps(body, separators=(",", ":"))
+
+
+def encode_batch(bodies: list[str]) -> bytes:
+    """Gzip an ``AnalyticsBatch`` built from already-serialised event bodies."""
+    payload = '{"events":[' + ",".join(bodies) + "]}"
+    return gzip.compress(payload.encode(), compresslevel=_GZIP_LEVEL)
+
+
+async def spool_events(
+    db: AsyncSession, events: list[AnalyticsEventIn], *, hub_id: UUID | None = None
+) -> int:
+    """Append events to the spool; the caller commits."""
+    await ensure_schema(db)
+    now = int(time.time())
+    hub = hub_id or settings.hub_id
+    await db.execute(
+        text("INSERT INTO analytics_spool (enqueued_at, body) VALUES (:t, :b)"),
+        [{"t": now, "b": encode_event(event, hub)} for event in events],
+    )
+    return len(events)
+
+
+async def spool_depth(db: AsyncSession) -> tuple[int, datetime | None]:
+    """Return ``(depth, oldest_enqueued_at)`` using rowid seeks only."""
+    await ensure_schema(db)
+    row = (
+        await db.execute(
+            text(
+                "SELECT"
+                " (SELECT seq FROM analytics_spool ORDER BY seq LIMIT 1),"
+                " (SELECT seq FROM analytics_spool ORDER BY seq DESC LIMIT 1),"
+                " (SELECT enqueued_at FROM analytics_spool ORDER BY seq LIMIT 1)"
+            )
+        )
+    ).one()
+    first, last, oldest = row
+    if first is None:
+        return 0, None
+    return last - first + 1, datetime.fromtimestamp(oldest, tz=timezone.utc)
+
+
+async def read_batch(db: AsyncSession, limit: int) -> list[tuple[int, str]]:
+    await ensure_schema(db)
+    rows = await db.execute(
+        text("SELECT seq, body FROM analytics_spool ORDER BY seq LIMIT :n"), {"n": limit}
+    )
+    return [(seq, body) for seq, body in rows]
+
+
+async def acknowledge(db: AsyncSession, last_seq: int) -> None:
+    """Drop every row up to and including ``last_seq``; the caller commits."""
+    await db.execute(text("DELETE FROM analytics_spool WHERE seq <= :s"), {"s": last_seq})
+
+
+async def dead_letter(db: AsyncSession, seqs: list[int], reason: str) -> None:
+    """Copy spool rows to ``analytics_dead_letter`` before they are acknowledged."""
+    await db.execute(
+        text(
+            "INSERT OR REPLACE INTO analytics_dead_letter"
+            " SELECT seq, enqueued_at, body, :r, :t FROM analytics_spool"
+            " WHERE seq IN (SELECT value FROM json_each(:s))"
+        ),
+        {"r": reason, "t": int(time.time()), "s": json.dumps(seqs)},
+    )
+
+
+async def dead_letter_depth(db: AsyncSession) -> int:
+    await ensure_schema(db)
+    return (await db.execute(text("SELECT COUNT(*) FROM analytics_dead_letter"))).scalar_one()
+
+
+def _not_stored(rows: list[tuple[int, str]], result: dict[str, Any]) -> tuple[list[int], str]:
+    """Spool rows SuperHub accepted the batch for but did not store, with the reason."""
+    errors = result.get("errors") or 0
+    if not errors:
+        return [], ""
+    rejected = set(result.get("rejected_event_ids") or ())
+    if len(rejected) != errors:
+        return [seq for seq, _ in rows], f"SuperHub reported {errors} unnamed error(s)"
+    seqs = [seq for seq, body in rows if json.loads(body)["event_id"] in rejected]
+    return seqs, "occurred_at outside SuperHub's accepted window"
+
+
+class AnalyticsDrainer:
+    """Uploads the spool to SuperHub; scheduled through the energy-aware scheduler."""
+
+    def __init__(
+        self,
+        *,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        scheduler: EnergyAwareScheduler = default_scheduler,
+        batch_size: int | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self._scheduler = scheduler
+        self.batch_size = batch_size or settings.analytics_batch_size
+        self._transport = transport
+        self._lock = asyncio.Lock()
+        self._resume = asyncio.Event()  # wakes run() to queue the next drain job
+        self.out_of_time = False  # the last drain stopped on its time budget
+        self.drained_total = 0
+        self.last_drain_at: datetime | None = None
+        self.last_drain_events = 0
+        self.last_drain_rate_eps: float | None = None
+        self.last_error: str | None = None
+
+    @property
+    def draining(self) -> bool:
+        return self._lock.locked()
+
+    def _client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=settings.superhub_base_url,
+            timeout=settings.analytics_upload_timeout_seconds,
+            headers={
+                "X-Api-Key": settings.superhub_api_key,
+                "Content-Type": "application/json",
+                "Content-Encoding": "gzip",
+            },
+            transport=self._transport or limiter.transport(TrafficClass.bulk),
+        )
+
+    async def drain(self, *, time_budget_s: float | None = None) -> int:
+        """Ship batches until the spool is empty, SuperHub is unreachable or
+        ``time_budget_s`` has passed (checked between batches).
+
+        Returns the number of events SuperHub stored or already had.
+        Unacknowledged rows stay in the spool for the next drain; rows SuperHub
+        refused are moved to the dead-letter table.
+        """
+        if self._lock.locked():
+            return 0
+        async with self._lock:
+            sent = 0
+            started = time.perf_counter()
+            self.last_error = None
+            self.out_of_time = False
+            try:
+                async with self._client() as client:
+                    while True:
+                        async with self._session_factory() as db:
+                            rows = await read_batch(db, self.batch_size)
+                        if not rows:
+                            break
+                        resp = await client.post(
+                            _AGGREGATE_ENDPOINT, content=encode_batch([b for _, b in rows])
+                        )
+                        resp.raise_for_status()
+                        kept, reason = _not_stored(rows, resp.json())
+                        async with self._session_factory() as db:
+                            if kept:
+                                await dead_letter(db, kept, reason)
+                            await acknowledge(db, rows[-1][0])
+                            await db.commit()
+                        if kept:
+                            logger.warning(
+                                "Dead-lettered %d analytics events: %s", len(kept), reason
+                            )
+                        sent += len(rows) - len(kept)
+                        self.drained_total += len(rows) - len(kept)
+                        if len(rows) < self.batch_size:
+                            break  # that was the tail of the spool
+                        if (
+                            time_budget_s is not None
+                            and time.perf_counter() - started >= time_budget_s
+                        ):
+                            self.out_of_time = True
+                            break
+            except httpx.HTTPStatusError as exc:
+                self.last_error = f"SuperHub returned {exc.response.status_code}"
+                logger.warning("SuperHub rejected analytics batch: %s", exc.response.text[:200])
+            except httpx.RequestError as exc:
+                self.last_error = f"SuperHub unreachable: {exc.__class__.__name__}"
+                logger.warning("Cannot reach SuperHub (offline?): %s", exc)
+
+            elapsed = time.perf_counter() - started
+            self.last_drain_at = datetime.now(timezone.utc)
+            self.last_drain_events = sent
+            self.last_drain_rate_eps = round(sent / elapsed, 1) if sent and elapsed > 0 else None
+            if sent:
+                logger.info("Drained %d analytics events to SuperHub in %.2fs", sent, elapsed)
+            return sent
+
+    async def status(self, db: AsyncSession) -> dict[str, Any]:
+        depth, oldest = await spool_depth(db)
+        return {
+            "depth": depth,
+            "oldest_enqueued_at": oldest,
+            "draining": self.draining,
+            "drained_total": self.drained_total,
+            "dead_letter_depth": await dead_letter_depth(db),
+            "last_drain_at": self.last_drain_at,
+            "last_drain_events": self.last_drain_events,
+            "last_drain_rate_eps": self.last_drain_rate_eps,
+            "last_error": self.last_error,
+        }
+
+    async def maybe_schedule(self) -> bool:
+        """Queue a drain job when online and the spool is non-empty."""
+        if settings.operating_mode != "online" or self.draining:
+            return False
+        if self._scheduler.is_active(_DRAIN_JOB):
+            return False
+        async with self._session_factory() as db:
+            depth, _ = await spool_depth(db)
+        if not depth:
+            return False
+        return self._scheduler.submit(
+            _DRAIN_JOB, self._drain_job, power_w=_DRAIN_POWER_W, duration_s=_DRAIN_DURATION_S
+        )
+
+    async def _drain_job(self) -> int:
+        # One more upload may start just before the budget runs out, so leave
+        # room for its timeout: the job then never outlasts its estimate.
+        budget_s = max(_DRAIN_DURATION_S - settings.analytics_upload_timeout_seconds, 0.0)
+        sent = await self.drain(time_budget_s=budget_s)
+        if self.out_of_time:
+            # Set after the drain has released its lock; the scheduler retires
+            # this job before run() wakes, so the follow-up job is accepted.
+            self._resume.set()
+        return sent
+
+    async def run(self) -> None:
+        while True:
+            self._resume.clear()
+            try:
+                await self.maybe_schedule()
+            except Exception:
+                logger.exception("Analytics drain scheduling failed")
+            # A job that ran out of time is followed up at once, not a full interval later.
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(
+                    self._resume.wait(), settings.analytics_drain_interval_seconds
+                )
+
+
+drainer = AnalyticsDrainer()
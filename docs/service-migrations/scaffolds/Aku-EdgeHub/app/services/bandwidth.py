@@ -0,0 +1,291 @@
+"""Shared upstream bandwidth limiter and per-class byte metering.
+
+All outbound HTTP clients get their transport from ``limiter.transport(cls)``,
+so relay, sync and bulk traffic draw from one token bucket sized by
+``BANDWIDTH_LIMIT_KBPS``.  Tokens are granted in strict priority order
+(relay → sync → bulk) and in chunks of at most ``BANDWIDTH_CHUNK_KB``, so an
+inference relay queued behind a large download waits for at most one chunk.
+Bulk transfers additionally leave ``BANDWIDTH_BULK_RESERVE_KB`` in the bucket,
+so interactive traffic usually finds tokens ready and bulk only consumes the
+budget nobody else is using.
+
+Bytes are counted per UTC day and class in memory and folded into the
+``network_usage`` table every ``BANDWIDTH_USAGE_FLUSH_SECONDS``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import httpx
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.session_sqlite import AsyncSessionLocal
+from app.schemas.network import TrafficClass
+
+logger = logging.getLogger(__name__)
+
+_PRIORITY = (TrafficClass.relay, TrafficClass.sync, TrafficClass.bulk)
+
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS network_usage (
+    day           TEXT    NOT NULL,
+    traffic_class TEXT    NOT NULL,
+    bytes_up      INTEGER NOT NULL DEFAULT 0,
+    bytes_down    INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, traffic_class)
+) WITHOUT ROWID
+"""
+
+_UPSERT = """
+INSERT INTO network_usage (day, traffic_class, bytes_up, bytes_down)
+VALUES (:day, :cls, :up, :down)
+ON CONFLICT (day, traffic_class) DO UPDATE SET
+    bytes_up = bytes_up + excluded.bytes_up,
+    bytes_down = bytes_down + excluded.bytes_down
+"""
+
+_schema_ready = False
+
+
+async def ensure_schema(db: AsyncSession) -> None:
+    global _schema_ready
+    if _schema_ready:
+        return
+    await db.execute(text(_CREATE_TABLE))
+    await db.commit()
+    _schema_ready = True
+
+
+async def query_usage(db: AsyncSession, days: int) -> list[dict[str, Any]]:
+    await ensure_schema(db)
+    since = (datetime.now(timezone.utc).date() - timedelta(days=days - 1)).isoformat()
+    rows = await db.execute(
+        text(
+            "SELECT day, traffic_class, bytes_up, bytes_down FROM network_usage"
+            " WHERE day >= :since ORDER BY day DESC, traffic_class"
+        ),
+        {"since": since},
+    )
+    return [dict(row._mapping) for row in rows]
+
+
+def _request_overhead(request: httpx.Request) -> int:
+    """Approximate request-line + header bytes on the wire."""
+    line = len(request.method) + len(request.url.raw_path) + 12
+    return line + sum(len(k) + len(v) + 4 for k, v in request.headers.raw)
+
+
+def _response_overhead(response: httpx.Response) -> int:
+    return 17 + sum(len(k) + len(v) + 4 for k, v in response.headers.raw)
+
+
+class BandwidthLimiter:
+    """Strict-priority token bucket shared by every upstream transfer."""
+
+    def __init__(
+        self,
+        *,
+        rate_bytes_per_s: float | None,
+        burst_bytes: int,
+        chunk_bytes: int,
+        bulk_reserve_bytes: int = 0,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    ) -> None:
+        self.rate_bytes_per_s = rate_bytes_per_s
+        self.chunk_bytes = chunk_bytes
+        self.burst_bytes = max(burst_bytes, chunk_bytes)
+        # Bulk must still be able to take a whole chunk from a full bucket.
+        self.bulk_reserve_bytes = min(bulk_reserve_bytes, self.burst_bytes - chunk_bytes)
+        self._session_factory = session_factory
+        self._tokens = float(self.burst_bytes)
+        self._updated = time.monotonic()
+        self._waiters: dict[TrafficClass, deque[tuple[int, asyncio.Future[None]]]] = {
+            cls: deque() for cls in _PRIORITY
+        }
+        self._timer: asyncio.TimerHandle | None = None
+        self._usage: dict[tuple[str, TrafficClass], list[int]] = {}
+
+    @classmethod
+    def from_settings(cls) -> BandwidthLimiter:
+        kbps = settings.bandwidth_limit_kbps
+        return cls(
+            rate_bytes_per_s=kbps * 1000 / 8 if kbps else None,
+            burst_bytes=settings.bandwidth_burst_kb * 1024,
+            chunk_bytes=settings.bandwidth_chunk_kb * 1024,
+            bulk_reserve_bytes=settings.bandwidth_bulk_reserve_kb * 1024,
+        )
+
+    # -- token bucket -------------------------------------------------------
+
+    def _floor(self, cls: TrafficClass) -> int:
+        return self.bulk_reserve_bytes if cls is TrafficClass.bulk else 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst_bytes, self._tokens + (now - self._updated) * self.rate_bytes_per_s
+        )
+        self._updated = now
+
+    def _dispatch(self) -> None:
+        """Grant queued chunks in priority order; lower classes never overtake."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._refill()
+        for cls in _PRIORITY:
+            queue = self._waiters[cls]
+            while queue:
+                nbytes, fut = queue[0]
+                if fut.done():  # cancelled while waiting
+                    queue.popleft()
+                    continue
+                deficit = nbytes + self._floor(cls) - self._tokens
+                if deficit > 0:
+                    self._timer = asyncio.get_running_loop().call_later(
+                        deficit / self.rate_bytes_per_s, self._dispatch
+                    )
+                    return
+                self._tokens -= nbytes
+                queue.popleft()
+                fut.set_result(None)
+
+    async def acquire(self, cls: TrafficClass, nbytes: int) -> None:
+        """Wait until ``nbytes`` may be transferred as ``cls``."""
+        if self.rate_bytes_per_s is None:
+            return
+        remaining = nbytes
+        while remaining > 0:
+            take = min(remaining, self.chunk_bytes)
+            remaining -= take
+            if not any(self._waiters.values()):
+                self._refill()
+                if self._tokens - take >= self._floor(cls):
+                    self._tokens -= take
+                    continue
+            fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+            self._waiters[cls].append((take, fut))
+            self._dispatch()
+            await fut
+
+    def waiting(self) -> dict[TrafficClass, int]:
+        return {
+            cls: sum(1 for _, fut in queue if not fut.done())
+            for cls, queue in self._waiters.items()
+        }
+
+    # -- metering -----------------------------------------------------------
+
+    def record(self, cls: TrafficClass, *, up: int = 0, down: int = 0) -> None:
+        self._add((datetime.now(timezone.utc).date().isoformat(), cls), up, down)
+
+    def _add(self, key: tuple[str, TrafficClass], up: int, down: int) -> None:
+        counters = self._usage.get(key)
+        if counters is None:
+            counters = self._usage[key] = [0, 0]
+        counters[0] += up
+        counters[1] += down
+
+    async def flush_usage(self, db: AsyncSession) -> int:
+        """Fold in-memory counters into ``network_usage``; returns rows written."""
+        await ensure_schema(db)
+        pending, self._usage = self._usage, {}
+        if not pending:
+            return 0
+        try:
+            await db.execute(
+                text(_UPSERT),
+                [
+                    {"day": day, "cls": str(cls), "up": up, "down": down}
+                    for (day, cls), (up, down) in pending.items()
+                ],
+            )
+            await db.commit()
+        except Exception:
+            for key, (up, down) in pending.items():
+                self._add(key, up, down)
+            raise
+        return len(pending)
+
+    # -- httpx integration --------------------------------------------------
+
+    def transport(
+        self, cls: TrafficClass, inner: httpx.AsyncBaseTransport | None = None
+    ) -> ThrottledTransport:
+        return ThrottledTransport(self, cls, inner)
+
+    async def run(self) -> None:
+        try:
+            while True:
+                await asyncio.sleep(settings.bandwidth_usage_flush_seconds)
+                try:
+                    async with self._session_factory() as db:
+                        await self.flush_usage(db)
+                except Exception:
+                    logger.exception("Network usage flush failed")
+        finally:
+            with contextlib.suppress(Exception):
+                async with self._session_factory() as db:
+                    await self.flush_usage(db)
+
+
+class _ThrottledStream(httpx.AsyncByteStream):
+    def __init__(
+        self, inner: httpx.AsyncByteStream, limiter: BandwidthLimiter, cls: TrafficClass
+    ) -> None:
+        self._inner = inner
+        self._limiter = limiter
+        self._cls = cls
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._inner:
+            await self._limiter.acquire(self._cls, len(chunk))
+            self._limiter.record(self._cls, down=len(chunk))
+            yield chunk
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+class ThrottledTransport(httpx.AsyncBaseTransport):
+    """httpx transport that meters and throttles one traffic class."""
+
+    def __init__(
+        self,
+        limiter: BandwidthLimiter,
+        cls: TrafficClass,
+        inner: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self._limiter = limiter
+        self._cls = cls
+        self._inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        up = len(await request.aread()) + _request_overhead(request)
+        await self._limiter.acquire(self._cls, up)
+        self._limiter.record(self._cls, up=up)
+
+        response = await self._inner.handle_async_request(request)
+        self._limiter.record(self._cls, down=_response_overhead(response))
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ThrottledStream(response.stream, self._limiter, self._cls),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+limiter = BandwidthLimiter.from_settings()
@@ -0,0 +1,407 @@
+"""Energy-monitor telemetry ingestion and time-series rollups.
+
+The INA3221 firmware (Aku-Hardware ``firmware/energy-monitor``) prints one JSON
+line per second to USB serial.  ``EnergyIngester`` tails that stream — a serial
+device such as ``/dev/ttyACM0``, or a plain file / FIFO as a local stand-in —
+parses lines in batches and writes them to SQLite.
+
+Storage layout (all values in milli-units: mV / mA, stored as INTEGER):
+
+* ``energy_raw``    — one row per second keyed by unix ts (rowid table, no
+  secondary indexes); kept for ``ENERGY_RAW_RETENTION_HOURS`` only.
+* ``energy_rollup`` — min / sum / max per metric for 1 min and 1 h buckets,
+  upserted incrementally at ingest time so queries never scan raw rows.
+
+The first reading stored for a second wins; later ones for the same second are
+dropped from the raw table and the rollups alike, so rollup ``samples`` always
+match the raw rows that were written.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections.abc import Iterable
+from typing import IO, NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.session_sqlite import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+METRICS: tuple[str, ...] = ("solar_v", "solar_a", "wind_v", "wind_a", "load_v", "load_a")
+
+MINUTE = 60
+HOUR = 3600
+RESOLUTIONS: tuple[int, ...] = (MINUTE, HOUR)
+
+# Firmware timestamps below this (2020-09-13) come from a Pico whose RTC was
+# never set — fall back to the hub's receive time instead.
+_MIN_PLAUSIBLE_TS = 1_600_000_000
+
+_EOF_POLL_SECONDS = 0.25
+_REOPEN_BACKOFF_SECONDS = 5.0
+_RETENTION_INTERVAL_SECONDS = 600.0
+
+_AGGS = ("min", "sum", "max")
+_ROLLUP_COLUMNS = [f"{m}_{agg}" for m in METRICS for agg in _AGGS]
+
+_CREATE_TABLES = (
+    f"""
+    CREATE TABLE IF NOT EXISTS energy_raw (
+        ts INTEGER PRIMARY KEY,
+        {", ".join(f"{m} INTEGER NOT NULL" for m in METRICS)}
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS energy_rollup (
+        resolution INTEGER NOT NULL,
+        bucket     INTEGER NOT NULL,
+        samples    INTEGER NOT NULL,
+        {", ".join(f"{c} INTEGER NOT NULL" for c in _ROLLUP_COLUMNS)},
+        PRIMARY KEY (resolution, bucket)
+    ) WITHOUT ROWID
+    """,
+)
+
+_EXISTING_RAW = "SELECT ts FROM energy_raw WHERE ts IN (SELECT value FROM json_each(:ts))"
+
+_INSERT_RAW = f"""
+INSERT INTO energy_raw (ts, {", ".join(METRICS)})
+VALUES (:ts, {", ".join(f":{m}" for m in METRICS)})
+"""
+
+_UPSERT_ROLLUP = f"""
+INSERT INTO energy_rollup (resolution, bucket, samples, {", ".join(_ROLLUP_COLUMNS)})
+VALUES (:resolution, :bucket, :samples, {", ".join(f":{c}" for c in _ROLLUP_COLUMNS)})
+ON CONFLICT (resolution, bucket) DO UPDATE SET
+    samples = samples + excluded.samples,
+    {", ".join(
+        f"{m}_min = MIN({m}_min, excluded.{m}_min), "
+        f"{m}_sum = {m}_sum + excluded.{m}_sum, "
+        f"{m}_max = MAX({m}_max, excluded.{m}_max)"
+        for m in METRICS
+    )}
+"""
+
+_schema_ready = False
+
+
+class EnergySample(NamedTuple):
+    """One firmware reading; electrical values in milli-units (mV / mA)."""
+
+    ts: int
+    solar_v: int
+    solar_a: int
+    wind_v: int
+    wind_a: int
+    load_v: int
+    load_a: int
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+
+
+def parse_line(line: str, *, received_at: float | None = None) -> EnergySample | None:
+    """Parse one firmware JSON line; returns None for blank, error or malformed lines."""
+    line = line.strip()
+    if not line.startswith("{"):
+        return None
+    try:
+        data = json.loads(line)
+        values = [round(float(data[m]) * 1000) for m in METRICS]
+    except (ValueError, KeyError, TypeError):
+        return None
+
+    ts = data.get("ts")
+    if not isinstance(ts, int | float) or ts < _MIN_PLAUSIBLE_TS:
+        ts = received_at if received_at is not None else time.time()
+    return EnergySample(int(ts), *values)
+
+
+def parse_lines(lines: Iterable[str], *, received_at: float | None = None) -> list[EnergySample]:
+    """Parse a batch of lines, dropping anything that is not a reading."""
+    samples = []
+    for line in lines:
+        sample = parse_line(line, received_at=received_at)
+        if sample is not None:
+            samples.append(sample)
+    return samples
+
+
+# ---------------------------------------------------------------------------
+# Storage
+# ---------------------------------------------------------------------------
+
+
+async def ensure_schema(db: AsyncSession) -> None:
+    global _schema_ready
+    if _schema_ready:
+        return
+    for ddl in _CREATE_TABLES:
+        await db.execute(text(ddl))
+    await db.commit()
+    _schema_ready = True
+
+
+def _rollup_rows(samples: list[EnergySample], resolution: int) -> list[dict[str, int]]:
+    """Pre-aggregate a batch per bucket so each bucket costs one upsert."""
+    buckets: dict[int, dict[str, int]] = {}
+    for sample in samples:
+        bucket = sample.ts - sample.ts % resolution
+        row = buckets.get(bucket)
+        if row is None:
+            row = {"resolution": resolution, "bucket": bucket, "samples": 0}
+            for m in METRICS:
+                value = getattr(sample, m)
+                row[f"{m}_min"] = value
+                row[f"{m}_sum"] = 0
+                row[f"{m}_max"] = value
+            buckets[bucket] = row
+        row["samples"] += 1
+        for m in METRICS:
+            value = getattr(sample, m)
+            if value < row[f"{m}_min"]:
+                row[f"{m}_min"] = value
+            elif value > row[f"{m}_max"]:
+                row[f"{m}_max"] = value
+            row[f"{m}_sum"] += value
+    return list(buckets.values())
+
+
+async def ingest_batch(db: AsyncSession, samples: list[EnergySample]) -> int:
+    """Write raw samples and fold them into the 1 min / 1 h rollups.
+
+    Samples for a second that is already stored, in the table or earlier in
+    the batch, are skipped by both.  Returns the number of samples stored.
+
+    The caller owns the transaction (``get_db`` commits for request handlers,
+    ``EnergyIngester`` commits per batch).
+    """
+    if not samples:
+        return 0
+    await ensure_schema(db)
+    stored = await db.execute(text(_EXISTING_RAW), {"ts": json.dumps([s.ts for s in samples])})
+    seen = set(stored.scalars())
+    fresh = []
+    for sample in samples:
+        if sample.ts not in seen:
+            seen.add(sample.ts)
+            fresh.append(sample)
+    if not fresh:
+        return 0
+    await db.execute(text(_INSERT_RAW), [s._asdict() for s in fresh])
+    for resolution in RESOLUTIONS:
+        await db.execute(text(_UPSERT_ROLLUP), _rollup_rows(fresh, resolution))
+    return len(fresh)
+
+
+async def apply_retention(db: AsyncSession, *, now: float | None = None) -> None:
+    """Drop raw rows and rollup buckets that have aged out of their window."""
+    await ensure_schema(db)
+    now = now if now is not None else time.time()
+    await db.execute(
+        text("DELETE FROM energy_raw WHERE ts < :cutoff"),
+        {"cutoff": int(now - settings.energy_raw_retention_hours * HOUR)},
+    )
+    for resolution, days in (
+        (MINUTE, settings.energy_minute_retention_days),
+        (HOUR, settings.energy_hour_retention_days),
+    ):
+        await db.execute(
+            text("DELETE FROM energy_rollup WHERE resolution = :res AND bucket < :cutoff"),
+            {"res": resolution, "cutoff": int(now - days * 86_400)},
+        )
+
+
+async def query_rollups(
+    db: AsyncSession,
+    *,
+    resolution: int,
+    since: int,
+    until: int,
+    limit: int,
+) -> list[dict[str, object]]:
+    """Return rollup buckets in [since, until) ordered oldest first."""
+    await ensure_schema(db)
+    result = await db.execute(
+        text(
+            """
+            SELECT * FROM energy_rollup
+            WHERE resolution = :res AND bucket >= :since AND bucket < :until
+            ORDER BY bucket
+            LIMIT :limit
+            """
+        ),
+        {"res": resolution, "since": since, "until": until, "limit": limit},
+    )
+    return [dict(row) for row in result.mappings()]
+
+
+class PowerReading(NamedTuple):
+    """Average power flows in watts over a recent telemetry window."""
+
+    solar_w: float
+    wind_w: float
+    load_w: float
+
+    @property
+    def net_w(self) -> float:
+        return self.solar_w + self.wind_w - self.load_w
+
+
+def sample_power(sample: EnergySample) -> PowerReading:
+    """Instantaneous power of a single reading (mV × mA = µW)."""
+    return PowerReading(
+        solar_w=sample.solar_v * sample.solar_a / 1e6,
+        wind_w=sample.wind_v * sample.wind_a / 1e6,
+        load_w=sample.load_v * sample.load_a / 1e6,
+    )
+
+
+async def recent_power(
+    db: AsyncSession, *, window_seconds: int, now: float | None = None
+) -> PowerReading | None:
+    """Average power over the last ``window_seconds`` of raw telemetry, or None if stale."""
+    await ensure_schema(db)
+    now = now if now is not None else time.time()
+    result = await db.execute(
+        text(
+            """
+            SELECT COUNT(*) AS n,
+                   AVG(solar_v * solar_a) AS solar,
+                   AVG(wind_v * wind_a)   AS wind,
+                   AVG(load_v * load_a)   AS load
+            FROM energy_raw WHERE ts >= :since
+            """
+        ),
+        {"since": int(now - window_seconds)},
+    )
+    row = result.mappings().one()
+    if not row["n"]:
+        return None
+    return PowerReading(
+        solar_w=row["solar"] / 1e6, wind_w=row["wind"] / 1e6, load_w=row["load"] / 1e6
+    )
+
+
+# ---------------------------------------------------------------------------
+# Ingester (background task)
+# ---------------------------------------------------------------------------
+
+
+class EnergyIngester:
+    """Tails the energy-monitor stream and persists readings in batches.
+
+    ``run()`` is meant to be wrapped with ``asyncio.create_task()`` from the
+    application lifespan.  Blocking reads happen in a worker thread so a
+    serial device that stalls never blocks the event loop.  Each line is
+    stamped when it arrives, for readings without a usable firmware clock.
+    A seekable source (the file stand-in) is reopened at the end of the last
+    stored batch, so a read or database error never ingests a line twice.
+    """
+
+    def __init__(
+        self,
+        source_path: str,
+        *,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        batch_size: int | None = None,
+        flush_seconds: float | None = None,
+    ) -> None:
+        self.source_path = source_path
+        self._session_factory = session_factory
+        self._batch_size = batch_size or settings.energy_batch_size
+        self._flush_seconds = flush_seconds or settings.energy_flush_seconds
+        self._partial = b""
+        self._offset = 0  # end of the last stored batch, for seekable sources
+        self._read_offset: int | None = None  # end of the last batch read
+        self._last_retention = 0.0
+        self.samples_ingested = 0
+        self.samples_duplicate = 0
+        self.lines_rejected = 0
+
+    def _read_lines(self, fh: IO[bytes]) -> list[tuple[float, str]]:
+        """Blocking read of up to one batch of ``(received_at, line)``, returning
+        early after the flush interval."""
+        lines: list[tuple[float, str]] = []
+        deadline = time.monotonic() + self._flush_seconds
+        while len(lines) < self._batch_size:
+            chunk = fh.readline()
+            if chunk:
+                chunk = self._partial + chunk
+                if chunk.endswith(b"\n"):
+                    self._partial = b""
+                    lines.append((time.time(), chunk.decode("utf-8", errors="replace")))
+                else:
+                    # Writer is mid-line (file stand-in); keep it for the next read.
+                    self._partial = chunk
+                continue
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(_EOF_POLL_SECONDS)
+        self._read_offset = fh.tell() - len(self._partial) if fh.seekable() else None
+        return lines
+
+    def _seek_to_offset(self, fh: IO[bytes]) -> None:
+        """Resume a reopened source after the last stored line."""
+        self._partial = b""  # re-read from the offset, or stale on a new stream
+        if not fh.seekable():
+            return
+        if self._offset > os.fstat(fh.fileno()).st_size:
+            self._offset = 0  # truncated or replaced: start over
+        fh.seek(self._offset)
+
+    async def flush(self, lines: list[tuple[float, str]]) -> int:
+        """Parse and store one batch; returns the number of samples stored."""
+        samples = []
+        for received_at, line in lines:
+            sample = parse_line(line, received_at=received_at)
+            if sample is not None:
+                samples.append(sample)
+        self.lines_rejected += len(lines) - len(samples)
+        if not samples:
+            return 0
+        async with self._session_factory() as db:
+            stored = await ingest_batch(db, samples)
+            if time.monotonic() - self._last_retention >= _RETENTION_INTERVAL_SECONDS:
+                await apply_retention(db)
+                self._last_retention = time.monotonic()
+            await db.commit()
+        self.samples_ingested += stored
+        self.samples_duplicate += len(samples) - stored
+        return stored
+
+    async def run(self) -> None:
+        logger.info("Energy ingester tailing %s", self.source_path)
+        while True:
+            try:
+                fh = await asyncio.to_thread(open, self.source_path, "rb")
+            except OSError as exc:
+                logger.warning("Cannot open energy source %s: %s", self.source_path, exc)
+                await asyncio.sleep(_REOPEN_BACKOFF_SECONDS)
+                continue
+
+            try:
+                self._seek_to_offset(fh)
+                while True:
+                    lines = await asyncio.to_thread(self._read_lines, fh)
+                    if lines:
+                        await self.flush(lines)
+                    if self._read_offset is not None:
+                        self._offset = self._read_offset
+            except OSError as exc:
+                logger.warning("Energy source %s read failed: %s", self.source_path, exc)
+            except Exception:
+                logger.exception("Energy ingester batch failed — reopening source")
+            finally:
+                fh.close()
+            await asyncio.sleep(_REOPEN_BACKOFF_SECONDS)
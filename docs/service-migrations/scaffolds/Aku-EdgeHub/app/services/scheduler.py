@@ -0,0 +1,230 @@
+"""Energy-budget-aware scheduler for EdgeHub background work.
+
+Solar-powered hubs must not run content downloads, sync drains or analytics
+uploads flat out after sunset.  The scheduler keeps an energy *credit* in Wh:
+
+* every tick it reads recent energy-monitor telemetry and adds the baseline
+  net power (solar + wind − load, with the estimated draw of jobs it is
+  already running added back so they are not counted twice) × elapsed time;
+* credit is clamped to ``[0, capacity]`` — deficits drain it, so heavy work
+  stops soon after net power turns negative;
+* a heavy job is admitted only when its estimated energy (power × duration)
+  fits in the remaining credit, which is debited up front.  Pending jobs are
+  packed first-fit in submission order, so small jobs fill the gaps that a
+  large one cannot use yet.
+
+Light jobs always run.  When no fresh telemetry exists (mains-powered hub or
+no energy monitor attached) heavy jobs run unconstrained up to the
+concurrency limit.
+
+``observe()`` / ``admit()`` / ``finish()`` are pure bookkeeping so the policy can be replayed
+against recorded telemetry; ``run()`` drives them from the application
+lifespan and executes admitted jobs as asyncio tasks.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.session_sqlite import AsyncSessionLocal
+from app.services.energy import PowerReading, recent_power
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """A unit of background work with an energy estimate."""
+
+    __slots__ = ("name", "run", "power_w", "duration_s", "heavy", "submitted_at", "started_at")
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[], Awaitable[Any]] | None,
+        *,
+        power_w: float,
+        duration_s: float,
+        heavy: bool = True,
+    ) -> None:
+        self.name = name
+        self.run = run
+        self.power_w = power_w
+        self.duration_s = duration_s
+        self.heavy = heavy
+        self.submitted_at = time.monotonic()
+        self.started_at: float | None = None
+
+    @property
+    def energy_wh(self) -> float:
+        return self.power_w * self.duration_s / 3600
+
+
+class EnergyAwareScheduler:
+    """Defers heavy background jobs until harvested surplus energy can pay for them."""
+
+    def __init__(
+        self,
+        *,
+        capacity_wh: float | None = None,
+        max_heavy_jobs: int | None = None,
+        tick_seconds: float | None = None,
+        telemetry_window_seconds: int | None = None,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    ) -> None:
+        self.capacity_wh = capacity_wh or settings.scheduler_budget_capacity_wh
+        self.max_heavy_jobs = max_heavy_jobs or settings.scheduler_max_heavy_jobs
+        self.tick_seconds = tick_seconds or settings.scheduler_tick_seconds
+        self.telemetry_window_seconds = (
+            telemetry_window_seconds or settings.scheduler_telemetry_window_seconds
+        )
+        self._session_factory = session_factory
+
+        self.credit_wh = 0.0
+        self._observed_at = time.monotonic()
+        # Draw of jobs that finished since the last observation; still in the telemetry.
+        self._finished_draw_wh = 0.0
+        self.last_reading: PowerReading | None = None
+        self._pending: dict[str, Job] = {}
+        self._running: dict[str, Job] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+        self.completed = 0
+        self.failed = 0
+
+    # -- submission ---------------------------------------------------------
+
+    def submit(
+        self,
+        name: str,
+        run: Callable[[], Awaitable[Any]] | None,
+        *,
+        power_w: float,
+        duration_s: float,
+        heavy: bool = True,
+    ) -> bool:
+        """Queue a job; returns False if a job with the same name is already queued or running."""
+        if name in self._pending or name in self._running:
+            return False
+        self._pending[name] = Job(name, run, power_w=power_w, duration_s=duration_s, heavy=heavy)
+        return True
+
+    def is_active(self, name: str) -> bool:
+        return name in self._pending or name in self._running
+
+    # -- policy -------------------------------------------------------------
+
+    @property
+    def running_power_w(self) -> float:
+        return sum(job.power_w for job in self._running.values() if job.heavy)
+
+    def observe(self, reading: PowerReading | None, dt_s: float) -> None:
+        """Fold the telemetry for the elapsed interval into the energy credit."""
+        self.last_reading = reading
+        self._observed_at = time.monotonic()
+        finished_draw_wh, self._finished_draw_wh = self._finished_draw_wh, 0.0
+        if reading is None:
+            return
+        baseline_net_w = reading.net_w + self.running_power_w
+        self.credit_wh += baseline_net_w * dt_s / 3600 + finished_draw_wh
+        self.credit_wh = min(max(self.credit_wh, 0.0), self.capacity_wh)
+
+    def admit(self) -> list[Job]:
+        """Move every pending job the current credit can pay for to running."""
+        reading = self.last_reading
+        admitted: list[Job] = []
+        heavy_slots = self.max_heavy_jobs - sum(1 for j in self._running.values() if j.heavy)
+        for job in list(self._pending.values()):
+            if job.heavy:
+                if heavy_slots <= 0:
+                    continue
+                if reading is not None:
+                    # A job bigger than the whole budget runs once credit is full.
+                    cost_wh = min(job.energy_wh, self.capacity_wh)
+                    if cost_wh > self.credit_wh:
+                        continue
+                    self.credit_wh -= cost_wh
+                heavy_slots -= 1
+            del self._pending[job.name]
+            job.started_at = time.monotonic()
+            self._running[job.name] = job
+            admitted.append(job)
+        return admitted
+
+    def plan(self, reading: PowerReading | None, dt_s: float) -> list[Job]:
+        """Update the energy credit for the elapsed interval and return jobs to start now."""
+        self.observe(reading, dt_s)
+        return self.admit()
+
+    def finish(self, job: Job, *, ok: bool = True) -> None:
+        if self._running.pop(job.name, None) is not None and job.heavy:
+            elapsed_s = time.monotonic() - max(self._observed_at, job.started_at or 0.0)
+            self._finished_draw_wh += job.power_w * elapsed_s / 3600
+        if ok:
+            self.completed += 1
+        else:
+            self.failed += 1
+
+    def overdue(self, factor: float) -> list[str]:
+        """Names of running jobs that have exceeded ``factor`` × their estimated duration."""
+        now = time.monotonic()
+        return [
+            job.name
+            for job in self._running.values()
+            if job.started_at is not None and now - job.started_at > job.duration_s * factor
+        ]
+
+    def status(self) -> dict[str, Any]:
+        reading = self.last_reading
+        return {
+            "constrained": reading is not None,
+            "net_power_w": round(reading.net_w, 2) if reading else None,
+            "credit_wh": round(self.credit_wh, 3),
+            "capacity_wh": self.capacity_wh,
+            "pending": sorted(self._pending),
+            "running": sorted(self._running),
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+    # -- runtime ------------------------------------------------------------
+
+    async def _execute(self, job: Job) -> None:
+        ok = False
+        try:
+            if job.run is not None:
+                await job.run()
+            ok = True
+        except Exception:
+            logger.exception("Scheduled job %s failed", job.name)
+        finally:
+            self.finish(job, ok=ok)
+
+    async def tick(self, dt_s: float) -> list[Job]:
+        async with self._session_factory() as db:
+            reading = await recent_power(db, window_seconds=self.telemetry_window_seconds)
+        admitted = self.plan(reading, dt_s)
+        for job in admitted:
+            task = asyncio.create_task(self._execute(job), name=f"job-{job.name}")
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return admitted
+
+    async def run(self) -> None:
+        last = time.monotonic()
+        while True:
+            now = time.monotonic()
+            try:
+                await self.tick(now - last)
+            except Exception:
+                logger.exception("Scheduler tick failed")
+            last = now
+            await asyncio.sleep(self.tick_seconds)
+
+
+scheduler = EnergyAwareScheduler()
@@ -9,6 +9,8 @@ from datetime import datetime, timezone
 import httpx
 
 from app.core.config import settings
+from app.schemas.network import TrafficClass
+from app.services.bandwidth import limiter
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +41,7 @@ async def trigger_cloud_sync(
             base_url=settings.akudemy_base_url,
             timeout=settings.sync_timeout_seconds,
             headers={"X-Api-Key": settings.akudemy_api_key},
+            transport=limiter.transport(TrafficClass.sync),
         ) as client:
             resp = await client.post(_SYNC_ENDPOINT, json=payload)
             resp.raise_for_status()
@@ -75,6 +78,7 @@ async def relay_infer(payload: dict[str, object]) -> dict[str, object]:
         base_url=settings.akuai_base_url,
         timeout=settings.infer_timeout_seconds,
         headers={"X-Api-Key": settings.akuai_api_key},
+        transport=limiter.transport(TrafficClass.relay),
     ) as client:
         resp = await client.post(_INFER_ENDPOINT, json=payload)
         resp.raise_for_status()
@@ -0,0 +1,203 @@
+"""Event-loop health monitor driving the hardware device-watchdog heartbeat.
+
+The Pico running ``firmware/device-watchdog`` power-cycles the SBC when it stops
+receiving ``PING\\n`` over UART for 90 s.  ``LoopHealthMonitor`` only writes
+that heartbeat while the service is demonstrably healthy:
+
+* event-loop lag — how late a short ``asyncio.sleep`` wakes up, kept in a
+  fixed-size window (p99 must stay under ``WATCHDOG_MAX_LOOP_LAG_MS``);
+* DB round-trip — a timed ``SELECT 1`` against the local SQLite store;
+* stuck tasks — scheduler jobs running far past their estimated duration.
+
+The monitor runs on the event loop itself, so a wedged loop or a hung database
+stops the heartbeat and the watchdog hard-resets the hub.
+
+A serial device is put in raw 8N1 mode at 115200 baud, the firmware's UART
+setting, each time it is opened; a regular-file stand-in is written as is.
+The device is never created: a missing or unwritable one is reported as a
+problem, so a wrong ``WATCHDOG_DEVICE_PATH`` shows up in the health check
+instead of heartbeats landing in a stray file.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import os
+import termios
+import time
+import tty
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.session_sqlite import AsyncSessionLocal
+from app.services.scheduler import EnergyAwareScheduler
+from app.services.scheduler import scheduler as default_scheduler
+
+logger = logging.getLogger(__name__)
+
+_LAG_WINDOW = 120  # samples kept for percentiles (60 s at the default 0.5 s interval)
+_HEARTBEAT = b"PING\n"
+_BAUD = termios.B115200  # firmware/device-watchdog UART speed
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already-sorted list."""
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _configure_uart(fd: int) -> None:
+    """Raw 8N1 at ``_BAUD``, ignoring modem lines, so ``PING\n`` goes out byte for byte."""
+    if not os.isatty(fd):
+        return
+    tty.setraw(fd)
+    attrs = termios.tcgetattr(fd)
+    attrs[2] |= termios.CLOCAL  # cflag
+    attrs[4] = attrs[5] = _BAUD  # ispeed, ospeed
+    termios.tcsetattr(fd, termios.TCSANOW, attrs)
+
+
+class LoopHealthMonitor:
+    """Measures loop lag, DB latency and stuck jobs; writes the UART heartbeat while healthy."""
+
+    def __init__(
+        self,
+        *,
+        device_path: str | None = None,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        scheduler: EnergyAwareScheduler = default_scheduler,
+    ) -> None:
+        self.device_path = device_path
+        self._session_factory = session_factory
+        self._scheduler = scheduler
+        self._lags_ms: deque[float] = deque(maxlen=_LAG_WINDOW)
+        self.db_rtt_ms: float | None = None
+        self.stuck_tasks = 0
+        self.heartbeats_sent = 0
+        self.heartbeats_withheld = 0
+        self.last_heartbeat_at: datetime | None = None
+        self.last_problems: list[str] = []
+
+    # -- measurements -------------------------------------------------------
+
+    def record_lag(self, lag_ms: float) -> None:
+        self._lags_ms.append(max(lag_ms, 0.0))
+
+    async def sample_lag(self, interval_s: float) -> float:
+        loop = asyncio.get_running_loop()
+        expected = loop.time() + interval_s
+        await asyncio.sleep(interval_s)
+        lag_ms = (loop.time() - expected) * 1000
+        self.record_lag(lag_ms)
+        return lag_ms
+
+    async def probe_db(self) -> float:
+        """Time a trivial query; a timeout counts as an infinite round trip."""
+        timeout_s = settings.watchdog_max_db_rtt_ms / 1000
+        start = time.perf_counter()
+        try:
+            async with self._session_factory() as db:
+                await asyncio.wait_for(db.execute(text("SELECT 1")), timeout=timeout_s)
+            rtt_ms = (time.perf_counter() - start) * 1000
+        except Exception as exc:  # includes TimeoutError
+            logger.warning("Watchdog DB probe failed: %r", exc)
+            rtt_ms = math.inf
+        self.db_rtt_ms = rtt_ms
+        return rtt_ms
+
+    def lag_percentiles(self) -> dict[str, float]:
+        ordered = sorted(self._lags_ms)
+        return {
+            "p50": round(_percentile(ordered, 50), 3),
+            "p95": round(_percentile(ordered, 95), 3),
+            "p99": round(_percentile(ordered, 99), 3),
+            "max": round(ordered[-1], 3) if ordered else 0.0,
+        }
+
+    # -- decision -----------------------------------------------------------
+
+    def problems(self) -> list[str]:
+        """Threshold breaches that must withhold the heartbeat; empty means healthy."""
+        found: list[str] = []
+        p99 = self.lag_percentiles()["p99"]
+        if p99 > settings.watchdog_max_loop_lag_ms:
+            found.append(f"event-loop lag p99 {p99:.0f} ms")
+        if self.db_rtt_ms is not None and self.db_rtt_ms > settings.watchdog_max_db_rtt_ms:
+            found.append(f"DB round-trip {self.db_rtt_ms:.0f} ms")
+        if self.stuck_tasks > settings.watchdog_max_stuck_tasks:
+            found.append(f"{self.stuck_tasks} stuck task(s)")
+        return found
+
+    @staticmethod
+    def _write_heartbeat(path: str) -> None:
+        # Non-blocking open: a tty without CLOCAL would otherwise wait for carrier detect.
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_NOCTTY | os.O_NONBLOCK)
+        try:
+            _configure_uart(fd)
+            os.set_blocking(fd, True)
+            os.write(fd, _HEARTBEAT)
+        finally:
+            os.close(fd)
+
+    async def check_and_heartbeat(self) -> bool:
+        """Refresh DB / stuck-task measurements and write ``PING`` if healthy."""
+        await self.probe_db()
+        self.stuck_tasks = len(self._scheduler.overdue(settings.watchdog_stuck_task_factor))
+        self.last_problems = self.problems()
+        if self.last_problems:
+            self.heartbeats_withheld += 1
+            logger.error("Withholding watchdog heartbeat: %s", "; ".join(self.last_problems))
+            return False
+        if self.device_path:
+            try:
+                await asyncio.to_thread(self._write_heartbeat, self.device_path)
+            except OSError as exc:
+                self.last_problems = [f"heartbeat device {self.device_path}: {exc.strerror or exc}"]
+                self.heartbeats_withheld += 1
+                logger.error("Cannot write heartbeat to %s: %s", self.device_path, exc)
+                return False
+        self.heartbeats_sent += 1
+        self.last_heartbeat_at = datetime.now(timezone.utc)
+        return True
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "healthy": not self.last_problems,
+            "loop_lag_ms": self.lag_percentiles(),
+            "db_rtt_ms": (
+                round(self.db_rtt_ms, 3)
+                if self.db_rtt_ms is not None and math.isfinite(self.db_rtt_ms)
+                else None
+            ),
+            "stuck_tasks": self.stuck_tasks,
+            "heartbeat_device": self.device_path,
+            "last_heartbeat_at": self.last_heartbeat_at,
+            "problems": self.last_problems,
+        }
+
+    # -- lifespan tasks -----------------------------------------------------
+
+    async def run(self) -> None:
+        lag_interval = settings.watchdog_lag_sample_seconds
+        heartbeat_every = settings.watchdog_heartbeat_seconds
+        next_heartbeat = time.monotonic()
+        while True:
+            await self.sample_lag(lag_interval)
+            if time.monotonic() >= next_heartbeat:
+                try:
+                    await self.check_and_heartbeat()
+                except Exception:
+                    logger.exception("Watchdog health check failed")
+                next_heartbeat = time.monotonic() + heartbeat_every
+
+
+monitor = LoopHealthMonitor(device_path=settings.watchdog_device_path)
@@ -52,3 +52,17 @@ async def client() -> AsyncClient:
         base_url="http://test",
     ) as ac:
         yield ac
+
+
+@pytest.fixture
+async def db() -> AsyncGenerator[AsyncSession, None]:
+    """Session on the shared in-memory test database (for service-level tests)."""
+    async with _TestSessionLocal() as session:
+        yield session
+        await session.commit()
+
+
+@pytest.fixture
+def session_factory() -> async_sessionmaker[AsyncSession]:
+    """Session factory for background components that open their own sessions."""
+    return _TestSessionLocal
@@ -0,0 +1,231 @@
+"""Tests for the durable analytics spool and its batched gzip drain to SuperHub."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import uuid
+
+import httpx
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.schemas.analytics import AnalyticsEventIn, AnalyticsEventType
+from app.services import analytics_spool as spool_svc
+from app.services.analytics_spool import AnalyticsDrainer
+from app.services.scheduler import EnergyAwareScheduler
+
+_HUB = uuid.UUID("5e1f0c3a-9d2b-4c47-8a11-0f6d2b7c9e01")
+
+
+@pytest.fixture
+async def empty_spool(db: AsyncSession) -> AsyncSession:
+    await spool_svc.ensure_schema(db)
+    await db.execute(text("DELETE FROM analytics_spool"))
+    await db.execute(text("DELETE FROM analytics_dead_letter"))
+    await db.commit()
+    return db
+
+
+def _events(n: int) -> list[AnalyticsEventIn]:
+    learner = uuid.uuid4()
+    return [
+        AnalyticsEventIn(learner_id=learner, event_type=AnalyticsEventType.CONTENT_VIEW)
+        for _ in range(n)
+    ]
+
+
+class _SuperHub:
+    """Records decoded batches; ``fail_on`` maps request number -> HTTP status or error."""
+
+    def __init__(self, fail_on: dict[int, int | Exception] | None = None) -> None:
+        self.batches: list[list[dict[str, object]]] = []
+        self.requests = 0
+        self.fail_on = fail_on or {}
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        failure = self.fail_on.get(self.requests)
+        if isinstance(failure, Exception):
+            raise failure
+        assert request.url.path == "/api/v1/analytics/aggregate"
+        assert request.headers["content-encoding"] == "gzip"
+        events = json.loads(gzip.decompress(request.content))["events"]
+        if failure:
+            return httpx.Response(failure, json={"detail": "unavailable"})
+        self.batches.append(events)
+        return httpx.Response(
+            200, json={"received": len(events), "inserted": len(events), "duplicates": 0}
+        )
+
+
+def _drainer(
+    session_factory: async_sessionmaker[AsyncSession], hub: _SuperHub, **kwargs: object
+) -> AnalyticsDrainer:
+    return AnalyticsDrainer(
+        session_factory=session_factory,
+        scheduler=EnergyAwareScheduler(),
+        transport=httpx.MockTransport(hub),
+        **kwargs,
+    )
+
+
+async def test_drain_ships_maximal_gzip_batches_in_order(
+    empty_spool: AsyncSession, session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    events = _events(2_500)
+    await spool_svc.spool_events(empty_spool, events, hub_id=_HUB)
+    await empty_spool.commit()
+
+    hub = _SuperHub()
+    drainer = _drainer(session_factory, hub, batch_size=1_000)
+    assert await drainer.drain() == 2_500
+
+    assert [len(batch) for batch in hub.batches] == [1_000, 1_000, 500]
+    shipped = [event for batch in hub.batches for event in batch]
+    assert [e["event_id"] for e in shipped] == [str(e.event_id) for e in events]
+    assert {e["hub_id"] for e in shipped} == {str(_HUB)}
+    assert await spool_svc.spool_depth(empty_spool) == (0, None)
+    status = await drainer.status(empty_spool)
+    assert status["drained_total"] == 2_500
+    assert status["last_drain_rate_eps"] > 0
+
+
+async def test_rows_deleted_only_after_acknowledgement(
+    empty_spool: AsyncSession, session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    await spool_svc.spool_events(empty_spool, _events(25), hub_id=_HUB)
+    await empty_spool.commit()
+
+    hub = _SuperHub(fail_on={2: 503})
+    drainer = _drainer(session_factory, hub, batch_size=10)
+    assert await drainer.drain() == 10
+    depth, oldest = await spool_svc.spool_depth(empty_spool)
+    assert depth == 15 and oldest is not None
+    assert drainer.last_error == "SuperHub returned 503"
+
+    # The next drain resumes exactly where the failed one stopped.
+    assert await drainer.drain() == 15
+    assert await spool_svc.spool_depth(empty_spool) == (0, None)
+    assert sum(len(batch) for batch in hub.batches) == 25
+    assert drainer.last_error is None
+
+
+async def test_offline_drain_keeps_every_event(
+    empty_spool: AsyncSession, session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    await spool_svc.spool_events(empty_spool, _events(5), hub_id=_HUB)
+    await empty_spool.commit()
+
+    hub = _SuperHub(fail_on={1: httpx.ConnectError("no route to host")})
+    drainer = _drainer(session_factory, hub)
+    assert await drainer.drain() == 0
+    assert (await spool_svc.spool_depth(empty_spool))[0] == 5
+    assert drainer.last_error.startswith("SuperHub unreachable")
+
+
+async def test_events_superhub_refuses_are_dead_lettered(
+    empty_spool: AsyncSession, session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    events = _events(6)
+    await spool_svc.spool_events(empty_spool, events, hub_id=_HUB)
+    await empty_spool.commit()
+    refused = {str(events[1].event_id), str(events[4].event_id)}
+
+    def superhub(request: httpx.Request) -> httpx.Response:
+        batch = json.loads(gzip.decompress(request.content))["events"]
+        ids = [e["event_id"] for e in batch if e["event_id"] in refused]
+        errors = len(ids) + (1 if len(batch) == 2 else 0)  # the last batch names none
+        return httpx.Response(200, json={"errors": errors, "rejected_event_ids": ids})
+
+    drainer = AnalyticsDrainer(
+        session_factory=session_factory,
+        scheduler=EnergyAwareScheduler(),
+        transport=httpx.MockTransport(superhub),
+        batch_size=4,
+    )
+    assert await drainer.drain() == 3  # events 0, 2 and 3; 4 and 5 are kept whole
+    assert await spool_svc.spool_depth(empty_spool) == (0, None)
+    rows = await empty_spool.execute(
+        text("SELECT body, reason FROM analytics_dead_letter ORDER BY seq")
+    )
+    kept = [(json.loads(body)["event_id"], reason) for body, reason in rows]
+    assert kept == [
+        (str(events[1].event_id), "occurred_at outside SuperHub's accepted window"),
+        (str(events[4].event_id), "SuperHub reported 2 unnamed error(s)"),
+        (str(events[5].event_id), "SuperHub reported 2 unnamed error(s)"),
+    ]
+    assert (await drainer.status(empty_spool))["dead_letter_depth"] == 3
+
+
+async def test_drain_is_submitted_to_scheduler_as_heavy_job(
+    empty_spool: AsyncSession, session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    drainer = _drainer(session_factory, _SuperHub())
+    assert await drainer.maybe_schedule() is False  # nothing to ship
+
+    await spool_svc.spool_events(empty_spool, _events(3), hub_id=_HUB)
+    await empty_spool.commit()
+    assert await drainer.maybe_schedule() is True
+    assert drainer._scheduler.status()["pending"] == ["analytics-drain"]
+    assert await drainer.maybe_schedule() is False  # already queued
+
+
+async def test_emit_and_spool_status_endpoints(
+    client: AsyncClient, empty_spool: AsyncSession
+) -> None:
+    learner = str(uuid.uuid4())
+    response = await client.post(
+        "/api/v1/analytics/events",
+        json={
+            "events": [
+                {"learner_id": learner, "event_type": "SESSION_START"},
+                {"learner_id": learner, "event_type": "SESSION_END", "duration_seconds": 42},
+            ]
+        },
+    )
+    assert response.status_code == 202
+    assert response.json() == {"accepted": 2, "spool_depth": 2}
+
+    response = await client.get("/api/v1/analytics/spool")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["depth"] == 2
+    assert data["oldest_enqueued_at"] is not None
+    assert data["draining"] is False
+
+
+async def test_emit_rejects_unknown_event_type(client: AsyncClient) -> None:
+    response = await client.post(
+        "/api/v1/analytics/events",
+        json={"events": [{"learner_id": str(uuid.uuid4()), "event_type": "CLICK"}]},
+    )
+    assert response.status_code == 422
+
+
+async def test_large_backlog_drains_as_a_series_of_bounded_jobs(
+    empty_spool: AsyncSession,
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    await spool_svc.spool_events(empty_spool, _events(25), hub_id=_HUB)
+    await empty_spool.commit()
+    hub = _SuperHub()
+    drainer = _drainer(session_factory, hub, batch_size=10)
+
+    # A spent budget still ships one batch per job, then asks for a follow-up.
+    assert await drainer.drain(time_budget_s=0) == 10
+    assert drainer.out_of_time and (await spool_svc.spool_depth(empty_spool))[0] == 15
+
+    monkeypatch.setattr(spool_svc, "_DRAIN_DURATION_S", 0.0)
+    jobs = 0
+    while await drainer.maybe_schedule():
+        jobs += 1
+        (job,) = drainer._scheduler.admit()
+        await drainer._scheduler._execute(job)
+        assert drainer._resume.is_set() == drainer.out_of_time
+        drainer._resume.clear()
+    assert jobs == 2 and sum(len(batch) for batch in hub.batches) == 25
+    assert not drainer.out_of_time and not drainer._scheduler.is_active("analytics-drain")
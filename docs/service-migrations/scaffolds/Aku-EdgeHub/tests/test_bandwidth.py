@@ -0,0 +1,104 @@
+"""Tests for the shared upstream bandwidth limiter and usage metering."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import httpx
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.network import TrafficClass
+from app.services import bandwidth as bandwidth_svc
+from app.services.bandwidth import BandwidthLimiter
+
+
+def _limiter(
+    rate: float, *, burst: int = 8_000, chunk: int = 4_000, reserve: int = 0
+) -> BandwidthLimiter:
+    return BandwidthLimiter(
+        rate_bytes_per_s=rate, burst_bytes=burst, chunk_bytes=chunk, bulk_reserve_bytes=reserve
+    )
+
+
+async def test_unlimited_limiter_never_waits() -> None:
+    limiter = BandwidthLimiter(rate_bytes_per_s=None, burst_bytes=1, chunk_bytes=1)
+    start = time.perf_counter()
+    await limiter.acquire(TrafficClass.bulk, 10_000_000)
+    assert time.perf_counter() - start < 0.01
+
+
+async def test_rate_is_enforced_after_burst() -> None:
+    limiter = _limiter(200_000, burst=20_000, chunk=10_000)
+    start = time.perf_counter()
+    await limiter.acquire(TrafficClass.sync, 60_000)  # 20 kB burst + 40 kB at 200 kB/s
+    elapsed = time.perf_counter() - start
+    assert 0.15 <= elapsed < 0.5
+
+
+async def test_queued_chunks_are_granted_in_priority_order() -> None:
+    limiter = _limiter(100_000, burst=4_000, chunk=4_000)
+    await limiter.acquire(TrafficClass.bulk, 4_000)  # drain the bucket
+    order: list[str] = []
+
+    async def transfer(cls: TrafficClass) -> None:
+        await limiter.acquire(cls, 4_000)
+        order.append(cls.value)
+
+    tasks = [asyncio.create_task(transfer(cls)) for cls in reversed(TrafficClass)]
+    await asyncio.sleep(0)
+    assert limiter.waiting() == {TrafficClass.relay: 1, TrafficClass.sync: 1, TrafficClass.bulk: 1}
+    await asyncio.gather(*tasks)
+    assert order == ["relay", "sync", "bulk"]
+
+
+async def test_relay_latency_stays_low_under_saturating_bulk() -> None:
+    limiter = _limiter(1_000_000, burst=32_000, chunk=8_000, reserve=8_000)
+    bulk = asyncio.create_task(limiter.acquire(TrafficClass.bulk, 500_000))
+    await asyncio.sleep(0.05)
+    assert not bulk.done()
+
+    start = time.perf_counter()
+    await limiter.acquire(TrafficClass.relay, 2_000)
+    relay_latency = time.perf_counter() - start
+    await bulk
+    # Relay only waits for the bulk reserve / one chunk, never for the whole download.
+    assert relay_latency < 0.05
+
+
+async def test_transport_meters_request_and_response_bytes(db: AsyncSession) -> None:
+    limiter = _limiter(10_000_000)
+    body = b"x" * 3_000
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=body)
+
+    transport = limiter.transport(TrafficClass.relay, inner=httpx.MockTransport(handler))
+    async with httpx.AsyncClient(transport=transport, base_url="http://akuai") as client:
+        resp = await client.post("/api/v1/models/gemma/infer", content=b"p" * 1_000)
+    assert resp.content == body
+
+    day = datetime.now(timezone.utc).date().isoformat()
+    up, down = limiter._usage[(day, TrafficClass.relay)]
+    assert 1_000 < up < 1_500  # body plus request line and headers
+    assert 3_000 < down < 3_200
+
+    await bandwidth_svc.ensure_schema(db)
+    before = {row["traffic_class"]: row for row in await bandwidth_svc.query_usage(db, 1)}.get(
+        "relay", {"bytes_up": 0, "bytes_down": 0}
+    )
+    assert await limiter.flush_usage(db) == 1
+    assert await limiter.flush_usage(db) == 0
+    after = {row["traffic_class"]: row for row in await bandwidth_svc.query_usage(db, 1)}
+    assert after["relay"]["bytes_up"] - before["bytes_up"] == up
+    assert after["relay"]["bytes_down"] - before["bytes_down"] == down
+
+
+async def test_network_usage_endpoint(client: AsyncClient) -> None:
+    response = await client.get("/api/v1/network/usage", params={"days": 3})
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data["waiting"]) == {"relay", "sync", "bulk"}
+    assert isinstance(data["items"], list)
@@ -0,0 +1,273 @@
+"""Tests for energy-monitor ingestion, rollups, retention and the /api/v1/energy endpoint."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.services import energy as energy_svc
+from app.services.energy import EnergyIngester, EnergySample, parse_line
+
+# Each test uses its own hour so rows on the shared in-memory DB never collide.
+_T0 = 1_767_225_600  # 2026-01-01T00:00:00Z
+
+
+def _line(ts: float, *, solar_v: float = 24.0, solar_a: float = 3.0, load_a: float = 1.5) -> str:
+    return json.dumps(
+        {
+            "ts": ts,
+            "solar_v": solar_v,
+            "solar_a": solar_a,
+            "wind_v": 23.9,
+            "wind_a": 0.4,
+            "load_v": 24.05,
+            "load_a": load_a,
+        }
+    )
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+
+
+def test_parse_line_converts_to_milli_units() -> None:
+    sample = parse_line(_line(_T0, solar_v=24.123, solar_a=3.456))
+    assert sample == EnergySample(_T0, 24123, 3456, 23900, 400, 24050, 1500)
+
+
+def test_parse_line_rejects_error_and_malformed_lines() -> None:
+    assert parse_line('{"error": "INA3221 not found at 0x40", "scanned": []}') is None
+    assert parse_line("Traceback (most recent call last):") is None
+    assert parse_line('{"ts": 1, "solar_v": ') is None
+    assert parse_line("") is None
+
+
+def test_parse_line_uses_receive_time_when_pico_clock_unset() -> None:
+    sample = parse_line(_line(42), received_at=_T0 + 5)
+    assert sample is not None
+    assert sample.ts == _T0 + 5
+
+
+# ---------------------------------------------------------------------------
+# Rollups
+# ---------------------------------------------------------------------------
+
+
+async def test_ingest_batch_maintains_minute_and_hour_rollups(db: AsyncSession) -> None:
+    base = _T0 + 3600
+    first = [parse_line(_line(base + i, solar_a=1.0 + i / 100)) for i in range(90)]
+    await energy_svc.ingest_batch(db, first)
+    # A second batch landing in an existing bucket must merge, not overwrite.
+    second = [parse_line(_line(base + 90 + i, solar_a=5.0)) for i in range(30)]
+    await energy_svc.ingest_batch(db, second)
+    await db.commit()
+
+    minutes = await energy_svc.query_rollups(
+        db, resolution=60, since=base, until=base + 3600, limit=10
+    )
+    assert [row["samples"] for row in minutes] == [60, 60]
+    assert minutes[0]["solar_a_min"] == 1000
+    assert minutes[0]["solar_a_max"] == 1590
+    assert minutes[1]["solar_a_max"] == 5000
+
+    hours = await energy_svc.query_rollups(
+        db, resolution=3600, since=base, until=base + 3600, limit=10
+    )
+    assert len(hours) == 1
+    assert hours[0]["samples"] == 120
+    assert hours[0]["load_a_sum"] == 120 * 1500
+
+
+async def test_retention_prunes_raw_rows_but_keeps_rollups(db: AsyncSession) -> None:
+    base = _T0 + 2 * 3600
+    await energy_svc.ingest_batch(db, [parse_line(_line(base + i)) for i in range(10)])
+    await db.commit()
+
+    await energy_svc.apply_retention(db, now=base + 2 * 86_400)
+    await db.commit()
+
+    raw = await db.execute(
+        text("SELECT COUNT(*) FROM energy_raw WHERE ts >= :a AND ts < :b"),
+        {"a": base, "b": base + 3600},
+    )
+    assert raw.scalar_one() == 0
+    hours = await energy_svc.query_rollups(
+        db, resolution=3600, since=base, until=base + 3600, limit=1
+    )
+    assert hours[0]["samples"] == 10
+
+
+async def test_repeated_seconds_are_stored_once_in_raw_and_rollups(db: AsyncSession) -> None:
+    base = _T0 + 5 * 3600
+    first = [parse_line(_line(base + i)) for i in (0, 1, 1, 2)]
+    assert await energy_svc.ingest_batch(db, first) == 3
+    assert await energy_svc.ingest_batch(db, [parse_line(_line(base + i)) for i in (2, 3)]) == 1
+    await db.commit()
+
+    raw = await db.execute(
+        text("SELECT COUNT(*) FROM energy_raw WHERE ts >= :a AND ts < :b"),
+        {"a": base, "b": base + 3600},
+    )
+    hours = await energy_svc.query_rollups(
+        db, resolution=3600, since=base, until=base + 3600, limit=1
+    )
+    assert raw.scalar_one() == hours[0]["samples"] == 4
+
+
+# ---------------------------------------------------------------------------
+# Ingester tailing a file stand-in
+# ---------------------------------------------------------------------------
+
+
+async def test_ingester_tails_file_in_batches(
+    tmp_path: Path, session_factory: async_sessionmaker[AsyncSession], db: AsyncSession
+) -> None:
+    base = _T0 + 3 * 3600
+    source = tmp_path / "ttyACM0"
+    source.write_text(
+        "MicroPython v1.22 boot banner\n"
+        + "".join(_line(base + i) + "\n" for i in range(25))
+        + _line(base + 25)[:20]  # half-written line at EOF
+    )
+
+    ingester = EnergyIngester(
+        str(source), session_factory=session_factory, batch_size=10, flush_seconds=0.01
+    )
+    with source.open("rb") as fh:
+        batches = []
+        while lines := ingester._read_lines(fh):
+            batches.append(lines)
+            await ingester.flush(lines)
+
+    assert [len(b) for b in batches] == [10, 10, 6]
+    assert ingester.samples_ingested == 25
+    assert ingester.lines_rejected == 1
+    assert ingester._partial.startswith(b'{"ts"')
+    assert ingester._read_offset == source.stat().st_size - len(ingester._partial)
+
+    hours = await energy_svc.query_rollups(
+        db, resolution=3600, since=base, until=base + 3600, limit=1
+    )
+    assert hours[0]["samples"] == 25
+
+
+async def test_readings_without_clock_keep_their_own_arrival_second(
+    tmp_path: Path, session_factory: async_sessionmaker[AsyncSession], db: AsyncSession
+) -> None:
+    base = _T0 + 6 * 3600
+    ingester = EnergyIngester(str(tmp_path / "unused"), session_factory=session_factory)
+    lines = [(base + i + 0.5, _line(42) + "\n") for i in range(5)]  # Pico RTC never set
+    assert await ingester.flush(lines) == 5
+
+    hours = await energy_svc.query_rollups(
+        db, resolution=3600, since=base, until=base + 3600, limit=1
+    )
+    assert hours[0]["samples"] == 5
+
+
+async def test_reopened_source_resumes_after_last_stored_batch(
+    tmp_path: Path,
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    base = _T0 + 7 * 3600
+    source = tmp_path / "ttyACM0"
+    source.write_text("".join(_line(base + i) + "\n" for i in range(25)))
+    monkeypatch.setattr(energy_svc, "_REOPEN_BACKOFF_SECONDS", 0.0)
+    monkeypatch.setattr(energy_svc, "_EOF_POLL_SECONDS", 0.001)
+    ingester = EnergyIngester(
+        str(source), session_factory=session_factory, batch_size=10, flush_seconds=0.01
+    )
+    flush, calls = ingester.flush, 0
+
+    async def flaky_flush(lines):
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise OSError("database is locked")
+        return await flush(lines)
+
+    monkeypatch.setattr(ingester, "flush", flaky_flush)
+    task = asyncio.create_task(ingester.run())
+    for _ in range(500):
+        if ingester.samples_ingested == 25:
+            break
+        await asyncio.sleep(0.01)
+    task.cancel()
+    # The failed batch is read again; nothing before it is.
+    assert (ingester.samples_ingested, ingester.samples_duplicate) == (25, 0)
+
+
+# ---------------------------------------------------------------------------
+# GET /api/v1/energy
+# ---------------------------------------------------------------------------
+
+
+async def test_energy_endpoint_returns_rollups(client: AsyncClient, db: AsyncSession) -> None:
+    base = _T0 + 4 * 3600
+    await energy_svc.ingest_batch(
+        db, [parse_line(_line(base + i, solar_v=20.0 + i % 2)) for i in range(120)]
+    )
+    await db.commit()
+
+    since = datetime.fromtimestamp(base, tz=timezone.utc).isoformat()
+    until = datetime.fromtimestamp(base + 3600, tz=timezone.utc).isoformat()
+    response = await client.get(
+        "/api/v1/energy", params={"resolution": "1m", "since": since, "until": until}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["resolution"] == "1m"
+    assert len(data["items"]) == 2
+    item = data["items"][0]
+    assert item["samples"] == 60
+    assert item["solar_v"] == {"min": 20.0, "avg": 20.5, "max": 21.0}
+
+    hourly = await client.get(
+        "/api/v1/energy", params={"resolution": "1h", "since": since, "until": until}
+    )
+    assert hourly.json()["items"][0]["samples"] == 120
+
+
+async def test_energy_endpoint_takes_naive_times_as_utc(
+    client: AsyncClient, db: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    base = _T0 + 8 * 3600
+    await energy_svc.ingest_batch(db, [parse_line(_line(base + i)) for i in range(60)])
+    await db.commit()
+    # A host clock away from UTC must not shift a naive window.
+    monkeypatch.setenv("TZ", "Asia/Kolkata")
+    time.tzset()
+    try:
+        since = datetime.fromtimestamp(base, tz=timezone.utc).replace(tzinfo=None)
+        until = since + timedelta(hours=1)
+        response = await client.get(
+            "/api/v1/energy",
+            params={"resolution": "1h", "since": since.isoformat(), "until": until.isoformat()},
+        )
+        assert response.status_code == 200
+        assert [item["samples"] for item in response.json()["items"]] == [60]
+        assert response.json()["until"].startswith(until.isoformat())
+
+        only_since = await client.get("/api/v1/energy", params={"since": since.isoformat()})
+        assert only_since.status_code == 200
+    finally:
+        monkeypatch.delenv("TZ")
+        time.tzset()
+
+
+async def test_energy_endpoint_rejects_inverted_window(client: AsyncClient) -> None:
+    response = await client.get(
+        "/api/v1/energy",
+        params={"since": "2026-01-02T00:00:00Z", "until": "2026-01-01T00:00:00Z"},
+    )
+    assert response.status_code == 422
@@ -0,0 +1,110 @@
+"""Drains the spool into the real Aku-SuperHub app, not a stand-in.
+
+Both services are packaged as ``app``, so SuperHub runs in a child process:
+the transport hands each request to a short script that replays it through
+SuperHub's ASGI app and prints the response.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import subprocess
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.schemas.analytics import AnalyticsEventIn, AnalyticsEventType
+from app.services import analytics_spool as spool_svc
+from app.services.analytics_spool import AnalyticsDrainer
+from app.services.scheduler import EnergyAwareScheduler
+
+_SUPERHUB = Path(__file__).resolve().parents[2] / "Aku-SuperHub"
+_HUB = uuid.UUID("5e1f0c3a-9d2b-4c47-8a11-0f6d2b7c9e02")
+
+_REPLAY = """
+import asyncio, base64, json, os, sys
+request = json.load(sys.stdin)
+os.environ["ANALYTICS_DB_PATH"] = os.path.join(request["tmp"], "analytics.db")
+os.environ["FLEET_DB_PATH"] = os.path.join(request["tmp"], "fleet.db")
+import httpx
+from app.main import app
+
+async def main():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://superhub") as client:
+        response = await client.request(
+            request["method"],
+            request["path"],
+            headers=request["headers"],
+            content=base64.b64decode(request["body"]),
+        )
+    print(json.dumps({"status": response.status_code, "body": response.text}))
+
+asyncio.run(main())
+"""
+
+pytestmark = pytest.mark.skipif(not _SUPERHUB.is_dir(), reason="Aku-SuperHub not checked out")
+
+
+def _superhub_transport(tmp_path: Path) -> httpx.MockTransport:
+    def handle(request: httpx.Request) -> httpx.Response:
+        payload = {
+            "tmp": str(tmp_path),
+            "method": request.method,
+            "path": request.url.path,
+            "headers": dict(request.headers),
+            "body": base64.b64encode(request.read()).decode(),
+        }
+        done = subprocess.run(
+            [sys.executable, "-c", _REPLAY],
+            input=json.dumps(payload),
+            capture_output=True,
+            cwd=_SUPERHUB,
+            text=True,
+            timeout=60,
+            check=True,
+        )
+        reply = json.loads(done.stdout.strip().splitlines()[-1])
+        return httpx.Response(reply["status"], content=reply["body"].encode())
+
+    return httpx.MockTransport(handle)
+
+
+async def test_events_outside_superhubs_window_are_dead_lettered_not_lost(
+    db: AsyncSession, session_factory: async_sessionmaker[AsyncSession], tmp_path: Path
+) -> None:
+    await spool_svc.ensure_schema(db)
+    await db.execute(text("DELETE FROM analytics_spool"))
+    await db.execute(text("DELETE FROM analytics_dead_letter"))
+    now = datetime.now(timezone.utc)
+    learner = uuid.uuid4()
+    # Fresh, a hub offline for 40 days, and a clock running 2 days fast.
+    events = [
+        AnalyticsEventIn(
+            learner_id=learner, event_type=AnalyticsEventType.CONTENT_VIEW, occurred_at=now + skew
+        )
+        for skew in (timedelta(0), -timedelta(days=40), timedelta(days=2), timedelta(0))
+    ]
+    await spool_svc.spool_events(db, events, hub_id=_HUB)
+    await db.commit()
+
+    drainer = AnalyticsDrainer(
+        session_factory=session_factory,
+        scheduler=EnergyAwareScheduler(),
+        transport=_superhub_transport(tmp_path),
+    )
+    assert await drainer.drain() == 2
+    assert drainer.last_error is None
+    assert await spool_svc.spool_depth(db) == (0, None)
+    rows = await db.execute(text("SELECT body FROM analytics_dead_letter ORDER BY seq"))
+    assert [json.loads(body)["event_id"] for (body,) in rows] == [
+        str(events[1].event_id),
+        str(events[2].event_id),
+    ]
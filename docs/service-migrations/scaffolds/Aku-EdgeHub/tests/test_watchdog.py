@@ -0,0 +1,148 @@
+"""Tests for the event-loop health monitor and device-watchdog heartbeat."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import termios
+import time
+from pathlib import Path
+
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.services.scheduler import EnergyAwareScheduler
+from app.services.watchdog import LoopHealthMonitor
+
+
+def _monitor(
+    tmp_path: Path,
+    session_factory: async_sessionmaker[AsyncSession],
+    scheduler: EnergyAwareScheduler | None = None,
+) -> tuple[LoopHealthMonitor, Path]:
+    uart = tmp_path / "ttyAMA0"
+    uart.touch()  # the monitor never creates the device
+    monitor = LoopHealthMonitor(
+        device_path=str(uart),
+        session_factory=session_factory,
+        scheduler=scheduler or EnergyAwareScheduler(),
+    )
+    return monitor, uart
+
+
+def test_heartbeat_sets_the_tty_to_raw_115200(tmp_path: Path) -> None:
+    controller, device = os.openpty()
+    try:
+        LoopHealthMonitor._write_heartbeat(os.ttyname(device))
+        iflag, oflag, cflag, lflag, ispeed, ospeed, _ = termios.tcgetattr(device)
+        assert (ispeed, ospeed) == (termios.B115200, termios.B115200)
+        assert not lflag & (termios.ICANON | termios.ECHO)
+        assert not oflag & termios.OPOST  # no "\n" → "\r\n" translation
+        assert cflag & termios.CSIZE == termios.CS8 and not cflag & termios.PARENB
+        assert os.read(controller, 16) == b"PING\n"
+    finally:
+        os.close(controller)
+        os.close(device)
+
+
+async def test_heartbeat_written_while_healthy(
+    tmp_path: Path, session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    monitor, uart = _monitor(tmp_path, session_factory)
+    for _ in range(3):
+        await monitor.sample_lag(0.001)
+
+    assert await monitor.check_and_heartbeat() is True
+    assert await monitor.check_and_heartbeat() is True
+    assert uart.read_bytes() == b"PING\nPING\n"
+    assert monitor.db_rtt_ms is not None and monitor.db_rtt_ms < 1000
+    assert monitor.status()["healthy"] is True
+
+
+async def test_heartbeat_withheld_when_event_loop_lags(
+    tmp_path: Path, session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    monitor, uart = _monitor(tmp_path, session_factory)
+
+    async def wedge() -> None:
+        time.sleep(0.05)  # blocking call on the loop, as a wedged handler would do
+
+    sampler = asyncio.create_task(monitor.sample_lag(0.001))
+    await asyncio.sleep(0)
+    await wedge()
+    lag_ms = await sampler
+    assert lag_ms >= 40
+
+    # Drive p99 over the threshold with a burst of very late wake-ups.
+    for _ in range(10):
+        monitor.record_lag(5_000)
+    assert await monitor.check_and_heartbeat() is False
+    assert uart.read_bytes() == b""
+    status = monitor.status()
+    assert status["healthy"] is False
+    assert status["loop_lag_ms"]["max"] == 5_000
+    assert "event-loop lag" in status["problems"][0]
+
+
+async def test_heartbeat_withheld_for_stuck_jobs(
+    tmp_path: Path, session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    scheduler = EnergyAwareScheduler(max_heavy_jobs=1)
+    scheduler.submit("content-download", None, power_w=10.0, duration_s=0.001)
+    (job,) = scheduler.plan(None, 1.0)
+    job.started_at = time.monotonic() - 10
+
+    monitor, uart = _monitor(tmp_path, session_factory, scheduler)
+    assert await monitor.check_and_heartbeat() is False
+    assert monitor.stuck_tasks == 1
+    assert uart.read_bytes() == b""
+
+
+async def test_heartbeat_withheld_when_db_probe_fails(tmp_path: Path) -> None:
+    class _BrokenSession:
+        async def __aenter__(self) -> _BrokenSession:
+            raise OSError("disk I/O error")
+
+        async def __aexit__(self, *exc: object) -> None:
+            return None
+
+    monitor = LoopHealthMonitor(
+        device_path=str(tmp_path / "uart"),
+        session_factory=_BrokenSession,  # type: ignore[arg-type]
+        scheduler=EnergyAwareScheduler(),
+    )
+    assert await monitor.check_and_heartbeat() is False
+    assert monitor.status()["db_rtt_ms"] is None
+    assert "DB round-trip" in monitor.status()["problems"][0]
+
+
+async def test_missing_device_is_reported_not_created(
+    tmp_path: Path, session_factory: async_sessionmaker[AsyncSession]
+) -> None:
+    monitor, uart = _monitor(tmp_path, session_factory)
+    uart.unlink()
+
+    assert await monitor.check_and_heartbeat() is False
+    assert not uart.exists()
+    status = monitor.status()
+    assert status["healthy"] is False
+    assert status["problems"] == [f"heartbeat device {uart}: No such file or directory"]
+
+    uart.touch()
+    assert await monitor.check_and_heartbeat() is True
+    assert monitor.status()["healthy"] is True
+
+
+def test_lag_percentiles_nearest_rank() -> None:
+    monitor = LoopHealthMonitor(scheduler=EnergyAwareScheduler())
+    for lag in range(1, 101):
+        monitor.record_lag(float(lag))
+    assert monitor.lag_percentiles() == {"p50": 50.0, "p95": 95.0, "p99": 99.0, "max": 100.0}
+
+
+async def test_offline_health_exposes_lag_percentiles(client: AsyncClient) -> None:
+    response = await client.get("/api/v1/health/offline")
+    assert response.status_code == 200
+    watchdog = response.json()["watchdog"]
+    assert set(watchdog["loop_lag_ms"]) == {"p50", "p95", "p99", "max"}
+    assert "stuck_tasks" in watchdog
@@ -0,0 +1,95 @@
+"""Application settings loaded from environment / .env file."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Literal
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        extra="ignore",
+    )
+
+    # App
+    app_env: str = "development"
+    log_level: str = "info"
+
+    # Gateway identity
+    service_did: str = "did:web:ighub.akulearn.io"
+
+    # JWT authentication — leave all key sources unset for scaffold ("role:…") tokens
+    jwt_algorithm: str = "RS256"
+    jwt_public_key_path: str | None = None
+    jwt_secret_key: str | None = None
+    jwt_jwks_url: str | None = None
+    jwt_issuer: str | None = None
+    jwt_audience: str | None = None
+    jwt_leeway_seconds: int = Field(30, ge=0)
+    jwks_refresh_interval_seconds: float = Field(300.0, gt=0)
+    jwt_claims_cache_size: int = Field(10_000, ge=0)  # 0 disables the verified-token cache
+
+    # Clearing ledger (SQLite, WAL mode)
+    ledger_db_path: str = "./ighub_ledger.db"
+    idempotency_ttl_seconds: int = Field(86_400, ge=1)
+    idempotency_sweep_interval_seconds: float = Field(300.0, gt=0)
+
+    # Wallet balance engine
+    wallet_lock_stripes: int = Field(256, ge=1)
+    wallet_issuer_wallets: str = "treasury-main"  # comma-separated wallets allowed to go negative
+    wallet_issuer_roles: str = "treasury"  # comma-separated roles allowed to debit them
+
+    # Metadata store (in-memory, oldest records evicted past the cap)
+    metadata_store_max_records: int = Field(1_000_000, ge=1)
+    metadata_query_max_limit: int = Field(1_000, ge=1)
+    metadata_pii_value_patterns: bool = True  # also scan string values (e-mail, phone, SSN)
+    metadata_pii_max_depth: int = Field(32, ge=1)
+    metadata_pii_max_nodes: int = Field(200_000, ge=1)  # keys + list items per payload
+    metadata_bulk_batch_size: int = Field(1_000, ge=1)  # lines stored / forwarded together
+    metadata_bulk_max_line_bytes: int = Field(1_048_576, ge=1)
+    metadata_bulk_max_records: int = Field(1_000_000, ge=1)  # lines per bulk upload
+    daas_bulk_ingest_url: str | None = None  # NDJSON batches; unset: bulk records not forwarded
+
+    # Compliance policy engine
+    compliance_rules_dir: str = str(Path(__file__).resolve().parents[1] / "data" / "compliance")
+    compliance_reload_interval_seconds: float = Field(5.0, gt=0)
+    compliance_decision_cache_size: int = Field(65_536, ge=1)
+    compliance_batch_max_items: int = Field(100_000, ge=1)
+    compliance_batch_max_bytes: int = Field(67_108_864, ge=1)  # refused before buffering
+
+    # Credential signing (Ed25519) — unset key path signs with an ephemeral key, development only
+    vc_signing_key_path: str | None = None
+    vc_signing_key_id: str | None = None  # JWS "kid"; defaults to "<service_did>#key-1"
+    vc_signing_pool: Literal["thread", "process"] = "thread"
+    vc_signing_workers: int | None = Field(None, ge=1)  # None: one per CPU
+    vc_signing_chunk_size: int = Field(512, ge=1)
+    credential_batch_max_items: int = Field(10_000, ge=1)
+    credential_issuer_roles: str = "issuer"  # comma-separated roles allowed to issue
+    vc_issuer_dids: str = ""  # comma-separated DIDs, besides SERVICE_DID, whose key is ours
+
+    # Credential status registry (StatusList2021 revocation bitstrings)
+    credential_status_db_path: str = "./ighub_credentials.db"
+    status_list_size: int = Field(131_072, ge=8, multiple_of=8)  # bits per list (16 KiB)
+    status_list_base_url: str = "https://ighub.akulearn.io/api/v1/credentials/status"
+    status_list_max_age_seconds: int = Field(300, ge=0)  # Cache-Control max-age for lists
+
+    # Rate limiting (token bucket per principal and route group)
+    rate_limit_enabled: bool = True
+    rate_limit_per_minute: int = Field(120, ge=1)
+    rate_limit_burst: int | None = Field(None, ge=1)  # None: one minute's worth
+    rate_limit_group_limits: str = ""  # e.g. "metadata=600,compliance=1200:300"
+    rate_limit_backend: Literal["memory", "redis"] = "memory"
+    rate_limit_shards: int = Field(64, ge=1)
+    rate_limit_max_keys: int = Field(100_000, ge=1)  # in-memory buckets tracked
+
+    # Redis (shared rate-limit buckets)
+    redis_url: str = "redis://localhost:6379/0"
+
+
+settings = Settings()
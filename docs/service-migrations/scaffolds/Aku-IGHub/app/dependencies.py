@@ -5,6 +5,8 @@ from __future__ import annotations
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
+from app.services import auth
+
 bearer_scheme = HTTPBearer(auto_error=False)
 
 
@@ -16,12 +18,27 @@ def _decode_roles(token: str) -> list[str]:
     return ["operator"]
 
 
+def _claim_list(value: object, *, split: bool = False) -> list[str]:
+    """Normalise a list-valued claim an issuer may also send as one string.
+
+    With ``split`` a string is space-delimited (``scp: "ig:read ig:write"``);
+    without, it is a single value (``roles: "operator"``), not its characters.
+    """
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return value.split() if split else [value]
+    return [str(item) for item in value]
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
 ) -> dict[str, object]:
     """Return an authenticated principal shape used by routers.
 
-    This keeps scaffolds runnable in CI while preserving an auth integration seam.
+    With a JWT key source configured, the token is verified through
+    ``auth.token_verifier`` (claims cached until ``exp``).  Without one, the
+    scaffold ``role:…`` tokens keep CI runnable.
     """
     if credentials is None:
         raise HTTPException(
@@ -29,25 +46,48 @@ async def get_current_user(
             detail="Authorization header with Bearer token is required.",
         )
 
-    roles = _decode_roles(credentials.credentials)
+    verifier = auth.token_verifier
+    if verifier is None:
+        roles = _decode_roles(credentials.credentials)
+        return {
+            "sub": "scaffold-user",
+            "roles": roles,
+            "scopes": ["ig:read", "ig:write"],
+            "token": credentials.credentials,
+        }
+
+    try:
+        claims = await verifier.verify(credentials.credentials)
+    except auth.TokenError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=f"Invalid bearer token: {exc}",
+            headers={"WWW-Authenticate": 'Bearer error="invalid_token"'},
+        ) from exc
     return {
-        "sub": "scaffold-user",
-        "roles": roles,
-        "scopes": ["ig:read", "ig:write"],
+        "sub": claims.get("sub"),
+        "roles": _claim_list(claims.get("roles")),
+        "scopes": _claim_list(claims.get("scp") or claims.get("scope"), split=True),
         "token": credentials.credentials,
+        "claims": claims,
     }
 
 
-def require_roles(*required_roles: str):
+def ensure_roles(user: dict[str, object], *required_roles: str) -> None:
+    """Raise 403 unless ``user`` holds one of ``required_roles``, for checks that
+    depend on the request body rather than the route."""
     required = set(required_roles)
+    roles = set(user.get("roles", []))
+    if required and roles.isdisjoint(required):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Requires one of roles: {sorted(required)}",
+        )
+
 
+def require_roles(*required_roles: str):
     async def _checker(user: dict[str, object] = Depends(get_current_user)) -> dict[str, object]:
-        roles = set(user.get("roles", []))
-        if required and roles.isdisjoint(required):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Requires one of roles: {sorted(required)}",
-            )
+        ensure_roles(user, *required_roles)
         return user
 
     return _checker
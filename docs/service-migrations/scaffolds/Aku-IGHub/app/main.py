@@ -2,19 +2,62 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import logging
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.core.config import settings
+from app.middleware import RateLimitMiddleware
 from app.routers import clearing, compliance, credentials, metadata
+from app.services import auth, rate_limit
+from app.services.compliance import policy_engine
+from app.services.ledger import ledger
+from app.services.signing import signing_engine
+from app.services.status_list import status_registry
+from app.services.wallets import wallets
+
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
-    """Startup / shutdown hook — add DB pool init here if needed."""
+    """Startup / shutdown hook — open the ledger, replay wallet balances, load compliance
+    rules, JWT keys, the VC signing key and credential status lists, install the rate
+    limiter, and run the key-sweep, rule-reload and JWKS-refresh tasks."""
+    await asyncio.to_thread(ledger.open)
+    logger.info("Replayed clearing journal: %d wallet balances", await wallets.load())
+    await asyncio.to_thread(policy_engine.load)
+    await asyncio.to_thread(signing_engine.load)
+    await asyncio.to_thread(status_registry.open)
+    auth.token_verifier = auth.build_token_verifier(settings)
+    if auth.token_verifier is None:
+        logger.warning("No JWT key source configured; accepting scaffold bearer tokens")
+    elif auth.token_verifier.jwks is not None:
+        await auth.token_verifier.jwks.refresh()
+    rate_limit.rate_limiter = rate_limit.build_rate_limiter(settings)
+    tasks = [
+        asyncio.create_task(ledger.run_sweeper(), name="idempotency-sweep"),
+        asyncio.create_task(policy_engine.run_reloader(), name="compliance-reload"),
+    ]
+    if auth.token_verifier is not None and auth.token_verifier.jwks is not None:
+        tasks.append(asyncio.create_task(auth.token_verifier.jwks.run(), name="jwks-refresh"))
     yield
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    if rate_limit.rate_limiter is not None:
+        await rate_limit.rate_limiter.close()
+        rate_limit.rate_limiter = None
+    await asyncio.to_thread(signing_engine.close)
+    await asyncio.to_thread(status_registry.close)
+    await asyncio.to_thread(ledger.close)
 
 
 def create_app() -> FastAPI:
@@ -33,6 +76,7 @@ def create_app() -> FastAPI:
         lifespan=lifespan,
     )
 
+    app.add_middleware(RateLimitMiddleware)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
@@ -1,29 +1,39 @@
-"""Aku Coin financial clearing router — idempotent settlement and status."""
+"""Aku Coin financial clearing router — idempotent settlement, status and balances."""
 
 from __future__ import annotations
 
 import uuid
+from collections.abc import Iterable
 from datetime import datetime, timezone
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import JSONResponse
 
-from app.dependencies import get_current_user
+from app.core.config import settings
+from app.dependencies import ensure_roles, get_current_user
 from app.schemas.clearing import (
+    ClearingBatchItemResult,
+    ClearingBatchSettleRequest,
+    ClearingBatchSettleResponse,
     ClearingSettleRequest,
     ClearingSettleResponse,
     ClearingStatus,
     ClearingTransactionResponse,
+    WalletBalanceResponse,
 )
+from app.services.idempotency import SingleFlight
+from app.services.ledger import ledger
+from app.services.settlement import net_transfers
+from app.services.wallets import wallets
 
 router = APIRouter(prefix="/api/v1/clearing", tags=["clearing"])
 
-# ---------------------------------------------------------------------------
-# In-memory idempotency store — replace with Redis / DB in production
-# ---------------------------------------------------------------------------
+# Concurrent requests with the same Idempotency-Key share one settlement.
+_in_flight: SingleFlight[tuple[ClearingTransactionResponse, bool]] = SingleFlight()
+_batch_in_flight: SingleFlight[tuple[ClearingBatchSettleResponse, bool]] = SingleFlight()
 
-_idempotency_store: dict[str, ClearingSettleResponse] = {}
-_idempotency_requests: dict[str, ClearingSettleRequest] = {}  # mirrors store for status replay
+_ISSUER_ROLES = tuple(r.strip() for r in settings.wallet_issuer_roles.split(",") if r.strip())
 
 
 def _get_idempotency_key(
@@ -47,6 +57,32 @@ def _get_idempotency_key(
     return idempotency_key
 
 
+def _authorize_debits(from_wallets: Iterable[str], user: dict) -> None:
+    """Only ``WALLET_ISSUER_ROLES`` callers may debit an issuer wallet (which may overdraw)."""
+    if any(wallets.may_overdraw(wallet) for wallet in from_wallets):
+        ensure_roles(user, *_ISSUER_ROLES)
+
+
+def _settle_response(
+    entry: ClearingTransactionResponse, *, already_processed: bool = False
+) -> ClearingSettleResponse:
+    return ClearingSettleResponse(
+        tx_id=entry.tx_id,
+        status=entry.status,
+        idempotency_key=entry.idempotency_key,
+        already_processed=already_processed,
+        settled_at=entry.settled_at,
+        created_at=entry.created_at,
+        failed_reason=entry.failed_reason,
+    )
+
+
+def _replay_response(entry: ClearingTransactionResponse) -> JSONResponse:
+    """HTTP 200 replay of an already-processed settlement (no double-debit)."""
+    replay = _settle_response(entry, already_processed=True)
+    return JSONResponse(status_code=status.HTTP_200_OK, content=replay.model_dump(mode="json"))
+
+
 # ---------------------------------------------------------------------------
 # Settle
 # ---------------------------------------------------------------------------
@@ -61,7 +97,9 @@ def _get_idempotency_key(
         "Initiates or replays an Aku Coin financial clearing operation. "
         "Provide a unique **Idempotency-Key** header per logical transaction. "
         "If the key has already been processed the original response is returned "
-        "with HTTP 200 (no double-debit). New settlements return HTTP 201."
+        "with HTTP 200 (no double-debit). New settlements return HTTP 201; a transfer "
+        "that would overdraw the source wallet is recorded with status FAILED. "
+        "Debiting an issuer wallet requires a treasury role."
     ),
     responses={
         status.HTTP_201_CREATED: {"description": "New clearing transaction accepted"},
@@ -73,35 +111,119 @@ async def settle_clearing(
     idempotency_key: str = Depends(_get_idempotency_key),
     current_user: dict = Depends(get_current_user),
 ) -> ClearingSettleResponse:
-    from fastapi.responses import JSONResponse  # local import to attach dynamic status
+    _authorize_debits([body.from_wallet], current_user)
 
     # --- Idempotency check ---
-    if idempotency_key in _idempotency_store:
-        cached = _idempotency_store[idempotency_key]
-        # Return 200 to signal replay; mutate already_processed flag on a copy
-        replay = cached.model_copy(update={"already_processed": True})
-        return JSONResponse(  # type: ignore[return-value]
-            status_code=status.HTTP_200_OK,
-            content=replay.model_dump(mode="json"),
+    existing = await ledger.get_by_key(idempotency_key)
+    if existing is not None:
+        return _replay_response(existing)  # type: ignore[return-value]
+
+    # --- New transaction (single-flight per key) ---
+    async def _settle() -> tuple[ClearingTransactionResponse, bool]:
+        now = datetime.now(timezone.utc)
+        entry = ClearingTransactionResponse(
+            tx_id=str(uuid.uuid4()),
+            status=ClearingStatus.SETTLED,
+            from_wallet=body.from_wallet,
+            to_wallet=body.to_wallet,
+            amount=body.amount,
+            currency=body.currency,
+            reference=body.reference,
+            idempotency_key=idempotency_key,
+            created_at=now,
+            settled_at=now,
         )
+        return await wallets.settle(entry, body.metadata)
 
-    # --- New transaction ---
-    # TODO: call internal ledger service to debit/credit wallets atomically
-    tx_id = str(uuid.uuid4())
-    now = datetime.now(timezone.utc)
-
-    result = ClearingSettleResponse(
-        tx_id=tx_id,
-        status=ClearingStatus.SETTLED,
-        idempotency_key=idempotency_key,
-        already_processed=False,
-        settled_at=now,
-        created_at=now,
-    )
+    (stored, created), leader = await _in_flight.run(idempotency_key, _settle)
+    if not (leader and created):  # concurrent duplicate, or recorded by another worker
+        return _replay_response(stored)  # type: ignore[return-value]
+    return _settle_response(stored)  # FastAPI uses status_code=201 from the decorator
+
+
+# ---------------------------------------------------------------------------
+# Batch settle
+# ---------------------------------------------------------------------------
+
+
+def _batch_replay_response(stored: ClearingBatchSettleResponse) -> JSONResponse:
+    replay = stored.model_copy(update={"already_processed": True})
+    return JSONResponse(status_code=status.HTTP_200_OK, content=replay.model_dump(mode="json"))
+
+
+@router.post(
+    "/settle/batch",
+    response_model=ClearingBatchSettleResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Settle up to 10,000 transfers atomically with wallet-pair netting (idempotent)",
+    description=(
+        "Settles a payout batch under a single **Idempotency-Key**. Transfers are netted "
+        "per wallet pair, the whole batch is written in one ledger transaction, and a "
+        "result is returned for every item in request order. If any wallet's net debit "
+        "would overdraw it, the whole batch is recorded as FAILED. Replaying the key "
+        "returns the original batch result with HTTP 200. Debiting an issuer wallet "
+        "requires a treasury role."
+    ),
+    responses={
+        status.HTTP_201_CREATED: {"description": "New batch settled"},
+        status.HTTP_200_OK: {"description": "Idempotent replay — batch already processed"},
+    },
+)
+async def settle_clearing_batch(
+    body: ClearingBatchSettleRequest,
+    idempotency_key: str = Depends(_get_idempotency_key),
+    current_user: dict = Depends(get_current_user),
+) -> ClearingBatchSettleResponse:
+    _authorize_debits({item.from_wallet for item in body.items}, current_user)
+
+    existing = await ledger.get_batch_by_key(idempotency_key)
+    if existing is not None:
+        return _batch_replay_response(existing)  # type: ignore[return-value]
+
+    async def _settle() -> tuple[ClearingBatchSettleResponse, bool]:
+        now = datetime.now(timezone.utc)
+        response = ClearingBatchSettleResponse(
+            batch_id=str(uuid.uuid4()),
+            status=ClearingStatus.SETTLED,
+            idempotency_key=idempotency_key,
+            item_count=len(body.items),
+            net_transfers=net_transfers(body.items),
+            items=[
+                ClearingBatchItemResult(
+                    index=i, tx_id=str(uuid.uuid4()), status=ClearingStatus.SETTLED
+                )
+                for i in range(len(body.items))
+            ],
+            settled_at=now,
+            created_at=now,
+        )
+        return await wallets.settle_batch(body, response)
 
-    _idempotency_store[idempotency_key] = result
-    _idempotency_requests[idempotency_key] = body
-    return result  # FastAPI uses status_code=201 from the decorator
+    (stored, created), leader = await _batch_in_flight.run(idempotency_key, _settle)
+    if not (leader and created):
+        return _batch_replay_response(stored)  # type: ignore[return-value]
+    return stored
+
+
+# ---------------------------------------------------------------------------
+# Wallet balance
+# ---------------------------------------------------------------------------
+
+
+@router.get(
+    "/wallets/{wallet_id}/balance",
+    response_model=WalletBalanceResponse,
+    summary="Get a wallet balance",
+    description="Current settled balance of a wallet, from the in-process balance engine.",
+)
+async def get_wallet_balance(
+    wallet_id: str,
+    currency: str = "AKU",
+    current_user: dict = Depends(get_current_user),
+) -> WalletBalanceResponse:
+    return WalletBalanceResponse(
+        wallet_id=wallet_id, currency=currency, balance=wallets.balance(wallet_id, currency)
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -119,26 +241,10 @@ async def get_clearing_status(
     tx_id: str,
     current_user: dict = Depends(get_current_user),
 ) -> ClearingTransactionResponse:
-    # TODO: query persistent ledger store
-    # Stub: look up from idempotency store for demonstration
-    for idem_key, record in _idempotency_store.items():
-        if record.tx_id == tx_id:
-            req = _idempotency_requests.get(idem_key)
-            return ClearingTransactionResponse(
-                tx_id=record.tx_id,
-                status=record.status,
-                from_wallet=req.from_wallet if req else "unknown",
-                to_wallet=req.to_wallet if req else "unknown",
-                amount=req.amount if req else "0.00",
-                currency=req.currency if req else "AKU",
-                reference=req.reference if req else None,
-                idempotency_key=record.idempotency_key,
-                created_at=record.created_at,
-                settled_at=record.settled_at,
-                failed_reason=None,
-            )
-
-    raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail=f"Clearing transaction '{tx_id}' not found.",
-    )
+    entry = await ledger.get(tx_id)
+    if entry is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Clearing transaction '{tx_id}' not found.",
+        )
+    return entry
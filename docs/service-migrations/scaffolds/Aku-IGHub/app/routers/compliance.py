@@ -2,91 +2,45 @@
 
 from __future__ import annotations
 
+import json
+from collections.abc import AsyncIterable, AsyncIterator
 from datetime import datetime, timezone
-from enum import StrEnum
 from typing import Any
 
-from fastapi import APIRouter, Depends
-from pydantic import BaseModel, ConfigDict, Field
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import Response
+from pydantic import ValidationError
 
+from app.core.config import settings
 from app.dependencies import get_current_user
+from app.schemas.compliance import (
+    ComplianceBatchCheckResponse,
+    ComplianceCheckRequest,
+    ComplianceCheckResponse,
+)
+from app.services.compliance import ComplianceResult, policy_engine
+from app.services.ndjson import iter_lines
 
 router = APIRouter(prefix="/api/v1/compliance", tags=["compliance"])
 
+_NDJSON = "application/x-ndjson"
 
-# ---------------------------------------------------------------------------
-# Inline schemas (compliance is self-contained; no shared schema module needed)
-# ---------------------------------------------------------------------------
-
-
-class ComplianceDecision(StrEnum):
-    ALLOWED = "ALLOWED"
-    BLOCKED = "BLOCKED"
-    REQUIRES_REVIEW = "REQUIRES_REVIEW"
 
-
-class PolicyDomain(StrEnum):
-    GDPR = "GDPR"
-    PDPA = "PDPA"  # Thailand / Singapore
-    FERPA = "FERPA"  # US education records
-    COPPA = "COPPA"  # US child privacy
-    NDPR = "NDPR"  # Nigeria Data Protection Regulation
-    POPIA = "POPIA"  # South Africa
-    LGPD = "LGPD"  # Brazil
-    CUSTOM = "CUSTOM"
-
-
-class ComplianceCheckRequest(BaseModel):
-    model_config = ConfigDict(populate_by_name=True)
-
-    operation: str = Field(
-        ...,
-        description="Logical operation being checked, e.g. 'data.export', 'credential.share'",
-    )
-    source_jurisdiction: str = Field(
-        ...,
-        description="ISO 3166-1 alpha-2 country code of the data source (e.g. 'NG', 'US')",
-        min_length=2,
-        max_length=2,
-    )
-    target_jurisdiction: str = Field(
-        ...,
-        description="ISO 3166-1 alpha-2 country code of the data destination (e.g. 'DE', 'ZA')",
-        min_length=2,
-        max_length=2,
-    )
-    applicable_policies: list[PolicyDomain] = Field(
-        default_factory=list,
-        description="Explicitly requested policy frameworks; empty means auto-detect from jurisdictions",
-    )
-    context: dict[str, Any] = Field(
-        default_factory=dict,
-        description="Additional context (data categories, user age group, consent status, etc.)",
+def _check_response(
+    body: ComplianceCheckRequest, result: ComplianceResult, checked_at: datetime
+) -> ComplianceCheckResponse:
+    return ComplianceCheckResponse(
+        decision=result.decision,
+        operation=body.operation,
+        source_jurisdiction=body.source_jurisdiction.upper(),
+        target_jurisdiction=body.target_jurisdiction.upper(),
+        policies_evaluated=list(result.policies_evaluated),
+        violations=list(result.violations),
+        recommendations=list(result.recommendations),
+        checked_at=checked_at,
     )
 
 
-class PolicyViolation(BaseModel):
-    model_config = ConfigDict(populate_by_name=True)
-
-    policy: PolicyDomain
-    rule: str = Field(..., description="Short rule identifier, e.g. 'GDPR.Art.46'")
-    description: str
-    severity: str = Field(..., description="'blocking' | 'warning' | 'informational'")
-
-
-class ComplianceCheckResponse(BaseModel):
-    model_config = ConfigDict(populate_by_name=True)
-
-    decision: ComplianceDecision
-    operation: str
-    source_jurisdiction: str
-    target_jurisdiction: str
-    policies_evaluated: list[PolicyDomain]
-    violations: list[PolicyViolation] = Field(default_factory=list)
-    recommendations: list[str] = Field(default_factory=list)
-    checked_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-
-
 # ---------------------------------------------------------------------------
 # Cross-border policy check
 # ---------------------------------------------------------------------------
@@ -107,128 +61,171 @@ async def compliance_check(
     body: ComplianceCheckRequest,
     current_user: dict = Depends(get_current_user),
 ) -> ComplianceCheckResponse:
-    # TODO: integrate with a policy-engine service (e.g. OPA / Cedar)
-    policies = body.applicable_policies or _infer_policies(
-        body.source_jurisdiction, body.target_jurisdiction
+    result = policy_engine.check(
+        body.operation,
+        body.source_jurisdiction,
+        body.target_jurisdiction,
+        body.applicable_policies,
     )
+    return _check_response(body, result, datetime.now(timezone.utc))
 
-    violations: list[PolicyViolation] = []
-    recommendations: list[str] = []
-
-    # Stub: surface a warning for EU→non-adequate-country transfers
-    _eu_member_states = {
-        "AT",
-        "BE",
-        "BG",
-        "CY",
-        "CZ",
-        "DE",
-        "DK",
-        "EE",
-        "ES",
-        "FI",
-        "FR",
-        "GR",
-        "HR",
-        "HU",
-        "IE",
-        "IT",
-        "LT",
-        "LU",
-        "LV",
-        "MT",
-        "NL",
-        "PL",
-        "PT",
-        "RO",
-        "SE",
-        "SI",
-        "SK",
-    }
-    _gdpr_adequate = {"AD", "AR", "CA", "CH", "FO", "GB", "GG", "IL", "IM", "JP", "JE", "NZ", "UY"}
-
-    if (
-        body.source_jurisdiction.upper() in _eu_member_states
-        and body.target_jurisdiction.upper() not in _eu_member_states | _gdpr_adequate
-        and PolicyDomain.GDPR in policies
-    ):
-        violations.append(
-            PolicyViolation(
-                policy=PolicyDomain.GDPR,
-                rule="GDPR.Art.46",
-                description=(
-                    f"Transfer to '{body.target_jurisdiction}' requires appropriate "
-                    "safeguards (SCCs, BCRs, or adequacy decision)."
-                ),
-                severity="blocking",
-            )
-        )
-        recommendations.append(
-            "Implement Standard Contractual Clauses (SCCs) before transferring personal data."
-        )
-
-    decision = (
-        ComplianceDecision.BLOCKED
-        if any(v.severity == "blocking" for v in violations)
-        else ComplianceDecision.ALLOWED
-    )
 
-    return ComplianceCheckResponse(
-        decision=decision,
-        operation=body.operation,
-        source_jurisdiction=body.source_jurisdiction.upper(),
-        target_jurisdiction=body.target_jurisdiction.upper(),
-        policies_evaluated=policies,
-        violations=violations,
-        recommendations=recommendations,
+# ---------------------------------------------------------------------------
+# Bulk policy check
+# ---------------------------------------------------------------------------
+
+
+def _invalid(index: int, errors: list[dict[str, Any]]) -> HTTPException:
+    for error in errors:
+        error["loc"] = (index, *error["loc"])
+    return HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=errors)
+
+
+def _too_large(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=detail)
+
+
+def _too_many_items() -> HTTPException:
+    return _too_large(f"At most {settings.compliance_batch_max_items} checks per batch.")
+
+
+async def _capped(chunks: AsyncIterable[bytes], max_bytes: int) -> AsyncIterator[bytes]:
+    """Pass the body through, refusing it once more than ``max_bytes`` have arrived."""
+    received = 0
+    async for chunk in chunks:
+        received += len(chunk)
+        if received > max_bytes:
+            raise _too_large(f"At most {max_bytes} bytes per batch.")
+        yield chunk
+
+
+async def _decode_batch(request: Request, content_type: str) -> list[Any]:
+    """Read the raw items, refusing oversized bodies before they are buffered.
+
+    NDJSON is decoded line by line as it arrives and stops at the first item
+    past ``COMPLIANCE_BATCH_MAX_ITEMS``; a JSON array is counted as soon as it
+    is decoded.  Both are refused before any item is validated.
+    """
+    max_bytes = settings.compliance_batch_max_bytes
+    length = request.headers.get("content-length")
+    if length is not None and length.isdigit() and int(length) > max_bytes:
+        raise _too_large(f"At most {max_bytes} bytes per batch.")
+    body = _capped(request.stream(), max_bytes)
+    if content_type != _NDJSON:
+        raw = b"".join([chunk async for chunk in body])
+        try:
+            items = json.loads(raw)
+        except ValueError as exc:
+            raise _invalid(0, [{"type": "json_invalid", "loc": (), "msg": str(exc)}]) from exc
+        if not isinstance(items, list):
+            raise _invalid(0, [{"type": "list_type", "loc": (), "msg": "Expected a JSON array"}])
+        if len(items) > settings.compliance_batch_max_items:
+            raise _too_many_items()
+        return items
+    items = []
+    async for line in iter_lines(body, max_bytes):
+        if not line.strip():
+            continue
+        if len(items) == settings.compliance_batch_max_items:
+            raise _too_many_items()
+        try:
+            items.append(json.loads(line))
+        except ValueError as exc:
+            raise _invalid(
+                len(items), [{"type": "json_invalid", "loc": (), "msg": str(exc)}]
+            ) from exc
+    return items
+
+
+def _dedup_key(item: Any) -> tuple | None:
+    """Hashable (operation, source, target, policies) for a well-shaped raw item, else None."""
+    if type(item) is not dict or type(item.get("context", {})) is not dict:
+        return None
+    policies = item.get("applicable_policies", ())
+    if type(policies) is list and all(type(p) is str for p in policies):
+        policies = tuple(policies)
+    key = (
+        item.get("operation"),
+        item.get("source_jurisdiction"),
+        item.get("target_jurisdiction"),
+        policies,
     )
+    return key if all(type(part) is str for part in key[:3]) and type(policies) is tuple else None
+
+
+def _parse_batch(items: list[Any]) -> list[ComplianceCheckRequest]:
+    """Validate a batch, running the model only once per distinct raw tuple.
+
+    ``context`` never affects a decision, so items that differ only in context
+    share one validated request.
+    """
+    validated: dict[tuple, ComplianceCheckRequest] = {}
+    requests: list[ComplianceCheckRequest] = []
+    for index, item in enumerate(items):
+        key = _dedup_key(item)
+        request = validated.get(key) if key is not None else None
+        if request is None:
+            try:
+                request = ComplianceCheckRequest.model_validate(item)
+            except ValidationError as exc:
+                raise _invalid(index, exc.errors(include_url=False, include_context=False)) from exc
+            if key is not None:
+                validated[key] = request
+        requests.append(request)
+    return requests
 
 
-def _infer_policies(source: str, target: str) -> list[PolicyDomain]:
-    """Derive a best-guess list of applicable policy frameworks from jurisdiction codes."""
-    _eu = {
-        "AT",
-        "BE",
-        "BG",
-        "CY",
-        "CZ",
-        "DE",
-        "DK",
-        "EE",
-        "ES",
-        "FI",
-        "FR",
-        "GR",
-        "HR",
-        "HU",
-        "IE",
-        "IT",
-        "LT",
-        "LU",
-        "LV",
-        "MT",
-        "NL",
-        "PL",
-        "PT",
-        "RO",
-        "SE",
-        "SI",
-        "SK",
-    }
-    policies: list[PolicyDomain] = []
-    jurisdictions = {source.upper(), target.upper()}
-
-    if jurisdictions & _eu:
-        policies.append(PolicyDomain.GDPR)
-    if jurisdictions & {"TH", "SG"}:
-        policies.append(PolicyDomain.PDPA)
-    if "US" in jurisdictions:
-        policies.extend([PolicyDomain.FERPA, PolicyDomain.COPPA])
-    if "NG" in jurisdictions:
-        policies.append(PolicyDomain.NDPR)
-    if "ZA" in jurisdictions:
-        policies.append(PolicyDomain.POPIA)
-    if "BR" in jurisdictions:
-        policies.append(PolicyDomain.LGPD)
-
-    return policies or [PolicyDomain.CUSTOM]
+@router.post(
+    "/check/batch",
+    response_model=ComplianceBatchCheckResponse,
+    summary="Bulk cross-border policy / compliance check",
+    description=(
+        "Evaluates many compliance checks in one request. Send a JSON array of "
+        "`/check` request bodies, or `application/x-ndjson` with one body per line. "
+        "Identical (operation, source, target, applicable_policies) tuples are evaluated "
+        "once. Results are returned in request order: as a JSON object for JSON input, "
+        "or as NDJSON (one result per line) for NDJSON input. `context` does not affect "
+        "decisions and is not part of the deduplication key."
+    ),
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/ComplianceCheckRequest"},
+                    }
+                },
+                _NDJSON: {"schema": {"type": "string"}},
+            },
+        }
+    },
+    responses={
+        status.HTTP_200_OK: {"content": {_NDJSON: {"schema": {"type": "string"}}}},
+        status.HTTP_413_REQUEST_ENTITY_TOO_LARGE: {"description": "Too many items or bytes"},
+    },
+)
+async def compliance_check_batch(
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+) -> Response:
+    content_type = request.headers.get("content-type", "").partition(";")[0].strip().lower()
+    items = _parse_batch(await _decode_batch(request, content_type))
+
+    distinct, results, order = policy_engine.check_many(items)
+    checked_at = datetime.now(timezone.utc)
+    # Serialise each distinct result once and splice the fragments in request order.
+    encoded = [
+        _check_response(item, result, checked_at).model_dump_json().encode()
+        for item, result in zip(distinct, results, strict=True)
+    ]
+    if content_type == _NDJSON:
+        body = b"".join(encoded[i] + b"\n" for i in order)
+        return Response(content=body, media_type=_NDJSON)
+    body = b'{"count":%d,"distinct":%d,"results":[%s]}' % (
+        len(items),
+        len(distinct),
+        b",".join(encoded[i] for i in order),
+    )
+    return Response(content=body, media_type="application/json")
@@ -1,21 +1,95 @@
-"""Verifiable credential router — issue and verify W3C VCs."""
+"""Verifiable credential router — issue, verify and revoke W3C VCs."""
 
 from __future__ import annotations
 
 import uuid
 from datetime import datetime, timezone
+from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import JSONResponse, Response
 
-from app.dependencies import get_current_user
+from app.core.config import settings
+from app.dependencies import get_current_user, require_roles
 from app.schemas.credentials import (
+    CredentialBatchIssueRequest,
+    CredentialBatchIssueResponse,
     CredentialIssueRequest,
     CredentialIssueResponse,
+    CredentialJwtVerifyRequest,
+    CredentialRevokeResponse,
     CredentialVerifyResponse,
 )
+from app.services.signing import credential_payload, signing_engine
+from app.services.status_list import status_registry
 
 router = APIRouter(prefix="/api/v1/credentials", tags=["credentials"])
 
+_ISSUER_ROLES = [r.strip() for r in settings.credential_issuer_roles.split(",") if r.strip()]
+# DIDs whose documents list the gateway's signing key; nothing else may be an issuer.
+_ISSUER_DIDS = frozenset(
+    [settings.service_did, *(d.strip() for d in settings.vc_issuer_dids.split(",") if d.strip())]
+)
+
+
+class _Issuance:
+    """Identifiers, issuers and status-list slots for credentials being issued together."""
+
+    def __init__(self, items: list[CredentialIssueRequest], issued_at: datetime) -> None:
+        self.items = items
+        self.issued_at = issued_at
+        self.ids = [str(uuid.uuid4()) for _ in items]
+        self.issuers = [item.issuer_did or settings.service_did for item in items]
+        self.indexes: list[int] = []
+        for index, issuer in enumerate(self.issuers):
+            if issuer not in _ISSUER_DIDS:
+                where = f"credentials[{index}]: " if len(items) > 1 else ""
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=f"{where}issuer_did {issuer!r} is not controlled by the gateway key",
+                )
+
+    async def register(self) -> None:
+        self.indexes = await status_registry.register_many(
+            [
+                (cid, item.subject_did, issuer, self.issued_at, item.expiry_date)
+                for item, cid, issuer in zip(self.items, self.ids, self.issuers, strict=True)
+            ]
+        )
+
+    def payloads(self) -> list[dict[str, Any]]:
+        return [
+            credential_payload(
+                item,
+                credential_id=cid,
+                issuer_did=issuer,
+                issued_at=self.issued_at,
+                status=status_registry.status_entry(index),
+            )
+            for item, cid, issuer, index in zip(
+                self.items, self.ids, self.issuers, self.indexes, strict=True
+            )
+        ]
+
+    def responses(self, tokens: list[str]) -> list[CredentialIssueResponse]:
+        list_size = status_registry.list_size
+        return [
+            CredentialIssueResponse(
+                credential_id=cid,
+                credential_type=item.credential_type,
+                subject_did=item.subject_did,
+                issuer_did=issuer,
+                issued_at=self.issued_at,
+                expiry_date=item.expiry_date,
+                jwt=token,
+                status_list_credential=status_registry.list_url(index // list_size),
+                status_list_index=index % list_size,
+            )
+            for item, cid, issuer, index, token in zip(
+                self.items, self.ids, self.issuers, self.indexes, tokens, strict=True
+            )
+        ]
+
 
 # ---------------------------------------------------------------------------
 # Issue
@@ -28,35 +102,56 @@ router = APIRouter(prefix="/api/v1/credentials", tags=["credentials"])
     status_code=status.HTTP_201_CREATED,
     summary="Issue a verifiable credential",
     description=(
-        "Signs and registers a new W3C Verifiable Credential for the given subject DID. "
-        "Returns a compact JWT VC. JWT authentication is required at this gateway boundary."
+        "Signs a new W3C Verifiable Credential for the given subject DID with the "
+        "gateway's Ed25519 key. Returns a compact JWT VC (alg EdDSA) whose "
+        "`credentialStatus` points at its StatusList2021 revocation bit. `issuer_did` must "
+        "be the gateway's service DID or one of `VC_ISSUER_DIDS`. Requires an issuer role."
     ),
 )
 async def issue_credential(
     body: CredentialIssueRequest,
-    current_user: dict = Depends(get_current_user),
+    current_user: dict = Depends(require_roles(*_ISSUER_ROLES)),
 ) -> CredentialIssueResponse:
-    # TODO: integrate with VC signing service (e.g. SpruceID / DIDKit)
-    credential_id = str(uuid.uuid4())
-    now = datetime.now(timezone.utc)
+    issuance = _Issuance([body], datetime.now(timezone.utc))
+    await issuance.register()
+    (payload,) = issuance.payloads()
+    (response,) = issuance.responses([signing_engine.sign(payload)])
+    return response
 
-    issuer_did: str = body.issuer_did or "did:web:ighub.akulearn.io"
 
-    # Stub: real implementation calls an internal signing microservice
-    signed_jwt = (
-        f"eyJhbGciOiJFZERTQSIsInR5cCI6IkpXVCJ9"
-        f".STUB_{credential_id.replace('-', '')}"
-        f".SIGNATURE_PLACEHOLDER"
-    )
+# ---------------------------------------------------------------------------
+# Batch issue
+# ---------------------------------------------------------------------------
 
-    return CredentialIssueResponse(
-        credential_id=credential_id,
-        credential_type=body.credential_type,
-        subject_did=body.subject_did,
-        issuer_did=issuer_did,
-        issued_at=now,
-        expiry_date=body.expiry_date,
-        jwt=signed_jwt,
+
+@router.post(
+    "/issue/batch",
+    response_model=CredentialBatchIssueResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Issue verifiable credentials in bulk",
+    description=(
+        "Signs many W3C Verifiable Credentials in one request with the gateway's Ed25519 "
+        "key. Payloads are built up front and signed in chunks on the signing worker pool. "
+        "Credentials are returned in request order. Requires an issuer role."
+    ),
+    responses={status.HTTP_413_REQUEST_ENTITY_TOO_LARGE: {"description": "Too many items"}},
+)
+async def issue_credential_batch(
+    body: CredentialBatchIssueRequest,
+    current_user: dict = Depends(require_roles(*_ISSUER_ROLES)),
+) -> CredentialBatchIssueResponse:
+    if len(body.credentials) > settings.credential_batch_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.credential_batch_max_items} credentials per batch.",
+        )
+    issuance = _Issuance(body.credentials, datetime.now(timezone.utc))
+    await issuance.register()
+    tokens = await signing_engine.sign_many(issuance.payloads())
+    return CredentialBatchIssueResponse(
+        count=len(tokens),
+        issued_at=issuance.issued_at,
+        credentials=issuance.responses(tokens),
     )
 
 
@@ -65,34 +160,163 @@ async def issue_credential(
 # ---------------------------------------------------------------------------
 
 
+def _expired(expiry_date: datetime | None, now: datetime) -> bool:
+    return expiry_date is not None and expiry_date <= now
+
+
+@router.post(
+    "/verify",
+    response_model=CredentialVerifyResponse,
+    summary="Verify a verifiable credential JWT",
+    description=(
+        "Checks the credential's Ed25519 signature, expiry and revocation bit without "
+        "any database lookup: revocation is a bit test on the cached status list named by "
+        "the credential's `credentialStatus`. JWT authentication required."
+    ),
+)
+async def verify_credential_jwt(
+    body: CredentialJwtVerifyRequest,
+    current_user: dict = Depends(get_current_user),
+) -> CredentialVerifyResponse:
+    try:
+        claims = signing_engine.verify(body.jwt)
+    except ValueError as exc:
+        return CredentialVerifyResponse(
+            credential_id="", valid=False, failure_reason=f"Invalid credential: {exc}"
+        )
+
+    now = datetime.now(timezone.utc)
+    vc = claims.get("vc", {})
+    issued_at = datetime.fromtimestamp(claims["nbf"], timezone.utc) if "nbf" in claims else None
+    expiry_date = datetime.fromtimestamp(claims["exp"], timezone.utc) if "exp" in claims else None
+    entry = vc.get("credentialStatus")
+    revoked = False
+    if entry is not None:
+        list_id = int(entry["statusListCredential"].rsplit("/", 1)[1])
+        index = list_id * status_registry.list_size + int(entry["statusListIndex"])
+        revoked = status_registry.is_revoked(index)
+    failure_reason = None
+    if claims.get("iss") not in _ISSUER_DIDS:
+        failure_reason = "Credential issuer is not controlled by the gateway key"
+    elif revoked:
+        failure_reason = "Credential has been revoked"
+    elif _expired(expiry_date, now):
+        failure_reason = "Credential has expired"
+    return CredentialVerifyResponse(
+        credential_id=str(claims.get("jti", "")).removeprefix("urn:uuid:"),
+        valid=failure_reason is None,
+        subject_did=claims.get("sub"),
+        issuer_did=claims.get("iss"),
+        issued_at=issued_at,
+        expiry_date=expiry_date,
+        revoked=revoked,
+        verified_at=now,
+        failure_reason=failure_reason,
+    )
+
+
 @router.get(
     "/{credential_id}/verify",
     response_model=CredentialVerifyResponse,
     summary="Verify a verifiable credential",
     description=(
-        "Validates the credential signature, expiry, and revocation status. "
-        "Returns a structured verification result. JWT authentication required."
+        "Resolves the credential from the status registry and checks its expiry and "
+        "revocation bit. Use `POST /verify` with the JWT to also check the signature. "
+        "JWT authentication required."
     ),
 )
 async def verify_credential(
     credential_id: str,
     current_user: dict = Depends(get_current_user),
 ) -> CredentialVerifyResponse:
-    # TODO: resolve credential from registry, validate signature, check revocation list
-    if not credential_id:
+    record = await status_registry.get(credential_id)
+    if record is None:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="credential_id must not be empty",
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Credential {credential_id} was not issued by this gateway",
         )
 
-    # Stub: real implementation resolves the DID document and validates the JWT
+    now = datetime.now(timezone.utc)
+    revoked = status_registry.is_revoked(record.status_index)
+    failure_reason = None
+    if revoked:
+        failure_reason = "Credential has been revoked"
+    elif _expired(record.expiry_date, now):
+        failure_reason = "Credential has expired"
     return CredentialVerifyResponse(
         credential_id=credential_id,
-        valid=True,
-        subject_did="did:web:subject.example",
-        issuer_did="did:web:ighub.akulearn.io",
-        issued_at=datetime.now(timezone.utc),
-        expiry_date=None,
-        revoked=False,
-        failure_reason=None,
+        valid=failure_reason is None,
+        subject_did=record.subject_did,
+        issuer_did=record.issuer_did,
+        issued_at=record.issued_at,
+        expiry_date=record.expiry_date,
+        revoked=revoked,
+        verified_at=now,
+        failure_reason=failure_reason,
     )
+
+
+# ---------------------------------------------------------------------------
+# Revoke
+# ---------------------------------------------------------------------------
+
+
+@router.post(
+    "/{credential_id}/revoke",
+    response_model=CredentialRevokeResponse,
+    summary="Revoke a verifiable credential",
+    description=(
+        "Sets the credential's bit in its StatusList2021 revocation list. Idempotent: "
+        "revoking again returns the original revocation time. Requires the operator role."
+    ),
+)
+async def revoke_credential(
+    credential_id: str,
+    current_user: dict = Depends(require_roles("operator")),
+) -> CredentialRevokeResponse:
+    record = await status_registry.revoke(credential_id)
+    if record is None or record.revoked_at is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Credential {credential_id} was not issued by this gateway",
+        )
+    list_id, index = divmod(record.status_index, status_registry.list_size)
+    return CredentialRevokeResponse(
+        credential_id=credential_id,
+        revoked_at=record.revoked_at,
+        status_list_credential=status_registry.list_url(list_id),
+        status_list_index=index,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Status lists
+# ---------------------------------------------------------------------------
+
+
+@router.get(
+    "/status/{list_id}",
+    summary="StatusList2021 revocation list",
+    description=(
+        "Public, cacheable StatusList2021Credential holding the gzip-compressed, "
+        "base64url-encoded revocation bitstring for one list, signed by the gateway key "
+        "(`proof.jwt`, a VC-JWT). Verifiers and edge hubs "
+        "cache it (Cache-Control / ETag, `If-None-Match` → 304) and check revocation "
+        "offline. No authentication required."
+    ),
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "List unchanged"}},
+)
+async def get_status_list(list_id: int, request: Request) -> Response:
+    found = status_registry.status_list_credential(list_id)
+    if found is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Status list {list_id} not found"
+        )
+    document, etag = found
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.status_list_max_age_seconds}",
+    }
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return JSONResponse(document, headers=headers)
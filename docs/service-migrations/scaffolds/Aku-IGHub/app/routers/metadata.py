@@ -6,25 +6,25 @@ import os
 import uuid
 from datetime import datetime, timezone
 
+import anyio
 import httpx
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import Response, StreamingResponse
 
+from app.core.config import settings
 from app.dependencies import get_current_user
 from app.schemas.metadata import (
+    MetadataCategory,
     MetadataPublishRequest,
     MetadataPublishResponse,
+    MetadataQueryResponse,
     MetadataRecord,
 )
+from app.services.bulk_publish import BulkPublisher
+from app.services.metadata_store import metadata_store
 
 router = APIRouter(prefix="/api/v1/metadata", tags=["metadata"])
 
-# ---------------------------------------------------------------------------
-# In-memory store — replace with persistent DB / cache in production
-# ---------------------------------------------------------------------------
-
-_metadata_store: dict[str, MetadataRecord] = {}
-
-
 # ---------------------------------------------------------------------------
 # Publish
 # ---------------------------------------------------------------------------
@@ -58,7 +58,7 @@ async def publish_metadata(
         published_at=now,
     )
 
-    _metadata_store[metadata_id] = record
+    metadata_store.add(record)
 
     # Forward to Aku-DaaS asynchronously (fire-and-forget with best-effort ack)
     daas_ingested = await _forward_to_daas(record)
@@ -88,6 +88,102 @@ async def _forward_to_daas(record: MetadataRecord) -> bool:
         return False
 
 
+class _DuplexStreamingResponse(StreamingResponse):
+    """Streams results while the request body is still being read.
+
+    The body generator owns ``receive``; Starlette's disconnect listener would
+    consume body messages, so it is disabled.  A client disconnect surfaces as
+    ``ClientDisconnect`` from ``request.stream()`` instead.
+    """
+
+    async def listen_for_disconnect(self, receive) -> None:
+        await anyio.sleep_forever()
+
+
+@router.post(
+    "/publish/bulk",
+    summary="Publish anonymised metadata as an NDJSON stream (forwarded to Aku-DaaS in batches)",
+    description=(
+        "Accepts one `MetadataPublishRequest` JSON object per line "
+        "(`application/x-ndjson`) and streams back one result per line — "
+        '`{"line", "status": "published", "metadata_id", "daas_ingested"}` or '
+        '`{"line", "status": "rejected", "errors"}` — followed by a `{"summary": …}` '
+        "line. Records are validated, stored and forwarded in batches while the "
+        "upload is still arriving. JWT authentication required."
+    ),
+    response_class=StreamingResponse,
+)
+async def publish_metadata_bulk(
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+) -> StreamingResponse:
+    publisher = BulkPublisher(
+        metadata_store,
+        batch_size=settings.metadata_bulk_batch_size,
+        max_line_bytes=settings.metadata_bulk_max_line_bytes,
+        max_records=settings.metadata_bulk_max_records,
+        forward_url=settings.daas_bulk_ingest_url,
+    )
+    return _DuplexStreamingResponse(
+        publisher.run(request.stream()), media_type="application/x-ndjson"
+    )
+
+
+# ---------------------------------------------------------------------------
+# Query
+# ---------------------------------------------------------------------------
+
+
+@router.get(
+    "",
+    response_model=MetadataQueryResponse,
+    summary="Query published metadata by category, tags and time range",
+    description=(
+        "Returns records matching every filter, oldest first: `category`, every `tag` "
+        "given (intersection), and `since` (inclusive) / `until` (exclusive) on "
+        "`published_at`. Pages are keyset-paginated: pass `next_cursor` back as `cursor`. "
+        "JWT authentication required."
+    ),
+)
+async def query_metadata(
+    category: MetadataCategory | None = None,
+    tag: list[str] = Query(default_factory=list, description="Repeat to intersect tags"),
+    since: datetime | None = None,
+    until: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = Query(100, ge=1, le=settings.metadata_query_max_limit),
+    current_user: dict = Depends(get_current_user),
+) -> Response:
+    try:
+        after = int(cursor) if cursor is not None else None
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Malformed cursor"
+        ) from exc
+    docs, next_seq = metadata_store.query(
+        category=category.value if category else None,
+        tags=tag,
+        since=_aware(since),
+        until=_aware(until),
+        after=after,
+        limit=limit,
+    )
+    next_cursor = b'"%d"' % next_seq if next_seq is not None else b"null"
+    body = b'{"count":%d,"next_cursor":%s,"records":[%s]}' % (
+        len(docs),
+        next_cursor,
+        b",".join(docs),
+    )
+    return Response(content=body, media_type="application/json")
+
+
+def _aware(value: datetime | None) -> datetime | None:
+    """Naive query timestamps are taken as UTC, like ``published_at``."""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
 # ---------------------------------------------------------------------------
 # Retrieve
 # ---------------------------------------------------------------------------
@@ -103,8 +199,7 @@ async def get_metadata(
     metadata_id: str,
     current_user: dict = Depends(get_current_user),
 ) -> MetadataRecord:
-    # TODO: query persistent store (e.g. Supabase / PostgreSQL)
-    record = _metadata_store.get(metadata_id)
+    record = metadata_store.get(metadata_id)
     if not record:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
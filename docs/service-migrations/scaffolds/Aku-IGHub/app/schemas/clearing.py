@@ -47,6 +47,9 @@ class ClearingSettleResponse(BaseModel):
         None, description="UTC timestamp of settlement; None while PENDING"
     )
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    failed_reason: str | None = Field(
+        None, description="Human-readable failure reason when status=FAILED"
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -70,3 +73,71 @@ class ClearingTransactionResponse(BaseModel):
     failed_reason: str | None = Field(
         None, description="Human-readable failure reason when status=FAILED"
     )
+
+
+# ---------------------------------------------------------------------------
+# Batch settle
+# ---------------------------------------------------------------------------
+
+
+class ClearingTransferItem(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    from_wallet: str = Field(..., description="Source wallet DID or address")
+    to_wallet: str = Field(..., description="Destination wallet DID or address")
+    amount: Decimal = Field(..., gt=Decimal("0"), description="AKU Coin amount (positive)")
+    reference: str | None = Field(None, description="Optional human-readable payment reference")
+
+
+class ClearingBatchSettleRequest(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    currency: str = Field("AKU", description="Currency token identifier for every item")
+    items: list[ClearingTransferItem] = Field(..., min_length=1, max_length=10_000)
+    metadata: dict[str, str] = Field(default_factory=dict, description="Batch-level metadata")
+
+
+class ClearingNetTransfer(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    from_wallet: str
+    to_wallet: str
+    amount: Decimal = Field(..., description="Net amount moved for this wallet pair")
+
+
+class ClearingBatchItemResult(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    index: int = Field(..., description="Position of the item in the request")
+    tx_id: str
+    status: ClearingStatus
+    failed_reason: str | None = None
+
+
+class ClearingBatchSettleResponse(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    batch_id: str
+    status: ClearingStatus
+    idempotency_key: str
+    already_processed: bool = False
+    item_count: int
+    net_transfers: list[ClearingNetTransfer] = Field(
+        ..., description="Wallet-pair net movements actually applied"
+    )
+    items: list[ClearingBatchItemResult]
+    settled_at: datetime | None = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+# ---------------------------------------------------------------------------
+# Wallet balance
+# ---------------------------------------------------------------------------
+
+
+class WalletBalanceResponse(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    wallet_id: str
+    currency: str
+    balance: Decimal = Field(..., description="Settled balance; only issuer wallets go negative")
@@ -0,0 +1,85 @@
+"""Pydantic v2 schemas for cross-border compliance and policy checks."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from enum import StrEnum
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ComplianceDecision(StrEnum):
+    ALLOWED = "ALLOWED"
+    BLOCKED = "BLOCKED"
+    REQUIRES_REVIEW = "REQUIRES_REVIEW"
+
+
+class PolicyDomain(StrEnum):
+    GDPR = "GDPR"
+    PDPA = "PDPA"  # Thailand / Singapore
+    FERPA = "FERPA"  # US education records
+    COPPA = "COPPA"  # US child privacy
+    NDPR = "NDPR"  # Nigeria Data Protection Regulation
+    POPIA = "POPIA"  # South Africa
+    LGPD = "LGPD"  # Brazil
+    CUSTOM = "CUSTOM"
+
+
+class ComplianceCheckRequest(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    operation: str = Field(
+        ...,
+        description="Logical operation being checked, e.g. 'data.export', 'credential.share'",
+    )
+    source_jurisdiction: str = Field(
+        ...,
+        description="ISO 3166-1 alpha-2 country code of the data source (e.g. 'NG', 'US')",
+        min_length=2,
+        max_length=2,
+    )
+    target_jurisdiction: str = Field(
+        ...,
+        description="ISO 3166-1 alpha-2 country code of the data destination (e.g. 'DE', 'ZA')",
+        min_length=2,
+        max_length=2,
+    )
+    applicable_policies: list[PolicyDomain] = Field(
+        default_factory=list,
+        description="Explicitly requested policy frameworks; empty means auto-detect from jurisdictions",
+    )
+    context: dict[str, Any] = Field(
+        default_factory=dict,
+        description="Additional context (data categories, user age group, consent status, etc.)",
+    )
+
+
+class PolicyViolation(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    policy: PolicyDomain
+    rule: str = Field(..., description="Short rule identifier, e.g. 'GDPR.Art.46'")
+    description: str
+    severity: str = Field(..., description="'blocking' | 'warning' | 'informational'")
+
+
+class ComplianceCheckResponse(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    decision: ComplianceDecision
+    operation: str
+    source_jurisdiction: str
+    target_jurisdiction: str
+    policies_evaluated: list[PolicyDomain]
+    violations: list[PolicyViolation] = Field(default_factory=list)
+    recommendations: list[str] = Field(default_factory=list)
+    checked_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class ComplianceBatchCheckResponse(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    count: int = Field(..., description="Number of checks in the request")
+    distinct: int = Field(..., description="Distinct (operation, source, target, policies) tuples")
+    results: list[ComplianceCheckResponse] = Field(..., description="One result per item, in order")
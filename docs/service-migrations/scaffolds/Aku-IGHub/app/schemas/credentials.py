@@ -46,6 +46,28 @@ class CredentialIssueResponse(BaseModel):
     issued_at: datetime
     expiry_date: datetime | None = None
     jwt: str = Field(..., description="Signed W3C Verifiable Credential as a compact JWT")
+    status_list_credential: str | None = Field(
+        None, description="URL of the StatusList2021 credential that tracks revocation"
+    )
+    status_list_index: int | None = Field(None, description="Bit index within that status list")
+
+
+class CredentialBatchIssueRequest(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    credentials: list[CredentialIssueRequest] = Field(
+        ..., min_length=1, description="Credentials to issue, signed in one batch"
+    )
+
+
+class CredentialBatchIssueResponse(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    count: int
+    issued_at: datetime
+    credentials: list[CredentialIssueResponse] = Field(
+        ..., description="Issued credentials, in request order"
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -53,6 +75,12 @@ class CredentialIssueResponse(BaseModel):
 # ---------------------------------------------------------------------------
 
 
+class CredentialJwtVerifyRequest(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    jwt: str = Field(..., description="Compact JWT VC as returned by the issue endpoints")
+
+
 class CredentialVerifyResponse(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
 
@@ -69,3 +97,18 @@ class CredentialVerifyResponse(BaseModel):
     )
     verified_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     failure_reason: str | None = Field(None, description="Human-readable reason when valid=False")
+
+
+# ---------------------------------------------------------------------------
+# Revoke
+# ---------------------------------------------------------------------------
+
+
+class CredentialRevokeResponse(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    credential_id: str
+    revoked: bool = True
+    revoked_at: datetime = Field(..., description="When the credential was first revoked")
+    status_list_credential: str
+    status_list_index: int
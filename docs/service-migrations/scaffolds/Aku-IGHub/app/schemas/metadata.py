@@ -8,6 +8,8 @@ from typing import Any
 
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 
+from app.services.pii import pii_scanner
+
 
 class MetadataCategory(StrEnum):
     LEARNING_ACTIVITY = "learning_activity"
@@ -39,12 +41,13 @@ class MetadataPublishRequest(BaseModel):
 
     @model_validator(mode="after")
     def _reject_pii_keys(self) -> MetadataPublishRequest:
-        """Best-effort guard: reject payloads with obvious PII field names."""
-        pii_keys = {"name", "email", "phone", "dob", "date_of_birth", "ssn", "passport", "address"}
-        found = pii_keys & {k.lower() for k in self.payload}
-        if found:
+        """Best-effort guard: reject payloads with PII field names or PII-like values at any
+        depth (see ``app/services/pii.py``)."""
+        findings = pii_scanner.scan(self.payload)
+        if findings:
             raise ValueError(
-                f"Payload contains probable PII keys: {found}. Strip PII before publishing."
+                f"Payload contains probable PII at: {', '.join(map(str, findings))}. "
+                "Strip PII before publishing."
             )
         return self
 
@@ -76,3 +79,13 @@ class MetadataRecord(BaseModel):
     source_service: str
     schema_version: str
     published_at: datetime
+
+
+class MetadataQueryResponse(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    count: int = Field(..., description="Records in this page")
+    next_cursor: str | None = Field(
+        None, description="Pass as `cursor` to fetch the next page; null on the last page"
+    )
+    records: list[MetadataRecord] = Field(..., description="Matching records, oldest first")
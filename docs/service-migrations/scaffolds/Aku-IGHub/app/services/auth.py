@@ -0,0 +1,317 @@
+"""JWT verification for the gateway auth boundary — JWKS key cache and verified-token LRU.
+
+Signature checks cost real CPU (~140 µs for RS256, see
+``scripts/bench_auth.py``), and clients resend the same bearer token on every
+request.
+:class:`TokenVerifier` therefore verifies a token once and caches its
+claims, keyed by the token's SHA-256 digest, until the token's own ``exp``.
+Eviction is LRU within ``JWT_CLAIMS_CACHE_SIZE`` entries.
+:meth:`TokenVerifier.revoke` is the revocation hook. It evicts a token (or
+every token of a ``jti`` or subject) and refuses it until it would have
+expired anyway.
+
+Signing keys come from one of three sources:
+
+* a JWKS endpoint (``JWT_JWKS_URL``).  :class:`JWKSCache` refreshes it in the
+  background and re-fetches early, at most every 30 s, when a token names an
+  unknown ``kid`` (key rotation);
+* a PEM public key (``JWT_PUBLIC_KEY_PATH``);
+* a shared secret (``JWT_SECRET_KEY``, HS256 for development only).
+
+PyJWT is an optional dependency (``requirements-extra.txt``).  With no key
+source configured, :func:`build_token_verifier` returns None and
+``get_current_user`` keeps accepting scaffold ``role:…`` tokens.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from app.core.config import Settings
+
+try:  # optional: only needed once a real key source is configured
+    import jwt
+except ImportError:  # pragma: no cover - exercised only without requirements-extra
+    jwt = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+_UNKNOWN_KID_REFRESH_SECONDS = 30.0
+_REVOCATION_RETENTION_SECONDS = 86_400.0
+
+
+class TokenError(Exception):
+    """The bearer token is malformed, expired, revoked or has a bad signature."""
+
+
+# ---------------------------------------------------------------------------
+# JWKS
+# ---------------------------------------------------------------------------
+
+
+class JWKSCache:
+    """Signing keys from a JWKS URL, refreshed periodically and on unknown ``kid``."""
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        refresh_interval_seconds: float = 300.0,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.url = url
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self._transport = transport
+        self._keys: dict[str, Any] = {}
+        self._attempted_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def refresh(self, *, min_age_seconds: float = 0.0) -> None:
+        """Fetch the key set; on failure the previous keys stay in use.
+
+        Skipped when the last attempt, successful or not, is younger than
+        ``min_age_seconds`` once the lock is taken, so callers queued behind an
+        in-flight fetch reuse its outcome instead of repeating it.
+        """
+        async with self._lock:
+            if time.monotonic() - self._attempted_at < min_age_seconds:
+                return
+            self._attempted_at = time.monotonic()
+            async with httpx.AsyncClient(transport=self._transport, timeout=10) as client:
+                response = await client.get(self.url)
+                response.raise_for_status()
+            keys = {
+                key.key_id: key.key
+                for key in jwt.PyJWKSet.from_dict(response.json()).keys
+                if key.key_id is not None
+            }
+            self._keys = keys
+        logger.info("Loaded %d JWKS signing keys from %s", len(keys), self.url)
+
+    async def get(self, kid: str | None) -> Any:
+        key = self._keys.get(kid) if kid is not None else None
+        if key is None and time.monotonic() - self._attempted_at >= _UNKNOWN_KID_REFRESH_SECONDS:
+            try:
+                # The issuer may have rotated keys; concurrent misses share one fetch.
+                await self.refresh(min_age_seconds=_UNKNOWN_KID_REFRESH_SECONDS)
+            except Exception:
+                logger.exception("JWKS refresh for unknown kid %r failed", kid)
+            key = self._keys.get(kid) if kid is not None else None
+        if key is None:
+            raise TokenError(f"Unknown signing key id {kid!r}")
+        return key
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval_seconds)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("JWKS refresh failed; keeping the previous keys")
+
+
+# ---------------------------------------------------------------------------
+# Verified-token cache
+# ---------------------------------------------------------------------------
+
+
+class VerifiedTokenCache:
+    """LRU of ``sha256(token) → claims``; an entry never outlives the token's ``exp``."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[bytes, tuple[float, dict[str, Any]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, digest: bytes, now: float) -> dict[str, Any] | None:
+        entry = self._entries.get(digest)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[0] <= now:
+            del self._entries[digest]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(digest)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, digest: bytes, claims: dict[str, Any], expires_at: float) -> None:
+        if self.maxsize <= 0:
+            return
+        self._entries[digest] = (expires_at, claims)
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, digest: bytes) -> dict[str, Any] | None:
+        entry = self._entries.pop(digest, None)
+        return entry[1] if entry else None
+
+    def evict_where(self, predicate: Callable[[dict[str, Any]], bool]) -> list[dict[str, Any]]:
+        doomed = [d for d, (_exp, claims) in self._entries.items() if predicate(claims)]
+        return [self._entries.pop(digest)[1] for digest in doomed]
+
+
+# ---------------------------------------------------------------------------
+# Verifier
+# ---------------------------------------------------------------------------
+
+
+def _digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+class TokenVerifier:
+    """Verifies bearer JWTs and caches their claims until ``exp``."""
+
+    def __init__(
+        self,
+        *,
+        algorithms: list[str],
+        key: Any = None,
+        jwks: JWKSCache | None = None,
+        issuer: str | None = None,
+        audience: str | None = None,
+        leeway_seconds: int = 30,
+        cache_size: int = 10_000,
+    ) -> None:
+        if jwt is None:
+            raise RuntimeError(
+                "JWT verification needs PyJWT: pip install -r requirements-extra.txt"
+            )
+        if (key is None) == (jwks is None):
+            raise ValueError("Configure exactly one of a static key or a JWKS source")
+        self.algorithms = algorithms
+        self.jwks = jwks
+        self._key = key
+        self._issuer = issuer
+        self._audience = audience
+        self._leeway = leeway_seconds
+        self.cache = VerifiedTokenCache(cache_size)
+        # digest / "jti:…" / "sub:…" → time after which the entry can be dropped
+        self._revoked: dict[bytes | str, float] = {}
+        self._revoked_before: dict[str, float] = {}
+
+    async def _decode(self, token: str) -> dict[str, Any]:
+        try:
+            key = self._key
+            if self.jwks is not None:
+                key = await self.jwks.get(jwt.get_unverified_header(token).get("kid"))
+            return jwt.decode(
+                token,
+                key,
+                algorithms=self.algorithms,
+                issuer=self._issuer,
+                audience=self._audience,
+                leeway=self._leeway,
+                options={"require": ["exp"]},
+            )
+        except jwt.PyJWTError as exc:
+            raise TokenError(str(exc)) from exc
+
+    async def verify(self, token: str) -> dict[str, Any]:
+        """Claims of a valid token; raises :class:`TokenError` otherwise."""
+        now = time.time()
+        digest = _digest(token)
+        claims = self.cache.get(digest, now)
+        if claims is not None:
+            return claims
+
+        claims = await self._decode(token)
+        if self._is_revoked(digest, claims):
+            raise TokenError("Token has been revoked")
+        # exp is required by _decode; leeway keeps cached and fresh answers identical.
+        self.cache.put(digest, claims, float(claims["exp"]) + self._leeway)
+        return claims
+
+    def revoke(
+        self, token: str | None = None, *, jti: str | None = None, sub: str | None = None
+    ) -> int:
+        """Revocation hook: evict cached claims and refuse the token from now on.
+
+        Pass the raw ``token``, its ``jti``, or a ``sub`` to refuse every token
+        of that subject issued up to now (logout everywhere).  Entries are kept
+        until the revoked token expires, or ``_REVOCATION_RETENTION_SECONDS``
+        when its ``exp`` is unknown.  Returns the number of cache entries evicted.
+        """
+        now = time.time()
+        self._revoked = {k: until for k, until in self._revoked.items() if until > now}
+        default_until = now + _REVOCATION_RETENTION_SECONDS
+        evicted: list[dict[str, Any]] = []
+        if token is not None:
+            digest = _digest(token)
+            claims = self.cache.pop(digest)
+            if claims is not None:
+                evicted.append(claims)
+                jti = jti or claims.get("jti")
+            self._revoked[digest] = self._until(claims, default_until)
+        if jti is not None:
+            evicted += self.cache.evict_where(lambda c: c.get("jti") == jti)
+            same = [c for c in evicted if c.get("jti") == jti]
+            self._revoked[f"jti:{jti}"] = max(
+                (self._until(c, default_until) for c in same), default=default_until
+            )
+        if sub is not None:
+            evicted += self.cache.evict_where(lambda c: c.get("sub") == sub)
+            self._revoked_before[sub] = now
+            self._revoked[f"sub:{sub}"] = default_until
+        return len(evicted)
+
+    def _until(self, claims: dict[str, Any] | None, default: float) -> float:
+        return float(claims["exp"]) + self._leeway if claims else default
+
+    def _is_revoked(self, digest: bytes, claims: dict[str, Any]) -> bool:
+        if not self._revoked:
+            return False
+        if digest in self._revoked or f"jti:{claims.get('jti')}" in self._revoked:
+            return True
+        sub = claims.get("sub")
+        if f"sub:{sub}" in self._revoked:
+            iat = claims.get("iat")
+            return iat is None or float(iat) <= self._revoked_before[sub]
+        return False
+
+
+def build_token_verifier(
+    config: Settings, *, transport: httpx.AsyncBaseTransport | None = None
+) -> TokenVerifier | None:
+    """Verifier for the configured key source, or None in scaffold mode."""
+    algorithms = [a.strip() for a in config.jwt_algorithm.split(",") if a.strip()]
+    common = {
+        "algorithms": algorithms,
+        "issuer": config.jwt_issuer,
+        "audience": config.jwt_audience,
+        "leeway_seconds": config.jwt_leeway_seconds,
+        "cache_size": config.jwt_claims_cache_size,
+    }
+    if config.jwt_jwks_url:
+        jwks = JWKSCache(
+            config.jwt_jwks_url,
+            refresh_interval_seconds=config.jwks_refresh_interval_seconds,
+            transport=transport,
+        )
+        return TokenVerifier(jwks=jwks, **common)
+    if config.jwt_public_key_path:
+        key = Path(config.jwt_public_key_path).read_text(encoding="utf-8")
+        return TokenVerifier(key=key, **common)
+    if config.jwt_secret_key:
+        return TokenVerifier(key=config.jwt_secret_key, **common)
+    return None
+
+
+# Installed by the app lifespan; None keeps the scaffold "role:…" tokens working.
+token_verifier: TokenVerifier | None = None
@@ -0,0 +1,204 @@
+"""Streaming NDJSON bulk publish for metadata records.
+
+:meth:`BulkPublisher.run` consumes the request body chunk by chunk and yields
+one NDJSON result line per input line, so neither the upload nor the result
+set is ever held in memory whole:
+
+* lines are split incrementally; a line longer than
+  ``METADATA_BULK_MAX_LINE_BYTES`` is rejected and skipped without buffering it;
+* every ``METADATA_BULK_BATCH_SIZE`` lines are validated against
+  :class:`MetadataPublishRequest` (PII guard included) in a worker thread, so the
+  event loop stays free while a batch is parsed;
+* valid records are stored with :meth:`MetadataStore.add_many` and forwarded to
+  ``DAAS_BULK_INGEST_URL`` as one NDJSON request per batch, over one HTTP
+  connection for the whole upload.  The forward of batch *n* runs while batch
+  *n + 1* is parsed; results of batch *n* are emitted once DaaS has answered.
+
+At most two batches are in flight, so a slow consumer or a slow DaaS slows the
+reads from the client instead of growing a queue.  The last line is a
+``{"summary": …}`` object.  Uploads past ``METADATA_BULK_MAX_RECORDS`` lines
+stop there with ``"truncated": true``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import uuid
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+import httpx
+from pydantic import ValidationError
+
+from app.schemas.metadata import MetadataPublishRequest, MetadataRecord
+from app.services.metadata_store import MetadataStore
+from app.services.ndjson import LINE_TOO_LONG, iter_lines
+
+
+@dataclass(slots=True)
+class BulkSummary:
+    lines: int = 0
+    published: int = 0
+    rejected: int = 0
+    batches: int = 0
+    daas_ingested: int = 0
+    truncated: bool = False
+
+    def to_line(self) -> bytes:
+        return (
+            b'{"summary":%s}\n'
+            % json.dumps(
+                {name: getattr(self, name) for name in self.__slots__}, separators=(",", ":")
+            ).encode()
+        )
+
+
+@dataclass(slots=True)
+class _Batch:
+    """Raw lines of one batch, then their parse results in input order."""
+
+    numbers: list[int] = field(default_factory=list)
+    lines: list[bytes | object] = field(default_factory=list)
+    records: list[MetadataRecord] = field(default_factory=list)
+    # per input line: MetadataRecord, or the rejection errors
+    outcomes: list[MetadataRecord | list] = field(default_factory=list)
+
+
+def _rejected(number: int, errors: list) -> bytes:
+    body = {"line": number, "status": "rejected", "errors": errors}
+    return json.dumps(body, separators=(",", ":")).encode() + b"\n"
+
+
+def _parse(batch: _Batch) -> _Batch:
+    """Validate a batch of lines (runs in a worker thread)."""
+    validate = MetadataPublishRequest.model_validate_json
+    now = datetime.now(timezone.utc)
+    for line in batch.lines:
+        if line is LINE_TOO_LONG:
+            batch.outcomes.append([{"type": "line_too_long", "msg": "Line exceeds the size limit"}])
+            continue
+        try:
+            body = validate(line)
+        except ValidationError as exc:
+            batch.outcomes.append(
+                exc.errors(include_url=False, include_context=False, include_input=False)
+            )
+            continue
+        record = MetadataRecord.model_construct(
+            metadata_id=str(uuid.uuid4()),
+            category=body.category,
+            payload=body.payload,
+            tags=body.tags,
+            source_service=body.source_service,
+            schema_version=body.schema_version,
+            published_at=now,
+        )
+        batch.records.append(record)
+        batch.outcomes.append(record)
+    batch.lines = []
+    return batch
+
+
+class BulkPublisher:
+    """Publishes one NDJSON upload; create one per request."""
+
+    def __init__(
+        self,
+        store: MetadataStore,
+        *,
+        batch_size: int,
+        max_line_bytes: int,
+        max_records: int,
+        forward_url: str | None = None,
+        timeout: float = 10.0,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.store = store
+        self.batch_size = batch_size
+        self.max_line_bytes = max_line_bytes
+        self.max_records = max_records
+        self.forward_url = forward_url
+        self.timeout = timeout
+        self._transport = transport
+        self.summary = BulkSummary()
+
+    async def run(self, chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+        """Yield result lines for the NDJSON body in ``chunks``, then the summary."""
+        client = None
+        if self.forward_url:
+            client = httpx.AsyncClient(transport=self._transport, timeout=self.timeout)
+        in_flight: tuple[_Batch, asyncio.Task[bool]] | None = None
+        try:
+            batch = _Batch()
+            number = 0
+            async for line in iter_lines(chunks, self.max_line_bytes):
+                number += 1
+                if line is not LINE_TOO_LONG and not line.strip():
+                    continue  # blank lines are skipped but still counted
+                if self.summary.lines >= self.max_records:
+                    self.summary.truncated = True
+                    break
+                self.summary.lines += 1
+                batch.numbers.append(number)
+                batch.lines.append(line)
+                if len(batch.numbers) >= self.batch_size:
+                    previous, in_flight = in_flight, await self._submit(batch, client)
+                    batch = _Batch()
+                    if previous is not None:
+                        yield await self._results(*previous)
+            if batch.numbers:
+                previous, in_flight = in_flight, await self._submit(batch, client)
+                if previous is not None:
+                    yield await self._results(*previous)
+            if in_flight is not None:
+                yield await self._results(*in_flight)
+                in_flight = None
+            yield self.summary.to_line()
+        finally:
+            if in_flight is not None:
+                in_flight[1].cancel()
+            if client is not None:
+                await client.aclose()
+
+    async def _submit(
+        self, batch: _Batch, client: httpx.AsyncClient | None
+    ) -> tuple[_Batch, asyncio.Task[bool]]:
+        """Parse and store ``batch``, and start forwarding it."""
+        batch = await asyncio.to_thread(_parse, batch)
+        docs = self.store.add_many(batch.records) if batch.records else []
+        self.summary.batches += 1
+        return batch, asyncio.create_task(self._forward(client, docs))
+
+    async def _forward(self, client: httpx.AsyncClient | None, docs: list[bytes]) -> bool:
+        """POST a batch to DaaS as NDJSON; True on acknowledged receipt."""
+        if client is None or not docs:
+            return False
+        try:
+            response = await client.post(
+                self.forward_url,
+                content=b"\n".join(docs) + b"\n",
+                headers={"Content-Type": "application/x-ndjson"},
+            )
+            return response.is_success
+        except httpx.RequestError:
+            return False
+
+    async def _results(self, batch: _Batch, forwarded: asyncio.Task[bool]) -> bytes:
+        ingested = await forwarded
+        flag = b"true" if ingested else b"false"
+        out = []
+        for number, outcome in zip(batch.numbers, batch.outcomes, strict=True):
+            if isinstance(outcome, MetadataRecord):
+                out.append(
+                    b'{"line":%d,"status":"published","metadata_id":"%s","daas_ingested":%s}\n'
+                    % (number, outcome.metadata_id.encode(), flag)
+                )
+            else:
+                out.append(_rejected(number, outcome))
+        self.summary.published += len(batch.records)
+        self.summary.rejected += len(batch.numbers) - len(batch.records)
+        if ingested:
+            self.summary.daas_ingested += len(batch.records)
+        return b"".join(out)
@@ -0,0 +1,337 @@
+"""Compiled compliance policy engine with memoised decisions and hot reload.
+
+Jurisdiction groups, policy inference and transfer rules are data, read from
+every ``*.json`` file in ``COMPLIANCE_RULES_DIR`` (merged in filename order):
+
+* ``groups`` — named jurisdiction sets, referenced elsewhere as ``@NAME``;
+* ``inference`` — which policy frameworks apply when the source or target
+  is in a set (used when a request names no ``applicable_policies``);
+* ``rules`` — violations raised for a source / target / operation-class
+  match, each with an optional ``*_not`` exclusion list.
+
+Loading compiles everything into one table keyed by ``(source, target,
+operation class)``.  Every code that any file names gets its own row, and
+``*`` stands for any other code.  A check is then three set probes and one
+dict lookup.  Finished decisions are memoised in a bounded LRU that belongs
+to the compiled table, so a reload discards it.
+
+:meth:`PolicyEngine.reload_if_changed` compares file names, sizes and mtimes.
+The lifespan task calls it every ``COMPLIANCE_RELOAD_INTERVAL_SECONDS``.  A
+rules file that fails to load is logged and the previous table stays active.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import itertools
+import json
+import logging
+import threading
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.core.config import settings
+from app.schemas.compliance import (
+    ComplianceCheckRequest,
+    ComplianceDecision,
+    PolicyDomain,
+    PolicyViolation,
+)
+
+logger = logging.getLogger(__name__)
+
+_ANY = "*"
+
+
+# ---------------------------------------------------------------------------
+# Rule file format
+# ---------------------------------------------------------------------------
+
+
+class _InferenceSpec(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    policy: PolicyDomain
+    jurisdictions: list[str]
+
+
+class _RuleSpec(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    id: str
+    policy: PolicyDomain
+    operations: list[str] = Field(default_factory=lambda: [_ANY])
+    source: list[str] = Field(default_factory=lambda: [_ANY])
+    source_not: list[str] = Field(default_factory=list)
+    target: list[str] = Field(default_factory=lambda: [_ANY])
+    target_not: list[str] = Field(default_factory=list)
+    severity: str
+    description: str
+    recommendation: str | None = None
+
+
+class _RuleFile(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    groups: dict[str, list[str]] = Field(default_factory=dict)
+    inference: list[_InferenceSpec] = Field(default_factory=list)
+    rules: list[_RuleSpec] = Field(default_factory=list)
+
+
+# ---------------------------------------------------------------------------
+# Compiled table
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True, slots=True)
+class _Matcher:
+    """Membership test for one side of a rule; ``include=None`` means any code."""
+
+    include: frozenset[str] | None
+    exclude: frozenset[str]
+
+    def __call__(self, code: str) -> bool:
+        return (self.include is None or code in self.include) and code not in self.exclude
+
+
+@dataclass(frozen=True, slots=True)
+class _Rule:
+    spec: _RuleSpec
+    operations: frozenset[str] | None
+    source: _Matcher
+    target: _Matcher
+
+
+@dataclass(frozen=True, slots=True)
+class ComplianceResult:
+    decision: ComplianceDecision
+    policies_evaluated: tuple[PolicyDomain, ...]
+    violations: tuple[PolicyViolation, ...]
+    recommendations: tuple[str, ...]
+
+
+def operation_class(operation: str) -> str:
+    """``"data.export"`` → ``"data"``."""
+    return operation.partition(".")[0].strip().lower()
+
+
+class _CompiledPolicies:
+    def __init__(self, spec: _RuleFile, cache_size: int) -> None:
+        groups = {name: frozenset(c.upper() for c in codes) for name, codes in spec.groups.items()}
+
+        def expand(items: list[str]) -> frozenset[str] | None:
+            codes: set[str] = set()
+            for item in items:
+                if item == _ANY:
+                    return None
+                if item.startswith("@"):
+                    if item[1:] not in groups:
+                        raise ValueError(f"unknown jurisdiction group {item!r}")
+                    codes |= groups[item[1:]]
+                else:
+                    codes.add(item.upper())
+            return frozenset(codes)
+
+        inference = [(entry.policy, expand(entry.jurisdictions)) for entry in spec.inference]
+        rules = [
+            _Rule(
+                spec=rule,
+                operations=(
+                    None
+                    if _ANY in rule.operations
+                    else frozenset(op.lower() for op in rule.operations)
+                ),
+                source=_Matcher(expand(rule.source), expand(rule.source_not) or frozenset()),
+                target=_Matcher(expand(rule.target), expand(rule.target_not) or frozenset()),
+            )
+            for rule in spec.rules
+        ]
+
+        # Every named code is its own row; "*" stands for all the others.
+        named: set[str] = set()
+        for _policy, codes in inference:
+            named |= codes or set()
+        for rule in rules:
+            for matcher in (rule.source, rule.target):
+                named |= (matcher.include or set()) | matcher.exclude
+        self.codes = frozenset(named)
+        self.operations = frozenset(
+            itertools.chain.from_iterable(rule.operations or () for rule in rules)
+        )
+
+        keys = (*sorted(self.codes), _ANY)
+        self.inferred: dict[tuple[str, str], tuple[PolicyDomain, ...]] = {}
+        for source, target in itertools.product(keys, keys):
+            found = tuple(
+                policy
+                for policy, codes in inference
+                if codes is None or source in codes or target in codes
+            )
+            self.inferred[(source, target)] = found or (PolicyDomain.CUSTOM,)
+
+        self.table: dict[tuple[str, str, str], tuple[_Rule, ...]] = {}
+        for source, target, op in itertools.product(keys, keys, (*sorted(self.operations), _ANY)):
+            self.table[(source, target, op)] = tuple(
+                rule
+                for rule in rules
+                if (rule.operations is None or op in rule.operations)
+                and rule.source(source)
+                and rule.target(target)
+            )
+
+        self.decide = functools.lru_cache(maxsize=cache_size)(self._decide)
+
+    def _decide(
+        self,
+        source: str,
+        target: str,
+        op_class: str,
+        policies: tuple[PolicyDomain, ...] | None,
+    ) -> ComplianceResult:
+        src = source if source in self.codes else _ANY
+        tgt = target if target in self.codes else _ANY
+        op = op_class if op_class in self.operations else _ANY
+        if policies is None:
+            policies = self.inferred[(src, tgt)]
+
+        violations: list[PolicyViolation] = []
+        recommendations: list[str] = []
+        for rule in self.table[(src, tgt, op)]:
+            if rule.spec.policy not in policies:
+                continue
+            violations.append(
+                PolicyViolation(
+                    policy=rule.spec.policy,
+                    rule=rule.spec.id,
+                    description=rule.spec.description.format(source=source, target=target),
+                    severity=rule.spec.severity,
+                )
+            )
+            if rule.spec.recommendation:
+                recommendations.append(rule.spec.recommendation)
+
+        decision = (
+            ComplianceDecision.BLOCKED
+            if any(v.severity == "blocking" for v in violations)
+            else ComplianceDecision.ALLOWED
+        )
+        return ComplianceResult(decision, policies, tuple(violations), tuple(recommendations))
+
+
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+
+
+class PolicyEngine:
+    """Loads, compiles and hot-reloads the rule files in ``directory``."""
+
+    def __init__(self, directory: str | Path, *, cache_size: int = 65_536) -> None:
+        self.directory = Path(directory)
+        self.cache_size = cache_size
+        self._compiled: _CompiledPolicies | None = None
+        self._signature: tuple | None = None
+        self._lock = threading.Lock()
+
+    def _files(self) -> list[Path]:
+        return sorted(self.directory.glob("*.json"))
+
+    def _current_signature(self) -> tuple:
+        return tuple((p.name, p.stat().st_mtime_ns, p.stat().st_size) for p in self._files())
+
+    def load(self) -> None:
+        """Read and compile every rule file; raises if any file is invalid."""
+        with self._lock:
+            signature = self._current_signature()
+            merged = _RuleFile()
+            for path in self._files():
+                part = _RuleFile.model_validate(json.loads(path.read_text(encoding="utf-8")))
+                merged.groups.update(part.groups)
+                merged.inference.extend(part.inference)
+                merged.rules.extend(part.rules)
+            compiled = _CompiledPolicies(merged, self.cache_size)
+            previous, self._compiled, self._signature = self._compiled, compiled, signature
+        if previous is not None:
+            previous.decide.cache_clear()
+        logger.info(
+            "Loaded %d compliance rules from %s", len(merged.rules), self.directory.resolve()
+        )
+
+    def reload_if_changed(self) -> bool:
+        """Reload when a rule file was added, removed or modified; returns True on reload."""
+        try:
+            if self._current_signature() == self._signature:
+                return False
+            self.load()
+        except Exception:
+            logger.exception("Compliance rules reload failed; keeping the previous rules")
+            return False
+        return True
+
+    def _table(self) -> _CompiledPolicies:
+        if self._compiled is None:
+            self.load()
+        assert self._compiled is not None
+        return self._compiled
+
+    def check(
+        self,
+        operation: str,
+        source: str,
+        target: str,
+        policies: list[PolicyDomain] | None = None,
+    ) -> ComplianceResult:
+        """Decision for one operation; ``policies`` empty or None means infer them."""
+        return self._table().decide(
+            source.upper(),
+            target.upper(),
+            operation_class(operation),
+            tuple(policies) if policies else None,
+        )
+
+    def check_many(
+        self, items: Sequence[ComplianceCheckRequest]
+    ) -> tuple[list[ComplianceCheckRequest], list[ComplianceResult], list[int]]:
+        """Evaluate each distinct (operation, source, target, policies) tuple once.
+
+        Returns the first request of each distinct tuple, its result, and for
+        every input item the index of its distinct tuple, in input order.
+        """
+        table = self._table()
+        positions: dict[tuple, int] = {}
+        distinct: list[ComplianceCheckRequest] = []
+        results: list[ComplianceResult] = []
+        order: list[int] = []
+        for item in items:
+            key = (
+                item.operation,
+                item.source_jurisdiction.upper(),
+                item.target_jurisdiction.upper(),
+                tuple(item.applicable_policies),
+            )
+            position = positions.get(key)
+            if position is None:
+                position = positions[key] = len(distinct)
+                distinct.append(item)
+                results.append(
+                    table.decide(key[1], key[2], operation_class(key[0]), key[3] or None)
+                )
+            order.append(position)
+        return distinct, results, order
+
+    def cache_info(self) -> functools._CacheInfo:
+        return self._table().decide.cache_info()
+
+    async def run_reloader(self) -> None:
+        while True:
+            await asyncio.sleep(settings.compliance_reload_interval_seconds)
+            await asyncio.to_thread(self.reload_if_changed)
+
+
+policy_engine = PolicyEngine(
+    settings.compliance_rules_dir, cache_size=settings.compliance_decision_cache_size
+)
@@ -0,0 +1,66 @@
+"""Per-key single-flight for idempotent operations.
+
+Concurrent requests carrying the same Idempotency-Key must not both settle.
+``SingleFlight.run`` lets the first caller for a key execute and parks every
+concurrent duplicate on that caller's future, so duplicates replay the result
+instead of repeating the work.  In-flight entries are per key and spread over
+independent shard tables, so unrelated keys never wait on each other and no
+table-wide lock exists.
+
+Scope is one process.  Duplicates that reach different workers are still
+settled once: the ledger checks the key and inserts in a single
+``BEGIN IMMEDIATE`` transaction and reports the loser as a replay.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import zlib
+from collections.abc import Awaitable, Callable
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """Sharded table of in-flight futures keyed by idempotency key."""
+
+    def __init__(self, shards: int = 64) -> None:
+        self._shards: list[dict[str, asyncio.Future[T]]] = [{} for _ in range(shards)]
+
+    def _shard(self, key: str) -> dict[str, asyncio.Future[T]]:
+        return self._shards[zlib.crc32(key.encode()) % len(self._shards)]
+
+    def in_flight(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        """Run ``fn`` once per concurrent ``key``; returns ``(result, leader)``.
+
+        If the leader fails, waiting duplicates retry and one of them becomes
+        the new leader — a failed attempt is never replayed as a result.
+        """
+        shard = self._shard(key)
+        while True:
+            pending = shard.get(key)
+            if pending is None:
+                break
+            try:
+                # shield: a cancelled follower must not cancel the leader's future.
+                return await asyncio.shield(pending), False
+            except Exception:
+                continue
+
+        fut: asyncio.Future[T] = asyncio.get_running_loop().create_future()
+        shard[key] = fut
+        try:
+            result = await fn()
+        except BaseException as exc:
+            fut.set_exception(exc if isinstance(exc, Exception) else RuntimeError("cancelled"))
+            fut.exception()  # mark retrieved; followers retry instead
+            raise
+        else:
+            fut.set_result(result)
+            return result, True
+        finally:
+            del shard[key]
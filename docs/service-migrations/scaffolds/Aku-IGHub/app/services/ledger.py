@@ -0,0 +1,405 @@
+"""Persistent clearing ledger — SQLite (WAL) with indexed tx_id and idempotency-key lookups.
+
+Two ``WITHOUT ROWID`` tables keep every lookup a single B-tree descent, so
+status reads stay flat as the ledger grows (see ``scripts/bench_ledger.py``):
+
+* ``clearing_tx`` — the ledger itself, clustered on ``tx_id`` and kept forever;
+* ``idempotency_keys`` — ``key → tx_id`` with an ``expires_at`` index.  Keys
+  are honoured for ``IDEMPOTENCY_TTL_SECONDS`` and then removed by
+  :meth:`ClearingLedger.sweep`, so replay state no longer grows without bound.
+
+Batch settlements write every item to ``clearing_tx`` plus one
+``clearing_batch`` row holding the stored response, all in one SQLite
+transaction.  Batch keys live in their own ``batch_idempotency_keys`` table,
+so a single settlement can never claim or overwrite a batch's key.
+
+sqlite3 is blocking, so the async API runs every call in a worker thread.  One
+writer connection serialises writes; each worker thread gets its own reader
+connection, which WAL lets proceed while a write is in progress.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+
+from app.core.config import settings
+from app.schemas.clearing import (
+    ClearingBatchSettleRequest,
+    ClearingBatchSettleResponse,
+    ClearingStatus,
+    ClearingTransactionResponse,
+)
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS clearing_tx (
+    tx_id           TEXT PRIMARY KEY,
+    status          TEXT NOT NULL,
+    from_wallet     TEXT NOT NULL,
+    to_wallet       TEXT NOT NULL,
+    amount          TEXT NOT NULL,
+    currency        TEXT NOT NULL,
+    reference       TEXT,
+    metadata        TEXT,
+    idempotency_key TEXT NOT NULL,
+    created_at      TEXT NOT NULL,
+    settled_at      TEXT,
+    failed_reason   TEXT
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key        TEXT PRIMARY KEY,
+    tx_id      TEXT NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS ix_idempotency_keys_expires_at ON idempotency_keys (expires_at);
+
+CREATE TABLE IF NOT EXISTS batch_idempotency_keys (
+    key        TEXT PRIMARY KEY,
+    batch_id   TEXT NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS ix_batch_idempotency_keys_expires_at
+    ON batch_idempotency_keys (expires_at);
+
+CREATE TABLE IF NOT EXISTS clearing_batch (
+    batch_id        TEXT PRIMARY KEY,
+    idempotency_key TEXT NOT NULL,
+    item_count      INTEGER NOT NULL,
+    response        TEXT NOT NULL,
+    created_at      TEXT NOT NULL
+);
+"""
+
+# Batch keys used to share idempotency_keys under a "batch:" prefix.  Move any
+# that still point at a batch; a single settlement's key is left where it is.
+_MIGRATE_BATCH_KEYS = """
+INSERT OR IGNORE INTO batch_idempotency_keys
+    SELECT substr(k.key, 7), k.tx_id, k.expires_at
+    FROM idempotency_keys AS k JOIN clearing_batch AS b ON b.batch_id = k.tx_id;
+DELETE FROM idempotency_keys WHERE tx_id IN (SELECT batch_id FROM clearing_batch);
+"""
+
+_TX_FIELDS = (
+    "tx_id",
+    "status",
+    "from_wallet",
+    "to_wallet",
+    "amount",
+    "currency",
+    "reference",
+    "idempotency_key",
+    "created_at",
+    "settled_at",
+    "failed_reason",
+)
+_TX_COLUMNS = ", ".join(_TX_FIELDS)
+_SWEEP_CHUNK = 10_000
+_REPLAY_CHUNK = 10_000
+_KEY_TABLES = ("idempotency_keys", "batch_idempotency_keys")
+
+
+def _to_entry(row: tuple) -> ClearingTransactionResponse:
+    # Pydantic parses the stored Decimal / ISO-8601 / enum strings back.
+    return ClearingTransactionResponse.model_validate(dict(zip(_TX_FIELDS, row, strict=True)))
+
+
+def _to_row(entry: ClearingTransactionResponse, metadata: dict[str, str] | None) -> tuple:
+    return (
+        entry.tx_id,
+        entry.status.value,
+        entry.from_wallet,
+        entry.to_wallet,
+        str(entry.amount),
+        entry.currency,
+        entry.reference,
+        json.dumps(metadata) if metadata else None,
+        entry.idempotency_key,
+        entry.created_at.isoformat(),
+        entry.settled_at.isoformat() if entry.settled_at else None,
+        entry.failed_reason,
+    )
+
+
+class ClearingLedger:
+    """Append-only clearing ledger with TTL-bounded idempotency keys."""
+
+    def __init__(self, path: str, *, idempotency_ttl_seconds: int) -> None:
+        self.path = path
+        self.idempotency_ttl_seconds = idempotency_ttl_seconds
+        self._writer: sqlite3.Connection | None = None
+        self._write_lock = threading.RLock()
+        self._readers = threading.local()
+        self._reader_conns: list[sqlite3.Connection] = []
+
+    # -- connections --------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # durable across app crashes in WAL mode
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def open(self) -> None:
+        with self._write_lock:
+            if self._writer is None:
+                writer = self._connect()
+                writer.executescript(_SCHEMA)
+                writer.executescript(f"BEGIN; {_MIGRATE_BATCH_KEYS} COMMIT;")
+                self._writer = writer
+
+    def close(self) -> None:
+        with self._write_lock:
+            for conn in self._reader_conns:
+                conn.close()
+            self._reader_conns.clear()
+            self._readers = threading.local()
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def _write_conn(self) -> sqlite3.Connection:
+        if self._writer is None:
+            self.open()
+        assert self._writer is not None
+        return self._writer
+
+    def _read_conn(self) -> sqlite3.Connection:
+        conn = getattr(self._readers, "conn", None)
+        if conn is None:
+            self._write_conn()  # schema must exist before the first read
+            conn = self._connect()
+            self._readers.conn = conn
+            with self._write_lock:
+                self._reader_conns.append(conn)
+        return conn
+
+    # -- blocking API (called from worker threads and benchmarks) -----------
+
+    def get_sync(self, tx_id: str) -> ClearingTransactionResponse | None:
+        row = (
+            self._read_conn()
+            .execute(f"SELECT {_TX_COLUMNS} FROM clearing_tx WHERE tx_id = ?", (tx_id,))
+            .fetchone()
+        )
+        return _to_entry(row) if row else None
+
+    def get_by_key_sync(
+        self, key: str, now: float | None = None
+    ) -> ClearingTransactionResponse | None:
+        now = time.time() if now is None else now
+        row = (
+            self._read_conn()
+            .execute(
+                f"SELECT {_TX_COLUMNS} FROM clearing_tx WHERE tx_id = "
+                "(SELECT tx_id FROM idempotency_keys WHERE key = ? AND expires_at > ?)",
+                (key, now),
+            )
+            .fetchone()
+        )
+        return _to_entry(row) if row else None
+
+    def record_many_sync(
+        self,
+        entries: list[tuple[ClearingTransactionResponse, dict[str, str] | None]],
+        now: float | None = None,
+    ) -> list[tuple[ClearingTransactionResponse, bool]]:
+        """Insert entries in one transaction; a live idempotency key returns its original entry.
+
+        Returns ``(entry, created)`` per input, where ``created`` is False for replays.
+        """
+        now = time.time() if now is None else now
+        expires_at = now + self.idempotency_ttl_seconds
+        results: list[tuple[ClearingTransactionResponse, bool]] = []
+        with self._write_lock:
+            conn = self._write_conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for entry, metadata in entries:
+                    row = conn.execute(
+                        f"SELECT {_TX_COLUMNS} FROM clearing_tx WHERE tx_id = "
+                        "(SELECT tx_id FROM idempotency_keys WHERE key = ? AND expires_at > ?)",
+                        (entry.idempotency_key, now),
+                    ).fetchone()
+                    if row:
+                        results.append((_to_entry(row), False))
+                        continue
+                    conn.execute(
+                        "INSERT INTO clearing_tx VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        _to_row(entry, metadata),
+                    )
+                    # REPLACE reclaims a key that expired but has not been swept yet.
+                    conn.execute(
+                        "INSERT OR REPLACE INTO idempotency_keys VALUES (?, ?, ?)",
+                        (entry.idempotency_key, entry.tx_id, expires_at),
+                    )
+                    results.append((entry, True))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return results
+
+    def get_batch_by_key_sync(
+        self, key: str, now: float | None = None
+    ) -> ClearingBatchSettleResponse | None:
+        now = time.time() if now is None else now
+        row = (
+            self._read_conn()
+            .execute(
+                "SELECT response FROM clearing_batch WHERE batch_id = "
+                "(SELECT batch_id FROM batch_idempotency_keys WHERE key = ? AND expires_at > ?)",
+                (key, now),
+            )
+            .fetchone()
+        )
+        return ClearingBatchSettleResponse.model_validate_json(row[0]) if row else None
+
+    def record_batch_sync(
+        self,
+        request: ClearingBatchSettleRequest,
+        response: ClearingBatchSettleResponse,
+        now: float | None = None,
+    ) -> tuple[ClearingBatchSettleResponse, bool]:
+        """Write a whole batch atomically; a live batch key returns the stored response."""
+        now = time.time() if now is None else now
+        key = response.idempotency_key
+        created_at = response.created_at.isoformat()
+        settled_at = response.settled_at.isoformat() if response.settled_at else None
+        metadata = json.dumps(request.metadata) if request.metadata else None
+        rows = [
+            (
+                result.tx_id,
+                result.status.value,
+                item.from_wallet,
+                item.to_wallet,
+                str(item.amount),
+                request.currency,
+                item.reference,
+                metadata,
+                response.idempotency_key,
+                created_at,
+                settled_at,
+                result.failed_reason,
+            )
+            for item, result in zip(request.items, response.items, strict=True)
+        ]
+        with self._write_lock:
+            conn = self._write_conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT response FROM clearing_batch WHERE batch_id = "
+                    "(SELECT batch_id FROM batch_idempotency_keys WHERE key = ? AND expires_at > ?)",
+                    (key, now),
+                ).fetchone()
+                if row:
+                    conn.execute("ROLLBACK")
+                    return ClearingBatchSettleResponse.model_validate_json(row[0]), False
+                conn.executemany(
+                    "INSERT INTO clearing_tx VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+                )
+                conn.execute(
+                    "INSERT INTO clearing_batch VALUES (?, ?, ?, ?, ?)",
+                    (
+                        response.batch_id,
+                        response.idempotency_key,
+                        response.item_count,
+                        response.model_dump_json(exclude={"already_processed"}),
+                        created_at,
+                    ),
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO batch_idempotency_keys VALUES (?, ?, ?)",
+                    (key, response.batch_id, now + self.idempotency_ttl_seconds),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return response, True
+
+    def iter_settled_sync(self) -> Iterator[tuple[str, str, str, str]]:
+        """Yield ``(currency, from_wallet, to_wallet, amount)`` for every SETTLED row."""
+        self._write_conn()  # schema must exist before the first read
+        cur = self._connect().execute(
+            "SELECT currency, from_wallet, to_wallet, amount FROM clearing_tx WHERE status = ?",
+            (ClearingStatus.SETTLED.value,),
+        )
+        try:
+            while rows := cur.fetchmany(_REPLAY_CHUNK):
+                yield from rows
+        finally:
+            cur.connection.close()
+
+    def sweep_sync(self, now: float | None = None) -> int:
+        """Delete expired idempotency keys in short chunks; returns keys removed."""
+        now = time.time() if now is None else now
+        removed = 0
+        for table in _KEY_TABLES:
+            while True:
+                with self._write_lock:
+                    cur = self._write_conn().execute(
+                        f"DELETE FROM {table} WHERE key IN ("
+                        f"SELECT key FROM {table} WHERE expires_at <= ? LIMIT ?)",
+                        (now, _SWEEP_CHUNK),
+                    )
+                removed += cur.rowcount
+                if cur.rowcount < _SWEEP_CHUNK:
+                    break
+        return removed
+
+    def idempotency_key_count_sync(self) -> int:
+        """Live and not yet swept keys, single and batch."""
+        conn = self._read_conn()
+        return sum(conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in _KEY_TABLES)
+
+    # -- async API ----------------------------------------------------------
+
+    async def get(self, tx_id: str) -> ClearingTransactionResponse | None:
+        return await asyncio.to_thread(self.get_sync, tx_id)
+
+    async def get_by_key(self, key: str) -> ClearingTransactionResponse | None:
+        return await asyncio.to_thread(self.get_by_key_sync, key)
+
+    async def record(
+        self, entry: ClearingTransactionResponse, metadata: dict[str, str] | None = None
+    ) -> tuple[ClearingTransactionResponse, bool]:
+        (result,) = await asyncio.to_thread(self.record_many_sync, [(entry, metadata)])
+        return result
+
+    async def get_batch_by_key(self, key: str) -> ClearingBatchSettleResponse | None:
+        return await asyncio.to_thread(self.get_batch_by_key_sync, key)
+
+    async def record_batch(
+        self, request: ClearingBatchSettleRequest, response: ClearingBatchSettleResponse
+    ) -> tuple[ClearingBatchSettleResponse, bool]:
+        return await asyncio.to_thread(self.record_batch_sync, request, response)
+
+    async def sweep(self) -> int:
+        return await asyncio.to_thread(self.sweep_sync)
+
+    async def run_sweeper(self) -> None:
+        while True:
+            await asyncio.sleep(settings.idempotency_sweep_interval_seconds)
+            try:
+                removed = await self.sweep()
+                if removed:
+                    logger.info("Expired %d idempotency keys", removed)
+            except Exception:
+                logger.exception("Idempotency key sweep failed")
+
+
+ledger = ClearingLedger(
+    settings.ledger_db_path, idempotency_ttl_seconds=settings.idempotency_ttl_seconds
+)
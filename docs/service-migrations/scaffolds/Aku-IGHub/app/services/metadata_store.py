@@ -0,0 +1,191 @@
+"""In-memory metadata store with inverted tag, category and publish-time indexes.
+
+Records get a monotonically increasing sequence number (``seq``) at publish
+time and are kept as compact JSON, so a query result is spliced straight into
+the response without re-serialising.  Three secondary indexes answer "all
+``skill_assessment`` records tagged X published since T":
+
+* ``tag → array('q')`` and ``category → array('q')`` postings of ``seq``s,
+  ascending by construction (appends only);
+* ``array('d')`` of publish timestamps indexed by ``seq``, non-decreasing, so a
+  time range maps to a ``seq`` range with two bisects.
+
+A query walks the shortest posting list from the start of the ``seq`` range and
+gallops through the others with ``bisect``.  Results are ordered by ``seq``, and
+the last ``seq`` returned is the keyset cursor for the next page, so paging
+stays stable while new records arrive.
+
+Memory is bounded by ``METADATA_STORE_MAX_RECORDS``.  Past it, the oldest
+records are evicted first.  Evicted ``seq``s are skipped by every query
+immediately, and are compacted out of the arrays and posting lists once half
+the capacity has been evicted.  Postings cost 8 bytes each, against ~36 for a
+list of Python ints.
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+
+from app.core.config import settings
+from app.schemas.metadata import MetadataRecord
+
+
+class MetadataStore:
+    """Bounded, append-ordered record store with tag / category / time indexes."""
+
+    def __init__(self, *, max_records: int) -> None:
+        if max_records < 1:
+            raise ValueError("max_records must be positive")
+        self.max_records = max_records
+        self._offset = 0  # seq of _docs[0]
+        self._floor = 0  # oldest live seq
+        self._next = 0  # seq of the next record
+        self._docs: list[bytes | None] = []
+        self._keys: list[str | None] = []
+        self._times = array("d")
+        self._ids: dict[str, int] = {}
+        self._by_tag: dict[str, array] = {}
+        self._by_category: dict[str, array] = {}
+
+    def __len__(self) -> int:
+        return self._next - self._floor
+
+    # -- writes -------------------------------------------------------------
+
+    def add(self, record: MetadataRecord) -> int:
+        """Store and index a record; returns its ``seq``."""
+        seq = self._next
+        timestamp = record.published_at.timestamp()
+        if self._times and timestamp < self._times[-1]:
+            timestamp = self._times[-1]  # keep the time index sorted across clock steps
+        self._docs.append(record.model_dump_json().encode())
+        self._keys.append(record.metadata_id)
+        self._times.append(timestamp)
+        self._ids[record.metadata_id] = seq
+        for tag in dict.fromkeys(record.tags):
+            postings = self._by_tag.get(tag)
+            if postings is None:
+                postings = self._by_tag[tag] = array("q")
+            postings.append(seq)
+        postings = self._by_category.get(record.category.value)
+        if postings is None:
+            postings = self._by_category[record.category.value] = array("q")
+        postings.append(seq)
+        self._next = seq + 1
+        if len(self) > self.max_records:
+            self._evict(len(self) - self.max_records)
+        return seq
+
+    def add_many(self, records: list[MetadataRecord]) -> list[bytes]:
+        """Store a batch; returns each record's stored JSON, for forwarding as-is."""
+        docs = []
+        for record in records:
+            seq = self.add(record)
+            docs.append(self._docs[seq - self._offset])
+        return docs
+
+    def _evict(self, count: int) -> None:
+        for seq in range(self._floor, self._floor + count):
+            slot = seq - self._offset
+            del self._ids[self._keys[slot]]
+            self._docs[slot] = self._keys[slot] = None
+        self._floor += count
+        if self._floor - self._offset >= max(self.max_records // 2, 1):
+            self._compact()
+
+    def _compact(self) -> None:
+        dead = self._floor - self._offset
+        del self._docs[:dead]
+        del self._keys[:dead]
+        del self._times[:dead]
+        self._offset = self._floor
+        for index in (self._by_tag, self._by_category):
+            for key in list(index):
+                postings = index[key]
+                del postings[: bisect_left(postings, self._floor)]
+                if not postings:
+                    del index[key]
+
+    # -- reads --------------------------------------------------------------
+
+    def get(self, metadata_id: str) -> MetadataRecord | None:
+        seq = self._ids.get(metadata_id)
+        if seq is None:
+            return None
+        return MetadataRecord.model_validate_json(self._docs[seq - self._offset])
+
+    def _seq_at(self, when: datetime, lo: int) -> int:
+        """First seq at or after ``lo`` published at or after ``when``."""
+        slot = bisect_left(self._times, when.timestamp(), lo - self._offset)
+        return slot + self._offset
+
+    def query(
+        self,
+        *,
+        category: str | None = None,
+        tags: list[str] | tuple[str, ...] = (),
+        since: datetime | None = None,
+        until: datetime | None = None,
+        after: int | None = None,
+        limit: int = 100,
+    ) -> tuple[list[bytes], int | None]:
+        """Records matching every filter, ascending by ``seq``.
+
+        ``since`` is inclusive and ``until`` exclusive.  ``after`` is the
+        cursor from the previous page.  Returns the JSON documents and the
+        cursor for the next page, or None when there is none.
+        """
+        lo = self._floor if after is None else max(self._floor, after + 1)
+        hi = self._next
+        if since is not None and lo < hi:
+            lo = self._seq_at(since, lo)
+        if until is not None and lo < hi:
+            hi = self._seq_at(until, lo)
+        if lo >= hi:
+            return [], None
+
+        postings = []
+        for tag in dict.fromkeys(tags):
+            if tag not in self._by_tag:
+                return [], None
+            postings.append(self._by_tag[tag])
+        if category is not None:
+            if category not in self._by_category:
+                return [], None
+            postings.append(self._by_category[category])
+
+        if not postings:
+            seqs = range(lo, min(hi, lo + limit + 1))
+        else:
+            seqs = self._intersect(sorted(postings, key=len), lo, hi, limit + 1)
+        docs = [self._docs[seq - self._offset] for seq in seqs]
+        if len(docs) > limit:
+            return docs[:limit], seqs[limit - 1]
+        return docs, None
+
+    @staticmethod
+    def _intersect(postings: list[array], lo: int, hi: int, limit: int) -> list[int]:
+        driver, others = postings[0], postings[1:]
+        positions = [bisect_left(other, lo) for other in others]
+        matches: list[int] = []
+        for i in range(bisect_left(driver, lo), len(driver)):
+            seq = driver[i]
+            if seq >= hi:
+                break
+            for k, other in enumerate(others):
+                p = bisect_left(other, seq, positions[k])
+                if p == len(other):
+                    return matches  # that list has nothing at or after seq
+                positions[k] = p
+                if other[p] != seq:
+                    break
+            else:
+                matches.append(seq)
+                if len(matches) == limit:
+                    break
+        return matches
+
+
+metadata_store = MetadataStore(max_records=settings.metadata_store_max_records)
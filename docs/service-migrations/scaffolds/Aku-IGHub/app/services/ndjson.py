@@ -0,0 +1,44 @@
+"""Incremental NDJSON line splitting for streamed request bodies.
+
+:func:`iter_lines` splits a byte stream on ``\\n`` as chunks arrive, so an
+upload is never held in memory whole.  A line longer than the caller's limit
+is not buffered: it comes out as :data:`LINE_TOO_LONG` and the rest of it is
+skipped.  Used by the bulk metadata publish and the compliance batch check.
+"""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterable, AsyncIterator
+
+LINE_TOO_LONG = object()
+
+
+async def iter_lines(
+    chunks: AsyncIterable[bytes], max_line_bytes: int
+) -> AsyncIterator[bytes | object]:
+    """Split a byte stream on ``\\n``; over-long lines come out as ``LINE_TOO_LONG``."""
+    pending = bytearray()
+    oversized = False
+    async for chunk in chunks:
+        pieces = chunk.split(b"\n")
+        for piece in pieces[:-1]:
+            if oversized:
+                oversized = False
+                yield LINE_TOO_LONG
+                continue
+            if pending:
+                pending += piece
+                line = bytes(pending)
+                pending.clear()
+            else:
+                line = piece
+            yield line if len(line) <= max_line_bytes else LINE_TOO_LONG
+        if not oversized:
+            pending += pieces[-1]
+            if len(pending) > max_line_bytes:
+                oversized = True
+                pending.clear()
+    if oversized:
+        yield LINE_TOO_LONG
+    elif pending.strip():
+        yield bytes(pending)
@@ -0,0 +1,152 @@
+"""Deep PII scanner for metadata payloads.
+
+:meth:`PIIScanner.scan` walks nested dicts and lists iteratively, with an
+explicit stack rather than recursion, so deep payloads cannot overflow the
+stack.  It flags keys that name PII and, optionally, string values that look
+like PII.
+
+* **Keys** are normalised before lookup: case-folded, with ``_``, ``-``, ``.``
+  and spaces removed.  So ``Email``, ``e-mail`` and ``Date_Of_Birth`` all
+  match, while ``username`` or ``address_type`` do not.  Raw keys found
+  clean are remembered, so a dict whose keys were all seen before is cleared
+  with one set operation.
+* **Values** (``METADATA_PII_VALUE_PATTERNS``) are searched with one
+  precompiled alternation for e-mail addresses, international phone numbers
+  and US SSNs, but only strings containing ``@``, ``+`` or ``-`` are searched.
+
+The scan runs inside request validation on the event loop, so it is bounded:
+nesting beyond ``METADATA_PII_MAX_DEPTH`` or more than
+``METADATA_PII_MAX_NODES`` keys and items raises :class:`PIIScanLimitError`
+rather than scanning on.  Only the first ``_VALUE_SCAN_CHARS`` characters of
+each string are pattern-checked.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+
+from app.core.config import settings
+
+PII_KEYS = (
+    "name",
+    "email",
+    "phone",
+    "dob",
+    "date_of_birth",
+    "ssn",
+    "passport",
+    "address",
+)
+
+_SEPARATORS = str.maketrans("", "", "_-. ")
+# Each alternative can only start at a token boundary (lookbehind), so a search is
+# linear in the string length even on long runs of word characters.
+_VALUE_PATTERN = re.compile(
+    r"(?P<email>(?<![\w.+-])[\w.+-]{1,64}@[\w-]{1,63}(?:\.[\w-]{1,63})+)"
+    r"|(?P<phone>(?<![\w+])\+[1-9]\d{7,14}\b)"
+    r"|(?P<ssn>\b\d{3}-\d{2}-\d{4}\b)",
+    re.ASCII,
+)
+_VALUE_SCAN_CHARS = 4_096
+_MAX_FINDINGS = 20
+_CLEAN_KEYS_MAX = 65_536
+
+
+class PIIScanLimitError(ValueError):
+    """The payload is too deep or too large to scan within the configured limits."""
+
+
+def normalise_key(key: str) -> str:
+    return key.casefold().translate(_SEPARATORS)
+
+
+@dataclass(frozen=True, slots=True)
+class PIIFinding:
+    path: str
+    reason: str  # "key" or the value pattern that matched
+
+    def __str__(self) -> str:
+        return f"{self.path} ({self.reason})"
+
+
+def _path(parts: tuple, leaf: str | int) -> str:
+    return "".join(f"[{p}]" if isinstance(p, int) else f".{p}" for p in (*parts, leaf))[1:]
+
+
+class PIIScanner:
+    """Iterative key / value PII scanner with depth and size limits."""
+
+    def __init__(
+        self,
+        keys: tuple[str, ...] = PII_KEYS,
+        *,
+        value_patterns: bool = True,
+        max_depth: int = 32,
+        max_nodes: int = 200_000,
+    ) -> None:
+        self.keys = frozenset(normalise_key(k) for k in keys)
+        self.value_patterns = value_patterns
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        # Payload keys repeat across records; remember the ones that are not PII.
+        self._clean_keys: set[object] = set()
+
+    def scan(self, payload: object) -> list[PIIFinding]:
+        """PII findings in ``payload`` (at most ``_MAX_FINDINGS``), depth first, document order."""
+        if not isinstance(payload, (dict, list)):
+            return []
+        keys, clean, check_values = self.keys, self._clean_keys, self.value_patterns
+        search = _VALUE_PATTERN.search
+        findings: list[PIIFinding] = []
+        nodes = 0
+        # (container, depth, path of the container as a tuple of keys / indexes)
+        stack: list[tuple[dict | list, int, tuple]] = [(payload, 0, ())]
+        while stack:
+            container, depth, path = stack.pop()
+            if depth > self.max_depth:
+                raise PIIScanLimitError(f"Payload nesting exceeds {self.max_depth} levels")
+            nodes += len(container)
+            if nodes > self.max_nodes:
+                raise PIIScanLimitError(f"Payload has more than {self.max_nodes} keys and items")
+            if type(container) is dict:
+                # Keys already known to be clean are skipped with one C-level subset test.
+                if not clean.issuperset(container):
+                    for key in container:
+                        if key in clean:
+                            continue
+                        if type(key) is str and key.casefold().translate(_SEPARATORS) in keys:
+                            findings.append(PIIFinding(_path(path, key), "key"))
+                            if len(findings) >= _MAX_FINDINGS:
+                                return findings
+                        elif len(clean) < _CLEAN_KEYS_MAX:
+                            clean.add(key)
+                items = container.items()
+            else:
+                items = enumerate(container)
+            children = []
+            for key, value in items:
+                kind = type(value)
+                if kind is dict or kind is list:
+                    if value:
+                        children.append((value, depth + 1, (*path, key)))
+                elif (
+                    kind is str
+                    and check_values
+                    and len(value) >= 6
+                    and ("@" in value or "+" in value or "-" in value)
+                ):
+                    match = search(value, 0, _VALUE_SCAN_CHARS)
+                    if match is not None:
+                        findings.append(PIIFinding(_path(path, key), match.lastgroup))
+                        if len(findings) >= _MAX_FINDINGS:
+                            return findings
+            stack.extend(reversed(children))  # visit children in document order
+        return findings
+
+
+pii_scanner = PIIScanner(
+    value_patterns=settings.metadata_pii_value_patterns,
+    max_depth=settings.metadata_pii_max_depth,
+    max_nodes=settings.metadata_pii_max_nodes,
+)
@@ -0,0 +1,222 @@
+"""Per-tenant token-bucket rate limiting for the gateway.
+
+Every request to ``/api/v1/<group>/…`` takes one token from the bucket of its
+(principal, route group) pair, where the principal is the verified JWT ``sub``
+(or the client address for unauthenticated requests).  A bucket holds
+``burst`` tokens and refills at ``per_minute`` tokens a minute.
+
+Buckets are stored in GCRA form: one float per key, the time at which the
+bucket will be full again (its "theoretical arrival time").  Taking a token
+pushes it forward by one refill interval; the request is refused when that
+would put it more than ``burst`` intervals ahead of now.  This is exactly a
+token bucket, without a separate token count or refill step.
+
+Two backends share the rules and the arithmetic:
+
+* :class:`RateLimiter` keeps buckets in process memory, spread over
+  ``RATE_LIMIT_SHARDS`` dicts.  Full buckets are indistinguishable from absent
+  ones, so a shard that outgrows its share of ``RATE_LIMIT_MAX_KEYS`` drops
+  them; only that shard is swept, which keeps the pause short.
+* :class:`RedisRateLimiter` runs the same step as a Lua script on a
+  Redis-compatible server (``REDIS_URL``), so every worker sees the same
+  buckets.  If the server is unreachable, requests are let through and a
+  warning is logged at most once a minute.
+
+redis-py is an optional dependency (``requirements-extra.txt``).  With
+``RATE_LIMIT_ENABLED=false``, :func:`build_rate_limiter` returns None and the
+middleware lets everything through.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from app.core.config import Settings
+
+try:  # optional: only needed for RATE_LIMIT_BACKEND=redis
+    import redis.asyncio as redis
+except ImportError:  # pragma: no cover - exercised only without requirements-extra
+    redis = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+_FAIL_OPEN_LOG_INTERVAL_SECONDS = 60.0
+_EPSILON = 1e-9
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitRule:
+    per_minute: int
+    burst: int
+
+    @property
+    def interval(self) -> float:
+        """Seconds to refill one token."""
+        return 60.0 / self.per_minute
+
+    @property
+    def policy(self) -> str:
+        """``RateLimit-Policy`` header value."""
+        return f"{self.burst};w={round(self.burst * self.interval)}"
+
+
+@dataclass(slots=True)
+class RateLimitDecision:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: float  # seconds until the bucket is full again
+    retry_after: float  # seconds until a token is available; 0 when allowed
+
+
+def parse_group_limits(spec: str) -> dict[str, tuple[int, int | None]]:
+    """``"metadata=600,compliance=1200:300"`` → ``{group: (per_minute, burst)}``."""
+    limits: dict[str, tuple[int, int | None]] = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        group, sep, value = item.partition("=")
+        rate, _, burst = value.partition(":")
+        if not sep or not group.strip() or not rate.strip().isdigit():
+            raise ValueError(f"Malformed rate limit {item!r}; expected group=per_minute[:burst]")
+        limits[group.strip()] = (int(rate), int(burst) if burst.strip() else None)
+    return limits
+
+
+class RateLimiter:
+    """In-memory sharded token buckets keyed by (principal, route group)."""
+
+    def __init__(
+        self,
+        *,
+        per_minute: int,
+        burst: int | None = None,
+        group_limits: dict[str, tuple[int, int | None]] | None = None,
+        shards: int = 64,
+        max_keys: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if per_minute < 1 or (burst is not None and burst < 1):
+            raise ValueError("per_minute and burst must be positive")
+        self.default_rule = RateLimitRule(per_minute, burst or per_minute)
+        self.rules = {
+            group: RateLimitRule(rate, group_burst or rate)
+            for group, (rate, group_burst) in (group_limits or {}).items()
+        }
+        self._clock = clock
+        self._shards: list[dict[str, float]] = [{} for _ in range(shards)]
+        self._shard_max = max(1, max_keys // shards)
+
+    def __len__(self) -> int:
+        return sum(map(len, self._shards))
+
+    def rule_for(self, group: str) -> RateLimitRule:
+        return self.rules.get(group, self.default_rule)
+
+    async def hit(self, principal: str, group: str) -> RateLimitDecision:
+        """Take one token for ``principal`` on ``group``."""
+        return self.take(f"{principal}|{group}", self.rule_for(group))
+
+    def take(self, key: str, rule: RateLimitRule) -> RateLimitDecision:
+        shard = self._shards[hash(key) % len(self._shards)]
+        now = self._clock()
+        tat = shard.get(key, now)
+        if tat < now:
+            tat = now
+        interval = rule.interval
+        ahead = tat + interval - now  # how far past full the bucket would be
+        excess = ahead - rule.burst * interval
+        if excess > _EPSILON:
+            return RateLimitDecision(False, rule.burst, 0, tat - now, excess)
+        shard[key] = now + ahead
+        if len(shard) > self._shard_max:
+            self._sweep(shard, now)
+        remaining = int((rule.burst * interval - ahead) / interval + _EPSILON)
+        return RateLimitDecision(True, rule.burst, remaining, ahead, 0.0)
+
+    def _sweep(self, shard: dict[str, float], now: float) -> None:
+        for key in [key for key, tat in shard.items() if tat <= now]:
+            del shard[key]  # full bucket: same as no entry
+        overflow = len(shard) - self._shard_max * 3 // 4
+        if overflow > 0:
+            # Every bucket is in use; forget the longest-tracked ones (they start full again).
+            for key in list(shard)[:overflow]:
+                del shard[key]
+
+    async def close(self) -> None:
+        return None
+
+
+# KEYS[1] bucket; ARGV interval, burst.  Returns {allowed, remaining, reset, retry_after}
+# with the floats as strings (Lua numbers are truncated to integers on the way out).
+_GCRA_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local ahead = tat + interval - now
+local excess = ahead - burst * interval
+if excess > 1e-9 then
+  return {0, 0, tostring(tat - now), tostring(excess)}
+end
+redis.call('SET', KEYS[1], tostring(now + ahead), 'PX', math.ceil(ahead * 1000))
+return {1, math.floor((burst * interval - ahead) / interval + 1e-9), tostring(ahead), '0'}
+"""
+
+
+class RedisRateLimiter(RateLimiter):
+    """Token buckets in a Redis-compatible server, shared by every gateway worker."""
+
+    def __init__(self, url: str, *, key_prefix: str = "ighub:rl:", **rules) -> None:
+        if redis is None:
+            raise RuntimeError(
+                "RATE_LIMIT_BACKEND=redis needs redis-py: pip install -r requirements-extra.txt"
+            )
+        super().__init__(**rules)
+        self.key_prefix = key_prefix
+        self._client = redis.from_url(url)
+        self._script = self._client.register_script(_GCRA_SCRIPT)
+        self._warned_at = float("-inf")
+
+    async def hit(self, principal: str, group: str) -> RateLimitDecision:
+        rule = self.rule_for(group)
+        try:
+            allowed, remaining, reset, retry_after = await self._script(
+                keys=[f"{self.key_prefix}{principal}|{group}"],
+                args=[rule.interval, rule.burst],
+            )
+        except redis.RedisError as exc:
+            now = time.monotonic()
+            if now - self._warned_at >= _FAIL_OPEN_LOG_INTERVAL_SECONDS:
+                self._warned_at = now
+                logger.warning("Rate limit backend unavailable, allowing requests: %s", exc)
+            return RateLimitDecision(True, rule.burst, rule.burst, 0.0, 0.0)
+        return RateLimitDecision(
+            bool(allowed), rule.burst, int(remaining), float(reset), float(retry_after)
+        )
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def build_rate_limiter(config: Settings) -> RateLimiter | None:
+    """Limiter for the configured backend, or None when rate limiting is disabled."""
+    if not config.rate_limit_enabled:
+        return None
+    rules = {
+        "per_minute": config.rate_limit_per_minute,
+        "burst": config.rate_limit_burst,
+        "group_limits": parse_group_limits(config.rate_limit_group_limits),
+    }
+    if config.rate_limit_backend == "redis":
+        return RedisRateLimiter(config.redis_url, **rules)
+    return RateLimiter(
+        shards=config.rate_limit_shards, max_keys=config.rate_limit_max_keys, **rules
+    )
+
+
+# Installed by the app lifespan; None lets every request through.
+rate_limiter: RateLimiter | None = None
@@ -0,0 +1,38 @@
+"""Settlement helpers — wallet-pair netting for batch payouts."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from decimal import Decimal
+
+from app.schemas.clearing import ClearingNetTransfer, ClearingTransferItem
+
+_ZERO = Decimal(0)
+
+
+def net_transfers(items: Iterable[ClearingTransferItem]) -> list[ClearingNetTransfer]:
+    """Collapse transfers to one net movement per unordered wallet pair.
+
+    ``a→b 10`` and ``b→a 4`` become ``a→b 6``; pairs that cancel out and
+    self-transfers disappear.  Output order follows each pair's first
+    appearance, so results are deterministic for a given request.
+    """
+    # (low, high) -> signed amount flowing low → high
+    flows: dict[tuple[str, str], Decimal] = {}
+    for item in items:
+        src, dst = item.from_wallet, item.to_wallet
+        if src == dst:
+            continue
+        if src < dst:
+            pair, amount = (src, dst), item.amount
+        else:
+            pair, amount = (dst, src), -item.amount
+        flows[pair] = flows.get(pair, _ZERO) + amount
+
+    net: list[ClearingNetTransfer] = []
+    for (low, high), amount in flows.items():
+        if amount > 0:
+            net.append(ClearingNetTransfer(from_wallet=low, to_wallet=high, amount=amount))
+        elif amount < 0:
+            net.append(ClearingNetTransfer(from_wallet=high, to_wallet=low, amount=-amount))
+    return net
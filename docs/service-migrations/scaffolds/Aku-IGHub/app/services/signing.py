@@ -0,0 +1,255 @@
+"""Local Ed25519 signing engine for JWT verifiable credentials.
+
+The issuer key is loaded once, from ``VC_SIGNING_KEY_PATH`` (PKCS#8 PEM).  In
+development, when the path is unset, an ephemeral key is generated with a
+warning; in any other environment a missing path fails startup, because
+credentials signed with a lost key stop verifying.  Credentials are signed as compact JWTs (``alg: EdDSA``) following the
+W3C VC-JWT encoding: ``iss``/``sub``/``jti``/``nbf``/``exp`` claims plus a
+``vc`` object.
+
+Single issues sign inline, since one Ed25519 signature takes tens of
+microseconds.  :meth:`SigningEngine.sign_many` splits a batch into chunks of
+``VC_SIGNING_CHUNK_SIZE``.  Each chunk is serialised, encoded and signed on
+a worker pool of ``VC_SIGNING_WORKERS``.  The pool is a thread pool by
+default, or a process pool when ``VC_SIGNING_POOL=process``, so bulk issuance
+scales past one core.  Process workers receive the raw 32-byte key, because
+key objects do not pickle.
+
+``cryptography`` is an optional dependency (``requirements-extra.txt``);
+without it credential issuance fails with a clear error.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import binascii
+import json
+import logging
+import os
+import threading
+from collections.abc import Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from app.core.config import settings
+from app.schemas.credentials import CredentialIssueRequest
+
+try:  # optional: only needed to issue credentials
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+except ImportError:  # pragma: no cover - exercised only without requirements-extra
+    InvalidSignature = ValueError  # type: ignore[assignment,misc]
+    serialization = None  # type: ignore[assignment]
+    Ed25519PrivateKey = None  # type: ignore[assignment,misc]
+
+logger = logging.getLogger(__name__)
+
+_VC_CONTEXT = ["https://www.w3.org/2018/credentials/v1"]
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64url_decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _encode_json(value: Any) -> str:
+    return _b64url(json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode())
+
+
+def credential_payload(
+    body: CredentialIssueRequest,
+    *,
+    credential_id: str,
+    issuer_did: str,
+    issued_at: datetime,
+    status: dict[str, str] | None = None,
+) -> dict[str, Any]:
+    """VC-JWT claims for one credential (``jti`` is the credential's URN).
+
+    ``status`` is the ``credentialStatus`` entry from the status registry.
+    """
+    vc: dict[str, Any] = {
+        "@context": _VC_CONTEXT,
+        "type": ["VerifiableCredential", body.credential_type.value],
+        "credentialSubject": {**body.claims, "id": body.subject_did},  # claims cannot move id
+        "issuanceDate": issued_at.isoformat(),
+    }
+    payload: dict[str, Any] = {
+        "iss": issuer_did,
+        "sub": body.subject_did,
+        "jti": f"urn:uuid:{credential_id}",
+        "nbf": int(issued_at.timestamp()),
+        "vc": vc,
+    }
+    if body.expiry_date is not None:
+        vc["expirationDate"] = body.expiry_date.isoformat()
+        payload["exp"] = int(body.expiry_date.timestamp())
+    if status is not None:
+        vc["credentialStatus"] = status
+    return payload
+
+
+def _sign_with(key: Any, header: str, payloads: Sequence[dict[str, Any]]) -> list[str]:
+    tokens = []
+    for payload in payloads:
+        signing_input = f"{header}.{_encode_json(payload)}"
+        signature = key.sign(signing_input.encode("ascii"))
+        tokens.append(f"{signing_input}.{_b64url(signature)}")
+    return tokens
+
+
+def _sign_chunk(private_bytes: bytes, header: str, payloads: Sequence[dict[str, Any]]) -> list[str]:
+    """Encode and sign payloads in a process-pool worker, which cannot share the key object."""
+    return _sign_with(Ed25519PrivateKey.from_private_bytes(private_bytes), header, payloads)
+
+
+class SigningEngine:
+    """Ed25519 VC-JWT signer with a worker pool for batches."""
+
+    def __init__(
+        self,
+        *,
+        key_path: str | None = None,
+        key_id: str,
+        workers: int | None = None,
+        pool: str = "thread",
+        chunk_size: int = 512,
+        allow_ephemeral: bool = False,
+    ) -> None:
+        if pool not in {"thread", "process"}:
+            raise ValueError(f"pool must be 'thread' or 'process', not {pool!r}")
+        self.key_path = key_path
+        self.key_id = key_id
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = pool
+        self.chunk_size = chunk_size
+        self.allow_ephemeral = allow_ephemeral
+        self._private_bytes: bytes | None = None
+        self._key: Any = None
+        self._header = ""
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+
+    # -- lifecycle ----------------------------------------------------------
+
+    def load(self) -> None:
+        """Load (or, without a key path and if allowed, generate) the signing key."""
+        if Ed25519PrivateKey is None:
+            raise RuntimeError(
+                "Credential signing needs cryptography: pip install -r requirements-extra.txt"
+            )
+        with self._lock:
+            if self._key is not None:
+                return
+            if self.key_path:
+                key = serialization.load_pem_private_key(
+                    Path(self.key_path).read_bytes(), password=None
+                )
+                if not isinstance(key, Ed25519PrivateKey):
+                    raise ValueError(f"{self.key_path} does not hold an Ed25519 private key")
+            elif not self.allow_ephemeral:
+                raise RuntimeError(
+                    "VC_SIGNING_KEY_PATH must be set outside development; "
+                    "credentials signed with an ephemeral key fail verification after a restart"
+                )
+            else:
+                logger.warning("VC_SIGNING_KEY_PATH not set; signing with an ephemeral Ed25519 key")
+                key = Ed25519PrivateKey.generate()
+            self._private_bytes = key.private_bytes(
+                serialization.Encoding.Raw,
+                serialization.PrivateFormat.Raw,
+                serialization.NoEncryption(),
+            )
+            self._header = _encode_json({"alg": "EdDSA", "typ": "JWT", "kid": self.key_id})
+            self._key = key
+
+    def close(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    def _pool(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = (
+                    ProcessPoolExecutor(max_workers=self.workers)
+                    if self.pool == "process"
+                    else ThreadPoolExecutor(self.workers, thread_name_prefix="vc-sign")
+                )
+            return self._executor
+
+    def public_key(self) -> Any:
+        self.load()
+        return self._key.public_key()
+
+    def public_jwk(self) -> dict[str, str]:
+        """The verification key as an OKP JWK, for the issuer's DID document."""
+        raw = self.public_key().public_bytes(
+            serialization.Encoding.Raw, serialization.PublicFormat.Raw
+        )
+        return {"kty": "OKP", "crv": "Ed25519", "x": _b64url(raw), "kid": self.key_id}
+
+    # -- signing ------------------------------------------------------------
+
+    def verify(self, token: str) -> dict[str, Any]:
+        """Payload of a compact JWT signed by this engine's key; ValueError otherwise."""
+        self.load()
+        try:
+            header, payload, signature = token.split(".")
+            if header != self._header:
+                raise ValueError("Credential was not signed with the gateway key")
+            self._key.public_key().verify(
+                _b64url_decode(signature), f"{header}.{payload}".encode("ascii")
+            )
+            return json.loads(_b64url_decode(payload))
+        except InvalidSignature as exc:
+            raise ValueError("Credential signature is invalid") from exc
+        except (TypeError, UnicodeError, binascii.Error) as exc:
+            raise ValueError("Credential is not a compact JWT") from exc
+
+    def sign(self, payload: dict[str, Any]) -> str:
+        """Sign one payload inline."""
+        self.load()
+        (token,) = _sign_with(self._key, self._header, [payload])
+        return token
+
+    async def sign_many(self, payloads: Sequence[dict[str, Any]]) -> list[str]:
+        """Sign a batch on the worker pool; tokens are returned in input order."""
+        self.load()
+        if len(payloads) <= self.chunk_size:
+            return await asyncio.to_thread(_sign_with, self._key, self._header, payloads)
+        loop = asyncio.get_running_loop()
+        pool = self._pool()
+        # Key objects do not pickle; process workers rebuild the key from its raw bytes.
+        func, key = (
+            (_sign_chunk, self._private_bytes)
+            if self.pool == "process"
+            else (_sign_with, self._key)
+        )
+        chunks = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    pool, func, key, self._header, payloads[i : i + self.chunk_size]
+                )
+                for i in range(0, len(payloads), self.chunk_size)
+            )
+        )
+        return [token for chunk in chunks for token in chunk]
+
+
+signing_engine = SigningEngine(
+    key_path=settings.vc_signing_key_path,
+    key_id=settings.vc_signing_key_id or f"{settings.service_did}#key-1",
+    workers=settings.vc_signing_workers,
+    pool=settings.vc_signing_pool,
+    chunk_size=settings.vc_signing_chunk_size,
+    allow_ephemeral=settings.app_env == "development",
+)
@@ -0,0 +1,364 @@
+"""Credential status registry — StatusList2021 revocation bitstrings backed by SQLite.
+
+Every issued credential gets a global ``status_index``.  Indexes are grouped
+into fixed-size lists of ``STATUS_LIST_SIZE`` bits, and each list is published
+at ``{STATUS_LIST_BASE_URL}/{list_id}`` as a gzip-compressed, base64url-encoded
+bitstring (W3C StatusList2021).  The credential's ``credentialStatus`` entry
+points to its list and bit.  A set bit means revoked.
+
+The bitstrings live in memory, so checking revocation is a bit test with no
+query (:meth:`CredentialStatusRegistry.is_revoked`).  The
+``credential_status`` table is the durable record: it maps
+``credential_id → status_index`` and stores ``revoked_at``.  On startup
+:meth:`CredentialStatusRegistry.open` rebuilds the bitstrings from the revoked
+rows.  Each list caches its encoding and ETag until its next revocation, so
+verifiers and edge hubs can poll the list URL cheaply and check offline.
+
+The StatusList2021Credential served for a list is signed by the issuer key
+as a VC-JWT, carried in a ``JwtProof2020`` proof, so a verifier can tell the
+gateway's list from a forged one.  Its ``issuanceDate`` is when that version
+of the list was first served.  The signed document is cached per list and
+ETag, so it is re-signed only after the list changes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import gzip
+import hashlib
+import sqlite3
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+from app.core.config import settings
+from app.services.signing import signing_engine
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS credential_status (
+    credential_id TEXT PRIMARY KEY,
+    status_index  INTEGER NOT NULL UNIQUE,
+    subject_did   TEXT NOT NULL,
+    issuer_did    TEXT NOT NULL,
+    issued_at     TEXT NOT NULL,
+    expiry_date   TEXT,
+    revoked_at    TEXT
+) WITHOUT ROWID;
+"""
+
+_FIELDS = (
+    "credential_id",
+    "status_index",
+    "subject_did",
+    "issuer_did",
+    "issued_at",
+    "expiry_date",
+    "revoked_at",
+)
+_COLUMNS = ", ".join(_FIELDS)
+_LOAD_CHUNK = 10_000
+
+
+def _b64url_decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class StatusList:
+    """A revocation bitstring; bit ``i`` is the most significant first within its byte."""
+
+    __slots__ = ("size", "_bits", "_encoded")
+
+    def __init__(self, size: int, bits: bytes | None = None) -> None:
+        if size <= 0 or size % 8:
+            raise ValueError("Status list size must be a positive multiple of 8")
+        if bits is not None and len(bits) != size // 8:
+            raise ValueError(f"Expected {size // 8} bytes of status bits, got {len(bits)}")
+        self.size = size
+        self._bits = bytearray(bits) if bits is not None else bytearray(size // 8)
+        self._encoded: tuple[str, str] | None = None
+
+    def __getitem__(self, index: int) -> bool:
+        return bool(self._bits[index >> 3] & (0x80 >> (index & 7)))
+
+    def set(self, index: int, value: bool = True) -> bool:
+        """Set or clear a bit; returns True if it changed."""
+        if self[index] == value:
+            return False
+        self._bits[index >> 3] ^= 0x80 >> (index & 7)
+        self._encoded = None
+        return True
+
+    def count(self) -> int:
+        return int.from_bytes(self._bits, "big").bit_count()
+
+    def encode(self) -> tuple[str, str]:
+        """``(encodedList, etag)``, cached until the next change.
+
+        ``mtime=0`` keeps the gzip output, and so the ETag, stable across restarts.
+        """
+        encoded = self._encoded
+        if encoded is None:
+            compressed = gzip.compress(bytes(self._bits), compresslevel=6, mtime=0)
+            etag = '"' + hashlib.sha256(compressed).hexdigest()[:32] + '"'
+            encoded = (base64.urlsafe_b64encode(compressed).rstrip(b"=").decode("ascii"), etag)
+            self._encoded = encoded
+        return encoded
+
+    @classmethod
+    def decode(cls, encoded_list: str) -> StatusList:
+        bits = gzip.decompress(_b64url_decode(encoded_list))
+        return cls(len(bits) * 8, bits)
+
+
+@dataclass(frozen=True, slots=True)
+class CredentialStatusRecord:
+    credential_id: str
+    status_index: int
+    subject_did: str
+    issuer_did: str
+    issued_at: datetime
+    expiry_date: datetime | None
+    revoked_at: datetime | None
+
+    @classmethod
+    def from_row(cls, row: tuple) -> CredentialStatusRecord:
+        values = dict(zip(_FIELDS, row, strict=True))
+        for field in ("issued_at", "expiry_date", "revoked_at"):
+            if values[field] is not None:
+                values[field] = datetime.fromisoformat(values[field])
+        return cls(**values)
+
+
+class CredentialStatusRegistry:
+    """Status-index allocation, revocation and in-memory StatusList2021 bitstrings."""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        list_size: int,
+        base_url: str,
+        signer: Callable[[dict[str, Any]], str] | None = None,
+    ) -> None:
+        if list_size <= 0 or list_size % 8:
+            raise ValueError("Status list size must be a positive multiple of 8")
+        self.path = path
+        self.list_size = list_size
+        self.base_url = base_url.rstrip("/")
+        self.signer = signer
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.RLock()
+        self._lists: list[StatusList] = []
+        self._signed: dict[int, tuple[dict[str, Any], str]] = {}  # list_id -> (document, etag)
+        self._next_index = 0
+
+    # -- lifecycle ----------------------------------------------------------
+
+    def open(self) -> None:
+        """Open the database and rebuild the bitstrings from the revoked rows."""
+        with self._lock:
+            if self._conn is not None:
+                return
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.executescript(_SCHEMA)
+            (last,) = conn.execute("SELECT MAX(status_index) FROM credential_status").fetchone()
+            self._lists = []
+            self._next_index = 0 if last is None else last + 1
+            self._grow(self._next_index)
+            cursor = conn.execute(
+                "SELECT status_index FROM credential_status WHERE revoked_at IS NOT NULL"
+            )
+            while rows := cursor.fetchmany(_LOAD_CHUNK):
+                for (index,) in rows:
+                    self._lists[index // self.list_size].set(index % self.list_size)
+            self._conn = conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.open()
+        assert self._conn is not None
+        return self._conn
+
+    def _grow(self, capacity: int) -> None:
+        while len(self._lists) * self.list_size < capacity:
+            self._lists.append(StatusList(self.list_size))
+
+    # -- status lists -------------------------------------------------------
+
+    @property
+    def issued(self) -> int:
+        return self._next_index
+
+    def list_url(self, list_id: int) -> str:
+        return f"{self.base_url}/{list_id}"
+
+    def status_entry(self, status_index: int) -> dict[str, str]:
+        """The ``credentialStatus`` object embedded in a credential."""
+        list_id, bit = divmod(status_index, self.list_size)
+        url = self.list_url(list_id)
+        return {
+            "id": f"{url}#{bit}",
+            "type": "StatusList2021Entry",
+            "statusPurpose": "revocation",
+            "statusListIndex": str(bit),
+            "statusListCredential": url,
+        }
+
+    def status_list(self, list_id: int) -> StatusList | None:
+        return self._lists[list_id] if 0 <= list_id < len(self._lists) else None
+
+    def is_revoked(self, status_index: int) -> bool:
+        """O(1) revocation check against the in-memory bitstring."""
+        list_id, bit = divmod(status_index, self.list_size)
+        status_list = self.status_list(list_id)
+        return status_list is not None and status_list[bit]
+
+    def status_list_credential(
+        self, list_id: int, now: datetime | None = None
+    ) -> tuple[dict[str, Any], str] | None:
+        """The signed StatusList2021Credential document for a list, with its ETag."""
+        if self.signer is None:
+            raise RuntimeError("Status list credentials need a signer")
+        with self._lock:
+            status_list = self.status_list(list_id)
+            if status_list is None:
+                return None
+            encoded_list, etag = status_list.encode()
+            cached = self._signed.get(list_id)
+            if cached is not None and cached[1] == etag:
+                return cached
+            issued_at = now or datetime.now(timezone.utc)
+            url = self.list_url(list_id)
+            credential = {
+                "@context": [
+                    "https://www.w3.org/2018/credentials/v1",
+                    "https://w3id.org/vc/status-list/2021/v1",
+                ],
+                "id": url,
+                "type": ["VerifiableCredential", "StatusList2021Credential"],
+                "issuer": settings.service_did,
+                "issuanceDate": issued_at.isoformat(),
+                "credentialSubject": {
+                    "id": f"{url}#list",
+                    "type": "StatusList2021",
+                    "statusPurpose": "revocation",
+                    "encodedList": encoded_list,
+                },
+            }
+            token = self.signer(
+                {
+                    "iss": settings.service_did,
+                    "sub": f"{url}#list",
+                    "jti": url,
+                    "nbf": int(issued_at.timestamp()),
+                    "vc": credential,
+                }
+            )
+            document = {**credential, "proof": {"type": "JwtProof2020", "jwt": token}}
+            self._signed[list_id] = (document, etag)
+            return document, etag
+
+    # -- blocking API (called from worker threads and benchmarks) -----------
+
+    def register_many_sync(
+        self, credentials: list[tuple[str, str, str, datetime, datetime | None]]
+    ) -> list[int]:
+        """Allocate status indexes for ``(credential_id, subject_did, issuer_did, issued_at,
+        expiry_date)`` tuples and record them in one transaction."""
+        with self._lock:
+            conn = self._db()
+            start = self._next_index
+            rows = [
+                (
+                    credential_id,
+                    start + offset,
+                    subject_did,
+                    issuer_did,
+                    issued_at.isoformat(),
+                    expiry_date.isoformat() if expiry_date else None,
+                )
+                for offset, (credential_id, subject_did, issuer_did, issued_at, expiry_date) in (
+                    enumerate(credentials)
+                )
+            ]
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT INTO credential_status (credential_id, status_index, subject_did, "
+                    "issuer_did, issued_at, expiry_date) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            self._next_index = start + len(rows)
+            self._grow(self._next_index)
+            return list(range(start, self._next_index))
+
+    def get_sync(self, credential_id: str) -> CredentialStatusRecord | None:
+        with self._lock:
+            row = (
+                self._db()
+                .execute(
+                    f"SELECT {_COLUMNS} FROM credential_status WHERE credential_id = ?",
+                    (credential_id,),
+                )
+                .fetchone()
+            )
+        return CredentialStatusRecord.from_row(row) if row else None
+
+    def revoke_sync(
+        self, credential_id: str, now: datetime | None = None
+    ) -> CredentialStatusRecord | None:
+        """Mark a credential revoked (idempotent); None if it was never issued here."""
+        now = now or datetime.now(timezone.utc)
+        with self._lock:
+            row = (
+                self._db()
+                .execute(
+                    "UPDATE credential_status SET revoked_at = COALESCE(revoked_at, ?) "
+                    f"WHERE credential_id = ? RETURNING {_COLUMNS}",
+                    (now.isoformat(), credential_id),
+                )
+                .fetchone()
+            )
+            if row is None:
+                return None
+            record = CredentialStatusRecord.from_row(row)
+            list_id, bit = divmod(record.status_index, self.list_size)
+            self._lists[list_id].set(bit)
+        return record
+
+    # -- async API ----------------------------------------------------------
+
+    async def register_many(
+        self, credentials: list[tuple[str, str, str, datetime, datetime | None]]
+    ) -> list[int]:
+        return await asyncio.to_thread(self.register_many_sync, credentials)
+
+    async def get(self, credential_id: str) -> CredentialStatusRecord | None:
+        return await asyncio.to_thread(self.get_sync, credential_id)
+
+    async def revoke(self, credential_id: str) -> CredentialStatusRecord | None:
+        return await asyncio.to_thread(self.revoke_sync, credential_id)
+
+
+status_registry = CredentialStatusRegistry(
+    settings.credential_status_db_path,
+    list_size=settings.status_list_size,
+    base_url=settings.status_list_base_url,
+    signer=signing_engine.sign,
+)
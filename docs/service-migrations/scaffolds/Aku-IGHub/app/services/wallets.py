@@ -0,0 +1,239 @@
+"""In-process wallet balance engine — Decimal balances with striped per-wallet locks.
+
+Balances live in memory and are rebuilt on startup by replaying every SETTLED
+row of the clearing ledger, which is the engine's write-ahead journal: a
+settlement is only acknowledged once its journal row has committed.
+
+Each settlement runs in three steps so that no lock is held across the
+journal write:
+
+1. **reserve** — under the source wallet's stripe lock, check the balance and
+   debit it.  An overdraft is recorded as a FAILED transaction instead;
+2. **journal** — write the transaction to the ledger.  If the write fails or
+   the idempotency key turns out to be taken, the debit is put back;
+3. **credit** — under the destination wallet's stripe lock, credit it.
+
+Funds are debited before they are credited, so a wallet can never spend money
+whose journal row has not committed and no balance goes below zero.  Only
+issuer wallets (``WALLET_ISSUER_WALLETS``, an exact list such as the treasury
+that mints payouts) may go negative, which makes every currency sum to zero
+(see :meth:`WalletEngine.invariant_violations`).  The clearing router only lets
+callers with a ``WALLET_ISSUER_ROLES`` role debit them.
+
+Wallets hash to ``WALLET_LOCK_STRIPES`` locks, so transfers between disjoint
+wallets never wait on each other; only the journal write is serialised, by
+SQLite.  Batches reserve all of their net debits atomically, taking the
+stripe locks in index order, so a batch either settles completely or not at all.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import zlib
+from collections import defaultdict
+from collections.abc import Iterable
+from contextlib import ExitStack
+from decimal import Decimal
+
+from app.core.config import settings
+from app.schemas.clearing import (
+    ClearingBatchSettleRequest,
+    ClearingBatchSettleResponse,
+    ClearingStatus,
+    ClearingTransactionResponse,
+)
+from app.services.ledger import ClearingLedger, ledger
+
+_ZERO = Decimal(0)
+_Key = tuple[str, str]  # (currency, wallet)
+
+
+class WalletEngine:
+    """Decimal wallet balances journalled through a :class:`ClearingLedger`."""
+
+    def __init__(
+        self,
+        journal: ClearingLedger,
+        *,
+        stripes: int = 256,
+        issuer_wallets: Iterable[str] = (),
+    ) -> None:
+        self._journal = journal
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._balances: dict[_Key, Decimal] = {}
+        self._issuer_wallets = frozenset(w for w in issuer_wallets if w)
+
+    # -- balances -----------------------------------------------------------
+
+    def _stripe(self, wallet: str) -> int:
+        return zlib.crc32(wallet.encode()) % len(self._locks)
+
+    def may_overdraw(self, wallet: str) -> bool:
+        """Whether ``wallet`` is an issuer wallet, matched exactly."""
+        return wallet in self._issuer_wallets
+
+    def balance(self, wallet: str, currency: str = "AKU") -> Decimal:
+        return self._balances.get((currency, wallet), _ZERO)
+
+    def _add(self, key: _Key, amount: Decimal) -> None:
+        # Caller holds the stripe lock for key's wallet.
+        self._balances[key] = self._balances.get(key, _ZERO) + amount
+
+    def _credit(self, currency: str, wallet: str, amount: Decimal) -> None:
+        with self._locks[self._stripe(wallet)]:
+            self._add((currency, wallet), amount)
+
+    def _reserve(self, currency: str, debits: dict[str, Decimal]) -> str | None:
+        """Debit every wallet in ``debits`` or none of them; returns a failure reason."""
+        stripes = sorted({self._stripe(wallet) for wallet in debits})
+        with ExitStack() as stack:
+            for index in stripes:  # fixed order: no deadlock between overlapping batches
+                stack.enter_context(self._locks[index])
+            for wallet, amount in debits.items():
+                available = self._balances.get((currency, wallet), _ZERO)
+                if available < amount and not self.may_overdraw(wallet):
+                    return (
+                        f"Insufficient funds in wallet '{wallet}': "
+                        f"balance {available} {currency}, debit {amount} {currency}"
+                    )
+            for wallet, amount in debits.items():
+                self._add((currency, wallet), -amount)
+        return None
+
+    def _credit_all(self, currency: str, amounts: dict[str, Decimal]) -> None:
+        for wallet, amount in amounts.items():
+            self._credit(currency, wallet, amount)
+
+    # -- settlement (blocking; runs in worker threads) ----------------------
+
+    def settle_sync(
+        self, entry: ClearingTransactionResponse, metadata: dict[str, str] | None = None
+    ) -> tuple[ClearingTransactionResponse, bool]:
+        """Apply and journal one transfer; returns ``(stored entry, created)``.
+
+        ``entry`` is the SETTLED transaction to apply.  On overdraft a FAILED
+        copy is journalled instead and no balance moves.
+        """
+        debits = {entry.from_wallet: entry.amount}
+        reason = self._reserve(entry.currency, debits)
+        if reason is not None:
+            failed = entry.model_copy(
+                update={
+                    "status": ClearingStatus.FAILED,
+                    "settled_at": None,
+                    "failed_reason": reason,
+                }
+            )
+            ((stored, created),) = self._journal.record_many_sync([(failed, metadata)])
+            return stored, created
+        try:
+            ((stored, created),) = self._journal.record_many_sync([(entry, metadata)])
+        except BaseException:
+            self._credit_all(entry.currency, debits)
+            raise
+        if not created:  # key already settled by another worker
+            self._credit_all(entry.currency, debits)
+        else:
+            self._credit(entry.currency, entry.to_wallet, entry.amount)
+        return stored, created
+
+    def settle_batch_sync(
+        self, request: ClearingBatchSettleRequest, response: ClearingBatchSettleResponse
+    ) -> tuple[ClearingBatchSettleResponse, bool]:
+        """Apply ``response.net_transfers`` atomically and journal the whole batch.
+
+        If any wallet's net debit would overdraw it, the batch and every item
+        are journalled as FAILED and no balance moves.
+        """
+        deltas: dict[str, Decimal] = defaultdict(Decimal)
+        for transfer in response.net_transfers:
+            deltas[transfer.from_wallet] -= transfer.amount
+            deltas[transfer.to_wallet] += transfer.amount
+        debits = {wallet: -delta for wallet, delta in deltas.items() if delta < 0}
+        credits = {wallet: delta for wallet, delta in deltas.items() if delta > 0}
+
+        reason = self._reserve(request.currency, debits)
+        if reason is not None:
+            failed = response.model_copy(
+                update={
+                    "status": ClearingStatus.FAILED,
+                    "settled_at": None,
+                    "net_transfers": [],
+                    "items": [
+                        item.model_copy(
+                            update={"status": ClearingStatus.FAILED, "failed_reason": reason}
+                        )
+                        for item in response.items
+                    ],
+                }
+            )
+            return self._journal.record_batch_sync(request, failed)
+        try:
+            stored, created = self._journal.record_batch_sync(request, response)
+        except BaseException:
+            self._credit_all(request.currency, debits)
+            raise
+        self._credit_all(request.currency, credits if created else debits)
+        return stored, created
+
+    # -- journal replay and invariants --------------------------------------
+
+    def _replay(self) -> dict[_Key, Decimal]:
+        balances: dict[_Key, Decimal] = defaultdict(Decimal)
+        for currency, src, dst, amount in self._journal.iter_settled_sync():
+            value = Decimal(amount)
+            balances[(currency, src)] -= value
+            balances[(currency, dst)] += value
+        return dict(balances)
+
+    def load_sync(self) -> int:
+        """Rebuild balances from the journal; returns the number of wallets."""
+        balances = self._replay()
+        with ExitStack() as stack:
+            for lock in self._locks:
+                stack.enter_context(lock)
+            self._balances = balances
+        return len(balances)
+
+    def invariant_violations(self) -> list[str]:
+        """Check that every currency sums to zero and matches a journal replay.
+
+        Only meaningful while no settlement is in flight: reserved debits are
+        not yet journalled.
+        """
+        problems: list[str] = []
+        totals: dict[str, Decimal] = defaultdict(Decimal)
+        for (currency, _wallet), amount in list(self._balances.items()):
+            totals[currency] += amount
+        for currency, total in sorted(totals.items()):
+            if total != 0:
+                problems.append(f"{currency} balances sum to {total}, expected 0")
+        replayed = self._replay()
+        for key in sorted(set(replayed) | set(self._balances)):
+            live, journal = self._balances.get(key, _ZERO), replayed.get(key, _ZERO)
+            if live != journal:
+                problems.append(f"{key[0]} wallet '{key[1]}': live {live}, journal {journal}")
+        return problems
+
+    # -- async API ----------------------------------------------------------
+
+    async def settle(
+        self, entry: ClearingTransactionResponse, metadata: dict[str, str] | None = None
+    ) -> tuple[ClearingTransactionResponse, bool]:
+        return await asyncio.to_thread(self.settle_sync, entry, metadata)
+
+    async def settle_batch(
+        self, request: ClearingBatchSettleRequest, response: ClearingBatchSettleResponse
+    ) -> tuple[ClearingBatchSettleResponse, bool]:
+        return await asyncio.to_thread(self.settle_batch_sync, request, response)
+
+    async def load(self) -> int:
+        return await asyncio.to_thread(self.load_sync)
+
+
+wallets = WalletEngine(
+    ledger,
+    stripes=settings.wallet_lock_stripes,
+    issuer_wallets=(w.strip() for w in settings.wallet_issuer_wallets.split(",")),
+)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+bench_auth.py — Gateway auth overhead per request, with and without the verified-token cache
+
+Calls the ``get_current_user`` dependency directly, as every router does, and
+reports the mean cost per call for:
+
+  scaffold      no key source configured ("role:…" tokens, no crypto)
+  <alg> cold    full signature verification on every call (JWT_CLAIMS_CACHE_SIZE=0)
+  <alg> cached  claims served from the verified-token LRU
+
+for RS256, ES256 and HS256 tokens.  --tokens distinct tokens are cycled to
+model a working set of active sessions; keep it below the cache size.
+
+Usage:
+  # Default run:
+  python scripts/bench_auth.py
+
+  # Bigger working set, more calls:
+  python scripts/bench_auth.py --tokens 5000 --calls 200000
+
+Requires PyJWT and cryptography (requirements-extra.txt).
+Run from the Aku-IGHub directory so ``app`` is importable.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from fastapi.security import HTTPAuthorizationCredentials
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.dependencies import get_current_user  # noqa: E402
+from app.services import auth  # noqa: E402
+from app.services.auth import TokenVerifier  # noqa: E402
+
+
+def _keys() -> dict[str, tuple[object, object]]:
+    rsa_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    ec_key = ec.generate_private_key(ec.SECP256R1())
+    secret = "bench-secret-" + "x" * 32
+    return {
+        "RS256": (rsa_key, rsa_key.public_key()),
+        "ES256": (ec_key, ec_key.public_key()),
+        "HS256": (secret, secret),
+    }
+
+
+def _credentials(algorithm: str, signing_key, count: int) -> list[HTTPAuthorizationCredentials]:
+    exp = int(time.time()) + 3600
+    return [
+        HTTPAuthorizationCredentials(
+            scheme="Bearer",
+            credentials=jwt.encode(
+                {"sub": f"user-{i}", "exp": exp, "roles": ["operator"], "scope": "ig:read"},
+                signing_key,
+                algorithm=algorithm,
+            ),
+        )
+        for i in range(count)
+    ]
+
+
+async def _time(creds: list[HTTPAuthorizationCredentials], calls: int) -> float:
+    for c in creds:  # warm-up: fills the cache when enabled
+        await get_current_user(c)
+    start = time.perf_counter()
+    for i in range(calls):
+        await get_current_user(creds[i % len(creds)])
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tokens", type=int, default=1_000, help="distinct active tokens")
+    parser.add_argument("--calls", type=int, default=50_000)
+    parser.add_argument("--cold-calls", type=int, default=2_000)
+    args = parser.parse_args()
+
+    auth.token_verifier = None
+    scaffold = [HTTPAuthorizationCredentials(scheme="Bearer", credentials="role:operator")]
+    print(f"{'scaffold':<16} {await _time(scaffold, args.calls):9.1f} µs/request")
+
+    for algorithm, (signing_key, verify_key) in _keys().items():
+        creds = _credentials(algorithm, signing_key, args.tokens)
+        results = {}
+        for label, cache_size, calls in (
+            ("cold", 0, args.cold_calls),
+            ("cached", args.tokens, args.calls),
+        ):
+            auth.token_verifier = TokenVerifier(
+                algorithms=[algorithm], key=verify_key, cache_size=cache_size
+            )
+            results[label] = await _time(creds, calls)
+            print(f"{algorithm + ' ' + label:<16} {results[label]:9.1f} µs/request")
+        print(f"{'':<16} {results['cold'] / results['cached']:9.1f}× faster with the cache")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
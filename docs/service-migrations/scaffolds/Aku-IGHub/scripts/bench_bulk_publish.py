@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+bench_bulk_publish.py — NDJSON bulk metadata publish throughput at 100k records
+
+Streams --records NDJSON lines (64 KiB body chunks) through BulkPublisher with a
+simulated DaaS bulk endpoint (httpx.MockTransport that sleeps --daas-latency-ms
+per request), and compares it with the per-record path behind
+POST /api/v1/metadata/publish (validate, store, one DaaS request per record),
+run on a --sample of the same lines:
+
+  bulk          records/s end to end, DaaS requests made, process peak RSS
+  per-record    records/s on the sample, one DaaS request each
+
+Usage:
+  # Default run (100k records, 5 ms DaaS latency):
+  python scripts/bench_bulk_publish.py
+
+  # Larger batches, slower DaaS:
+  python scripts/bench_bulk_publish.py --batch-size 5000 --daas-latency-ms 20
+
+Run from the Aku-IGHub directory so ``app`` is importable.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import resource
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.schemas.metadata import MetadataPublishRequest, MetadataRecord  # noqa: E402
+from app.services.bulk_publish import BulkPublisher  # noqa: E402
+from app.services.metadata_store import MetadataStore  # noqa: E402
+
+CHUNK = 64 * 1024
+
+
+def _lines(records: int) -> list[bytes]:
+    return [
+        json.dumps(
+            {
+                "category": "learning_activity",
+                "payload": {
+                    "lesson_id": f"math-{i % 977}",
+                    "module": {"id": f"m-{i % 31}", "title": "Fractions"},
+                    "attempts": [{"score": (i % 100) / 100, "duration_s": 300 + i % 60}],
+                },
+                "tags": ["math", f"grade-{i % 12}"],
+                "source_service": "Akudemy",
+            }
+        ).encode()
+        + b"\n"
+        for i in range(records)
+    ]
+
+
+def _transport(latency: float, calls: list[int]) -> httpx.MockTransport:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(1)
+        await asyncio.sleep(latency)
+        return httpx.Response(202)
+
+    return httpx.MockTransport(handler)
+
+
+async def _bulk(lines: list[bytes], batch_size: int, latency: float) -> tuple[float, int]:
+    body = b"".join(lines)
+
+    async def chunks():
+        for start in range(0, len(body), CHUNK):
+            yield body[start : start + CHUNK]
+
+    calls: list[int] = []
+    publisher = BulkPublisher(
+        MetadataStore(max_records=len(lines)),
+        batch_size=batch_size,
+        max_line_bytes=1 << 20,
+        max_records=len(lines),
+        forward_url="https://daas.bench/bulk",
+        transport=_transport(latency, calls),
+    )
+    start = time.perf_counter()
+    async for _ in publisher.run(chunks()):
+        pass
+    elapsed = time.perf_counter() - start
+    assert publisher.summary.published == len(lines), publisher.summary
+    return elapsed, len(calls)
+
+
+async def _per_record(lines: list[bytes], latency: float) -> float:
+    store = MetadataStore(max_records=len(lines))
+    calls: list[int] = []
+    async with httpx.AsyncClient(transport=_transport(latency, calls)) as client:
+        start = time.perf_counter()
+        for line in lines:
+            body = MetadataPublishRequest.model_validate_json(line)
+            record = MetadataRecord(
+                metadata_id=str(uuid.uuid4()),
+                category=body.category,
+                payload=body.payload,
+                tags=body.tags,
+                source_service=body.source_service,
+                schema_version=body.schema_version,
+                published_at=datetime.now(timezone.utc),
+            )
+            store.add(record)
+            await client.post("https://daas.bench/ingest", json=record.model_dump(mode="json"))
+        return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    parser.add_argument("--daas-latency-ms", type=float, default=5.0)
+    parser.add_argument("--sample", type=int, default=2_000, help="records for per-record path")
+    args = parser.parse_args()
+
+    latency = args.daas_latency_ms / 1e3
+    lines = _lines(args.records)
+    size = sum(map(len, lines))
+    print(f"body          {args.records:,} lines, {size / 1e6:.1f} MB")
+
+    elapsed, calls = asyncio.run(_bulk(lines, args.batch_size, latency))
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    print(
+        f"bulk          {elapsed:6.2f} s  {args.records / elapsed:>9,.0f} records/s"
+        f"  {calls} DaaS requests  process peak RSS {rss / 1e6:.0f} MB"
+    )
+
+    sample = lines[: args.sample]
+    elapsed = asyncio.run(_per_record(sample, latency))
+    print(
+        f"per-record    {elapsed:6.2f} s  {len(sample) / elapsed:>9,.0f} records/s"
+        f"  ({len(sample):,}-record sample, {len(sample):,} DaaS requests)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+bench_ledger.py — Clearing ledger status-lookup benchmark
+
+Fills a scratch SQLite ledger with synthetic settled transactions and, at each
+checkpoint (10k, 100k, 1M, … up to --rows), times random status lookups by
+tx_id and by idempotency key through ``ClearingLedger``.  Latency should stay
+flat as the ledger grows.  For comparison, checkpoints up to --scan-limit also
+time the previous implementation: a linear scan over an in-memory dict.
+
+Usage:
+  # Default run (1M transactions):
+  python scripts/bench_ledger.py
+
+  # The 10M-transaction run quoted in the README (~2 GB scratch file):
+  python scripts/bench_ledger.py --rows 10000000
+
+  # Keep the database for inspection:
+  python scripts/bench_ledger.py --db /tmp/ledger-bench.db
+
+Run from the Aku-IGHub directory so ``app`` is importable.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.ledger import ClearingLedger  # noqa: E402
+
+_INSERT_BATCH = 50_000
+_SAMPLE_EVERY = 97  # keep ~1 % of tx_ids / keys for lookups
+
+
+def _checkpoints(rows: int) -> list[int]:
+    points, n = [], 10_000
+    while n < rows:
+        points.append(n)
+        n *= 10
+    return points + [rows]
+
+
+def _percentiles(samples_us: list[float]) -> str:
+    ordered = sorted(samples_us)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return f"p50 {statistics.median(ordered):7.1f} µs   p99 {p99:7.1f} µs"
+
+
+def _fill(conn: sqlite3.Connection, start: int, stop: int, sample: list[tuple[str, str]]) -> None:
+    created = datetime.now(timezone.utc).isoformat()
+    expires = time.time() + 86_400
+    for lo in range(start, stop, _INSERT_BATCH):
+        tx_rows, key_rows = [], []
+        for i in range(lo, min(lo + _INSERT_BATCH, stop)):
+            tx_id, key = str(uuid.uuid4()), str(uuid.uuid4())
+            tx_rows.append(
+                (tx_id, "SETTLED", f"wallet-{i % 5000}", f"wallet-{(i * 7) % 5000}", "10.00",
+                 "AKU", None, None, key, created, created, None)  # fmt: skip
+            )
+            key_rows.append((key, tx_id, expires))
+            if i % _SAMPLE_EVERY == 0:
+                sample.append((tx_id, key))
+        conn.execute("BEGIN")
+        conn.executemany(
+            "INSERT INTO clearing_tx VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", tx_rows
+        )
+        conn.executemany("INSERT INTO idempotency_keys VALUES (?, ?, ?)", key_rows)
+        conn.execute("COMMIT")
+
+
+def _time_lookups(fn, keys: list[str]) -> list[float]:
+    samples = []
+    for key in keys:
+        start = time.perf_counter()
+        assert fn(key) is not None
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def _time_scan(n: int, lookups: int) -> list[float]:
+    """The old get_clearing_status: iterate every idempotency-store entry."""
+    store = {str(i): str(i) for i in range(n)}
+    samples = []
+    for _ in range(lookups):
+        target = str(random.randrange(n))
+        start = time.perf_counter()
+        for _key, tx_id in store.items():
+            if tx_id == target:
+                break
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=5_000, help="lookups per checkpoint")
+    parser.add_argument("--scan-limit", type=int, default=1_000_000)
+    parser.add_argument("--db", help="ledger path (default: a temporary file)")
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(prefix="ledger-bench-"), "ledger.db")
+    ledger = ClearingLedger(path, idempotency_ttl_seconds=86_400)
+    ledger.open()
+    loader = sqlite3.connect(path, isolation_level=None)
+    loader.execute("PRAGMA journal_mode=WAL")
+    loader.execute("PRAGMA synchronous=OFF")
+
+    print(f"ledger: {path}")
+    sample: list[tuple[str, str]] = []
+    loaded = 0
+    for point in _checkpoints(args.rows):
+        start = time.perf_counter()
+        _fill(loader, loaded, point, sample)
+        fill_s = time.perf_counter() - start
+        loaded = point
+
+        picks = random.sample(sample, min(args.lookups, len(sample)))
+        by_tx = _time_lookups(ledger.get_sync, [tx_id for tx_id, _ in picks])
+        by_key = _time_lookups(ledger.get_by_key_sync, [key for _, key in picks])
+        print(f"\n{point:>12,} tx  (+{fill_s:6.1f} s to load)")
+        print(f"  get(tx_id)        {_percentiles(by_tx)}")
+        print(f"  get_by_key(key)   {_percentiles(by_key)}")
+        if point <= args.scan_limit:
+            print(f"  old dict scan     {_percentiles(_time_scan(point, 20))}")
+
+    loader.close()
+    ledger.close()
+
+
+if __name__ == "__main__":
+    main()
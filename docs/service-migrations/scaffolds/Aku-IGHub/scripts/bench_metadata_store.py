@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+bench_metadata_store.py — Metadata query latency and index memory at 5M records
+
+Fills a MetadataStore with synthetic records (3 tags each, drawn with a skewed
+distribution from --tags distinct tags; 4 categories; one record every 100 ms)
+and reports:
+
+  ingest          records indexed per second
+  index memory    bytes held by the posting lists and time index, per record
+  queries         mean latency of a first page (limit 100) for typical filters:
+                  a common tag, a rare tag, tag ∩ category, tag ∩ tag, tag + time
+                  range, time range only, and a keyset page deep into a result set
+
+Usage:
+  # Default run (5M records):
+  python scripts/bench_metadata_store.py
+
+  # Quicker run:
+  python scripts/bench_metadata_store.py --records 500000
+
+Run from the Aku-IGHub directory so ``app`` is importable.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import resource
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.schemas.metadata import MetadataCategory, MetadataRecord  # noqa: E402
+from app.services.metadata_store import MetadataStore  # noqa: E402
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+CATEGORIES = list(MetadataCategory)
+
+
+def _fill(store: MetadataStore, records: int, tags: int, rng: random.Random) -> float:
+    weights = [1 / (rank + 1) for rank in range(tags)]  # Zipf-like: tag-0 is the most common
+    names = [f"tag-{rank}" for rank in range(tags)]
+    start = time.perf_counter()
+    for i in range(records):
+        store.add(
+            MetadataRecord.model_construct(
+                metadata_id=f"m-{i:09d}",
+                category=CATEGORIES[i % 4],
+                payload={"score": i % 100, "lesson": f"lesson-{i % 977}"},
+                tags=rng.choices(names, weights, k=3),
+                source_service="Akudemy",
+                schema_version="1.0",
+                published_at=T0 + timedelta(milliseconds=100 * i),
+            )
+        )
+    return time.perf_counter() - start
+
+
+def _time(store: MetadataStore, repeats: int, **query) -> tuple[float, int]:
+    docs, _ = store.query(**query)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        store.query(**query)
+    return (time.perf_counter() - start) / repeats * 1e6, len(docs)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--records", type=int, default=5_000_000)
+    parser.add_argument("--tags", type=int, default=1_000, help="distinct tags")
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    store = MetadataStore(max_records=args.records)
+    elapsed = _fill(store, args.records, args.tags, random.Random(7))
+    print(
+        f"ingest        {args.records:,} records in {elapsed:.1f} s"
+        f" ({args.records / elapsed:,.0f}/s)"
+    )
+
+    postings = sum(len(p) for index in (store._by_tag, store._by_category) for p in index.values())
+    index_bytes = 8 * (postings + len(store._times))
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    print(
+        f"index memory  {index_bytes / 1e6:,.0f} MB ({index_bytes / args.records:.0f} B/record);"
+        f" process peak RSS {rss / 1e9:.2f} GB"
+    )
+
+    mid = T0 + timedelta(milliseconds=100 * args.records // 2)
+    hour = timedelta(hours=1)
+    rare = f"tag-{args.tags - 1}"
+    deep_cursor = args.records // 2
+    cases = {
+        "common tag": {"tags": ["tag-0"]},
+        "rare tag": {"tags": [rare]},
+        "tag ∩ category": {"tags": ["tag-3"], "category": "skill_assessment"},
+        "tag ∩ tag": {"tags": ["tag-1", "tag-2"]},
+        "rare ∩ common": {"tags": [rare, "tag-0"]},
+        "tag + 1 h range": {"tags": ["tag-5"], "since": mid, "until": mid + hour},
+        "1 h range only": {"since": mid, "until": mid + hour},
+        "deep keyset page": {"tags": ["tag-0"], "after": deep_cursor},
+    }
+    for label, query in cases.items():
+        micros, count = _time(store, args.repeats, **query)
+        print(f"{label:<18} {micros:9.1f} µs  ({count} records)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+bench_pii.py — Deep PII scan cost on ~1 MB nested metadata payloads
+
+Builds three PII-free payload shapes of about --size bytes of JSON and times
+PIIScanner.scan() on each, with and without value-pattern checks:
+
+  records     a list of flat-ish learning-activity records (typical bulk payload)
+  tree        a balanced tree of dicts, 6 levels deep
+  text        fewer keys, long free-text string values (worst case for value patterns)
+
+json.loads of the same bytes is shown for scale: the gateway already pays it
+before validation runs.
+
+Usage:
+  # Default run (1 MB payloads):
+  python scripts/bench_pii.py
+
+  # Bigger payloads, more repeats:
+  python scripts/bench_pii.py --size 4000000 --repeats 20
+
+Run from the Aku-IGHub directory so ``app`` is importable.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.pii import PIIScanner  # noqa: E402
+
+
+def _records(size: int) -> dict:
+    record = {
+        "lesson_id": "math-101",
+        "module": {"id": "m-7", "title": "Fractions", "tags": ["math", "grade-5"]},
+        "attempts": [{"score": 0.8, "duration_s": 312, "hint_used": False}] * 3,
+        "device": {"os": "android", "app_version": "4.2.0", "locale": "en-NG"},
+    }
+    count = max(1, size // len(json.dumps(record)))
+    return {"records": [dict(record, seq=i) for i in range(count)]}
+
+
+def _tree(size: int) -> dict:
+    def build(depth: int) -> dict:
+        if depth == 0:
+            return {"value": 0.5, "label": "leaf-node", "count": 3}
+        return {f"branch_{i}": build(depth - 1) for i in range(fanout)}
+
+    fanout = 2
+    while len(json.dumps(build(6))) < size:
+        fanout += 1
+    return build(6)
+
+
+def _text(size: int) -> dict:
+    sentence = "Learner completed the unit on fractions and requested further practice. "
+    entry = {"note": sentence * 20, "rubric": {"criterion": "reasoning", "level": 3}}
+    count = max(1, size // len(json.dumps(entry)))
+    return {"feedback": [entry] * count}
+
+
+def _time(fn, arg, repeats: int) -> float:
+    fn(arg)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(arg)
+    return (time.perf_counter() - start) / repeats * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--size", type=int, default=1_000_000, help="approximate JSON bytes")
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    keys_only = PIIScanner(value_patterns=False, max_nodes=10**9)
+    with_values = PIIScanner(value_patterns=True, max_nodes=10**9)
+    print(
+        f"{'shape':<8} {'bytes':>9} {'nodes':>8} {'json.loads':>11} {'keys':>9} {'keys+values':>12}"
+    )
+    for shape, build in (("records", _records), ("tree", _tree), ("text", _text)):
+        payload = build(args.size)
+        raw = json.dumps(payload)
+        nodes = raw.count(":") + raw.count(",")  # rough keys + items count
+        assert not with_values.scan(payload)
+        loads = _time(json.loads, raw, args.repeats)
+        keys = _time(keys_only.scan, payload, args.repeats)
+        values = _time(with_values.scan, payload, args.repeats)
+        print(
+            f"{shape:<8} {len(raw):>9,} {nodes:>8,} {loads:>9.1f}ms {keys:>7.1f}ms {values:>10.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+bench_rate_limit.py — Rate-limit overhead per request, limiter alone and as ASGI middleware
+
+Reports the mean cost of:
+
+  limiter.hit       one token-bucket step, cycling --principals × 4 route groups
+                    (buckets are generous enough that every request is allowed)
+  middleware        RateLimitMiddleware in front of a bare ASGI app that returns
+                    200, minus the bare app alone; principal resolved from the
+                    scaffold token and from a cached HS256 JWT
+
+The ASGI app is called directly, with no server or HTTP parsing, so the
+middleware delta is the whole of what rate limiting adds to a request.
+
+Usage:
+  # Default run:
+  python scripts/bench_rate_limit.py
+
+  # More tenants, more calls:
+  python scripts/bench_rate_limit.py --principals 50000 --calls 500000
+
+Requires PyJWT (requirements-extra.txt) for the JWT case.
+Run from the Aku-IGHub directory so ``app`` is importable.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import jwt
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.middleware import RateLimitMiddleware  # noqa: E402
+from app.services import auth, rate_limit  # noqa: E402
+from app.services.auth import TokenVerifier  # noqa: E402
+from app.services.rate_limit import RateLimiter  # noqa: E402
+
+GROUPS = ("credentials", "clearing", "metadata", "compliance")
+
+
+async def _bare_app(scope, receive, send) -> None:
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def _receive() -> dict:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message) -> None:
+    return None
+
+
+def _scopes(tokens: list[str]) -> list[dict]:
+    return [
+        {
+            "type": "http",
+            "path": f"/api/v1/{GROUPS[i % len(GROUPS)]}/item",
+            "headers": [
+                (b"host", b"ighub.test"),
+                (b"authorization", f"Bearer {token}".encode()),
+                (b"accept", b"application/json"),
+            ],
+            "client": ("10.0.0.1", 50000),
+        }
+        for i, token in enumerate(tokens)
+    ]
+
+
+async def _per_call(app, scopes: list[dict], calls: int) -> float:
+    for scope in scopes:
+        await app(scope, _receive, _send)
+    start = time.perf_counter()
+    for i in range(calls):
+        await app(scopes[i % len(scopes)], _receive, _send)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+async def _hit(limiter: RateLimiter, principals: int, calls: int) -> float:
+    keys = [(f"sub:tenant-{i % principals}", GROUPS[i % len(GROUPS)]) for i in range(calls)]
+    start = time.perf_counter()
+    for principal, group in keys:
+        await limiter.hit(principal, group)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+async def _run(principals: int, calls: int) -> None:
+    generous = {"per_minute": 10**9, "max_keys": 4 * principals}
+    print(f"{'case':<28} {'µs/request':>10}")
+    micros = await _hit(RateLimiter(**generous), principals, calls)
+    print(f"{'limiter.hit':<28} {micros:>10.2f}")
+
+    secret = "bench-secret-" + "x" * 32
+    exp = int(time.time()) + 3600
+    jwt_tokens = [
+        jwt.encode({"sub": f"tenant-{i}", "exp": exp}, secret, algorithm="HS256")
+        for i in range(principals)
+    ]
+    cases = {
+        "scaffold token": (None, _scopes(["role:operator"] * len(GROUPS))),
+        "cached HS256 JWT": (
+            TokenVerifier(algorithms=["HS256"], key=secret, cache_size=2 * principals),
+            _scopes(jwt_tokens),
+        ),
+    }
+    middleware = RateLimitMiddleware(_bare_app)
+    for label, (verifier, scopes) in cases.items():
+        auth.token_verifier = verifier
+        rate_limit.rate_limiter = None
+        bare = await _per_call(_bare_app, scopes, calls)
+        rate_limit.rate_limiter = RateLimiter(**generous)
+        limited = await _per_call(middleware, scopes, calls)
+        print(f"{'middleware, ' + label:<28} {limited - bare:>10.2f}  (bare app {bare:.2f})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--principals", type=int, default=10_000)
+    parser.add_argument("--calls", type=int, default=200_000)
+    args = parser.parse_args()
+    asyncio.run(_run(args.principals, args.calls))
+
+
+if __name__ == "__main__":
+    main()
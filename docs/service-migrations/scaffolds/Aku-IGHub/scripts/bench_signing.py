@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+bench_signing.py — Ed25519 VC signing throughput and batch issuance latency
+
+Reports, for the signing engine behind ``/api/v1/credentials/issue`` and
+``/api/v1/credentials/issue/batch``:
+
+  inline        SigningEngine.sign() one credential at a time (the single-issue path)
+  thread pool   SigningEngine.sign_many() over --batch credentials, VC_SIGNING_POOL=thread
+  process pool  the same with VC_SIGNING_POOL=process
+
+as signatures per second and batch latency (payload building included).  Pool
+speed-up needs more than one core; with one CPU expect the pools to match the
+inline rate.
+
+Usage:
+  # Default run (10k-credential batches, one worker per CPU):
+  python scripts/bench_signing.py
+
+  # Larger batches, explicit worker count and chunk size:
+  python scripts/bench_signing.py --batch 50000 --workers 8 --chunk-size 1024
+
+Requires cryptography (requirements-extra.txt).
+Run from the Aku-IGHub directory so ``app`` is importable.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.schemas.credentials import CredentialIssueRequest, CredentialType  # noqa: E402
+from app.services.signing import SigningEngine, credential_payload  # noqa: E402
+
+
+def _requests(count: int) -> list[CredentialIssueRequest]:
+    return [
+        CredentialIssueRequest(
+            subject_did=f"did:key:z6MkBench{i}",
+            credential_type=CredentialType.LEARNING_ACHIEVEMENT,
+            claims={"course": f"course-{i % 500}", "score": i % 100, "level": "B2"},
+        )
+        for i in range(count)
+    ]
+
+
+def _payloads(requests: list[CredentialIssueRequest]) -> list[dict]:
+    now = datetime.now(timezone.utc)
+    return [
+        credential_payload(
+            r, credential_id=str(uuid.uuid4()), issuer_did="did:web:bench", issued_at=now
+        )
+        for r in requests
+    ]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--batch", type=int, default=10_000, help="credentials per batch")
+    parser.add_argument("--rounds", type=int, default=3, help="batches per pool type")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=512)
+    args = parser.parse_args()
+    requests = _requests(args.batch)
+    print(f"{args.batch} credentials per batch, {args.workers} workers, chunk {args.chunk_size}")
+
+    inline = SigningEngine(key_id="did:web:bench#key-1", allow_ephemeral=True)
+    start = time.perf_counter()
+    for payload in _payloads(requests):
+        inline.sign(payload)
+    elapsed = time.perf_counter() - start
+    print(f"{'inline':<14} {args.batch / elapsed:10,.0f} signatures/s")
+
+    for pool in ("thread", "process"):
+        engine = SigningEngine(
+            key_id="did:web:bench#key-1",
+            workers=args.workers,
+            pool=pool,
+            chunk_size=args.chunk_size,
+            allow_ephemeral=True,
+        )
+        await engine.sign_many(_payloads(requests[: args.chunk_size * args.workers]))  # warm-up
+        latencies = []
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            await engine.sign_many(_payloads(requests))
+            latencies.append(time.perf_counter() - start)
+        engine.close()
+        best = min(latencies)
+        print(
+            f"{pool + ' pool':<14} {args.batch / best:10,.0f} signatures/s"
+            f"   batch latency {best * 1e3:8.1f} ms (best of {args.rounds})"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
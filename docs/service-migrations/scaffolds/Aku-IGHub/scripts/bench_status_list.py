@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+bench_status_list.py — StatusList2021 revocation checks at 10M issued credentials
+
+Fills a scratch credential status registry, revokes a random fraction and reports:
+
+  register        status-index allocation + SQLite insert throughput
+  revoke          single revocations (UPDATE + bit set)
+  rebuild         startup time to rebuild every bitstring from the revoked rows
+  bit test        CredentialStatusRegistry.is_revoked() — the per-verification cost
+  row lookup      the same question answered by a primary-key query, for comparison
+  encode          gzip + base64url of every list, and the total published size
+  verifier        decoding one published list and testing a bit (edge-hub side)
+
+Usage:
+  # Default run (10M credentials, 1% revoked, 131,072-bit lists):
+  python scripts/bench_status_list.py
+
+  # Smaller, quicker run:
+  python scripts/bench_status_list.py --credentials 1000000 --revoked 0.05
+
+Run from the Aku-IGHub directory so ``app`` is importable.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.status_list import CredentialStatusRegistry, StatusList  # noqa: E402
+
+_CHUNK = 100_000
+
+
+def _registry(path: str, list_size: int) -> CredentialStatusRegistry:
+    return CredentialStatusRegistry(path, list_size=list_size, base_url="https://bench/status")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--credentials", type=int, default=10_000_000)
+    parser.add_argument("--revoked", type=float, default=0.01, help="fraction revoked")
+    parser.add_argument("--list-size", type=int, default=131_072)
+    parser.add_argument("--lookups", type=int, default=1_000_000)
+    args = parser.parse_args()
+    rng = random.Random(7)
+
+    with tempfile.TemporaryDirectory(prefix="ighub-bench-") as tmp:
+        path = str(Path(tmp) / "status.db")
+        registry = _registry(path, args.list_size)
+        now = datetime.now(timezone.utc)
+
+        start = time.perf_counter()
+        for offset in range(0, args.credentials, _CHUNK):
+            registry.register_many_sync(
+                [
+                    (f"cred-{i}", "did:key:z6MkBench", "did:web:bench", now, None)
+                    for i in range(offset, min(offset + _CHUNK, args.credentials))
+                ]
+            )
+        elapsed = time.perf_counter() - start
+        print(
+            f"{'register':<12} {args.credentials:>12,} in {elapsed:6.1f} s"
+            f"  ({args.credentials / elapsed:,.0f}/s)"
+        )
+
+        revoked = rng.sample(range(args.credentials), int(args.credentials * args.revoked))
+        start = time.perf_counter()
+        for index in revoked:
+            registry.revoke_sync(f"cred-{index}")
+        elapsed = time.perf_counter() - start
+        print(
+            f"{'revoke':<12} {len(revoked):>12,} in {elapsed:6.1f} s"
+            f"  ({elapsed / max(len(revoked), 1) * 1e6:.1f} µs each)"
+        )
+        registry.close()
+
+        registry = _registry(path, args.list_size)
+        start = time.perf_counter()
+        registry.open()
+        print(f"{'rebuild':<12} {'':>12} in {time.perf_counter() - start:6.2f} s")
+
+        probes = [rng.randrange(args.credentials) for _ in range(args.lookups)]
+        is_revoked = registry.is_revoked
+        start = time.perf_counter()
+        hits = sum(is_revoked(i) for i in probes)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{'bit test':<12} {elapsed / args.lookups * 1e9:10.0f} ns/check"
+            f"  ({hits:,} of {args.lookups:,} revoked)"
+        )
+
+        sample = probes[: min(len(probes), 50_000)]
+        start = time.perf_counter()
+        for i in sample:
+            registry.get_sync(f"cred-{i}")
+        elapsed = time.perf_counter() - start
+        print(f"{'row lookup':<12} {elapsed / len(sample) * 1e9:10.0f} ns/check")
+
+        lists = (args.credentials + args.list_size - 1) // args.list_size
+        start = time.perf_counter()
+        encoded = [registry.status_list(i).encode()[0] for i in range(lists)]
+        elapsed = time.perf_counter() - start
+        published = sum(len(e) for e in encoded)
+        print(
+            f"{'encode':<12} {lists:>12,} lists in {elapsed:6.2f} s"
+            f"  ({published / 1e6:.2f} MB published vs {lists * args.list_size / 8e6:.2f} MB raw)"
+        )
+
+        start = time.perf_counter()
+        decoded = StatusList.decode(encoded[0])
+        elapsed = time.perf_counter() - start
+        print(
+            f"{'verifier':<12} decode one list {elapsed * 1e3:.2f} ms,"
+            f" then bit tests at memory speed ({decoded.count():,} revoked in list 0)"
+        )
+        registry.close()
+
+
+if __name__ == "__main__":
+    main()
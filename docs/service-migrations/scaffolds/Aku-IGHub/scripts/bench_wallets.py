@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+bench_wallets.py — Wallet balance engine settlement-throughput benchmark
+
+For each wallet count, funds every wallet from a treasury wallet and then has
+--threads worker threads settle random transfers between wallets, reporting
+settlements per second.  Each count is run three ways:
+
+  core       balance checks and updates only (no journal), striped locks
+  1 lock     the same with a single lock (stripes=1), i.e. no striping
+  journal    the full ``WalletEngine.settle_sync`` path, journalled to SQLite
+
+Few wallets means most transfers contend on the same stripes; many wallets
+lets disjoint transfers proceed in parallel.  After every journalled run the
+balances are checked against a journal replay and for sum-to-zero.
+
+Usage:
+  # Default run:
+  python scripts/bench_wallets.py
+
+  # More threads and transfers, custom wallet counts:
+  python scripts/bench_wallets.py --threads 16 --transfers 100000 --wallets 2 64 4096
+
+Run from the Aku-IGHub directory so ``app`` is importable.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.schemas.clearing import ClearingStatus, ClearingTransactionResponse  # noqa: E402
+from app.services.ledger import ClearingLedger  # noqa: E402
+from app.services.wallets import WalletEngine  # noqa: E402
+
+_TREASURY = "treasury-bench"
+_FUNDING = Decimal("1000000.00")
+
+
+def _entry(src: str, dst: str, amount: Decimal) -> ClearingTransactionResponse:
+    now = datetime.now(timezone.utc)
+    return ClearingTransactionResponse(
+        tx_id=str(uuid.uuid4()),
+        status=ClearingStatus.SETTLED,
+        from_wallet=src,
+        to_wallet=dst,
+        amount=amount,
+        currency="AKU",
+        idempotency_key=str(uuid.uuid4()),
+        created_at=now,
+        settled_at=now,
+    )
+
+
+def _plan(wallets: list[str], transfers: int, seed: int) -> list[tuple[str, str, Decimal]]:
+    rng = random.Random(seed)
+    return [
+        (*rng.sample(wallets, 2), Decimal(rng.randint(1, 10_000)) / 100) for _ in range(transfers)
+    ]
+
+
+def _run_threads(work, plans: list[list[tuple[str, str, Decimal]]]) -> float:
+    threads = [threading.Thread(target=work, args=(plan,)) for plan in plans]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def _bench_core(engine: WalletEngine, plans) -> float:
+    def work(plan):
+        for src, dst, amount in plan:
+            if engine._reserve("AKU", {src: amount}) is None:
+                engine._credit("AKU", dst, amount)
+
+    return _run_threads(work, plans)
+
+
+def _bench_journal(engine: WalletEngine, plans) -> float:
+    def work(plan):
+        for src, dst, amount in plan:
+            engine.settle_sync(_entry(src, dst, amount))
+
+    return _run_threads(work, plans)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--wallets", type=int, nargs="+", default=[2, 16, 256, 4096])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--transfers", type=int, default=20_000, help="per wallet count")
+    parser.add_argument("--stripes", type=int, default=256)
+    args = parser.parse_args()
+
+    per_thread = args.transfers // args.threads
+    scratch = tempfile.mkdtemp(prefix="wallet-bench-")
+    print(f"{args.threads} threads, {per_thread * args.threads:,} transfers per run\n")
+    print(f"{'wallets':>8}  {'core':>12}  {'1 lock':>12}  {'journal':>12}   invariant")
+    for count in args.wallets:
+        wallets = [f"wallet-{i}" for i in range(count)]
+        plans = [_plan(wallets, per_thread, seed) for seed in range(args.threads)]
+        total = per_thread * args.threads
+
+        rates = []
+        for stripes in (args.stripes, 1):
+            ledger = ClearingLedger(
+                os.path.join(scratch, f"core-{count}-{stripes}.db"), idempotency_ttl_seconds=60
+            )
+            engine = WalletEngine(ledger, stripes=stripes, issuer_wallets=[_TREASURY])
+            for wallet in wallets:
+                engine._reserve("AKU", {_TREASURY: _FUNDING})
+                engine._credit("AKU", wallet, _FUNDING)
+            rates.append(total / _bench_core(engine, plans))
+            ledger.close()
+
+        ledger = ClearingLedger(
+            os.path.join(scratch, f"journal-{count}.db"), idempotency_ttl_seconds=60
+        )
+        engine = WalletEngine(ledger, stripes=args.stripes, issuer_wallets=[_TREASURY])
+        for wallet in wallets:
+            engine.settle_sync(_entry(_TREASURY, wallet, _FUNDING))
+        rates.append(total / _bench_journal(engine, plans))
+        problems = engine.invariant_violations()
+        ledger.close()
+
+        cells = "  ".join(f"{rate:>8,.0f} /s" for rate in rates)
+        print(f"{count:>8}  {cells}   {'ok' if not problems else problems[0]}")
+
+
+if __name__ == "__main__":
+    main()
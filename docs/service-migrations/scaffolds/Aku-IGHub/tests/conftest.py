@@ -2,10 +2,18 @@
 
 from __future__ import annotations
 
+import os
+import tempfile
+
 import pytest
 from httpx import ASGITransport, AsyncClient
 
-from app.main import app
+# Keep the SQLite stores out of the working tree; must be set before app import.
+_DB_DIR = tempfile.mkdtemp(prefix="ighub-test-")
+os.environ.setdefault("LEDGER_DB_PATH", os.path.join(_DB_DIR, "ledger.db"))
+os.environ.setdefault("CREDENTIAL_STATUS_DB_PATH", os.path.join(_DB_DIR, "credentials.db"))
+
+from app.main import app  # noqa: E402
 
 
 @pytest.fixture
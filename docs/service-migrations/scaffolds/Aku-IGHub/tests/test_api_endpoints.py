@@ -7,12 +7,13 @@ import uuid
 from httpx import AsyncClient
 
 AUTH_HEADERS = {"Authorization": "Bearer role:operator"}
+ISSUER_HEADERS = {"Authorization": "Bearer role:issuer"}
 
 
 async def test_issue_and_verify_credential(client: AsyncClient) -> None:
     issue_response = await client.post(
         "/api/v1/credentials/issue",
-        headers=AUTH_HEADERS,
+        headers=ISSUER_HEADERS,
         json={
             "subject_did": "did:web:learner.akulearn.io",
             "credential_type": "SkillBadge",
@@ -0,0 +1,112 @@
+"""Tests for the streaming NDJSON bulk metadata publish."""
+
+from __future__ import annotations
+
+import json
+
+import httpx
+from httpx import AsyncClient
+
+from app.services.bulk_publish import BulkPublisher
+from app.services.metadata_store import MetadataStore
+
+AUTH = {"Authorization": "Bearer role:operator"}
+
+
+def _line(i: int, **overrides) -> bytes:
+    body = {
+        "category": "learning_activity",
+        "payload": {"lesson_id": f"math-{i}", "score": i},
+        "tags": ["bulk"],
+        "source_service": "Akudemy",
+    }
+    return json.dumps(body | overrides).encode() + b"\n"
+
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+async def _collect(agen) -> list:
+    return [item async for item in agen]
+
+
+async def test_batches_are_forwarded_as_ndjson() -> None:
+    received: list[list[dict]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.headers["content-type"] == "application/x-ndjson"
+        received.append([json.loads(line) for line in request.content.splitlines()])
+        return httpx.Response(202)
+
+    store = MetadataStore(max_records=100)
+    publisher = BulkPublisher(
+        store,
+        batch_size=4,
+        max_line_bytes=10_000,
+        max_records=100,
+        forward_url="https://daas.test/bulk",
+        transport=httpx.MockTransport(handler),
+    )
+    data = b"".join(_line(i) for i in range(10))
+    out = b"".join(await _collect(publisher.run(_chunks(data, 64))))
+    results = [json.loads(line) for line in out.splitlines()]
+
+    assert [len(batch) for batch in received] == [4, 4, 2]
+    assert [r["line"] for r in results[:-1]] == list(range(1, 11))
+    assert all(r["status"] == "published" and r["daas_ingested"] for r in results[:-1])
+    assert results[-1]["summary"] == {
+        "lines": 10,
+        "published": 10,
+        "rejected": 0,
+        "batches": 3,
+        "daas_ingested": 10,
+        "truncated": False,
+    }
+    assert len(store) == 10
+    assert received[0][0]["metadata_id"] == results[0]["metadata_id"]
+
+
+async def test_bulk_endpoint_reports_each_line(client: AsyncClient) -> None:
+    body = b"".join(
+        [
+            _line(1),
+            b"not json\n",
+            _line(3, payload={"learner": {"email": "ada@example.org"}}),
+            b"\n",
+            _line(5, tags=["bulk-endpoint"]),
+        ]
+    )
+    response = await client.post(
+        "/api/v1/metadata/publish/bulk",
+        content=body,
+        headers=AUTH | {"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    results = [json.loads(line) for line in response.text.splitlines()]
+
+    assert [(r["line"], r["status"]) for r in results[:-1]] == [
+        (1, "published"),
+        (2, "rejected"),
+        (3, "rejected"),
+        (5, "published"),
+    ]
+    assert "learner.email" in results[2]["errors"][0]["msg"]
+    assert results[-1]["summary"]["published"] == 2
+    assert results[-1]["summary"]["rejected"] == 2
+
+    stored = await client.get(f"/api/v1/metadata/{results[3]['metadata_id']}", headers=AUTH)
+    assert stored.json()["tags"] == ["bulk-endpoint"]
+
+
+async def test_bulk_upload_stops_at_record_cap() -> None:
+    publisher = BulkPublisher(
+        MetadataStore(max_records=100), batch_size=2, max_line_bytes=10_000, max_records=3
+    )
+    data = b"".join(_line(i) for i in range(5))
+    out = b"".join(await _collect(publisher.run(_chunks(data, 1024))))
+    summary = json.loads(out.splitlines()[-1])["summary"]
+    assert summary["lines"] == 3 and summary["truncated"] is True
+    assert summary["daas_ingested"] == 0
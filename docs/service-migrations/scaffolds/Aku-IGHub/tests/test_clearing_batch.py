@@ -0,0 +1,109 @@
+"""Tests for batch settlement with wallet-pair netting."""
+
+from __future__ import annotations
+
+import time
+import uuid
+from decimal import Decimal
+
+from httpx import AsyncClient
+
+from app.schemas.clearing import ClearingTransferItem
+from app.services.settlement import net_transfers
+
+AUTH_HEADERS = {"Authorization": "Bearer role:treasury"}
+
+
+def _item(src: str, dst: str, amount: str) -> ClearingTransferItem:
+    return ClearingTransferItem(from_wallet=src, to_wallet=dst, amount=Decimal(amount))
+
+
+def test_net_transfers_collapses_pairs_and_drops_zero_nets() -> None:
+    items = [
+        _item("a", "b", "10"),
+        _item("b", "a", "4"),
+        _item("a", "c", "5.25"),
+        _item("c", "c", "1"),
+        _item("b", "a", "6"),
+        _item("d", "c", "0.10"),
+        _item("c", "d", "0.35"),
+    ]
+    net = [(t.from_wallet, t.to_wallet, t.amount) for t in net_transfers(items)]
+    assert net == [("a", "c", Decimal("5.25")), ("c", "d", Decimal("0.25"))]
+
+
+async def test_ten_thousand_transfer_payout_is_one_request(client: AsyncClient) -> None:
+    treasury = "treasury-main"
+    tutors = [f"tutor-{i}" for i in range(1_000)]
+    items = [
+        {"from_wallet": treasury, "to_wallet": tutors[i % 1_000], "amount": "0.50"}
+        for i in range(10_000)
+    ]
+    key = str(uuid.uuid4())
+    headers = {**AUTH_HEADERS, "Idempotency-Key": key}
+
+    start = time.perf_counter()
+    response = await client.post(
+        "/api/v1/clearing/settle/batch", headers=headers, json={"items": items}
+    )
+    elapsed = time.perf_counter() - start
+    assert response.status_code == 201
+    batch = response.json()
+    assert batch["status"] == "SETTLED"
+    assert batch["item_count"] == 10_000
+    assert [item["index"] for item in batch["items"]] == list(range(10_000))
+    # Ten payouts per tutor collapse into one movement each.
+    assert len(batch["net_transfers"]) == 1_000
+    assert {Decimal(t["amount"]) for t in batch["net_transfers"]} == {Decimal("5.00")}
+    assert elapsed < 10
+
+    replay = await client.post(
+        "/api/v1/clearing/settle/batch", headers=headers, json={"items": items[:1]}
+    )
+    assert replay.status_code == 200
+    assert replay.json()["batch_id"] == batch["batch_id"]
+    assert replay.json()["already_processed"] is True
+    assert replay.json()["items"] == batch["items"]
+
+    last = batch["items"][-1]["tx_id"]
+    status = await client.get(f"/api/v1/clearing/{last}", headers=AUTH_HEADERS)
+    assert status.status_code == 200
+    assert status.json()["to_wallet"] == tutors[9_999 % 1_000]
+    assert status.json()["idempotency_key"] == key
+
+
+async def test_batch_and_single_keys_do_not_collide(client: AsyncClient) -> None:
+    key = str(uuid.uuid4())
+    headers = {**AUTH_HEADERS, "Idempotency-Key": key}
+    body = {"from_wallet": "wallet-a", "to_wallet": "wallet-b", "amount": "1.00"}
+
+    single = await client.post("/api/v1/clearing/settle", headers=headers, json=body)
+    batch = await client.post(
+        "/api/v1/clearing/settle/batch", headers=headers, json={"items": [body]}
+    )
+    assert single.status_code == 201
+    assert batch.status_code == 201
+    assert batch.json()["items"][0]["tx_id"] != single.json()["tx_id"]
+
+    # A single key spelled like the old batch namespace cannot take over the batch's key.
+    prefixed = {**AUTH_HEADERS, "Idempotency-Key": f"batch:{key}"}
+    assert (
+        await client.post("/api/v1/clearing/settle", headers=prefixed, json=body)
+    ).status_code == 201
+    replay = await client.post(
+        "/api/v1/clearing/settle/batch", headers=headers, json={"items": [body]}
+    )
+    assert replay.status_code == 200
+    assert replay.json()["batch_id"] == batch.json()["batch_id"]
+
+
+async def test_batch_rejects_empty_and_oversized_requests(client: AsyncClient) -> None:
+    headers = {**AUTH_HEADERS, "Idempotency-Key": str(uuid.uuid4())}
+    empty = await client.post("/api/v1/clearing/settle/batch", headers=headers, json={"items": []})
+    assert empty.status_code == 422
+
+    item = {"from_wallet": "wallet-a", "to_wallet": "wallet-b", "amount": "1.00"}
+    oversized = await client.post(
+        "/api/v1/clearing/settle/batch", headers=headers, json={"items": [item] * 10_001}
+    )
+    assert oversized.status_code == 422
@@ -0,0 +1,103 @@
+"""Concurrency tests for idempotent settlement (per-key single-flight)."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from collections import Counter, defaultdict
+from decimal import Decimal
+
+import pytest
+from httpx import AsyncClient
+
+from app.services import ledger as ledger_module
+from app.services.idempotency import SingleFlight
+from app.services.wallets import wallets
+
+AUTH_HEADERS = {"Authorization": "Bearer role:treasury"}
+
+
+async def test_load_1000_concurrent_requests_over_100_keys(
+    client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    ledger = ledger_module.ledger
+    record_calls = 0
+    original_record = ledger.record_many_sync
+
+    def counting_record(*args, **kwargs):
+        nonlocal record_calls
+        record_calls += 1
+        time.sleep(0.01)  # widen the race window: duplicates arrive mid-settlement
+        return original_record(*args, **kwargs)
+
+    monkeypatch.setattr(ledger, "record_many_sync", counting_record)
+
+    keys = [str(uuid.uuid4()) for _ in range(100)]
+    payee = f"wallet-load-{uuid.uuid4()}"
+    body = {"from_wallet": "treasury-main", "to_wallet": payee, "amount": "1.00"}
+
+    async def settle(key: str):
+        return key, await client.post(
+            "/api/v1/clearing/settle",
+            headers={**AUTH_HEADERS, "Idempotency-Key": key},
+            json=body,
+        )
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(settle(keys[i % 100]) for i in range(1_000)))
+    elapsed = time.perf_counter() - start
+
+    statuses = Counter(resp.status_code for _, resp in results)
+    assert statuses == {201: 100, 200: 900}
+
+    tx_ids: dict[str, set[str]] = defaultdict(set)
+    for key, resp in results:
+        tx_ids[key].add(resp.json()["tx_id"])
+    assert all(len(ids) == 1 for ids in tx_ids.values())
+
+    # Exactly one settlement per key reached the ledger, and was credited once.
+    assert record_calls == 100
+    assert wallets.balance(payee) == Decimal("100.00")
+    for key in keys:
+        stored = await ledger.get_by_key(key)
+        assert stored is not None and {stored.tx_id} == tx_ids[key]
+
+    throughput = len(results) / elapsed
+    assert throughput > 100
+
+
+async def test_followers_retry_when_leader_fails() -> None:
+    flight: SingleFlight[str] = SingleFlight(shards=4)
+    calls = 0
+
+    async def flaky() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        if calls == 1:
+            raise RuntimeError("ledger unavailable")
+        return "settled"
+
+    results = await asyncio.gather(
+        *(flight.run("k", flaky) for _ in range(5)), return_exceptions=True
+    )
+    assert isinstance(results[0], RuntimeError)
+    assert results[1:] == [("settled", True)] + [("settled", False)] * 3
+    assert calls == 2
+    assert flight.in_flight() == 0
+
+
+async def test_unrelated_keys_run_concurrently() -> None:
+    flight: SingleFlight[str] = SingleFlight()
+
+    async def slow(key: str) -> str:
+        await asyncio.sleep(0.05)
+        return key
+
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(flight.run(f"key-{i}", lambda i=i: slow(f"key-{i}")) for i in range(50))
+    )
+    assert time.perf_counter() - start < 0.5  # 50 × 50 ms if serialised
+    assert all(leader for _, leader in results)
@@ -0,0 +1,236 @@
+"""Tests for the compiled compliance policy engine and its hot reload."""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.schemas.compliance import ComplianceDecision, PolicyDomain
+from app.services.compliance import PolicyEngine, operation_class
+
+AUTH_HEADERS = {"Authorization": "Bearer role:operator"}
+
+
+@pytest.fixture
+def rules_dir(tmp_path: Path) -> Path:
+    target = tmp_path / "compliance"
+    shutil.copytree(settings.compliance_rules_dir, target)
+    return target
+
+
+@pytest.fixture
+def engine(rules_dir: Path) -> PolicyEngine:
+    return PolicyEngine(rules_dir, cache_size=128)
+
+
+def _touch(path: Path, data: dict) -> None:
+    path.write_text(json.dumps(data), encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_operation_class() -> None:
+    assert operation_class("data.export") == "data"
+    assert operation_class("Credential.share.bulk") == "credential"
+    assert operation_class("audit") == "audit"
+
+
+@pytest.mark.parametrize(
+    ("source", "target", "expected"),
+    [
+        ("NG", "DE", [PolicyDomain.GDPR, PolicyDomain.NDPR]),
+        ("us", "th", [PolicyDomain.PDPA, PolicyDomain.FERPA, PolicyDomain.COPPA]),
+        ("ZA", "BR", [PolicyDomain.POPIA, PolicyDomain.LGPD]),
+        ("KE", "GH", [PolicyDomain.CUSTOM]),
+    ],
+)
+def test_policies_are_inferred_from_jurisdictions(
+    engine: PolicyEngine, source: str, target: str, expected: list[PolicyDomain]
+) -> None:
+    assert list(engine.check("data.export", source, target).policies_evaluated) == expected
+
+
+def test_eu_transfer_to_non_adequate_country_is_blocked(engine: PolicyEngine) -> None:
+    blocked = engine.check("credential.share", "DE", "US", [PolicyDomain.GDPR])
+    assert blocked.decision == ComplianceDecision.BLOCKED
+    assert [v.rule for v in blocked.violations] == ["GDPR.Art.46"]
+    assert "'US'" in blocked.violations[0].description
+    assert blocked.recommendations[0].startswith("Implement Standard Contractual Clauses")
+
+    # Inferred policies include GDPR for an EU source; unnamed targets fall in the "*" row.
+    assert engine.check("data.export", "fr", "ke").decision == ComplianceDecision.BLOCKED
+    for target in ("FR", "GB", "JP"):
+        assert engine.check("data.export", "DE", target).decision == ComplianceDecision.ALLOWED
+    # GDPR not among the requested frameworks: the rule does not apply.
+    assert engine.check("data.export", "DE", "US", [PolicyDomain.FERPA]).violations == ()
+
+
+def test_decisions_are_memoised_and_fast(engine: PolicyEngine) -> None:
+    engine.check("data.export", "DE", "US")
+    hits = engine.cache_info().hits
+    start = time.perf_counter()
+    for _ in range(100_000):
+        engine.check("data.export", "DE", "US")
+    per_check_us = (time.perf_counter() - start) * 1e6 / 100_000
+    assert engine.cache_info().hits == hits + 100_000
+    assert per_check_us < 20
+
+
+def test_rule_changes_hot_reload_and_clear_the_cache(engine: PolicyEngine, rules_dir: Path) -> None:
+    assert engine.check("data.export", "DE", "US").decision == ComplianceDecision.BLOCKED
+    assert engine.reload_if_changed() is False
+
+    jurisdictions = json.loads((rules_dir / "jurisdictions.json").read_text())
+    jurisdictions["groups"]["GDPR_ADEQUATE"].append("US")
+    _touch(rules_dir / "jurisdictions.json", jurisdictions)
+    assert engine.reload_if_changed() is True
+    assert engine.cache_info().currsize == 0
+    assert engine.check("data.export", "DE", "US").decision == ComplianceDecision.ALLOWED
+
+    # A new file with an operation-specific rule is picked up as well.
+    _touch(
+        rules_dir / "ndpr.json",
+        {
+            "rules": [
+                {
+                    "id": "NDPR.2.11",
+                    "policy": "NDPR",
+                    "operations": ["data"],
+                    "source": ["NG"],
+                    "target_not": ["NG"],
+                    "severity": "blocking",
+                    "description": "Export of Nigerian personal data to '{target}' needs NITDA approval.",
+                }
+            ]
+        },
+    )
+    assert engine.reload_if_changed() is True
+    assert engine.check("data.export", "NG", "GH").decision == ComplianceDecision.BLOCKED
+    assert engine.check("credential.share", "NG", "GH").decision == ComplianceDecision.ALLOWED
+
+
+def test_invalid_rule_file_keeps_previous_rules(engine: PolicyEngine, rules_dir: Path) -> None:
+    assert engine.check("data.export", "DE", "US").decision == ComplianceDecision.BLOCKED
+    _touch(rules_dir / "broken.json", {"rules": [{"id": "X", "policy": "NOPE"}]})
+    assert engine.reload_if_changed() is False
+    assert engine.check("data.export", "DE", "US").decision == ComplianceDecision.BLOCKED
+
+
+async def test_compliance_endpoint_uses_compiled_rules(client: AsyncClient) -> None:
+    response = await client.post(
+        "/api/v1/compliance/check",
+        headers=AUTH_HEADERS,
+        json={"operation": "data.export", "source_jurisdiction": "de", "target_jurisdiction": "us"},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["decision"] == "BLOCKED"
+    assert body["source_jurisdiction"] == "DE"
+    assert body["policies_evaluated"] == ["GDPR", "FERPA", "COPPA"]
+    assert body["violations"][0]["rule"] == "GDPR.Art.46"
+
+
+def _batch_items(n: int) -> list[dict]:
+    sources, targets = ["DE", "NG", "US", "fr", "KE"], ["US", "GB", "ZA", "th", "BR", "de"]
+    operations = ["data.export", "credential.share", "metadata.publish"]
+    return [
+        {
+            "operation": operations[i % 3],
+            "source_jurisdiction": sources[i % 5],
+            "target_jurisdiction": targets[i % 6],
+            "context": {"row": i},
+        }
+        for i in range(n)
+    ]
+
+
+async def test_batch_of_50k_checks_is_deduplicated_and_ordered(client: AsyncClient) -> None:
+    items = _batch_items(50_000)
+    payload = json.dumps(items)
+    start = time.perf_counter()
+    response = await client.post(
+        "/api/v1/compliance/check/batch",
+        headers={**AUTH_HEADERS, "Content-Type": "application/json"},
+        content=payload,
+    )
+    elapsed = time.perf_counter() - start
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == 50_000
+    assert body["distinct"] == 30  # lcm(3, 5, 6) combinations repeat
+    assert len(body["results"]) == 50_000
+    for i in (0, 1, 29, 30, 49_999):
+        result, item = body["results"][i], items[i]
+        assert result["operation"] == item["operation"]
+        assert result["source_jurisdiction"] == item["source_jurisdiction"].upper()
+        assert result["target_jurisdiction"] == item["target_jurisdiction"].upper()
+    assert body["results"][0]["decision"] == "BLOCKED"  # DE → US
+    assert elapsed < 1.0
+
+
+async def test_ndjson_batch_streams_results_per_line(client: AsyncClient) -> None:
+    items = _batch_items(7)
+    payload = "\n".join(json.dumps(item) for item in items[:4]) + "\n\n"
+    payload += "\n".join(json.dumps(item) for item in items[4:]) + "\n"
+    response = await client.post(
+        "/api/v1/compliance/check/batch",
+        headers={**AUTH_HEADERS, "Content-Type": "application/x-ndjson"},
+        content=payload,
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["source_jurisdiction"] for line in lines] == [
+        item["source_jurisdiction"].upper() for item in items
+    ]
+
+
+async def test_batch_validation_errors_and_limits(
+    client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    bad = "\n".join([json.dumps(_batch_items(1)[0]), json.dumps({"operation": "data.export"})])
+    response = await client.post(
+        "/api/v1/compliance/check/batch",
+        headers={**AUTH_HEADERS, "Content-Type": "application/x-ndjson"},
+        content=bad,
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"][0] == 1
+
+    monkeypatch.setattr(settings, "compliance_batch_max_items", 2)
+    response = await client.post(
+        "/api/v1/compliance/check/batch", headers=AUTH_HEADERS, json=_batch_items(3)
+    )
+    assert response.status_code == 413
+
+    # NDJSON is refused at the first item over the cap, without reading the rest.
+    sent = 0
+
+    async def endless():
+        nonlocal sent
+        for item in _batch_items(1_000):
+            sent += 1
+            yield json.dumps(item).encode() + b"\n"
+
+    response = await client.post(
+        "/api/v1/compliance/check/batch",
+        headers={**AUTH_HEADERS, "Content-Type": "application/x-ndjson"},
+        content=endless(),
+    )
+    assert response.status_code == 413
+    assert sent < 10
+
+    monkeypatch.setattr(settings, "compliance_batch_max_items", 100)
+    monkeypatch.setattr(settings, "compliance_batch_max_bytes", 1_000)
+    response = await client.post(
+        "/api/v1/compliance/check/batch", headers=AUTH_HEADERS, json=_batch_items(50)
+    )
+    assert response.status_code == 413
+    assert "bytes" in response.json()["detail"]
@@ -0,0 +1,138 @@
+"""Tests for the persistent clearing ledger and TTL-bounded idempotency keys."""
+
+from __future__ import annotations
+
+import uuid
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+
+from app.schemas.clearing import (
+    ClearingBatchItemResult,
+    ClearingBatchSettleRequest,
+    ClearingBatchSettleResponse,
+    ClearingStatus,
+    ClearingTransactionResponse,
+)
+from app.services.ledger import ClearingLedger
+
+AUTH_HEADERS = {"Authorization": "Bearer role:operator"}
+
+
+@pytest.fixture
+def ledger(tmp_path: Path) -> Iterator[ClearingLedger]:
+    ledger = ClearingLedger(str(tmp_path / "ledger.db"), idempotency_ttl_seconds=60)
+    yield ledger
+    ledger.close()
+
+
+def _entry(key: str, amount: str = "10.00") -> ClearingTransactionResponse:
+    now = datetime.now(timezone.utc)
+    return ClearingTransactionResponse(
+        tx_id=str(uuid.uuid4()),
+        status=ClearingStatus.SETTLED,
+        from_wallet="wallet-a",
+        to_wallet="wallet-b",
+        amount=Decimal(amount),
+        currency="AKU",
+        idempotency_key=key,
+        created_at=now,
+        settled_at=now,
+    )
+
+
+async def test_record_and_lookup_by_tx_id_and_key(ledger: ClearingLedger) -> None:
+    entry = _entry("k-1", amount="0.000000000000000001")
+    stored, created = await ledger.record(entry, {"invoice": "INV-9"})
+    assert created is True and stored == entry
+
+    assert await ledger.get(entry.tx_id) == entry
+    assert await ledger.get_by_key("k-1") == entry
+    assert (await ledger.get(entry.tx_id)).amount == Decimal("0.000000000000000001")
+    assert await ledger.get("missing") is None
+
+
+async def test_live_key_replays_original_entry(ledger: ClearingLedger) -> None:
+    first, _ = await ledger.record(_entry("k-dup"))
+    replay, created = await ledger.record(_entry("k-dup", amount="99"))
+    assert created is False
+    assert replay.tx_id == first.tx_id and replay.amount == Decimal("10.00")
+
+
+def test_expired_keys_are_swept_but_ledger_is_kept(ledger: ClearingLedger) -> None:
+    t0 = 1_000_000.0
+    ((old, _),) = ledger.record_many_sync([(_entry("k-old"), None)], now=t0)
+    ledger.record_many_sync([(_entry("k-new"), None)], now=t0 + 45)
+
+    # Past its TTL a key no longer replays, even before the sweep runs.
+    assert ledger.get_by_key_sync("k-old", now=t0 + 61) is None
+    assert ledger.sweep_sync(now=t0 + 61) == 1
+    assert ledger.idempotency_key_count_sync() == 1
+    assert ledger.get_sync(old.tx_id) == old
+
+    ((reused, created),) = ledger.record_many_sync([(_entry("k-old"), None)], now=t0 + 62)
+    assert created is True and reused.tx_id != old.tx_id
+
+
+def test_prefixed_batch_keys_move_to_their_own_table(tmp_path: Path) -> None:
+    path = str(tmp_path / "ledger.db")
+    ledger = ClearingLedger(path, idempotency_ttl_seconds=60)
+    request = ClearingBatchSettleRequest.model_validate(
+        {"items": [{"from_wallet": "wallet-a", "to_wallet": "wallet-b", "amount": "1"}]}
+    )
+    now = datetime.now(timezone.utc)
+    response = ClearingBatchSettleResponse(
+        batch_id=str(uuid.uuid4()),
+        status=ClearingStatus.SETTLED,
+        idempotency_key="k-batch",
+        item_count=1,
+        net_transfers=[],
+        items=[ClearingBatchItemResult(index=0, tx_id=str(uuid.uuid4()), status="SETTLED")],
+        settled_at=now,
+        created_at=now,
+    )
+    ledger.record_batch_sync(request, response)
+    ledger.record_many_sync([(_entry("batch:k-single"), None)])
+    conn = ledger._write_conn()
+    # Rewrite the batch key the way earlier versions stored it.
+    conn.execute("DELETE FROM batch_idempotency_keys")
+    conn.execute(
+        "INSERT INTO idempotency_keys VALUES (?, ?, ?)",
+        ("batch:k-batch", response.batch_id, 10**10),
+    )
+    ledger.close()
+
+    reopened = ClearingLedger(path, idempotency_ttl_seconds=60)
+    try:
+        assert reopened.get_batch_by_key_sync("k-batch").batch_id == response.batch_id
+        assert reopened.get_by_key_sync("batch:k-single") is not None
+        assert reopened.get_by_key_sync("batch:k-batch") is None
+    finally:
+        reopened.close()
+
+
+async def test_settle_replay_and_status_use_ledger(client: AsyncClient) -> None:
+    key = str(uuid.uuid4())
+    body = {"from_wallet": "wallet-x", "to_wallet": "wallet-y", "amount": "12.34"}
+    headers = {**AUTH_HEADERS, "Idempotency-Key": key}
+
+    first = await client.post("/api/v1/clearing/settle", headers=headers, json=body)
+    assert first.status_code == 201
+    replay = await client.post("/api/v1/clearing/settle", headers=headers, json=body)
+    assert replay.status_code == 200
+    assert replay.json()["tx_id"] == first.json()["tx_id"]
+    assert replay.json()["already_processed"] is True
+
+    status = await client.get(f"/api/v1/clearing/{first.json()['tx_id']}", headers=AUTH_HEADERS)
+    assert status.status_code == 200
+    assert status.json()["from_wallet"] == "wallet-x"
+    assert Decimal(status.json()["amount"]) == Decimal("12.34")
+
+
+async def test_status_of_unknown_tx_is_404(client: AsyncClient) -> None:
+    response = await client.get(f"/api/v1/clearing/{uuid.uuid4()}", headers=AUTH_HEADERS)
+    assert response.status_code == 404
@@ -0,0 +1,119 @@
+"""Tests for the indexed metadata store and the GET /api/v1/metadata query endpoint."""
+
+from __future__ import annotations
+
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from httpx import AsyncClient
+
+from app.schemas.metadata import MetadataCategory, MetadataRecord
+from app.services.metadata_store import MetadataStore
+
+AUTH = {"Authorization": "Bearer role:operator"}
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _record(i: int, category: MetadataCategory, tags: list[str]) -> MetadataRecord:
+    return MetadataRecord(
+        metadata_id=f"m-{i}",
+        category=category,
+        payload={"i": i},
+        tags=tags,
+        source_service="Akudemy",
+        schema_version="1.0",
+        published_at=T0 + timedelta(minutes=i),
+    )
+
+
+def _fill(store: MetadataStore, count: int) -> None:
+    for i in range(count):
+        category = (
+            MetadataCategory.SKILL_ASSESSMENT if i % 2 else MetadataCategory.LEARNING_ACTIVITY
+        )
+        tags = ["math"] if i % 3 == 0 else []
+        if i % 5 == 0:
+            tags.append("grade-7")
+        store.add(_record(i, category, tags))
+
+
+def _ids(docs: list[bytes]) -> list[int]:
+    return [json.loads(doc)["payload"]["i"] for doc in docs]
+
+
+def test_tag_category_and_time_filters_intersect() -> None:
+    store = MetadataStore(max_records=1_000)
+    _fill(store, 200)
+    docs, cursor = store.query(
+        category="skill_assessment",
+        tags=["math", "grade-7"],
+        since=T0 + timedelta(minutes=20),
+        until=T0 + timedelta(minutes=150),
+    )
+    expected = [i for i in range(20, 150) if i % 2 and i % 3 == 0 and i % 5 == 0]
+    assert _ids(docs) == expected and cursor is None
+    assert store.query(tags=["math", "unknown"]) == ([], None)
+    assert store.get("m-42").payload == {"i": 42}
+
+
+def test_keyset_pagination_is_stable_under_inserts() -> None:
+    store = MetadataStore(max_records=1_000)
+    _fill(store, 100)
+    expected = [i for i in range(100) if i % 3 == 0]
+    seen, cursor = [], None
+    while True:
+        docs, cursor = store.query(tags=["math"], after=cursor, limit=7)
+        seen += _ids(docs)
+        if cursor is None:
+            break
+        # New records land after every existing cursor, so they never shift earlier pages.
+        store.add(_record(10_000 + len(seen), MetadataCategory.SYSTEM_TELEMETRY, ["other"]))
+    assert seen == expected
+
+
+def test_oldest_records_are_evicted_and_compacted() -> None:
+    store = MetadataStore(max_records=10)
+    _fill(store, 35)
+    assert len(store) == 10
+    assert store.get("m-24") is None and store.get("m-25") is not None
+    assert _ids(store.query(limit=100)[0]) == list(range(25, 35))
+    assert _ids(store.query(tags=["math"])[0]) == [27, 30, 33]
+    assert len(store._docs) <= 15  # compacted once half the capacity was evicted
+    assert all(p[0] >= store._floor for p in store._by_tag.values())
+
+
+async def test_query_endpoint(client: AsyncClient) -> None:
+    tag = f"cohort-{uuid.uuid4().hex[:8]}"
+    for i in range(5):
+        response = await client.post(
+            "/api/v1/metadata/publish",
+            headers=AUTH,
+            json={
+                "category": "skill_assessment" if i < 4 else "learning_activity",
+                "payload": {"i": i},
+                "tags": [tag, "algebra"] if i % 2 == 0 else [tag],
+                "source_service": "Akudemy",
+            },
+        )
+        assert response.status_code == 201
+
+    params = {"category": "skill_assessment", "tag": [tag, "algebra"], "limit": 1}
+    first = (await client.get("/api/v1/metadata", params=params, headers=AUTH)).json()
+    assert [r["payload"]["i"] for r in first["records"]] == [0]
+    second = (
+        await client.get(
+            "/api/v1/metadata", params={**params, "cursor": first["next_cursor"]}, headers=AUTH
+        )
+    ).json()
+    assert [r["payload"]["i"] for r in second["records"]] == [2]
+    assert second["next_cursor"] is None
+
+    since = (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat()
+    later = await client.get("/api/v1/metadata", params={"tag": tag, "since": since}, headers=AUTH)
+    assert later.json() == {"count": 0, "next_cursor": None, "records": []}
+
+    bad = await client.get("/api/v1/metadata", params={"cursor": "abc"}, headers=AUTH)
+    assert bad.status_code == 400
+    too_big = await client.get("/api/v1/metadata", params={"limit": 10**6}, headers=AUTH)
+    assert too_big.status_code == 422
@@ -0,0 +1,19 @@
+"""Tests for the incremental NDJSON line splitter."""
+
+from __future__ import annotations
+
+from app.services.ndjson import LINE_TOO_LONG, iter_lines
+
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+async def test_lines_are_split_across_chunks_and_long_lines_skipped() -> None:
+    data = b'{"a":1}\n\n' + b"x" * 50 + b'\n{"b":2}'
+    for size in (1, 3, 7, len(data)):
+        lines = [line async for line in iter_lines(_chunks(data, size), max_line_bytes=20)]
+        assert lines[0] == b'{"a":1}' and lines[1] == b""
+        assert lines[2] is LINE_TOO_LONG
+        assert lines[3] == b'{"b":2}'
@@ -0,0 +1,57 @@
+"""Tests for the deep PII scanner and the metadata publish guard."""
+
+from __future__ import annotations
+
+import pytest
+from httpx import AsyncClient
+
+from app.services.pii import PIIScanLimitError, PIIScanner
+
+AUTH = {"Authorization": "Bearer role:operator"}
+
+
+def test_nested_keys_are_found_after_normalisation() -> None:
+    scanner = PIIScanner()
+    payload = {
+        "lesson_id": "math-101",
+        "learner": {"E-Mail": "redacted", "profile": [{"Date_Of_Birth": "redacted"}]},
+        "username": "u-123",  # not PII by name
+        "address_type": "home",
+    }
+    assert [str(f) for f in scanner.scan(payload)] == [
+        "learner.E-Mail (key)",
+        "learner.profile[0].Date_Of_Birth (key)",
+    ]
+
+
+def test_value_patterns_are_optional() -> None:
+    payload = {"notes": ["contact ada@example.org later"], "ref": {"x": "+447911123456"}}
+    assert [f.reason for f in PIIScanner().scan(payload)] == ["email", "phone"]
+    assert PIIScanner(value_patterns=False).scan(payload) == []
+    assert PIIScanner().scan({"id": "123-45-6789", "score": "12345-67-8"})[0].reason == "ssn"
+    assert PIIScanner().scan({"blob": "a" * 100_000, "version": "v1.2.3-rc"}) == []
+
+
+def test_depth_and_size_limits() -> None:
+    deep: dict = {}
+    node = deep
+    for _ in range(50):
+        node["child"] = {}
+        node = node["child"]
+    with pytest.raises(PIIScanLimitError, match="nesting"):
+        PIIScanner(max_depth=32).scan(deep)
+    assert PIIScanner(max_depth=64).scan(deep) == []
+
+    with pytest.raises(PIIScanLimitError, match="more than 1000"):
+        PIIScanner(max_nodes=1_000).scan({"items": list(range(2_000))})
+
+
+async def test_publish_rejects_nested_pii(client: AsyncClient) -> None:
+    body = {
+        "category": "learning_activity",
+        "payload": {"lesson_id": "math-101", "learner": {"email": "ada@example.org"}},
+        "source_service": "Akudemy",
+    }
+    response = await client.post("/api/v1/metadata/publish", json=body, headers=AUTH)
+    assert response.status_code == 422
+    assert "learner.email" in response.text
@@ -0,0 +1,121 @@
+"""Tests for the per-tenant token-bucket rate limiter and its middleware."""
+
+from __future__ import annotations
+
+import time
+
+import pytest
+from httpx import AsyncClient
+
+from app.services import auth, rate_limit
+from app.services.rate_limit import RateLimiter, parse_group_limits
+
+AUTH = {"Authorization": "Bearer role:operator"}
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def test_bucket_allows_burst_then_refills() -> None:
+    clock = FakeClock()
+    limiter = RateLimiter(per_minute=60, burst=3, clock=clock)
+    decisions = [await limiter.hit("sub:a", "metadata") for _ in range(4)]
+    assert [d.allowed for d in decisions] == [True, True, True, False]
+    assert [d.remaining for d in decisions] == [2, 1, 0, 0]
+    assert decisions[-1].retry_after == pytest.approx(1.0)
+
+    clock.now += 1.0  # one token back
+    assert (await limiter.hit("sub:a", "metadata")).allowed
+    assert not (await limiter.hit("sub:a", "metadata")).allowed
+    # Other principals and route groups have their own buckets.
+    assert (await limiter.hit("sub:b", "metadata")).allowed
+    assert (await limiter.hit("sub:a", "credentials")).allowed
+
+    clock.now += 60.0
+    full = await limiter.hit("sub:a", "metadata")
+    assert (full.remaining, full.reset) == (2, pytest.approx(1.0))
+
+
+async def test_group_limits_and_sweeping() -> None:
+    clock = FakeClock()
+    limiter = RateLimiter(
+        per_minute=60,
+        group_limits=parse_group_limits("compliance=6:1, metadata=600"),
+        shards=2,
+        max_keys=100,
+        clock=clock,
+    )
+    assert limiter.rule_for("compliance").policy == "1;w=10"
+    assert limiter.rule_for("metadata").burst == 600
+    assert limiter.rule_for("clearing").policy == "60;w=60"
+    assert (await limiter.hit("sub:a", "compliance")).allowed
+    refused = await limiter.hit("sub:a", "compliance")
+    assert not refused.allowed and refused.retry_after == pytest.approx(10.0)
+
+    for i in range(1_000):
+        await limiter.hit(f"sub:{i}", "clearing")
+    assert len(limiter) <= 100
+
+    with pytest.raises(ValueError, match="Malformed"):
+        parse_group_limits("metadata")
+
+
+async def test_middleware_returns_429_with_headers(
+    client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(rate_limit, "rate_limiter", RateLimiter(per_minute=60, burst=2))
+    url = "/api/v1/metadata/does-not-exist"
+    first = await client.get(url, headers=AUTH)
+    assert first.status_code == 404
+    assert first.headers["ratelimit-limit"] == "2"
+    assert first.headers["ratelimit-remaining"] == "1"
+    assert first.headers["ratelimit-policy"] == "2;w=2"
+
+    await client.get(url, headers=AUTH)
+    refused = await client.get(url, headers=AUTH)
+    assert refused.status_code == 429
+    assert refused.headers["retry-after"] == "1"
+    assert refused.headers["ratelimit-remaining"] == "0"
+    assert "metadata" in refused.json()["detail"]
+
+    # Another route group, and routes outside /api/v1, are unaffected.
+    assert (await client.get("/api/v1/clearing/tx-unknown", headers=AUTH)).status_code != 429
+    health = await client.get("/health")
+    assert health.status_code == 200 and "ratelimit-limit" not in health.headers
+
+
+async def test_scaffold_tokens_get_separate_buckets(
+    client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(rate_limit, "rate_limiter", RateLimiter(per_minute=60, burst=1))
+    url = "/api/v1/metadata/does-not-exist"
+    assert (await client.get(url, headers=AUTH)).status_code == 404
+    assert (await client.get(url, headers=AUTH)).status_code == 429
+    other = {"Authorization": "Bearer role:auditor"}
+    assert (await client.get(url, headers=other)).status_code == 404
+
+
+async def test_buckets_are_keyed_by_verified_sub(
+    client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    jwt = pytest.importorskip("jwt")
+    secret = "rate-limit-test-secret-" + "x" * 16
+    verifier = auth.TokenVerifier(algorithms=["HS256"], key=secret)
+    monkeypatch.setattr(auth, "token_verifier", verifier)
+    monkeypatch.setattr(rate_limit, "rate_limiter", RateLimiter(per_minute=60, burst=1))
+
+    def bearer(sub: str) -> dict[str, str]:
+        claims = {"sub": sub, "exp": int(time.time()) + 300, "roles": ["operator"]}
+        return {"Authorization": f"Bearer {jwt.encode(claims, secret, algorithm='HS256')}"}
+
+    url = "/api/v1/metadata/does-not-exist"
+    assert (await client.get(url, headers=bearer("tenant-a"))).status_code == 404
+    assert (await client.get(url, headers=bearer("tenant-a"))).status_code == 429
+    assert (await client.get(url, headers=bearer("tenant-b"))).status_code == 404
+    # Invalid tokens fall back to the client address and still get a 401 from auth.
+    assert (await client.get(url, headers={"Authorization": "Bearer junk"})).status_code == 401
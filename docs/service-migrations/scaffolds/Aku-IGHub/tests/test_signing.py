@@ -0,0 +1,159 @@
+"""Tests for the Ed25519 credential signing engine and batch issuance."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.routers import credentials
+from app.services.signing import SigningEngine, signing_engine
+
+jwt = pytest.importorskip("jwt")
+serialization = pytest.importorskip("cryptography.hazmat.primitives.serialization")
+ed25519 = pytest.importorskip("cryptography.hazmat.primitives.asymmetric.ed25519")
+
+AUTH = {"Authorization": "Bearer role:issuer"}
+
+
+def _decode(token: str, engine: SigningEngine = signing_engine) -> dict:
+    return jwt.decode(token, engine.public_key(), algorithms=["EdDSA"])
+
+
+def test_engine_loads_pem_key_and_signs_eddsa(tmp_path) -> None:
+    key = ed25519.Ed25519PrivateKey.generate()
+    path = tmp_path / "vc.pem"
+    path.write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    engine = SigningEngine(key_path=str(path), key_id="did:web:test#key-1")
+    token = engine.sign({"iss": "did:web:test", "sub": "did:key:z1"})
+
+    assert jwt.get_unverified_header(token) == {
+        "alg": "EdDSA",
+        "typ": "JWT",
+        "kid": "did:web:test#key-1",
+    }
+    assert jwt.decode(token, key.public_key(), algorithms=["EdDSA"])["sub"] == "did:key:z1"
+    assert engine.public_jwk()["x"]
+
+
+async def test_sign_many_preserves_order_across_chunks() -> None:
+    engine = SigningEngine(
+        key_id="did:web:test#key-1", workers=2, chunk_size=7, allow_ephemeral=True
+    )
+    try:
+        tokens = await engine.sign_many([{"n": i} for i in range(50)])
+    finally:
+        engine.close()
+    assert [_decode(token, engine)["n"] for token in tokens] == list(range(50))
+
+
+async def test_issue_returns_verifiable_vc_jwt(client: AsyncClient) -> None:
+    response = await client.post(
+        "/api/v1/credentials/issue",
+        json={
+            "subject_did": "did:key:z6MkSubject",
+            "credential_type": "Certificate",
+            "claims": {"course": "algebra-1", "grade": "A"},
+            "expiry_date": "2030-01-01T00:00:00Z",
+        },
+        headers=AUTH,
+    )
+    assert response.status_code == 201
+    issued = response.json()
+    claims = _decode(issued["jwt"])
+    assert claims["iss"] == issued["issuer_did"] == settings.service_did
+    assert claims["jti"] == f"urn:uuid:{issued['credential_id']}"
+    assert claims["exp"] == int(datetime(2030, 1, 1, tzinfo=timezone.utc).timestamp())
+    assert claims["vc"]["type"] == ["VerifiableCredential", "Certificate"]
+    assert claims["vc"]["credentialSubject"] == {
+        "id": "did:key:z6MkSubject",
+        "course": "algebra-1",
+        "grade": "A",
+    }
+
+
+def test_engine_refuses_ephemeral_key_unless_allowed() -> None:
+    with pytest.raises(RuntimeError, match="VC_SIGNING_KEY_PATH"):
+        SigningEngine(key_id="did:web:test#key-1").load()
+
+
+async def test_batch_issue(client: AsyncClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(signing_engine, "chunk_size", 64)
+    monkeypatch.setattr(
+        credentials, "_ISSUER_DIDS", credentials._ISSUER_DIDS | {"did:web:school.example"}
+    )
+    items = [
+        {
+            "subject_did": f"did:key:z{i}",
+            "credential_type": "SkillBadge",
+            "claims": {"badge": i},
+            "issuer_did": "did:web:school.example" if i % 2 else None,
+        }
+        for i in range(1_000)
+    ]
+    response = await client.post(
+        "/api/v1/credentials/issue/batch", json={"credentials": items}, headers=AUTH
+    )
+    assert response.status_code == 201
+    body = response.json()
+    assert body["count"] == 1_000
+    for i, issued in enumerate(body["credentials"]):
+        claims = _decode(issued["jwt"])
+        assert claims["sub"] == issued["subject_did"] == f"did:key:z{i}"
+        assert claims["vc"]["credentialSubject"]["badge"] == i
+        assert claims["iss"] == (items[i]["issuer_did"] or settings.service_did)
+    assert len({issued["credential_id"] for issued in body["credentials"]}) == 1_000
+
+
+async def test_batch_issue_limits(client: AsyncClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    empty = await client.post(
+        "/api/v1/credentials/issue/batch", json={"credentials": []}, headers=AUTH
+    )
+    assert empty.status_code == 422
+
+    monkeypatch.setattr(settings, "credential_batch_max_items", 2)
+    item = {"subject_did": "did:key:z1", "credential_type": "Identity", "claims": {}}
+    too_many = await client.post(
+        "/api/v1/credentials/issue/batch", json={"credentials": [item] * 3}, headers=AUTH
+    )
+    assert too_many.status_code == 413
+
+
+async def test_issue_requires_issuer_role_and_controlled_issuer(client: AsyncClient) -> None:
+    body = {
+        "subject_did": "did:key:z6MkSubject",
+        "credential_type": "Certificate",
+        "claims": {"id": "did:web:someone-else", "course": "algebra-1"},
+    }
+    learner = {"Authorization": "Bearer role:learner"}
+    assert (
+        await client.post("/api/v1/credentials/issue", json=body, headers=learner)
+    ).status_code == 403
+    forged = {**body, "issuer_did": "did:web:university.example"}
+    response = await client.post("/api/v1/credentials/issue", json=forged, headers=AUTH)
+    assert response.status_code == 422
+    batch = await client.post(
+        "/api/v1/credentials/issue/batch", json={"credentials": [body, forged]}, headers=AUTH
+    )
+    assert batch.status_code == 422 and "credentials[1]" in batch.json()["detail"]
+
+    # A claim named "id" cannot replace the subject.
+    issued = (await client.post("/api/v1/credentials/issue", json=body, headers=AUTH)).json()
+    assert _decode(issued["jwt"])["vc"]["credentialSubject"]["id"] == "did:key:z6MkSubject"
+
+
+async def test_verify_rejects_issuer_the_gateway_does_not_control(client: AsyncClient) -> None:
+    payload = {"iss": "did:web:university.example", "sub": "did:key:z1", "jti": "urn:uuid:x"}
+    response = await client.post(
+        "/api/v1/credentials/verify", json={"jwt": signing_engine.sign(payload)}, headers=AUTH
+    )
+    assert response.json()["valid"] is False
+    assert "not controlled" in response.json()["failure_reason"]
@@ -0,0 +1,146 @@
+"""Tests for StatusList2021 revocation: bitstrings, registry persistence and endpoints."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pytest
+from httpx import AsyncClient
+
+from app.services.signing import signing_engine
+from app.services.status_list import CredentialStatusRegistry, StatusList, status_registry
+
+pytest.importorskip("cryptography")
+
+AUTH = {"Authorization": "Bearer role:issuer,operator"}
+CREDENTIAL = {"subject_did": "did:key:z6MkLearner", "credential_type": "Certificate", "claims": {}}
+
+
+def test_bitstring_round_trips_through_encoded_list() -> None:
+    status_list = StatusList(131_072)
+    assert status_list.set(0) and status_list.set(9) and status_list.set(131_071)
+    assert not status_list.set(9)  # already set
+    encoded, etag = status_list.encode()
+    assert status_list.encode() == (encoded, etag)  # cached until the next change
+    assert len(encoded) < 200  # 16 KiB of mostly zeros compresses to a few dozen bytes
+
+    decoded = StatusList.decode(encoded)
+    assert decoded.size == 131_072 and decoded.count() == 3
+    assert decoded[0] and decoded[9] and decoded[131_071] and not decoded[8]
+    assert decoded._bits[1] == 0b0100_0000  # bit 9 is the second most significant of byte 1
+
+    status_list.set(9, False)
+    assert status_list.encode()[1] != etag
+
+
+def test_registry_rebuilds_bits_from_database(tmp_path) -> None:
+    path = str(tmp_path / "status.db")
+    registry = CredentialStatusRegistry(path, list_size=16, base_url="https://hub.test/status")
+    now = datetime.now(timezone.utc)
+    indexes = registry.register_many_sync(
+        [(f"cred-{i}", "did:key:z1", "did:web:hub", now, None) for i in range(40)]
+    )
+    assert indexes == list(range(40))
+    assert registry.status_entry(37)["statusListCredential"] == "https://hub.test/status/2"
+    assert registry.status_entry(37)["statusListIndex"] == "5"
+
+    first = registry.revoke_sync("cred-37")
+    assert first is not None and registry.is_revoked(37) and not registry.is_revoked(36)
+    assert registry.revoke_sync("cred-37").revoked_at == first.revoked_at  # idempotent
+    assert registry.revoke_sync("unknown") is None
+    registry.close()
+
+    reopened = CredentialStatusRegistry(path, list_size=16, base_url="https://hub.test/status")
+    reopened.open()
+    assert reopened.is_revoked(37) and reopened.issued == 40
+    new = [("cred-new", "did:key:z1", "did:web:hub", now, None)]
+    assert reopened.register_many_sync(new) == [40]
+    reopened.close()
+
+
+async def test_issue_revoke_and_verify(client: AsyncClient) -> None:
+    issued = (await client.post("/api/v1/credentials/issue", json=CREDENTIAL, headers=AUTH)).json()
+    list_url = issued["status_list_credential"]
+    list_id = int(list_url.rsplit("/", 1)[1])
+
+    by_jwt = await client.post(
+        "/api/v1/credentials/verify", json={"jwt": issued["jwt"]}, headers=AUTH
+    )
+    assert by_jwt.json()["valid"] is True
+    assert by_jwt.json()["credential_id"] == issued["credential_id"]
+
+    before = await client.get(f"/api/v1/credentials/status/{list_id}")
+    assert before.status_code == 200
+    assert before.headers["cache-control"].startswith("public, max-age=")
+    etag = before.headers["etag"]
+    unchanged = await client.get(
+        f"/api/v1/credentials/status/{list_id}", headers={"If-None-Match": etag}
+    )
+    assert unchanged.status_code == 304
+
+    revoked = await client.post(
+        f"/api/v1/credentials/{issued['credential_id']}/revoke", headers=AUTH
+    )
+    assert revoked.status_code == 200
+    assert revoked.json()["status_list_index"] == issued["status_list_index"]
+
+    for response in (
+        await client.get(f"/api/v1/credentials/{issued['credential_id']}/verify", headers=AUTH),
+        await client.post("/api/v1/credentials/verify", json={"jwt": issued["jwt"]}, headers=AUTH),
+    ):
+        assert response.json()["valid"] is False
+        assert response.json()["revoked"] is True
+
+    after = await client.get(
+        f"/api/v1/credentials/status/{list_id}", headers={"If-None-Match": etag}
+    )
+    assert after.status_code == 200 and after.headers["etag"] != etag
+    subject = after.json()["credentialSubject"]
+    assert subject["statusPurpose"] == "revocation"
+    assert StatusList.decode(subject["encodedList"])[issued["status_list_index"]]
+
+
+async def test_status_list_credential_is_signed(client: AsyncClient) -> None:
+    issued = (await client.post("/api/v1/credentials/issue", json=CREDENTIAL, headers=AUTH)).json()
+    list_url = issued["status_list_credential"]
+    response = await client.get(f"/api/v1/credentials/status/{list_url.rsplit('/', 1)[1]}")
+    document = response.json()
+    proof = document.pop("proof")
+    assert proof["type"] == "JwtProof2020"
+    claims = signing_engine.verify(proof["jwt"])
+    assert claims["vc"] == document  # the JWT signs exactly the served credential
+    assert (claims["iss"], claims["jti"]) == (document["issuer"], list_url)
+    issued_at = datetime.fromisoformat(document["issuanceDate"])
+    assert claims["nbf"] == int(issued_at.timestamp())
+
+    again = await client.get(f"/api/v1/credentials/status/{list_url.rsplit('/', 1)[1]}")
+    assert again.json()["proof"] == proof  # signed once per ETag, not per request
+
+
+async def test_unknown_and_tampered_credentials(client: AsyncClient) -> None:
+    unknown = await client.get("/api/v1/credentials/not-issued/verify", headers=AUTH)
+    assert unknown.status_code == 404
+    assert (
+        await client.post("/api/v1/credentials/not-issued/revoke", headers=AUTH)
+    ).status_code == 404
+    assert (await client.get(f"/api/v1/credentials/status/{10**9}")).status_code == 404
+
+    issued = (await client.post("/api/v1/credentials/issue", json=CREDENTIAL, headers=AUTH)).json()
+    header, payload, signature = issued["jwt"].split(".")
+    tampered = f"{header}.{payload}.{signature[:-4]}AAAA"
+    response = await client.post("/api/v1/credentials/verify", json={"jwt": tampered}, headers=AUTH)
+    assert response.json()["valid"] is False
+    assert "signature" in response.json()["failure_reason"]
+
+
+async def test_revoke_requires_operator_role(client: AsyncClient) -> None:
+    issued = (await client.post("/api/v1/credentials/issue", json=CREDENTIAL, headers=AUTH)).json()
+    response = await client.post(
+        f"/api/v1/credentials/{issued['credential_id']}/revoke",
+        headers={"Authorization": "Bearer role:viewer"},
+    )
+    assert response.status_code == 403
+    assert not status_registry.is_revoked(
+        int(issued["status_list_credential"].rsplit("/", 1)[1]) * status_registry.list_size
+        + issued["status_list_index"]
+    )
@@ -0,0 +1,177 @@
+"""Tests for the wallet balance engine: overdrafts, striped locking and journal replay."""
+
+from __future__ import annotations
+
+import random
+import threading
+import uuid
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+
+from app.schemas.clearing import ClearingStatus, ClearingTransactionResponse
+from app.services.ledger import ClearingLedger
+from app.services.wallets import WalletEngine
+
+AUTH_HEADERS = {"Authorization": "Bearer role:operator"}
+TREASURY_HEADERS = {"Authorization": "Bearer role:treasury"}
+
+
+@pytest.fixture
+def ledger(tmp_path: Path) -> Iterator[ClearingLedger]:
+    ledger = ClearingLedger(str(tmp_path / "ledger.db"), idempotency_ttl_seconds=60)
+    yield ledger
+    ledger.close()
+
+
+@pytest.fixture
+def engine(ledger: ClearingLedger) -> WalletEngine:
+    return WalletEngine(ledger, stripes=16, issuer_wallets=["treasury-main"])
+
+
+def _entry(src: str, dst: str, amount: str) -> ClearingTransactionResponse:
+    now = datetime.now(timezone.utc)
+    return ClearingTransactionResponse(
+        tx_id=str(uuid.uuid4()),
+        status=ClearingStatus.SETTLED,
+        from_wallet=src,
+        to_wallet=dst,
+        amount=Decimal(amount),
+        currency="AKU",
+        idempotency_key=str(uuid.uuid4()),
+        created_at=now,
+        settled_at=now,
+    )
+
+
+def test_overdraft_is_recorded_as_failed(engine: WalletEngine, ledger: ClearingLedger) -> None:
+    engine.settle_sync(_entry("treasury-main", "alice", "10.10"))
+    stored, created = engine.settle_sync(_entry("alice", "bob", "10.11"))
+
+    assert created is True
+    assert stored.status == ClearingStatus.FAILED
+    assert "Insufficient funds in wallet 'alice'" in stored.failed_reason
+    assert ledger.get_sync(stored.tx_id) == stored
+    assert engine.balance("alice") == Decimal("10.10")
+    assert engine.balance("bob") == 0
+    assert engine.balance("treasury-main") == Decimal("-10.10")
+
+
+def test_parallel_settlements_keep_balances_exact(engine: WalletEngine) -> None:
+    wallets = [f"w-{i}" for i in range(20)]
+    for wallet in wallets:
+        engine.settle_sync(_entry("treasury-main", wallet, "5.00"))
+
+    def worker(seed: int) -> None:
+        rng = random.Random(seed)
+        for _ in range(100):
+            src, dst = rng.sample(wallets, 2)
+            engine.settle_sync(_entry(src, dst, f"{rng.randint(1, 300) / 100:.2f}"))
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(engine.balance(wallet) >= 0 for wallet in wallets)
+    assert sum(engine.balance(wallet) for wallet in wallets) == Decimal("100.00")
+    assert engine.invariant_violations() == []
+
+
+def test_balances_are_rebuilt_from_the_journal(
+    engine: WalletEngine, ledger: ClearingLedger
+) -> None:
+    engine.settle_sync(_entry("treasury-main", "alice", "7.25"))
+    engine.settle_sync(_entry("alice", "bob", "2.05"))
+    engine.settle_sync(_entry("bob", "carol", "9.99"))  # overdraft: not replayed
+
+    restarted = WalletEngine(ledger, stripes=4, issuer_wallets=["treasury-main"])
+    assert restarted.load_sync() == 3
+    assert restarted.balance("alice") == Decimal("5.20")
+    assert restarted.balance("bob") == Decimal("2.05")
+    assert restarted.balance("carol") == 0
+    assert restarted.invariant_violations() == []
+
+
+def test_invariant_check_reports_drift(engine: WalletEngine) -> None:
+    engine.settle_sync(_entry("treasury-main", "alice", "1.00"))
+    engine._credit("AKU", "alice", Decimal("0.01"))  # a credit that never hit the journal
+
+    problems = engine.invariant_violations()
+    assert problems == [
+        "AKU balances sum to 0.01, expected 0",
+        "AKU wallet 'alice': live 1.01, journal 1.00",
+    ]
+
+
+async def test_batch_overdraft_fails_whole_batch(client: AsyncClient) -> None:
+    treasury, alice, bob = "treasury-main", f"alice-{uuid.uuid4()}", "bob"
+    funded = await client.post(
+        "/api/v1/clearing/settle",
+        headers={**TREASURY_HEADERS, "Idempotency-Key": str(uuid.uuid4())},
+        json={"from_wallet": treasury, "to_wallet": alice, "amount": "3.00"},
+    )
+    assert funded.json()["status"] == "SETTLED"
+
+    # Netted, alice pays out 4.00 but only holds 3.00.
+    items = [
+        {"from_wallet": alice, "to_wallet": bob, "amount": "2.50"},
+        {"from_wallet": bob, "to_wallet": alice, "amount": "1.00"},
+        {"from_wallet": alice, "to_wallet": bob, "amount": "2.50"},
+    ]
+    response = await client.post(
+        "/api/v1/clearing/settle/batch",
+        headers={**AUTH_HEADERS, "Idempotency-Key": str(uuid.uuid4())},
+        json={"items": items},
+    )
+    assert response.status_code == 201
+    batch = response.json()
+    assert batch["status"] == "FAILED"
+    assert {item["status"] for item in batch["items"]} == {"FAILED"}
+    assert alice in batch["items"][0]["failed_reason"]
+
+    balance = await client.get(f"/api/v1/clearing/wallets/{alice}/balance", headers=AUTH_HEADERS)
+    assert balance.status_code == 200
+    assert Decimal(balance.json()["balance"]) == Decimal("3.00")
+
+    items[-1]["amount"] = "1.50"
+    response = await client.post(
+        "/api/v1/clearing/settle/batch",
+        headers={**AUTH_HEADERS, "Idempotency-Key": str(uuid.uuid4())},
+        json={"items": items},
+    )
+    assert response.json()["status"] == "SETTLED"
+    balance = await client.get(f"/api/v1/clearing/wallets/{alice}/balance", headers=AUTH_HEADERS)
+    assert Decimal(balance.json()["balance"]) == Decimal("0.00")
+
+
+async def test_only_listed_issuer_wallets_overdraw_for_treasury_callers(
+    client: AsyncClient,
+) -> None:
+    async def settle(headers: dict, src: str) -> tuple[int, dict]:
+        response = await client.post(
+            "/api/v1/clearing/settle",
+            headers={**headers, "Idempotency-Key": str(uuid.uuid4())},
+            json={"from_wallet": src, "to_wallet": f"x-{uuid.uuid4()}", "amount": "1000000"},
+        )
+        return response.status_code, response.json()
+
+    learner = {"Authorization": "Bearer role:learner"}
+    # A look-alike name is an ordinary wallet: no funds, no overdraft.
+    code, body = await settle(learner, f"treasury-{uuid.uuid4()}")
+    assert (code, body["status"]) == (201, "FAILED")
+    assert (await settle(learner, "treasury-main"))[0] == 403
+    batch = await client.post(
+        "/api/v1/clearing/settle/batch",
+        headers={**learner, "Idempotency-Key": str(uuid.uuid4())},
+        json={"items": [{"from_wallet": "treasury-main", "to_wallet": "x", "amount": "1"}]},
+    )
+    assert batch.status_code == 403
+
+    code, body = await settle(TREASURY_HEADERS, "treasury-main")
+    assert (code, body["status"]) == (201, "SETTLED")
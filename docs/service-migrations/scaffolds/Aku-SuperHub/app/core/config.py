@@ -0,0 +1,46 @@
+"""Application settings loaded from environment / .env file."""
+
+from __future__ import annotations
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        extra="ignore",
+    )
+
+    # Service identity
+    service_env: str = "development"
+    log_level: str = "INFO"
+    region_code: str = "global"  # reported in the regional analytics summary
+
+    # Edge Hub registry (SQLite)
+    fleet_db_path: str = "./superhub_fleet.db"
+
+    # Hub health telemetry (in-memory ring buffers, 24 B per sample per hub)
+    telemetry_window_samples: int = Field(60, ge=1)
+    telemetry_trend_horizon_hours: float = Field(6.0, gt=0)  # alert if a threshold is this close
+    telemetry_trend_min_samples: int = Field(5, ge=2)
+    telemetry_max_sample_age_seconds: float = Field(900.0, gt=0)  # older hubs leave fleet alerts
+
+    # Analytics event store (SQLite, one table per UTC hour)
+    analytics_db_path: str = "./superhub_analytics.db"
+    analytics_bloom_capacity: int = Field(200_000, ge=1)  # expected events per hour partition
+    analytics_bloom_error_rate: float = Field(0.01, gt=0, lt=1)
+    analytics_bloom_partitions: int = Field(72, ge=1)  # hour partitions with a cached filter
+    analytics_rollup_flush_seconds: float = Field(5.0, ge=0)  # hourly rollup write-behind
+    analytics_max_event_age_hours: int = Field(720, ge=1)  # older occurred_at is rejected
+    analytics_max_event_skew_seconds: float = Field(3600.0, ge=0)  # allowed hub clock lead
+
+    # NDJSON stream ingest (POST /api/v1/analytics/stream)
+    analytics_stream_chunk_events: int = Field(1000, ge=1, le=1000)  # events per commit
+    analytics_stream_max_pending_chunks: int = Field(2, ge=1)  # queued before body reads pause
+    analytics_stream_max_line_bytes: int = Field(65_536, ge=1024)
+
+
+settings = Settings()
@@ -2,19 +2,28 @@
 
 from __future__ import annotations
 
+import asyncio
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.middleware import GzipRequestMiddleware
 from app.routers import analytics, fleet, models
+from app.services.event_store import event_store
+from app.services.hub_registry import hub_registry
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
-    """Startup / shutdown hook — initialise Kafka consumer here if needed."""
+    """Startup / shutdown hook — open the analytics event store and hub registry; initialise
+    Kafka consumer here if needed."""
+    await asyncio.to_thread(event_store.open)
+    await asyncio.to_thread(hub_registry.open)
     yield
+    await asyncio.to_thread(hub_registry.close)
+    await asyncio.to_thread(event_store.close)
 
 
 def create_app() -> FastAPI:
@@ -39,6 +48,8 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    # The NDJSON stream is inflated as it is read rather than buffered and capped.
+    app.add_middleware(GzipRequestMiddleware, streaming_paths=("/api/v1/analytics/stream",))
 
     app.include_router(fleet.router)
     app.include_router(analytics.router)
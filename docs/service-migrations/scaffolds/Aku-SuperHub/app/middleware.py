@@ -0,0 +1,165 @@
+"""ASGI middleware for Aku-SuperHub."""
+
+from __future__ import annotations
+
+import json
+import zlib
+from collections.abc import Awaitable, Callable, Iterable, MutableMapping
+from typing import Any
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+
+class _MalformedGzip(Exception):
+    pass
+
+
+class GzipRequestMiddleware:
+    """Transparently inflate ``Content-Encoding: gzip`` request bodies.
+
+    Edge Hubs upload analytics batches gzipped to save uplink bandwidth.  The
+    inflated size is capped so a small compressed body cannot expand without
+    bound; oversize bodies get 413 and corrupt ones 400.  A body of several
+    concatenated gzip members (RFC 1952 section 2.2, as ``cat a.gz b.gz``
+    produces) inflates to the members in order.
+
+    Bodies for ``streaming_paths`` are not buffered: they are inflated as they
+    arrive and passed on in pieces of at most ``piece_bytes``, with no total
+    cap, for endpoints that consume their body incrementally.  A corrupt
+    stream still gets 400 if the endpoint has not responded yet.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_body_bytes: int = 16 * 1024 * 1024,
+        streaming_paths: Iterable[str] = (),
+        piece_bytes: int = 256 * 1024,
+    ) -> None:
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.streaming_paths = frozenset(streaming_paths)
+        self.piece_bytes = piece_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = [(k, v) for k, v in scope["headers"] if k != b"content-encoding"]
+        encoding = next((v for k, v in scope["headers"] if k == b"content-encoding"), None)
+        if encoding is None or encoding.strip().lower() != b"gzip":
+            await self.app(scope, receive, send)
+            return
+        if scope["path"] in self.streaming_paths:
+            await self._stream(dict(scope, headers=headers), receive, send)
+            return
+
+        inflater = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+        chunks: list[bytes] = []
+        size = 0
+        more_body = True
+        try:
+            while more_body:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    return
+                more_body = message.get("more_body", False)
+                data = message.get("body", b"")
+                while data:
+                    if inflater.eof:  # another gzip member follows
+                        inflater = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+                    chunk = inflater.decompress(data, self.max_body_bytes - size + 1)
+                    size += len(chunk)
+                    if size > self.max_body_bytes or inflater.unconsumed_tail:
+                        await _reject(send, 413, "Decompressed request body too large")
+                        return
+                    chunks.append(chunk)
+                    data = inflater.unused_data
+            tail = inflater.flush()
+            if not inflater.eof:
+                raise zlib.error("truncated gzip stream")
+        except zlib.error:
+            await _reject(send, 400, "Malformed gzip request body")
+            return
+        body = b"".join(chunks) + tail
+
+        headers = [(k, v) for k, v in headers if k != b"content-length"]
+        headers.append((b"content-length", str(len(body)).encode()))
+        scope = dict(scope, headers=headers)
+        sent = False
+
+        async def replay() -> Message:
+            nonlocal sent
+            if sent:
+                return await receive()
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        await self.app(scope, replay, send)
+
+    async def _stream(self, scope: Scope, receive: Receive, send: Send) -> None:
+        scope["headers"] = [(k, v) for k, v in scope["headers"] if k != b"content-length"]
+        inflater = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+        compressed = b""  # received but not yet inflated
+        more_body = True
+        finished = False
+        responded = False
+
+        async def inflate() -> Message:
+            nonlocal inflater, compressed, more_body, finished
+            if finished:
+                return await receive()
+            try:
+                while True:
+                    if compressed:
+                        if inflater.eof:  # another gzip member follows
+                            inflater = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+                        piece = inflater.decompress(compressed, self.piece_bytes)
+                        compressed = inflater.unconsumed_tail or inflater.unused_data
+                        if piece:
+                            return {"type": "http.request", "body": piece, "more_body": True}
+                    elif more_body:
+                        message = await receive()
+                        if message["type"] == "http.disconnect":
+                            return message
+                        more_body = message.get("more_body", False)
+                        compressed = message.get("body", b"")
+                    else:
+                        tail = inflater.flush()
+                        if not inflater.eof:
+                            raise zlib.error("truncated gzip stream")
+                        finished = True
+                        return {"type": "http.request", "body": tail, "more_body": False}
+            except zlib.error as exc:
+                raise _MalformedGzip from exc
+
+        async def tracked_send(message: Message) -> None:
+            nonlocal responded
+            responded = responded or message["type"] == "http.response.start"
+            await send(message)
+
+        try:
+            await self.app(scope, inflate, tracked_send)
+        except _MalformedGzip:
+            if responded:
+                raise
+            await _reject(send, 400, "Malformed gzip request body")
+
+
+async def _reject(send: Send, status: int, detail: str) -> None:
+    payload = json.dumps({"detail": detail}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(payload)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": payload})
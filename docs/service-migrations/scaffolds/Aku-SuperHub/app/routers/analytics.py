@@ -1,10 +1,21 @@
 from __future__ import annotations
 
+import math
 from datetime import datetime, timedelta
+from uuid import UUID
 
-from fastapi import APIRouter, Query, status
+from fastapi import APIRouter, Query, Request, status
 
-from app.schemas.analytics import AnalyticsBatch, BatchIngestResult, RegionalSummary
+from app.core.config import settings
+from app.schemas.analytics import (
+    BatchIngestResult,
+    EventType,
+    RegionalSummary,
+    StreamIngestResult,
+)
+from app.services.batch_decoder import EventBatch
+from app.services.event_store import EventColumns, event_store, to_timestamp
+from app.services.stream_ingest import ingest_ndjson
 
 router = APIRouter(prefix="/api/v1/analytics", tags=["Analytics"])
 
@@ -14,17 +25,43 @@ router = APIRouter(prefix="/api/v1/analytics", tags=["Analytics"])
 # ---------------------------------------------------------------------------
 
 
-def _batch_upsert_events(batch: AnalyticsBatch) -> BatchIngestResult:
+async def _batch_upsert_events(batch: EventColumns) -> BatchIngestResult:
     """
     Persist events to the analytics store, skipping duplicates by event_id.
     Returns a result summary including counts of inserted / duplicate events.
     """
-    raise NotImplementedError("Replace with real data-access layer")
-
-
-def _compute_regional_summary(window_start: datetime, window_end: datetime) -> RegionalSummary:
-    """Aggregate stored events within the given time window and return summary stats."""
-    raise NotImplementedError("Replace with real aggregation query")
+    result = await event_store.append(batch)
+    return BatchIngestResult(
+        received=len(batch),
+        inserted=result.inserted,
+        duplicates=result.duplicates,
+        errors=len(result.rejected),
+        rejected_event_ids=[UUID(bytes=batch.event_id[i]) for i in result.rejected],
+    )
+
+
+async def _compute_regional_summary(
+    window_start: datetime, window_end: datetime
+) -> RegionalSummary:
+    """
+    Merge the ingest-time hourly rollups covering the window into summary stats.
+    The window start is rounded up to a whole UTC hour; the hour containing
+    window_end is included up to the latest ingested event.
+    """
+    first_hour = math.ceil(to_timestamp(window_start) / 3600)
+    last_hour = math.ceil(to_timestamp(window_end) / 3600) - 1
+    totals = await event_store.rollup(first_hour, last_hour)
+    return RegionalSummary(
+        region=settings.region_code,
+        total_learners=totals.distinct_learners,
+        total_sessions=totals.count(EventType.SESSION_END),
+        total_content_views=totals.count(EventType.CONTENT_VIEW),
+        total_assessments=totals.count(EventType.ASSESSMENT_SUBMIT),
+        average_session_duration_seconds=totals.average_session_duration,
+        active_hubs=totals.active_hubs,
+        window_start=datetime.utcfromtimestamp(first_hour * 3600),
+        window_end=window_end,
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -39,12 +76,47 @@ def _compute_regional_summary(window_start: datetime, window_end: datetime) -> R
     summary="Ingest analytics events from Edge Hubs",
     description=(
         "Accept a batch of analytics events forwarded by Edge Hub devices. "
-        "Events are upserted; duplicates (matched on event_id) are silently skipped. "
+        "Events are upserted; duplicates (matched on event_id) are silently skipped, "
+        "and events whose occurred_at is outside the accepted window are counted as "
+        "errors and listed in rejected_event_ids. "
         "Batch size is capped at 1 000 events per request."
     ),
 )
-async def aggregate_analytics(batch: AnalyticsBatch) -> BatchIngestResult:
-    return _batch_upsert_events(batch)
+async def aggregate_analytics(batch: EventBatch) -> BatchIngestResult:
+    return await _batch_upsert_events(batch)
+
+
+@router.post(
+    "/stream",
+    response_model=StreamIngestResult,
+    status_code=status.HTTP_200_OK,
+    summary="Stream an Edge Hub backlog as NDJSON",
+    description=(
+        "Accept any number of analytics events as NDJSON, one AnalyticsEvent per line, "
+        "e.g. a hub draining its offline spool in one request. The body is read as it "
+        "arrives and committed in chunks; while the store is behind, reading pauses and "
+        "TCP flow control slows the sender. Invalid lines are counted and skipped, and "
+        "the first few are reported with their line numbers. Duplicates (matched on "
+        "event_id) are skipped, so a broken-off stream can be resent as a whole. "
+        "Content-Encoding: gzip bodies are inflated on the fly."
+    ),
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/x-ndjson": {"schema": {"$ref": "#/components/schemas/AnalyticsEvent"}}
+            },
+        }
+    },
+)
+async def stream_analytics(request: Request) -> StreamIngestResult:
+    return await ingest_ndjson(
+        request.stream(),
+        event_store,
+        chunk_events=settings.analytics_stream_chunk_events,
+        max_pending_chunks=settings.analytics_stream_max_pending_chunks,
+        max_line_bytes=settings.analytics_stream_max_line_bytes,
+    )
 
 
 @router.get(
@@ -54,7 +126,9 @@ async def aggregate_analytics(batch: AnalyticsBatch) -> BatchIngestResult:
     description=(
         "Return aggregated analytics for the SuperHub's region over the requested "
         "time window (defaults to the last 24 hours). Metrics include total learners, "
-        "sessions, content views, assessments, and average session duration."
+        "sessions, content views, assessments, and average session duration. "
+        "Served from hourly rollups: the window start is rounded up to the hour and "
+        "total_learners is a HyperLogLog estimate (~1.6 % standard error)."
     ),
 )
 async def get_analytics_summary(
@@ -67,4 +141,4 @@ async def get_analytics_summary(
 ) -> RegionalSummary:
     window_end = datetime.utcnow()
     window_start = window_end - timedelta(hours=window_hours)
-    return _compute_regional_summary(window_start, window_end)
+    return await _compute_regional_summary(window_start, window_end)
@@ -3,31 +3,43 @@ from __future__ import annotations
 import math
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, Query, status
+from fastapi import APIRouter, HTTPException, Query, Response, status
+
+from app.schemas.fleet import (
+    EdgeHub,
+    EdgeHubHealth,
+    FleetAlerts,
+    FleetAlertType,
+    HubHealthMetrics,
+    HubStatus,
+    PaginatedHubs,
+)
+from app.services.hub_registry import InvalidCursor, hub_registry
+from app.services.telemetry import ALERT_THRESHOLDS, telemetry_store
 
-from app.schemas.fleet import EdgeHub, EdgeHubHealth, HubHealthMetrics, HubStatus, PaginatedHubs
+_ALERT_TYPES = {
+    "cpu_percent": FleetAlertType.HIGH_CPU,
+    "memory_percent": FleetAlertType.HIGH_MEMORY,
+    "disk_percent": FleetAlertType.HIGH_DISK,
+}
+_ALERT_HUB_FIELDS = ("hub_id", "name", "region", "status", "value")
 
 router = APIRouter(prefix="/api/v1/fleet", tags=["Fleet Management"])
 
 
 # ---------------------------------------------------------------------------
-# Stub helpers — replace with real DB calls in production
+# Data-access helpers
 # ---------------------------------------------------------------------------
 
 
-def _get_all_hubs() -> list[EdgeHub]:
-    """Return all registered Edge Hub records from the data store."""
-    raise NotImplementedError("Replace with real data-access layer")
-
-
-def _get_hub_by_id(hub_id: UUID) -> EdgeHub | None:
+async def _get_hub_by_id(hub_id: UUID) -> EdgeHub | None:
     """Fetch a single hub by its UUID; returns None if not found."""
-    raise NotImplementedError("Replace with real data-access layer")
+    return await hub_registry.get(hub_id)
 
 
-def _get_hub_metrics(hub_id: UUID) -> HubHealthMetrics:
-    """Retrieve live telemetry metrics for the given hub."""
-    raise NotImplementedError("Replace with real telemetry collector")
+def _get_hub_metrics(hub_id: UUID) -> HubHealthMetrics | None:
+    """Latest telemetry sample pushed by the given hub; None if it has not reported."""
+    return telemetry_store.latest(hub_id)
 
 
 # ---------------------------------------------------------------------------
@@ -41,8 +53,13 @@ def _get_hub_metrics(hub_id: UUID) -> HubHealthMetrics:
     summary="List Edge Hub devices",
     description=(
         "Return a paginated list of all Edge Hub devices registered to this "
-        "SuperHub's region, sorted by registration date descending."
+        "SuperHub's region, sorted by registration date descending. "
+        "Follow next_cursor for constant-cost pages at any depth; page/page_size "
+        "offsets are still accepted (page is ignored when a cursor is given)."
     ),
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"description": "Malformed or mismatched cursor"},
+    },
 )
 async def list_hubs(
     page: int = Query(default=1, ge=1, description="Page number (1-based)"),
@@ -50,40 +67,149 @@ async def list_hubs(
     status_filter: HubStatus | None = Query(
         default=None, alias="status", description="Filter by hub status"
     ),
+    region: str | None = Query(
+        default=None, min_length=1, max_length=64, description="Filter by region code"
+    ),
+    cursor: str | None = Query(
+        default=None, description="next_cursor from the previous page (keyset pagination)"
+    ),
 ) -> PaginatedHubs:
-    all_hubs = _get_all_hubs()
-
-    if status_filter is not None:
-        all_hubs = [h for h in all_hubs if h.status == status_filter]
-
-    total = len(all_hubs)
-    pages = max(1, math.ceil(total / page_size))
-    start = (page - 1) * page_size
-    end = start + page_size
+    try:
+        result = await hub_registry.page(
+            limit=page_size,
+            status=status_filter,
+            region=region,
+            cursor=cursor,
+            offset=(page - 1) * page_size,
+        )
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
 
     return PaginatedHubs(
-        items=all_hubs[start:end],
-        total=total,
+        items=result.hubs,
+        total=result.total,
         page=page,
         page_size=page_size,
-        pages=pages,
+        pages=max(1, math.ceil(result.total / page_size)),
+        next_cursor=result.next_cursor,
+    )
+
+
+@router.post(
+    "",
+    response_model=EdgeHub,
+    status_code=status.HTTP_201_CREATED,
+    summary="Register an Edge Hub",
+    description=(
+        "Add an Edge Hub to this SuperHub's registry. Registering a known hub_id "
+        "again refreshes its record (keeping the original registered_at) and "
+        "returns 200."
+    ),
+)
+async def register_hub(hub: EdgeHub, response: Response) -> EdgeHub:
+    if not await hub_registry.register([hub]):
+        response.status_code = status.HTTP_200_OK
+    return await hub_registry.get(hub.hub_id)
+
+
+@router.get(
+    "/alerts",
+    response_model=FleetAlerts,
+    summary="Fleet-wide threshold alerts",
+    description=(
+        "Check the latest telemetry sample of every hub against the CPU, memory and "
+        "disk thresholds in one pass, and return the breaching hubs grouped by alert "
+        "type, highest value first. Hubs whose latest sample is older than "
+        "TELEMETRY_MAX_SAMPLE_AGE_SECONDS are left out. Filter by region and by tags "
+        "given as key:value (repeatable; all must match). `hubs_checked` counts the "
+        "hubs with a fresh sample that match the filters."
+    ),
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"description": "Malformed tag filter"},
+    },
+)
+async def fleet_alerts(
+    region: str | None = Query(
+        default=None, min_length=1, max_length=64, description="Filter by region code"
+    ),
+    tag: list[str] = Query(default=[], description="key:value hub tag filter, repeatable"),
+) -> FleetAlerts:
+    if any(":" not in item for item in tag):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Tag filters must be key:value",
+        )
+    tags = dict(item.partition(":")[::2] for item in tag)
+
+    breaches = telemetry_store.breaches()
+    labels = await hub_registry.labels(
+        {hub_id for found in breaches.values() for hub_id, _ in found}, region, tags
+    )
+    fresh = telemetry_store.fresh()
+    if region is None and not tags:
+        hubs_checked = len(fresh)
+    else:
+        hubs_checked = len((await hub_registry.matching(region, tags)).intersection(fresh))
+
+    alerts: dict[FleetAlertType, list[dict]] = {}
+    alerting: set[bytes] = set()
+    for metric, found in breaches.items():
+        matching = sorted(
+            ((value, hub_id) for hub_id, value in found if hub_id in labels), reverse=True
+        )
+        alerting.update(hub_id for _, hub_id in matching)
+        # Plain dicts: FleetAlerts validates the whole list in one pydantic-core pass.
+        alerts[_ALERT_TYPES[metric]] = [
+            dict(zip(_ALERT_HUB_FIELDS, (hub_id, *labels[hub_id], value)))
+            for value, hub_id in matching
+        ]
+
+    return FleetAlerts(
+        hubs_checked=hubs_checked,
+        hubs_alerting=len(alerting),
+        alerts=alerts,
+        thresholds={_ALERT_TYPES[m]: threshold for m, threshold in ALERT_THRESHOLDS.items()},
     )
 
 
+@router.post(
+    "/{hub_id}/metrics",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Push hub telemetry",
+    description=(
+        "Record one health telemetry sample from a registered Edge Hub. Samples are "
+        "kept in a fixed-size per-hub window that backs the health endpoint."
+    ),
+    responses={
+        status.HTTP_404_NOT_FOUND: {"description": "Hub not found"},
+    },
+)
+async def push_hub_metrics(hub_id: UUID, metrics: HubHealthMetrics) -> Response:
+    if await _get_hub_by_id(hub_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Edge Hub '{hub_id}' not found in this region.",
+        )
+    telemetry_store.push(hub_id, metrics)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
 @router.get(
     "/{hub_id}/health",
     response_model=EdgeHubHealth,
     summary="Get hub health status",
     description=(
-        "Fetch the current health status and live telemetry metrics for a "
-        "specific Edge Hub. Returns 404 if the hub is not registered."
+        "Fetch the current health status, latest telemetry sample and rolling "
+        "p50 / p95 / max over the hub's recent samples. Alerts cover the latest "
+        "sample, sustained load and memory/disk trends. Returns 404 if the hub is "
+        "not registered or has not reported telemetry yet."
     ),
     responses={
-        status.HTTP_404_NOT_FOUND: {"description": "Hub not found"},
+        status.HTTP_404_NOT_FOUND: {"description": "Hub not found or no telemetry yet"},
     },
 )
 async def get_hub_health(hub_id: UUID) -> EdgeHubHealth:
-    hub = _get_hub_by_id(hub_id)
+    hub = await _get_hub_by_id(hub_id)
     if hub is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -91,18 +217,16 @@ async def get_hub_health(hub_id: UUID) -> EdgeHubHealth:
         )
 
     metrics = _get_hub_metrics(hub_id)
-
-    alerts: list[str] = []
-    if metrics.cpu_percent > 90.0:
-        alerts.append(f"High CPU utilisation: {metrics.cpu_percent:.1f}%")
-    if metrics.memory_percent > 85.0:
-        alerts.append(f"High memory utilisation: {metrics.memory_percent:.1f}%")
-    if metrics.disk_percent > 80.0:
-        alerts.append(f"High disk utilisation: {metrics.disk_percent:.1f}%")
+    if metrics is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Edge Hub '{hub_id}' has not reported telemetry yet.",
+        )
 
     return EdgeHubHealth(
         hub_id=hub.hub_id,
         status=hub.status,
         metrics=metrics,
-        alerts=alerts,
+        rolling=telemetry_store.rolling(hub_id),
+        alerts=telemetry_store.alerts(hub_id),
     )
@@ -6,6 +6,8 @@ from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, Field
 
+MAX_BATCH_EVENTS = 1000
+
 
 class EventType(str, Enum):
     SESSION_START = "SESSION_START"
@@ -42,7 +44,7 @@ class AnalyticsBatch(BaseModel):
 
     model_config = ConfigDict(frozen=True)
 
-    events: list[AnalyticsEvent] = Field(..., min_length=1, max_length=1000)
+    events: list[AnalyticsEvent] = Field(..., min_length=1, max_length=MAX_BATCH_EVENTS)
 
 
 class BatchIngestResult(BaseModel):
@@ -52,9 +54,30 @@ class BatchIngestResult(BaseModel):
     inserted: int = Field(..., ge=0, description="New events inserted")
     duplicates: int = Field(..., ge=0, description="Duplicate event_ids skipped")
     errors: int = Field(..., ge=0, description="Events that failed validation or write")
+    rejected_event_ids: list[UUID] = Field(
+        default_factory=list,
+        description="Valid events refused for an occurred_at outside the accepted window; "
+        "not stored, so the sender must keep them",
+    )
     ingested_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+class StreamLineError(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    line: int = Field(..., ge=1, description="1-based line number in the NDJSON body")
+    error: str
+
+
+class StreamIngestResult(BatchIngestResult):
+    """Outcome of one NDJSON stream; counts cover every non-blank line read."""
+
+    chunks: int = Field(..., ge=0, description="Chunks committed, one transaction each")
+    error_samples: list[StreamLineError] = Field(
+        default_factory=list, description="The first invalid lines, with their line numbers"
+    )
+
+
 class RegionalSummary(BaseModel):
     """Aggregated analytics summary for the SuperHub's region."""
 
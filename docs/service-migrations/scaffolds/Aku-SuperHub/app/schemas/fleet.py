@@ -14,6 +14,12 @@ class HubStatus(str, Enum):
     MAINTENANCE = "MAINTENANCE"
 
 
+class FleetAlertType(str, Enum):
+    HIGH_CPU = "HIGH_CPU"
+    HIGH_MEMORY = "HIGH_MEMORY"
+    HIGH_DISK = "HIGH_DISK"
+
+
 class HubHealthMetrics(BaseModel):
     model_config = ConfigDict(frozen=True)
 
@@ -24,6 +30,27 @@ class HubHealthMetrics(BaseModel):
     uptime_seconds: int = Field(..., ge=0, description="Hub process uptime in seconds")
 
 
+class MetricStats(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    p50: float
+    p95: float
+    max: float
+
+
+class RollingHealthMetrics(BaseModel):
+    """Distribution of each metric over the hub's recent samples."""
+
+    model_config = ConfigDict(frozen=True)
+
+    samples: int = Field(..., ge=1, description="Samples in the window")
+    window_seconds: float = Field(..., ge=0.0, description="Time between oldest and newest")
+    cpu_percent: MetricStats
+    memory_percent: MetricStats
+    disk_percent: MetricStats
+    active_learners: MetricStats
+
+
 class EdgeHub(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -47,7 +74,10 @@ class EdgeHubHealth(BaseModel):
 
     hub_id: UUID
     status: HubStatus
-    metrics: HubHealthMetrics
+    metrics: HubHealthMetrics = Field(..., description="Most recent sample")
+    rolling: RollingHealthMetrics | None = Field(
+        default=None, description="p50 / p95 / max over the recent samples"
+    )
     checked_at: datetime = Field(default_factory=datetime.utcnow)
     alerts: list[str] = Field(default_factory=list, description="Active alert messages, if any")
 
@@ -60,3 +90,30 @@ class PaginatedHubs(BaseModel):
     page: int = Field(..., ge=1)
     page_size: int = Field(..., ge=1)
     pages: int = Field(..., ge=0)
+    next_cursor: str | None = Field(
+        default=None, description="Pass as ?cursor= for the next page; null on the last page"
+    )
+
+
+class FleetAlertHub(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    hub_id: UUID
+    name: str
+    region: str
+    status: HubStatus
+    value: float = Field(..., description="Latest value of the breaching metric")
+
+
+class FleetAlerts(BaseModel):
+    """Hubs whose latest telemetry sample breaches a threshold, grouped by alert type."""
+
+    model_config = ConfigDict(frozen=True)
+
+    hubs_checked: int = Field(
+        ..., ge=0, description="Hubs with a fresh telemetry sample that match the filters"
+    )
+    hubs_alerting: int = Field(..., ge=0, description="Distinct hubs with at least one alert")
+    alerts: dict[FleetAlertType, list[FleetAlertHub]]
+    thresholds: dict[FleetAlertType, float]
+    checked_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,188 @@
+"""Fast-path decoding of ``/aggregate`` bodies straight into ``EventColumns``.
+
+Validating a batch through ``AnalyticsBatch`` builds one frozen
+``AnalyticsEvent`` per event, parsing up to five UUIDs and a datetime into
+Python objects, which ``EventColumns.from_events`` then takes apart again.
+:func:`decode_batch` goes from the parsed JSON to the stored representation
+column by column instead:
+
+* each UUID column is checked for the canonical 36-character hyphenated form
+  and converted with a single ``bytes.fromhex`` over the whole column;
+* ``event_type`` maps through a dict of the ``EventType`` values;
+* ``occurred_at`` must match a strict ISO 8601 pattern before
+  ``datetime.fromisoformat`` reads it;
+* ``duration_seconds`` and ``metadata`` values are type-checked in place.
+
+The fast path only accepts what ``AnalyticsBatch`` accepts, with the same
+stored values.  Anything else (a missing field, a lax form pydantic would
+coerce, an invalid value) returns ``None``, and :data:`EventBatch` then
+validates the body through ``AnalyticsBatch`` as before.  Clients therefore
+see exactly the same accepted inputs and the same 422 errors; only well-formed
+batches skip the models.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import re
+import struct
+from datetime import datetime
+from typing import Annotated, Any
+
+from pydantic import GetPydanticSchema
+from pydantic_core import core_schema
+
+from app.schemas.analytics import MAX_BATCH_EVENTS, AnalyticsBatch
+from app.services.event_store import EVENT_TYPE_CODES, EventColumns, to_timestamp
+
+_EVENT_TYPE_CODES = {event_type.value: code for event_type, code in EVENT_TYPE_CODES.items()}
+_HYPHENS = (8, 13, 18, 23)
+_ISO_DATETIME = (
+    r"[0-9]{4}-[0-9]{2}-[0-9]{2}T[0-9]{2}:[0-9]{2}:[0-9]{2}(?:\.[0-9]{1,6})?"
+    r"(?:Z|[+-](?:[01][0-9]|2[0-3]):[0-5][0-9])?"
+)
+_ISO_DATETIME_LINES = re.compile(rf"(?:{_ISO_DATETIME}\n)*{_ISO_DATETIME}")
+_METADATA_TYPES = frozenset({str, int, float, bool})
+_MISSING = object()
+_compact_json = json.JSONEncoder(separators=(",", ":")).encode  # as in EventColumns.from_events
+
+
+def _uuid_bytes(values: list[Any]) -> list[bytes] | None:
+    """16-byte ids for canonical UUID strings, or None if any is not one."""
+    if set(map(type, values)) != {str} or set(map(len, values)) != {36}:
+        return None
+    joined = "".join(values)
+    if any(joined[i::36].count("-") != len(values) for i in _HYPHENS):
+        return None
+    digits = joined.replace("-", "")
+    if len(digits) != 32 * len(values):
+        return None
+    try:
+        raw = bytes.fromhex(digits)
+    except ValueError:
+        return None
+    if len(raw) != 16 * len(values):  # fromhex skips whitespace
+        return None
+    return list(struct.unpack("16s" * len(values), raw))
+
+
+def _optional_uuid_bytes(values: list[Any]) -> list[bytes | None] | None:
+    present = [i for i, value in enumerate(values) if value is not None]
+    if not present:
+        return values
+    converted = _uuid_bytes([values[i] for i in present])
+    if converted is None:
+        return None
+    column: list[bytes | None] = [None] * len(values)
+    for i, value in zip(present, converted):
+        column[i] = value
+    return column
+
+
+def _timestamps(values: list[Any]) -> list[float] | None:
+    try:
+        # One regex pass over the whole column; a line per value.
+        if not _ISO_DATETIME_LINES.fullmatch("\n".join(values)):
+            return None
+        return [to_timestamp(datetime.fromisoformat(value)) for value in values]
+    except (TypeError, ValueError):  # not a string; out-of-range field
+        return None
+
+
+def _durations(values: list[Any]) -> list[float | None] | None:
+    column: list[float | None] = []
+    for value in values:
+        if value is None:
+            column.append(None)
+            continue
+        if type(value) is not float and type(value) is not int:
+            return None
+        try:
+            value = float(value)
+        except OverflowError:
+            return None
+        if not (math.isfinite(value) and value >= 0.0):
+            return None
+        column.append(value)
+    return column
+
+
+def _metadata(values: list[Any]) -> list[str | None] | None:
+    column: list[str | None] = []
+    for value in values:
+        if value is _MISSING:
+            column.append(None)
+            continue
+        if type(value) is not dict:
+            return None
+        if not value:
+            column.append(None)
+            continue
+        for item in value.values():
+            if type(item) not in _METADATA_TYPES:
+                return None
+            if type(item) is float and not math.isfinite(item):
+                return None
+        column.append(_compact_json(value))
+    return column
+
+
+def decode_batch(value: Any) -> EventColumns | None:
+    """``value`` (a parsed ``AnalyticsBatch`` body) as columns, or None if off the fast path."""
+    if type(value) is not dict:
+        return None
+    events = value.get("events")
+    if type(events) is not list or not 1 <= len(events) <= MAX_BATCH_EVENTS:
+        return None
+    if set(map(type, events)) != {dict}:
+        return None
+    try:
+        event_id = _uuid_bytes([event["event_id"] for event in events])
+        hub_id = _uuid_bytes([event["hub_id"] for event in events])
+        learner_id = _uuid_bytes([event["learner_id"] for event in events])
+        types = [_EVENT_TYPE_CODES.get(event["event_type"]) for event in events]
+        occurred_at = _timestamps([event["occurred_at"] for event in events])
+    except (KeyError, TypeError):  # missing field; unhashable event_type
+        return None
+    if event_id is None or hub_id is None or learner_id is None or occurred_at is None:
+        return None
+    if None in types:
+        return None
+    content_id = _optional_uuid_bytes([event.get("content_id") for event in events])
+    session_id = _optional_uuid_bytes([event.get("session_id") for event in events])
+    durations = _durations([event.get("duration_seconds") for event in events])
+    metadata = _metadata([event.get("metadata", _MISSING) for event in events])
+    if content_id is None or session_id is None or durations is None or metadata is None:
+        return None
+    return EventColumns(
+        event_id=event_id,
+        hub_id=hub_id,
+        learner_id=learner_id,
+        event_type=types,
+        occurred_at=occurred_at,
+        content_id=content_id,
+        session_id=session_id,
+        duration_seconds=durations,
+        metadata=metadata,
+    )
+
+
+def _validate(value: Any, handler: core_schema.ValidatorFunctionWrapHandler) -> EventColumns:
+    columns = decode_batch(value)
+    if columns is None:
+        # Off the fast path: AnalyticsBatch decides, with its own errors.
+        columns = EventColumns.from_events(handler(value).events)
+    return columns
+
+
+# Request body type for /aggregate: documented and validated as AnalyticsBatch,
+# delivered as EventColumns.
+EventBatch = Annotated[
+    EventColumns,
+    GetPydanticSchema(
+        lambda _, handler: core_schema.no_info_wrap_validator_function(
+            _validate, handler.generate_schema(AnalyticsBatch)
+        )
+    ),
+]
@@ -0,0 +1,395 @@
+"""Analytics event store — SQLite (WAL), one append-only table per UTC hour.
+
+Events are routed to a partition table by ``occurred_at`` (``events_YYYYMMDDHH``)
+and stored in a compact typed layout: UUIDs as 16-byte blobs, the event type
+as a small integer, timestamps as epoch seconds, and metadata as compact JSON
+(NULL when empty).  Rows are appended in arrival order.  A window query only
+opens the partitions it covers, and old hours can be dropped table by table.
+
+Deduplication on ``event_id`` is exact.  Each partition has a unique index
+on ``event_id``, fronted by an in-memory Bloom filter:
+
+* an id the filter has never seen is new for certain, so backfills of fresh
+  events never query the index before inserting;
+* an id the filter may have seen (a retry, or a ~1 % false positive) is
+  looked up in the index, in chunks of ``_LOOKUP_CHUNK`` ids.
+
+So the store knows exactly which events of a batch were inserted, which
+``BatchIngestResult`` and the ingest-time rollups rely on.  A retried event
+carries the same ``occurred_at``, so it always lands in the same partition.
+
+``occurred_at`` is set by the hub, so it bounds how many partitions a batch
+can open: events older than ``ANALYTICS_MAX_EVENT_AGE_HOURS`` or more than
+``ANALYTICS_MAX_EVENT_SKEW_SECONDS`` ahead of the server clock are rejected
+(listed in ``AppendResult.rejected``), never stored.  Ingest answers with
+their ids, so the hub can keep them rather than treat them as delivered.
+
+Filters are kept for the ``ANALYTICS_BLOOM_PARTITIONS`` most recently
+written hours.  Each is sized for ``ANALYTICS_BLOOM_CAPACITY`` events at
+``ANALYTICS_BLOOM_ERROR_RATE`` (~310 KB at the defaults).  A filter is rebuilt
+from its partition's index when an evicted hour is written again.  A filter
+can only err towards "maybe seen", so a crash or a rolled-back batch costs an
+index lookup, never a lost or duplicated event.
+
+sqlite3 is blocking, so the async API runs every call in a worker thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from app.core.config import settings
+from app.schemas.analytics import AnalyticsEvent, EventType
+from app.services.rollups import ROLLUP_SCHEMA, RollupIndex, RollupTotals
+
+# Stored as the position in this tuple: append new event types, never reorder.
+EVENT_TYPES: tuple[EventType, ...] = tuple(EventType)
+EVENT_TYPE_CODES: dict[EventType, int] = {t: code for code, t in enumerate(EVENT_TYPES)}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS event_partitions (
+    hour       INTEGER PRIMARY KEY,  -- hours since the Unix epoch, UTC
+    table_name TEXT NOT NULL,
+    events     INTEGER NOT NULL
+);
+"""
+_PARTITION_TABLE = """
+CREATE TABLE IF NOT EXISTS {table} (
+    event_id         BLOB NOT NULL,
+    hub_id           BLOB NOT NULL,
+    learner_id       BLOB NOT NULL,
+    event_type       INTEGER NOT NULL,
+    occurred_at      REAL NOT NULL,
+    content_id       BLOB,
+    session_id       BLOB,
+    duration_seconds REAL,
+    metadata         TEXT
+)
+"""
+_PARTITION_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS {table}_event_id ON {table} (event_id)"
+_LOOKUP_CHUNK = 500
+_MASK64 = (1 << 64) - 1
+
+
+def partition_table(hour: int) -> str:
+    return "events_" + time.strftime("%Y%m%d%H", time.gmtime(hour * 3600))
+
+
+def to_timestamp(value: datetime) -> float:
+    """Epoch seconds; naive datetimes are taken as UTC, like ``occurred_at``."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class BloomFilter:
+    """Blocked Bloom filter over byte keys (false positives only).
+
+    All six probe bits of a key fall in one 64-bit word, so a test is one hash,
+    one array read and a mask compare, instead of a loop over probes.  Blocking
+    costs some accuracy, which ~30 % more bits than a classic filter make up.
+    Keys are hashed with the builtin (per-process) ``hash``; filters are never
+    persisted.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        bits = 1.3 * -capacity * math.log(error_rate) / math.log(2) ** 2
+        self._words = array("Q", bytes(8 * max(1, math.ceil(bits / 64))))
+
+    def _probe(self, key: bytes) -> tuple[int, int]:
+        h = hash(key) & _MASK64
+        mask = (
+            1 << (h & 63)
+            | 1 << (h >> 6 & 63)
+            | 1 << (h >> 12 & 63)
+            | 1 << (h >> 18 & 63)
+            | 1 << (h >> 24 & 63)
+            | 1 << (h >> 30 & 63)
+        )
+        return (h >> 36) % len(self._words), mask
+
+    def add(self, key: bytes) -> bool:
+        """Add ``key``; returns True if it may have been present already."""
+        word, mask = self._probe(key)
+        old = self._words[word]
+        if old & mask == mask:
+            return True
+        self._words[word] = old | mask
+        return False
+
+    def __contains__(self, key: bytes) -> bool:
+        word, mask = self._probe(key)
+        return self._words[word] & mask == mask
+
+
+@dataclass(slots=True)
+class EventColumns:
+    """A batch of events as parallel columns, in the stored representation."""
+
+    event_id: list[bytes] = field(default_factory=list)
+    hub_id: list[bytes] = field(default_factory=list)
+    learner_id: list[bytes] = field(default_factory=list)
+    event_type: list[int] = field(default_factory=list)
+    occurred_at: list[float] = field(default_factory=list)
+    content_id: list[bytes | None] = field(default_factory=list)
+    session_id: list[bytes | None] = field(default_factory=list)
+    duration_seconds: list[float | None] = field(default_factory=list)
+    metadata: list[str | None] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.event_id)
+
+    @classmethod
+    def from_events(cls, events: Iterable[AnalyticsEvent]) -> EventColumns:
+        columns = cls()
+        for event in events:
+            columns.event_id.append(event.event_id.bytes)
+            columns.hub_id.append(event.hub_id.bytes)
+            columns.learner_id.append(event.learner_id.bytes)
+            columns.event_type.append(EVENT_TYPE_CODES[event.event_type])
+            columns.occurred_at.append(to_timestamp(event.occurred_at))
+            columns.content_id.append(event.content_id.bytes if event.content_id else None)
+            columns.session_id.append(event.session_id.bytes if event.session_id else None)
+            columns.duration_seconds.append(event.duration_seconds)
+            columns.metadata.append(
+                json.dumps(event.metadata, separators=(",", ":")) if event.metadata else None
+            )
+        return columns
+
+    def rows(self, indexes: list[int]) -> Iterator[tuple]:
+        """Row tuples for the given (ascending, distinct) positions."""
+        columns = (
+            self.event_id,
+            self.hub_id,
+            self.learner_id,
+            self.event_type,
+            self.occurred_at,
+            self.content_id,
+            self.session_id,
+            self.duration_seconds,
+            self.metadata,
+        )
+        if len(indexes) == len(self):
+            return zip(*columns)
+        return zip(*([column[i] for i in indexes] for column in columns))
+
+
+@dataclass(slots=True)
+class AppendResult:
+    inserted: int
+    duplicates: int
+    new: list[int]  # positions in the batch of the events actually inserted
+    rejected: list[int] = field(default_factory=list)  # positions outside the window
+
+
+class EventStore:
+    """Hour-partitioned, deduplicated analytics event log."""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        bloom_capacity: int = 200_000,
+        bloom_error_rate: float = 0.01,
+        bloom_partitions: int = 72,
+        rollup_flush_seconds: float = 5.0,
+        max_event_age_seconds: float | None = None,
+        max_event_skew_seconds: float | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = path
+        self.bloom_capacity = bloom_capacity
+        self.bloom_error_rate = bloom_error_rate
+        self.bloom_partitions = bloom_partitions
+        self.max_event_age_seconds = max_event_age_seconds
+        self.max_event_skew_seconds = max_event_skew_seconds
+        self._clock = clock
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.RLock()
+        self._tables: dict[int, str] = {}
+        self._blooms: OrderedDict[int, BloomFilter] = OrderedDict()
+        self._rollups = RollupIndex(flush_seconds=rollup_flush_seconds)
+
+    # -- connection ---------------------------------------------------------
+
+    def open(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                return
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.executescript(_SCHEMA + ROLLUP_SCHEMA)
+            self._tables = dict(conn.execute("SELECT hour, table_name FROM event_partitions"))
+            self._rollups.load(conn)
+            self._conn = conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._rollups.flush(self._conn)
+                self._conn.execute("COMMIT")
+                self._conn.close()
+                self._conn = None
+            self._tables.clear()
+            self._blooms.clear()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.open()
+        assert self._conn is not None
+        return self._conn
+
+    # -- partitions ---------------------------------------------------------
+
+    def _partition(self, conn: sqlite3.Connection, hour: int) -> tuple[str, BloomFilter]:
+        """Table and Bloom filter for ``hour``, creating the partition if needed."""
+        table = self._tables.get(hour)
+        if table is None:
+            table = partition_table(hour)
+            conn.execute(_PARTITION_TABLE.format(table=table))
+            conn.execute(_PARTITION_INDEX.format(table=table))
+            conn.execute("INSERT INTO event_partitions VALUES (?, ?, 0)", (hour, table))
+            self._tables[hour] = table
+            bloom = BloomFilter(self.bloom_capacity, self.bloom_error_rate)
+        else:
+            bloom = self._blooms.get(hour)
+            if bloom is not None:
+                self._blooms.move_to_end(hour)
+                return table, bloom
+            (events,) = conn.execute(
+                "SELECT events FROM event_partitions WHERE hour = ?", (hour,)
+            ).fetchone()
+            bloom = BloomFilter(max(self.bloom_capacity, 2 * events), self.bloom_error_rate)
+            for (event_id,) in conn.execute(f"SELECT event_id FROM {table}"):
+                bloom.add(event_id)
+        self._blooms[hour] = bloom
+        if len(self._blooms) > self.bloom_partitions:
+            self._blooms.popitem(last=False)
+        return table, bloom
+
+    @staticmethod
+    def _existing(conn: sqlite3.Connection, table: str, keys: list[bytes]) -> set[bytes]:
+        found: set[bytes] = set()
+        for start in range(0, len(keys), _LOOKUP_CHUNK):
+            chunk = keys[start : start + _LOOKUP_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            found.update(
+                row[0]
+                for row in conn.execute(
+                    f"SELECT event_id FROM {table} WHERE event_id IN ({placeholders})", chunk
+                )
+            )
+        return found
+
+    # -- blocking API (called from worker threads and benchmarks) -----------
+
+    def append_sync(self, columns: EventColumns) -> AppendResult:
+        """Insert the in-window events not stored yet, in one transaction."""
+        ids = columns.event_id
+        by_hour: dict[int, list[int]] = {}
+        seen: set[bytes] = set()
+        duplicates = 0
+        rejected: list[int] = []
+        now = self._clock()
+        oldest = (
+            -math.inf if self.max_event_age_seconds is None else now - self.max_event_age_seconds
+        )
+        newest = (
+            math.inf if self.max_event_skew_seconds is None else now + self.max_event_skew_seconds
+        )
+        for i, occurred_at in enumerate(columns.occurred_at):
+            if not oldest <= occurred_at <= newest:
+                rejected.append(i)
+                continue
+            if ids[i] in seen:
+                duplicates += 1  # repeated within the batch
+                continue
+            seen.add(ids[i])
+            hour = int(occurred_at // 3600)
+            if hour in by_hour:
+                by_hour[hour].append(i)
+            else:
+                by_hour[hour] = [i]
+
+        new: list[int] = []
+        with self._lock:
+            conn = self._db()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for hour, indexes in by_hour.items():
+                    table, bloom = self._partition(conn, hour)
+                    add = bloom.add
+                    maybe = [ids[i] for i in indexes if add(ids[i])]
+                    fresh = indexes
+                    if maybe:
+                        existing = self._existing(conn, table, maybe)
+                        if existing:
+                            fresh = [i for i in indexes if ids[i] not in existing]
+                            duplicates += len(indexes) - len(fresh)
+                    if not fresh:
+                        continue
+                    conn.executemany(
+                        f"INSERT INTO {table} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        columns.rows(fresh),
+                    )
+                    conn.execute(
+                        "UPDATE event_partitions SET events = events + ? WHERE hour = ?",
+                        (len(fresh), hour),
+                    )
+                    new += fresh
+                if new:
+                    self._rollups.apply(conn, columns, new)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                # Partitions created in the rolled-back transaction no longer exist.
+                self._tables = dict(conn.execute("SELECT hour, table_name FROM event_partitions"))
+                self._blooms = OrderedDict(
+                    (hour, bloom) for hour, bloom in self._blooms.items() if hour in self._tables
+                )
+                self._rollups.load(conn)
+                raise
+        return AppendResult(inserted=len(new), duplicates=duplicates, new=new, rejected=rejected)
+
+    def count_sync(self) -> int:
+        with self._lock:
+            query = "SELECT COALESCE(SUM(events), 0) FROM event_partitions"
+            (events,) = self._db().execute(query).fetchone()
+            return events
+
+    def rollup_sync(self, first_hour: int, last_hour: int) -> RollupTotals:
+        """Merged ingest-time rollups of the UTC hours ``first_hour`` … ``last_hour``."""
+        with self._lock:
+            return self._rollups.totals(self._db(), first_hour, last_hour)
+
+    # -- async API ----------------------------------------------------------
+
+    async def append(self, columns: EventColumns) -> AppendResult:
+        return await asyncio.to_thread(self.append_sync, columns)
+
+    async def rollup(self, first_hour: int, last_hour: int) -> RollupTotals:
+        return await asyncio.to_thread(self.rollup_sync, first_hour, last_hour)
+
+
+event_store = EventStore(
+    settings.analytics_db_path,
+    bloom_capacity=settings.analytics_bloom_capacity,
+    bloom_error_rate=settings.analytics_bloom_error_rate,
+    bloom_partitions=settings.analytics_bloom_partitions,
+    rollup_flush_seconds=settings.analytics_rollup_flush_seconds,
+    max_event_age_seconds=settings.analytics_max_event_age_hours * 3600,
+    max_event_skew_seconds=settings.analytics_max_event_skew_seconds,
+)
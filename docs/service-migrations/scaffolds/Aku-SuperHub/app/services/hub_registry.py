@@ -0,0 +1,352 @@
+"""Edge Hub registry — SQLite (WAL), indexed for paginated fleet listings.
+
+Hubs are listed newest registration first, ordered by ``(registered_at,
+hub_id)`` descending; ``hub_id`` breaks ties, so the order is total and
+stable.  Two indexes serve the listing:
+
+* ``(status, registered_at DESC, hub_id DESC)`` for status-filtered pages;
+* ``(registered_at DESC, hub_id DESC)`` for unfiltered pages.
+
+A region index serves region-filtered pages and lookups.
+
+Pages come in two forms:
+
+* keyset: the cursor token carries the sort key of the last hub returned, and
+  the next page starts right after it with an index seek, so every page costs
+  the same however deep it is.  The token also pins the filters it was issued
+  for;
+* offset (``page``/``page_size``): kept for existing clients.  SQLite still
+  has to step over the skipped index entries.
+
+Totals come from ``hub_counts``, one row per (region, status), maintained by
+triggers in the same transaction as every insert, delete or status change.
+No listing ever counts rows.
+
+sqlite3 is blocking, so the async API runs every call in a worker thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import binascii
+import json
+import sqlite3
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
+
+from app.core.config import settings
+from app.schemas.fleet import EdgeHub, HubStatus
+from app.services.event_store import to_timestamp
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hubs (
+    hub_id           BLOB PRIMARY KEY,
+    region           TEXT NOT NULL,
+    name             TEXT NOT NULL,
+    status           TEXT NOT NULL,
+    ip_address       TEXT NOT NULL,
+    firmware_version TEXT NOT NULL,
+    last_seen_at     REAL,           -- epoch seconds, UTC
+    registered_at    REAL NOT NULL,  -- epoch seconds, UTC
+    tags             TEXT NOT NULL   -- JSON object
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS hubs_status_registered
+    ON hubs (status, registered_at DESC, hub_id DESC);
+CREATE INDEX IF NOT EXISTS hubs_registered ON hubs (registered_at DESC, hub_id DESC);
+CREATE INDEX IF NOT EXISTS hubs_region ON hubs (region, registered_at DESC, hub_id DESC);
+
+CREATE TABLE IF NOT EXISTS hub_counts (
+    region TEXT NOT NULL,
+    status TEXT NOT NULL,
+    hubs   INTEGER NOT NULL,
+    PRIMARY KEY (region, status)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS hubs_count_insert AFTER INSERT ON hubs BEGIN
+    INSERT INTO hub_counts VALUES (NEW.region, NEW.status, 1)
+        ON CONFLICT (region, status) DO UPDATE SET hubs = hubs + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS hubs_count_delete AFTER DELETE ON hubs BEGIN
+    UPDATE hub_counts SET hubs = hubs - 1 WHERE region = OLD.region AND status = OLD.status;
+END;
+CREATE TRIGGER IF NOT EXISTS hubs_count_update AFTER UPDATE OF region, status ON hubs
+WHEN OLD.region IS NOT NEW.region OR OLD.status IS NOT NEW.status BEGIN
+    UPDATE hub_counts SET hubs = hubs - 1 WHERE region = OLD.region AND status = OLD.status;
+    INSERT INTO hub_counts VALUES (NEW.region, NEW.status, 1)
+        ON CONFLICT (region, status) DO UPDATE SET hubs = hubs + 1;
+END;
+"""
+_COLUMNS = (
+    "hub_id, region, name, status, ip_address, firmware_version,"
+    " last_seen_at, registered_at, tags"
+)
+# Re-registration refreshes everything but the original registration time.
+_UPSERT = f"""
+INSERT INTO hubs ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (hub_id) DO UPDATE SET
+    region = excluded.region,
+    name = excluded.name,
+    status = excluded.status,
+    ip_address = excluded.ip_address,
+    firmware_version = excluded.firmware_version,
+    last_seen_at = excluded.last_seen_at,
+    tags = excluded.tags
+"""
+_LOOKUP_CHUNK = 500
+_TOTAL = "SELECT COALESCE(SUM(hubs), 0) FROM hub_counts"
+
+
+class InvalidCursor(ValueError):
+    """The cursor token is malformed or was issued for different filters."""
+
+
+@dataclass(slots=True)
+class HubPage:
+    hubs: list[EdgeHub]
+    total: int
+    next_cursor: str | None  # None on the last page
+
+
+def _row(hub: EdgeHub) -> tuple:
+    return (
+        hub.hub_id.bytes,
+        hub.region,
+        hub.name,
+        hub.status.value,
+        hub.ip_address,
+        hub.firmware_version,
+        to_timestamp(hub.last_seen_at) if hub.last_seen_at else None,
+        to_timestamp(hub.registered_at),
+        json.dumps(hub.tags, separators=(",", ":")),
+    )
+
+
+def _hub(row: tuple) -> EdgeHub:
+    hub_id, region, name, status, ip, firmware, last_seen_at, registered_at, tags = row
+    # Validated on registration; construct without re-validating.
+    return EdgeHub.model_construct(
+        hub_id=UUID(bytes=hub_id),
+        region=region,
+        name=name,
+        status=HubStatus(status),
+        ip_address=ip,
+        firmware_version=firmware,
+        last_seen_at=(
+            datetime.utcfromtimestamp(last_seen_at) if last_seen_at is not None else None
+        ),
+        registered_at=datetime.utcfromtimestamp(registered_at),
+        tags=json.loads(tags),
+    )
+
+
+def encode_cursor(
+    registered_at: float, hub_id: bytes, status: HubStatus | None, region: str | None
+) -> str:
+    token = json.dumps(
+        [registered_at, hub_id.hex(), status.value if status else None, region],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(token.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, status: HubStatus | None, region: str | None) -> tuple[float, bytes]:
+    """Sort key after which the next page starts."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        registered_at, hub_hex, cursor_status, cursor_region = json.loads(raw)
+        key = float(registered_at), bytes.fromhex(hub_hex)
+    except (ValueError, TypeError, binascii.Error) as exc:
+        raise InvalidCursor("Malformed cursor") from exc
+    if cursor_status != (status.value if status else None) or cursor_region != region:
+        raise InvalidCursor("Cursor was issued for different status/region filters")
+    return key
+
+
+class HubRegistry:
+    """Registered Edge Hubs of this SuperHub, with maintained per-status counts."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.RLock()
+
+    def open(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                return
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.open()
+        assert self._conn is not None
+        return self._conn
+
+    # -- blocking API (called from worker threads and benchmarks) -----------
+
+    def register_sync(self, hubs: Iterable[EdgeHub]) -> int:
+        """Insert or refresh hubs in one transaction; returns how many were new."""
+        rows = [_row(hub) for hub in hubs]
+        with self._lock:
+            conn = self._db()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                (before,) = conn.execute(_TOTAL).fetchone()
+                conn.executemany(_UPSERT, rows)
+                (after,) = conn.execute(_TOTAL).fetchone()
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return after - before
+
+    def get_sync(self, hub_id: UUID) -> EdgeHub | None:
+        with self._lock:
+            row = (
+                self._db()
+                .execute(f"SELECT {_COLUMNS} FROM hubs WHERE hub_id = ?", (hub_id.bytes,))
+                .fetchone()
+            )
+        return _hub(row) if row else None
+
+    def labels_sync(
+        self,
+        hub_ids: Iterable[bytes],
+        region: str | None = None,
+        tags: dict[str, str] | None = None,
+    ) -> dict[bytes, tuple[str, str, str]]:
+        """``(name, region, status)`` of the registered hubs among ``hub_ids``.
+
+        ``hub_ids`` are 16-byte ids.  Only hubs in ``region`` (if given) and
+        carrying every ``tags`` key with that value are returned.
+        """
+        ids = list(hub_ids)
+        columns = "hub_id, name, region, status" + (", tags" if tags else "")
+        found: dict[bytes, tuple[str, str, str]] = {}
+        with self._lock:
+            conn = self._db()
+            for start in range(0, len(ids), _LOOKUP_CHUNK):
+                chunk = ids[start : start + _LOOKUP_CHUNK]
+                # Region is checked here: a region clause would steer SQLite onto
+                # the region index, scanning the whole region instead of seeking ids.
+                where = f" WHERE hub_id IN ({','.join('?' * len(chunk))})"
+                for row in conn.execute(f"SELECT {columns} FROM hubs{where}", chunk):
+                    if region is not None and row[2] != region:
+                        continue
+                    if tags:
+                        labels = json.loads(row[4])
+                        if any(labels.get(key) != value for key, value in tags.items()):
+                            continue
+                    found[row[0]] = row[1:4]
+        return found
+
+    def matching_sync(
+        self, region: str | None = None, tags: dict[str, str] | None = None
+    ) -> set[bytes]:
+        """Ids of the hubs in ``region`` (if given) carrying every ``tags`` key with that value.
+
+        Filtered in SQL, over the region index when ``region`` is given, so the
+        caller can intersect with its own ids instead of looking each one up.
+        """
+        clauses, params = _filters(None, region)
+        for key, value in (tags or {}).items():
+            clauses.append("EXISTS (SELECT 1 FROM json_each(tags) WHERE key = ? AND value = ?)")
+            params += [key, value]
+        with self._lock:
+            rows = self._db().execute(f"SELECT hub_id FROM hubs{_where(clauses)}", params)
+            return {hub_id for (hub_id,) in rows}
+
+    def count_sync(self, status: HubStatus | None = None, region: str | None = None) -> int:
+        clauses, params = _filters(status, region)
+        with self._lock:
+            (total,) = (
+                self._db()
+                .execute(f"SELECT COALESCE(SUM(hubs), 0) FROM hub_counts{_where(clauses)}", params)
+                .fetchone()
+            )
+        return total
+
+    def page_sync(
+        self,
+        *,
+        limit: int,
+        status: HubStatus | None = None,
+        region: str | None = None,
+        cursor: str | None = None,
+        offset: int = 0,
+    ) -> HubPage:
+        """One page, newest registration first: after ``cursor`` if given, else at ``offset``."""
+        clauses, params = _filters(status, region)
+        if cursor is not None:
+            clauses.append("(registered_at, hub_id) < (?, ?)")
+            params += decode_cursor(cursor, status, region)
+            offset = 0
+        sql = (
+            f"SELECT {_COLUMNS} FROM hubs{_where(clauses)}"
+            " ORDER BY registered_at DESC, hub_id DESC LIMIT ? OFFSET ?"
+        )
+        with self._lock:
+            rows = self._db().execute(sql, (*params, limit + 1, offset)).fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(last[7], last[0], status, region)
+        return HubPage([_hub(row) for row in rows], self.count_sync(status, region), next_cursor)
+
+    # -- async API ----------------------------------------------------------
+
+    async def register(self, hubs: Iterable[EdgeHub]) -> int:
+        return await asyncio.to_thread(self.register_sync, list(hubs))
+
+    async def get(self, hub_id: UUID) -> EdgeHub | None:
+        return await asyncio.to_thread(self.get_sync, hub_id)
+
+    async def labels(
+        self,
+        hub_ids: Iterable[bytes],
+        region: str | None = None,
+        tags: dict[str, str] | None = None,
+    ) -> dict[bytes, tuple[str, str, str]]:
+        return await asyncio.to_thread(self.labels_sync, list(hub_ids), region, tags)
+
+    async def matching(
+        self, region: str | None = None, tags: dict[str, str] | None = None
+    ) -> set[bytes]:
+        return await asyncio.to_thread(self.matching_sync, region, tags)
+
+    async def page(self, **kwargs) -> HubPage:
+        return await asyncio.to_thread(lambda: self.page_sync(**kwargs))
+
+
+def _filters(status: HubStatus | None, region: str | None) -> tuple[list[str], list]:
+    clauses: list[str] = []
+    params: list = []
+    if status is not None:
+        clauses.append("status = ?")
+        params.append(status.value)
+    if region is not None:
+        clauses.append("region = ?")
+        params.append(region)
+    return clauses, params
+
+
+def _where(clauses: list[str]) -> str:
+    return " WHERE " + " AND ".join(clauses) if clauses else ""
+
+
+hub_registry = HubRegistry(settings.fleet_db_path)
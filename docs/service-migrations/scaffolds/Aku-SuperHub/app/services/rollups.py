@@ -0,0 +1,375 @@
+"""Hourly analytics rollups, maintained at ingest time.
+
+Every event the store inserts also updates the rollup bucket of its UTC hour:
+
+* a count per ``EventType``;
+* the sum and count of ``SESSION_END`` durations;
+* the hubs that reported, as a bitmap over dense hub ordinals;
+* the learners seen, as a HyperLogLog sketch (2^12 one-byte registers,
+  ~1.6 % standard error, exact-ish below a few thousand learners).
+
+Buckets are updated in memory in the store's write transaction and written
+to ``event_rollups`` every ``ANALYTICS_ROLLUP_FLUSH_SECONDS`` (rewriting a
+4 KB sketch per touched hour on every batch would dominate ingest).  Each
+stored bucket records how many of its partition's events it covers, so after
+a crash the hours that lag are recomputed from their partitions on open, and
+the first open of an existing database builds them all.  A regional summary
+merges buckets rather than scanning events, so its cost depends on the
+window length and the number of hubs, not on how many events are stored.
+
+Merging is done on whole bitmaps as Python integers: hub bitmaps are OR-ed,
+and sketch registers are max-ed lane by lane with one subtraction and a few
+masks over a 4 KB integer (:func:`merge_registers`).  Whole UTC days inside a
+window are served from a cached merge of their 24 hours, so a 720-hour window
+merges at most 30 day buckets and 2 × 23 hour buckets.  A day's cache is
+dropped whenever one of its hours is written.
+
+Buckets for the last ``_RETAINED_DAYS`` days are kept in memory (~10 KB each
+with 50k hubs).  Older hours stay on disk; a late event for one of them
+reads, updates and writes back that single row.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import sqlite3
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from hashlib import blake2b
+from typing import TYPE_CHECKING
+
+from app.schemas.analytics import EventType
+
+if TYPE_CHECKING:
+    from app.services.event_store import EventColumns
+
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS event_rollups (
+    hour           INTEGER PRIMARY KEY,  -- hours since the Unix epoch, UTC
+    events         INTEGER NOT NULL,     -- partition events folded in; see RollupIndex.load
+    counts         TEXT NOT NULL,        -- JSON list indexed by event type code
+    duration_sum   REAL NOT NULL,
+    duration_count INTEGER NOT NULL,
+    hubs           BLOB NOT NULL,        -- little-endian bitmap over hub ordinals
+    learners       BLOB NOT NULL         -- HyperLogLog registers
+);
+CREATE TABLE IF NOT EXISTS hub_ordinals (
+    hub_id  BLOB PRIMARY KEY,
+    ordinal INTEGER NOT NULL UNIQUE
+) WITHOUT ROWID;
+"""
+
+HLL_PRECISION = 12
+HLL_REGISTERS = 1 << HLL_PRECISION
+_HLL_ALPHA = 0.7213 / (1 + 1.079 / HLL_REGISTERS)
+_HLL_INDEX_MASK = HLL_REGISTERS - 1
+_HLL_RANK_BITS = 64 - HLL_PRECISION
+_LANE_HIGH = int.from_bytes(b"\x80" * HLL_REGISTERS, "little")
+_LANES_FULL = (1 << 8 * HLL_REGISTERS) - 1
+_INV_POW2 = [2.0**-rank for rank in range(_HLL_RANK_BITS + 2)]
+
+_RETAINED_DAYS = 32  # covers any 720-hour window ending now, plus clock skew
+
+# Same codes as the event store: position in EventType.
+_TYPE_CODES: dict[EventType, int] = {t: code for code, t in enumerate(EventType)}
+_SESSION_END = _TYPE_CODES[EventType.SESSION_END]
+
+
+def learner_rank(key: bytes) -> tuple[int, int]:
+    """HyperLogLog register index and rank for ``key``.
+
+    Sketches are persisted, so this hashes with BLAKE2b rather than the
+    per-process builtin ``hash``.
+    """
+    h = int.from_bytes(blake2b(key, digest_size=8).digest(), "little")
+    return h & _HLL_INDEX_MASK, _HLL_RANK_BITS + 1 - (h >> HLL_PRECISION).bit_length()
+
+
+def merge_registers(a: int, b: int) -> int:
+    """Lane-wise max of two register arrays packed as little-endian integers.
+
+    Registers never exceed 53, so setting each lane's high bit before
+    subtracting cannot borrow across lanes, and the high bit of each
+    difference says which side is larger.
+    """
+    ge = ((a | _LANE_HIGH) - b) & _LANE_HIGH
+    take_a = (ge >> 7) * 0xFF
+    return (a & take_a) | (b & ~take_a & _LANES_FULL)
+
+
+def estimate_cardinality(registers: bytes) -> int:
+    """HyperLogLog estimate, with linear counting for small cardinalities."""
+    zeros = registers.count(0)
+    estimate = _HLL_ALPHA * HLL_REGISTERS**2 / sum(map(_INV_POW2.__getitem__, registers))
+    if estimate <= 2.5 * HLL_REGISTERS and zeros:
+        estimate = HLL_REGISTERS * math.log(HLL_REGISTERS / zeros)
+    return round(estimate)
+
+
+@dataclass(slots=True)
+class HourRollup:
+    """One hour's rollup, in the mutable form updated at ingest."""
+
+    events: int = 0
+    counts: list[int] = field(default_factory=lambda: [0] * len(EventType))
+    duration_sum: float = 0.0
+    duration_count: int = 0
+    hubs: bytearray = field(default_factory=bytearray)
+    learners: bytearray = field(default_factory=lambda: bytearray(HLL_REGISTERS))
+
+    def row(self, hour: int) -> tuple:
+        return (
+            hour,
+            self.events,
+            json.dumps(self.counts),
+            self.duration_sum,
+            self.duration_count,
+            bytes(self.hubs),
+            bytes(self.learners),
+        )
+
+    @classmethod
+    def from_row(cls, row: tuple) -> HourRollup:
+        _, events, counts, duration_sum, duration_count, hubs, learners = row
+        counts = json.loads(counts)
+        counts += [0] * (len(EventType) - len(counts))  # event types added since
+        return cls(
+            events, counts, duration_sum, duration_count, bytearray(hubs), bytearray(learners)
+        )
+
+    def totals(self) -> RollupTotals:
+        return RollupTotals(
+            list(self.counts),
+            self.duration_sum,
+            self.duration_count,
+            int.from_bytes(self.hubs, "little"),
+            int.from_bytes(self.learners, "little"),
+        )
+
+
+@dataclass(slots=True)
+class RollupTotals:
+    """Merged rollups of any number of hours, in the form cheapest to merge."""
+
+    counts: list[int] = field(default_factory=lambda: [0] * len(EventType))
+    duration_sum: float = 0.0
+    duration_count: int = 0
+    hubs: int = 0
+    learners: int = 0
+
+    def merge(self, other: RollupTotals) -> None:
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.duration_sum += other.duration_sum
+        self.duration_count += other.duration_count
+        self.hubs |= other.hubs
+        self.learners = merge_registers(self.learners, other.learners)
+
+    def count(self, event_type: EventType) -> int:
+        return self.counts[_TYPE_CODES[event_type]]
+
+    @property
+    def active_hubs(self) -> int:
+        return self.hubs.bit_count()
+
+    @property
+    def distinct_learners(self) -> int:
+        return estimate_cardinality(self.learners.to_bytes(HLL_REGISTERS, "little"))
+
+    @property
+    def average_session_duration(self) -> float | None:
+        return self.duration_sum / self.duration_count if self.duration_count else None
+
+
+class RollupIndex:
+    """Hour buckets of the recent past plus per-day merge caches.
+
+    Not thread-safe on its own; :class:`~app.services.event_store.EventStore`
+    calls it under its lock, inside its write transactions.
+    """
+
+    def __init__(
+        self, *, flush_seconds: float = 5.0, clock: Callable[[], float] = time.time
+    ) -> None:
+        self.flush_seconds = flush_seconds
+        self._clock = clock
+        self._hours: dict[int, HourRollup] = {}
+        self._days: dict[int, RollupTotals] = {}
+        self._dirty: dict[int, HourRollup] = {}
+        self._ordinals: dict[bytes, int] = {}
+        self._new_ordinals: list[tuple[bytes, int]] = []
+        self._floor = 0  # first hour kept in memory
+        self._flushed_at = 0.0
+
+    def _retained_floor(self) -> int:
+        return (int(self._clock() // 86400) - _RETAINED_DAYS) * 24
+
+    # -- persistence --------------------------------------------------------
+
+    def load(self, conn: sqlite3.Connection) -> None:
+        """(Re)read the retained hours, rebuilding any that lag their partition.
+
+        An hour lags when events were committed after its bucket was last
+        flushed (a crash, or a rolled-back flush); its bucket is recomputed
+        from the partition table, and written back in one transaction.
+        """
+        self._floor = self._retained_floor()
+        self._ordinals = dict(conn.execute("SELECT hub_id, ordinal FROM hub_ordinals"))
+        self._new_ordinals = []
+        self._hours = {
+            row[0]: HourRollup.from_row(row)
+            for row in conn.execute("SELECT * FROM event_rollups WHERE hour >= ?", (self._floor,))
+        }
+        self._days.clear()
+        self._dirty.clear()
+        lagging = conn.execute(
+            "SELECT p.hour, p.table_name FROM event_partitions p"
+            " LEFT JOIN event_rollups r ON r.hour = p.hour WHERE r.events IS NOT p.events"
+        ).fetchall()
+        for hour, table in lagging:
+            bucket = HourRollup()
+            rows = conn.execute(
+                f"SELECT event_type, hub_id, learner_id, duration_seconds FROM {table}"
+            )
+            while chunk := rows.fetchmany(10_000):
+                event_type, hub_id, learner_id, duration = map(list, zip(*chunk))
+                self._fold(bucket, event_type, hub_id, learner_id, duration, range(len(chunk)))
+            if hour >= self._floor:
+                self._hours[hour] = bucket
+            self._dirty[hour] = bucket
+        if self._dirty:
+            conn.execute("BEGIN IMMEDIATE")
+            self.flush(conn)
+            conn.execute("COMMIT")
+        self._flushed_at = self._clock()
+
+    def flush(self, conn: sqlite3.Connection) -> None:
+        """Write dirty buckets and new hub ordinals; the caller owns the transaction."""
+        if self._new_ordinals:
+            conn.executemany("INSERT INTO hub_ordinals VALUES (?, ?)", self._new_ordinals)
+            self._new_ordinals = []
+        if self._dirty:
+            conn.executemany(
+                "INSERT OR REPLACE INTO event_rollups VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [bucket.row(hour) for hour, bucket in self._dirty.items()],
+            )
+            self._dirty.clear()
+        self._flushed_at = self._clock()
+
+    def _stored(self, conn: sqlite3.Connection, hour: int) -> HourRollup | None:
+        row = conn.execute("SELECT * FROM event_rollups WHERE hour = ?", (hour,)).fetchone()
+        return HourRollup.from_row(row) if row else None
+
+    # -- ingest -------------------------------------------------------------
+
+    def _evict(self) -> None:
+        floor = self._retained_floor()
+        if floor <= self._floor:
+            return
+        self._floor = floor
+        for hour in [hour for hour in self._hours if hour < floor]:
+            del self._hours[hour]  # still in _dirty until flushed, if written recently
+        for day in [day for day in self._days if day * 24 < floor]:
+            del self._days[day]
+
+    def _bucket(self, conn: sqlite3.Connection, hour: int) -> HourRollup:
+        bucket = self._hours.get(hour) or self._dirty.get(hour)
+        if bucket is None:
+            if hour < self._floor:  # late event for an hour no longer in memory
+                bucket = self._stored(conn, hour) or HourRollup()
+            else:
+                bucket = self._hours[hour] = HourRollup()
+        return bucket
+
+    def _fold(
+        self,
+        bucket: HourRollup,
+        event_type: list[int],
+        hub_id: list[bytes],
+        learner_id: list[bytes],
+        duration: list[float | None],
+        indexes: Iterable[int],
+    ) -> None:
+        ordinals = self._ordinals
+        counts, hubs, learners = bucket.counts, bucket.hubs, bucket.learners
+        events = 0
+        for i in indexes:
+            events += 1
+            code = event_type[i]
+            counts[code] += 1
+            if code == _SESSION_END and duration[i] is not None:
+                bucket.duration_sum += duration[i]
+                bucket.duration_count += 1
+            ordinal = ordinals.get(hub_id[i])
+            if ordinal is None:
+                ordinal = ordinals[hub_id[i]] = len(ordinals)
+                self._new_ordinals.append((hub_id[i], ordinal))
+            byte = ordinal >> 3
+            if byte >= len(hubs):
+                hubs.extend(bytes(byte + 1 - len(hubs)))
+            hubs[byte] |= 1 << (ordinal & 7)
+            index, rank = learner_rank(learner_id[i])
+            if rank > learners[index]:
+                learners[index] = rank
+        bucket.events += events
+
+    def apply(
+        self, conn: sqlite3.Connection, columns: EventColumns, indexes: Iterable[int]
+    ) -> None:
+        """Fold the events at ``indexes`` of ``columns`` into their hour buckets.
+
+        Called inside the store's write transaction; dirty buckets are written
+        through ``conn`` once ``flush_seconds`` have passed since the last flush.
+        The caller calls :meth:`load` if the transaction rolls back.
+        """
+        self._evict()
+        occurred_at = columns.occurred_at
+        by_hour: dict[int, list[int]] = {}
+        for i in indexes:
+            hour = int(occurred_at[i] // 3600)
+            if hour in by_hour:
+                by_hour[hour].append(i)
+            else:
+                by_hour[hour] = [i]
+        for hour, hour_indexes in by_hour.items():
+            bucket = self._bucket(conn, hour)
+            self._fold(
+                bucket,
+                columns.event_type,
+                columns.hub_id,
+                columns.learner_id,
+                columns.duration_seconds,
+                hour_indexes,
+            )
+            self._dirty[hour] = bucket
+            self._days.pop(hour // 24, None)
+        if self._clock() - self._flushed_at >= self.flush_seconds:
+            self.flush(conn)
+
+    # -- queries ------------------------------------------------------------
+
+    def totals(self, conn: sqlite3.Connection, first_hour: int, last_hour: int) -> RollupTotals:
+        """Merged rollups of the hours ``first_hour`` … ``last_hour`` inclusive."""
+        self._evict()
+        totals = RollupTotals()
+        hour = first_hour
+        while hour <= last_hour:
+            day = hour // 24
+            if hour % 24 == 0 and hour + 23 <= last_hour and hour >= self._floor:
+                cached = self._days.get(day)
+                if cached is None:
+                    cached = self._days[day] = RollupTotals()
+                    for h in range(hour, hour + 24):
+                        if h in self._hours:
+                            cached.merge(self._hours[h].totals())
+                totals.merge(cached)
+                hour += 24
+                continue
+            bucket = self._hours.get(hour) if hour >= self._floor else None
+            if bucket is None and hour < self._floor:
+                bucket = self._dirty.get(hour) or self._stored(conn, hour)
+            if bucket is not None:
+                totals.merge(bucket.totals())
+            hour += 1
+        return totals
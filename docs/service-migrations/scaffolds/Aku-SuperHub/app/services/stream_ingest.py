@@ -0,0 +1,239 @@
+"""Streaming NDJSON analytics ingest: a hub's whole backlog in one request.
+
+A hub back from a week offline used to drain its spool as hundreds of
+sequential 1,000-event ``/aggregate`` requests, paying a round trip for each.
+:func:`ingest_ndjson` reads one NDJSON body (one ``AnalyticsEvent`` per line)
+as it arrives and writes it in chunks:
+
+* complete lines are parsed a block at a time, then validated
+  ``chunk_events`` at a time through the ``/aggregate`` fast path
+  (:func:`~app.services.batch_decoder.decode_batch`).  If a chunk is off that
+  path, each event is validated with the ``AnalyticsEvent`` model instead;
+* each chunk is one ``EventStore.append``, one transaction;
+* chunks pass through a queue of ``max_pending_chunks`` to a single writer
+  task.  When the store falls behind, the queue fills and the reader stops
+  pulling the body.  The server then stops reading the socket, and TCP flow
+  control slows the hub down to the store's pace.
+
+Memory is bounded by the queue, not by the body: at most
+``max_pending_chunks + 2`` chunks of events, plus one partial line of at most
+``max_line_bytes``.
+
+An invalid line is counted in ``errors`` and skipped, whether it is bad
+UTF-8, bad JSON, an invalid event or an overlong line.  The first
+``_ERROR_SAMPLES`` are reported with their line numbers.  Events the store
+rejects for an ``occurred_at`` outside its window count as errors too; they
+are listed in ``rejected_event_ids`` instead of the samples.  Chunks commit
+independently.  If the stream breaks off, what was committed stays, and
+resending the whole body is safe because ingest is idempotent on
+``event_id``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import json
+from collections.abc import AsyncIterable
+from dataclasses import dataclass, field
+from typing import Any
+from uuid import UUID
+
+from pydantic import ValidationError
+
+from app.schemas.analytics import (
+    MAX_BATCH_EVENTS,
+    AnalyticsEvent,
+    StreamIngestResult,
+    StreamLineError,
+)
+from app.services.batch_decoder import decode_batch
+from app.services.event_store import EventColumns, EventStore
+
+_ERROR_SAMPLES = 20
+
+
+@dataclass(slots=True)
+class _Tally:
+    received: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    errors: int = 0
+    chunks: int = 0
+    rejected: list[UUID] = field(default_factory=list)
+    # The lowest-numbered invalid lines, as a max-heap on line number: parse
+    # errors are found as lines arrive, validation errors a chunk later.
+    samples: list[tuple[int, str]] = field(default_factory=list)
+
+    def error(self, line: int, message: str) -> None:
+        self.errors += 1
+        if len(self.samples) < _ERROR_SAMPLES:
+            heapq.heappush(self.samples, (-line, message))
+        elif line < -self.samples[0][0]:
+            heapq.heapreplace(self.samples, (-line, message))
+
+    def error_samples(self) -> list[StreamLineError]:
+        ordered = sorted(self.samples, reverse=True)
+        return [StreamLineError(line=-line, error=error) for line, error in ordered]
+
+
+def _describe(exc: ValidationError) -> str:
+    first = exc.errors(include_url=False)[0]
+    where = ".".join(map(str, first["loc"])) or "event"
+    more = exc.error_count() - 1
+    return f"{where}: {first['msg']}" + (f" (+{more} more)" if more else "")
+
+
+class _Parser:
+    """Splits body bytes into lines and parses them, keeping line numbers."""
+
+    def __init__(self, tally: _Tally, max_line_bytes: int) -> None:
+        self.tally = tally
+        self.max_line_bytes = max_line_bytes
+        self.events: list[Any] = []  # parsed, not yet validated
+        self.lines: list[int] = []  # line number of each parsed event
+        self._partial = b""
+        self._skipping = False  # inside an overlong line, until its newline
+        self._line = 0  # lines consumed so far
+
+    def feed(self, data: bytes) -> None:
+        if self._skipping:
+            newline = data.find(b"\n")
+            if newline == -1:
+                return
+            data, self._skipping = data[newline + 1 :], False
+        data = self._partial + data
+        cut = data.rfind(b"\n")
+        if cut == -1:
+            self._partial = data
+        else:
+            self._parse(data[:cut])
+            self._partial = data[cut + 1 :]
+        if len(self._partial) > self.max_line_bytes:
+            self._line += 1
+            self.tally.received += 1
+            self.tally.error(self._line, f"Line longer than {self.max_line_bytes} bytes")
+            self._partial, self._skipping = b"", True
+
+    def close(self) -> None:
+        """Parse a final line that has no trailing newline."""
+        if self._partial and not self._skipping:
+            self._parse(self._partial)
+        self._partial = b""
+
+    def _parse(self, block: bytes) -> None:
+        first = self._line + 1
+        lines = block.split(b"\n")
+        self._line += len(lines)
+        # Common case: every line is a JSON value; one C-level pass per block.
+        if b"" not in lines and max(map(len, lines)) <= self.max_line_bytes:
+            try:
+                parsed = list(map(json.loads, block.decode().split("\n")))
+            except ValueError:  # bad UTF-8 or JSON somewhere: go line by line
+                pass
+            else:
+                self.tally.received += len(parsed)
+                self.events += parsed
+                self.lines += range(first, first + len(parsed))
+                return
+        for number, line in enumerate(lines, first):
+            if not line.strip():
+                continue
+            self.tally.received += 1
+            if len(line) > self.max_line_bytes:
+                self.tally.error(number, f"Line longer than {self.max_line_bytes} bytes")
+                continue
+            try:
+                self.events.append(json.loads(line.decode()))
+            except UnicodeDecodeError:
+                self.tally.error(number, "Invalid UTF-8")
+                continue
+            except json.JSONDecodeError as exc:
+                self.tally.error(number, f"Invalid JSON: {exc.msg}")
+                continue
+            self.lines.append(number)
+
+    def take(self, count: int) -> tuple[list[Any], list[int]]:
+        events, lines = self.events[:count], self.lines[:count]
+        del self.events[:count], self.lines[:count]
+        return events, lines
+
+
+def _columns(events: list[Any], lines: list[int], tally: _Tally) -> EventColumns:
+    columns = decode_batch({"events": events})
+    if columns is not None:
+        return columns
+    valid = []
+    for event, line in zip(events, lines):
+        try:
+            valid.append(AnalyticsEvent.model_validate(event))
+        except ValidationError as exc:
+            tally.error(line, _describe(exc))
+    return EventColumns.from_events(valid)
+
+
+async def _write(
+    queue: asyncio.Queue[EventColumns | None], store: EventStore, tally: _Tally
+) -> None:
+    while (columns := await queue.get()) is not None:
+        result = await store.append(columns)
+        tally.inserted += result.inserted
+        tally.duplicates += result.duplicates
+        tally.errors += len(result.rejected)
+        tally.rejected += [UUID(bytes=columns.event_id[i]) for i in result.rejected]
+        tally.chunks += 1
+
+
+async def _put(
+    queue: asyncio.Queue[EventColumns | None],
+    writer: asyncio.Task[None],
+    item: EventColumns | None,
+) -> None:
+    """``queue.put`` that stops waiting, and raises, if the writer has failed."""
+    put = asyncio.ensure_future(queue.put(item))
+    await asyncio.wait((put, writer), return_when=asyncio.FIRST_COMPLETED)
+    if not put.done():
+        put.cancel()
+        writer.result()  # the writer only ends before the sentinel by raising
+
+
+async def ingest_ndjson(
+    body: AsyncIterable[bytes],
+    store: EventStore,
+    *,
+    chunk_events: int = MAX_BATCH_EVENTS,
+    max_pending_chunks: int = 2,
+    max_line_bytes: int = 65_536,
+) -> StreamIngestResult:
+    """Validate and store every event of an NDJSON body, ``chunk_events`` per commit."""
+    if not 1 <= chunk_events <= MAX_BATCH_EVENTS:
+        raise ValueError(f"chunk_events must be between 1 and {MAX_BATCH_EVENTS}")
+    tally = _Tally()
+    parser = _Parser(tally, max_line_bytes)
+    queue: asyncio.Queue[EventColumns | None] = asyncio.Queue(max_pending_chunks)
+    writer = asyncio.create_task(_write(queue, store, tally))
+    try:
+        async for data in body:
+            parser.feed(data)
+            while len(parser.events) >= chunk_events:
+                columns = _columns(*parser.take(chunk_events), tally)
+                if columns:
+                    await _put(queue, writer, columns)
+        parser.close()
+        while parser.events:
+            columns = _columns(*parser.take(chunk_events), tally)
+            if columns:
+                await _put(queue, writer, columns)
+        await _put(queue, writer, None)
+        await writer
+    finally:
+        writer.cancel()  # no-op once finished; otherwise stop after the current commit
+    return StreamIngestResult(
+        received=tally.received,
+        inserted=tally.inserted,
+        duplicates=tally.duplicates,
+        errors=tally.errors,
+        rejected_event_ids=tally.rejected,
+        chunks=tally.chunks,
+        error_samples=tally.error_samples(),
+    )
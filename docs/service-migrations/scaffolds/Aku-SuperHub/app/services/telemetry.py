@@ -0,0 +1,283 @@
+"""Recent health telemetry per Edge Hub, in fixed-size ring buffers.
+
+Every hub that pushes metrics gets a slot in a set of shared typed arrays (a
+slab): ``capacity`` samples of the four windowed metrics as float32, each
+with its receive time as a float64, plus the hub's ring head, sample count
+and latest uptime.  Pushing a sample overwrites the oldest one in place, so
+no Python object is kept per sample, and nothing is kept per hub beyond one
+dict entry mapping its id to its slot.
+
+Memory per hub is ``24 × TELEMETRY_WINDOW_SAMPLES + 31`` bytes in the slab,
+plus ~120 bytes for the id→slot entry: ~1.6 KB at the default 60 samples,
+or ~80 MB for 50,000 hubs.  The slab grows by doubling as hubs are added, so
+up to half of it can be unused headroom.
+
+Windowed metrics are ``cpu_percent``, ``memory_percent``, ``disk_percent``
+and ``active_learners``; float32 is exact for learner counts below 2^24.
+``uptime_seconds`` is kept for the latest sample only: a hub whose uptime
+is shorter than the window restarted inside it.
+
+The latest value of each thresholded metric is also kept in columns of its
+own for fleet-wide threshold sweeps (:meth:`TelemetryStore.breaches`): a
+float32 per slot, and a byte per slot holding the value in half-percent steps.
+A sweep maps the byte column through a 256-entry table with
+``bytes.translate`` (one C-level pass over all hubs) and then checks only the
+slots it flags against the exact float32.  These columns add 15 bytes per hub.
+A flagged hub whose latest sample is older than ``max_sample_age_seconds``
+has gone quiet; its last reading is no longer news, so it drops out of the sweep.
+
+State is in-process and rebuilt by the hubs' next pushes after a restart.
+All operations are short, pure-Python and run on the event loop.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from array import array
+from collections.abc import Callable
+from uuid import UUID
+
+from app.core.config import settings
+from app.schemas.fleet import HubHealthMetrics, MetricStats, RollingHealthMetrics
+
+WINDOW_FIELDS = ("cpu_percent", "memory_percent", "disk_percent", "active_learners")
+ALERT_THRESHOLDS = {"cpu_percent": 90.0, "memory_percent": 85.0, "disk_percent": 80.0}
+_ALERT_LABELS = {"cpu_percent": "CPU", "memory_percent": "memory", "disk_percent": "disk"}
+_TRENDED = ("memory_percent", "disk_percent")  # resources that fill up
+_F = len(WINDOW_FIELDS)
+_STEPS_PER_PERCENT = 2  # resolution of the coarse sweep columns (≤ 200 fits a byte)
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def _slope_per_hour(times: list[float], values: list[float]) -> float:
+    """Least-squares slope of ``values`` over ``times`` (per hour)."""
+    n = len(times)
+    t_mean = sum(times) / n
+    v_mean = sum(values) / n
+    var = sum((t - t_mean) ** 2 for t in times)
+    if var == 0:
+        return 0.0
+    cov = sum((t - t_mean) * (v - v_mean) for t, v in zip(times, values))
+    return cov / var * 3600
+
+
+class TelemetryStore:
+    """Per-hub ring buffers of recent ``HubHealthMetrics`` samples."""
+
+    def __init__(
+        self,
+        *,
+        capacity: int = 60,
+        trend_horizon_hours: float = 6.0,
+        trend_min_samples: int = 5,
+        max_sample_age_seconds: float | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.trend_horizon_hours = trend_horizon_hours
+        self.trend_min_samples = trend_min_samples
+        self.max_sample_age_seconds = max_sample_age_seconds
+        self._clock = clock
+        self._slots: dict[bytes, int] = {}
+        self._hub_ids: list[bytes] = []  # slot → hub id
+        self._allocated = 0
+        self._values = array("f")  # slot × capacity × field
+        self._times = array("d")  # slot × capacity
+        self._head = array("I")  # next position to write, per slot
+        self._count = array("I")  # samples held, per slot
+        self._uptime = array("d")  # latest uptime_seconds, per slot
+        # Latest value of each thresholded metric, per slot (columnar, for sweeps).
+        self._latest = {name: array("f") for name in ALERT_THRESHOLDS}
+        self._coarse = {name: bytearray() for name in ALERT_THRESHOLDS}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the slab (excluding the id→slot dict)."""
+        arrays = (
+            self._values,
+            self._times,
+            self._head,
+            self._count,
+            self._uptime,
+            *self._latest.values(),
+        )
+        coarse = sum(len(column) for column in self._coarse.values())
+        return sum(len(a) * a.itemsize for a in arrays) + coarse
+
+    def _slot(self, hub_id: UUID) -> int:
+        slot = self._slots.get(hub_id.bytes)
+        if slot is not None:
+            return slot
+        slot = self._slots[hub_id.bytes] = len(self._slots)
+        self._hub_ids.append(hub_id.bytes)
+        if slot == self._allocated:
+            grow = max(16, self._allocated)
+            self._values.frombytes(bytes(grow * self.capacity * _F * self._values.itemsize))
+            self._times.frombytes(bytes(grow * self.capacity * self._times.itemsize))
+            for column in (self._head, self._count, self._uptime, *self._latest.values()):
+                column.frombytes(bytes(grow * column.itemsize))
+            for coarse in self._coarse.values():
+                coarse.extend(bytes(grow))
+            self._allocated += grow
+        return slot
+
+    def push(self, hub_id: UUID, metrics: HubHealthMetrics) -> None:
+        """Record one sample, received now, overwriting the hub's oldest if full."""
+        slot = self._slot(hub_id)
+        position = self._head[slot]
+        sample = slot * self.capacity + position
+        base = sample * _F
+        self._values[base] = metrics.cpu_percent
+        self._values[base + 1] = metrics.memory_percent
+        self._values[base + 2] = metrics.disk_percent
+        self._values[base + 3] = metrics.active_learners
+        self._times[sample] = self._clock()
+        self._uptime[slot] = metrics.uptime_seconds
+        for name, column in self._latest.items():
+            value = column[slot] = getattr(metrics, name)
+            self._coarse[name][slot] = int(value * _STEPS_PER_PERCENT)
+        self._head[slot] = (position + 1) % self.capacity
+        if self._count[slot] < self.capacity:
+            self._count[slot] += 1
+
+    def latest(self, hub_id: UUID) -> HubHealthMetrics | None:
+        slot = self._slots.get(hub_id.bytes)
+        if slot is None:
+            return None
+        sample = slot * self.capacity + (self._head[slot] - 1) % self.capacity
+        cpu, memory, disk, learners = self._values[sample * _F : sample * _F + _F]
+        return HubHealthMetrics(
+            cpu_percent=round(cpu, 2),  # drop float32 noise
+            memory_percent=round(memory, 2),
+            disk_percent=round(disk, 2),
+            active_learners=int(learners),
+            uptime_seconds=int(self._uptime[slot]),
+        )
+
+    def _oldest(self) -> float:
+        """Receive time before which a hub's latest sample counts as stale."""
+        if self.max_sample_age_seconds is None:
+            return -math.inf
+        return self._clock() - self.max_sample_age_seconds
+
+    def fresh(self) -> list[bytes]:
+        """Ids of the hubs whose latest sample is not stale, in slot order."""
+        oldest = self._oldest()
+        if oldest == -math.inf:
+            return list(self._hub_ids)
+        capacity, head, times = self.capacity, self._head, self._times
+        return [
+            hub_id
+            for slot, hub_id in enumerate(self._hub_ids)
+            if times[slot * capacity + (head[slot] - 1) % capacity] >= oldest
+        ]
+
+    def breaches(
+        self, thresholds: dict[str, float] = ALERT_THRESHOLDS
+    ) -> dict[str, list[tuple[bytes, float]]]:
+        """Hubs whose latest sample is above each metric's threshold.
+
+        Returns ``{metric: [(hub_id bytes, latest value), …]}`` in slot order.
+        Hubs whose latest sample is older than ``max_sample_age_seconds`` are
+        left out.
+        """
+        hubs = len(self._slots)
+        found: dict[str, list[tuple[bytes, float]]] = {}
+        oldest = self._oldest()
+        capacity, head, times = self.capacity, self._head, self._times
+        for name, threshold in thresholds.items():
+            # Any value above the threshold has at least its step; a few below share it.
+            step = max(0, math.floor(threshold * _STEPS_PER_PERCENT))
+            table = bytes(1 if q >= step else 0 for q in range(256))
+            flags = self._coarse[name][:hubs].translate(table)
+            column, hits = self._latest[name], []
+            slot = flags.find(1)
+            while slot != -1:
+                if (
+                    column[slot] > threshold
+                    and times[slot * capacity + (head[slot] - 1) % capacity] >= oldest
+                ):
+                    hits.append((self._hub_ids[slot], round(column[slot], 2)))
+                slot = flags.find(1, slot + 1)
+            found[name] = hits
+        return found
+
+    def _window(self, slot: int) -> tuple[list[float], list[list[float]]]:
+        """Sample times and per-field values held for ``slot`` (ring order, not time order)."""
+        count = self._count[slot]
+        first = slot * self.capacity
+        times = self._times[first : first + count].tolist()
+        block = self._values[first * _F : (first + count) * _F]
+        return times, [block[f::_F].tolist() for f in range(_F)]
+
+    def rolling(self, hub_id: UUID) -> RollingHealthMetrics | None:
+        """p50 / p95 / max of each windowed metric over the samples held."""
+        slot = self._slots.get(hub_id.bytes)
+        if slot is None:
+            return None
+        times, columns = self._window(slot)
+        stats = {}
+        for name, values in zip(WINDOW_FIELDS, columns):
+            values.sort()
+            stats[name] = MetricStats(
+                p50=round(_percentile(values, 0.5), 2),
+                p95=round(_percentile(values, 0.95), 2),
+                max=round(values[-1], 2),
+            )
+        return RollingHealthMetrics(
+            samples=len(times), window_seconds=max(times) - min(times), **stats
+        )
+
+    def alerts(self, hub_id: UUID) -> list[str]:
+        """Threshold, sustained-load and trend alerts for the hub's window."""
+        slot = self._slots.get(hub_id.bytes)
+        if slot is None:
+            return []
+        latest = self.latest(hub_id)
+        times, columns = self._window(slot)
+        by_field = dict(zip(WINDOW_FIELDS, columns))
+        alerts: list[str] = []
+        for name, threshold in ALERT_THRESHOLDS.items():
+            label = _ALERT_LABELS[name]
+            value = getattr(latest, name)
+            if value > threshold:
+                alerts.append(f"High {label} utilisation: {value:.1f}%")
+            median = _percentile(sorted(by_field[name]), 0.5)
+            if len(times) >= self.trend_min_samples and median > threshold:
+                alerts.append(
+                    f"Sustained high {label} utilisation: median {median:.1f}% "
+                    f"over the last {len(times)} samples"
+                )
+        if len(times) >= self.trend_min_samples:
+            for name in _TRENDED:
+                slope = _slope_per_hour(times, by_field[name])
+                value, threshold = getattr(latest, name), ALERT_THRESHOLDS[name]
+                if slope <= 0 or value >= threshold:
+                    continue
+                hours = (threshold - value) / slope
+                if hours <= self.trend_horizon_hours:
+                    alerts.append(
+                        f"{_ALERT_LABELS[name].capitalize()} rising {slope:.1f} %/h: "
+                        f"{threshold:.0f}% in ~{hours:.1f} h"
+                    )
+            if latest.uptime_seconds < max(times) - min(times):
+                alerts.append(f"Hub restarted {latest.uptime_seconds // 60} min ago")
+        return alerts
+
+
+telemetry_store = TelemetryStore(
+    capacity=settings.telemetry_window_samples,
+    trend_horizon_hours=settings.telemetry_trend_horizon_hours,
+    trend_min_samples=settings.telemetry_trend_min_samples,
+    max_sample_age_seconds=settings.telemetry_max_sample_age_seconds,
+)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+bench_batch_decoder.py — /aggregate body decoding, events per second per core
+
+Builds --batches bodies of 1,000 events (every event with a session and
+content id, every fifth with a duration and metadata) and reports, from the
+JSON bytes to EventColumns:
+
+  json.loads    parsing alone, the floor both paths share
+  models        json.loads + AnalyticsBatch validation + EventColumns.from_events
+                (the previous request path)
+  fast path     json.loads + EventBatch, which decodes well-formed batches
+                column by column (the current request path)
+  fallback      EventBatch on batches with one lax event (a hyphenless UUID):
+                a failed fast attempt, then the models
+
+Usage:
+  # Default run (200 batches):
+  python scripts/bench_batch_decoder.py
+
+  # Longer run:
+  python scripts/bench_batch_decoder.py --batches 1000
+
+Run from the Aku-SuperHub directory so ``app`` is importable.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.schemas.analytics import MAX_BATCH_EVENTS, AnalyticsBatch, EventType  # noqa: E402
+from app.services.batch_decoder import EventBatch  # noqa: E402
+from app.services.event_store import EventColumns  # noqa: E402
+
+T0 = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _bodies(batches: int, rng: random.Random, lax: bool = False) -> list[bytes]:
+    hub_ids = [_uuid(rng) for _ in range(500)]
+    types = [t.value for t in EventType]
+    bodies = []
+    for b in range(batches):
+        events = []
+        for i in range(MAX_BATCH_EVENTS):
+            event = {
+                "event_id": _uuid(rng),
+                "hub_id": hub_ids[i % len(hub_ids)],
+                "learner_id": _uuid(rng),
+                "event_type": types[i % len(types)],
+                "occurred_at": (T0 + timedelta(seconds=b * 600 + i * 0.6)).isoformat(),
+                "content_id": _uuid(rng),
+                "session_id": _uuid(rng),
+            }
+            if i % 5 == 0:
+                event["duration_seconds"] = 60.0 + i % 900
+                event["metadata"] = {"lesson": f"l-{i % 300}", "score": i % 10}
+            events.append(event)
+        if lax:
+            events[-1]["event_id"] = events[-1]["event_id"].replace("-", "")
+        bodies.append(json.dumps({"events": events}).encode())
+    return bodies
+
+
+def _events_per_second(decode, bodies: list[bytes]) -> float:
+    start = time.perf_counter()
+    for body in bodies:
+        decode(body)
+    return len(bodies) * MAX_BATCH_EVENTS / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--batches", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    bodies = _bodies(args.batches, rng)
+    lax = _bodies(args.batches, rng, lax=True)
+    adapter = TypeAdapter(EventBatch)
+
+    def models(body: bytes) -> EventColumns:
+        return EventColumns.from_events(AnalyticsBatch.model_validate(json.loads(body)).events)
+
+    def fast(body: bytes) -> EventColumns:
+        return adapter.validate_python(json.loads(body))
+
+    assert models(bodies[0]) == fast(bodies[0]) and models(lax[0]) == fast(lax[0])
+    baseline = _events_per_second(models, bodies)
+    print(f"{'case':<12} {'events/s':>10} {'µs/event':>9} {'vs models':>10}")
+    for label, decode, sample in (
+        ("json.loads", json.loads, bodies),
+        ("models", models, bodies),
+        ("fast path", fast, bodies),
+        ("fallback", fast, lax),
+    ):
+        rate = baseline if decode is models else _events_per_second(decode, sample)
+        print(f"{label:<12} {rate:>10,.0f} {1e6 / rate:>9.2f} {rate / baseline:>9.2f}×")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+bench_event_store.py — Analytics ingest throughput into the hour-partitioned event store
+
+Replays a fleet backfill: --events fresh events from --hubs hubs spread over
+--hours hours, in /aggregate-sized batches of 1,000, and reports:
+
+  store only     EventStore.append_sync from prebuilt columns
+  /aggregate     json.loads + EventBatch decoding + append
+                 (the request path minus HTTP)
+  retries        the same batches resent: every event is a duplicate
+  on disk        database size per stored event
+
+Usage:
+  # Default run (1M events over one week):
+  python scripts/bench_event_store.py
+
+  # Quicker run:
+  python scripts/bench_event_store.py --events 200000
+
+Run from the Aku-SuperHub directory so ``app`` is importable.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.schemas.analytics import EventType  # noqa: E402
+from app.services.batch_decoder import EventBatch  # noqa: E402
+from app.services.event_store import EventStore  # noqa: E402
+
+BATCH = 1_000
+T0 = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def _bodies(events: int, hubs: int, hours: int, rng: random.Random) -> list[bytes]:
+    hub_ids = [str(uuid.UUID(int=rng.getrandbits(128), version=4)) for _ in range(hubs)]
+    types = [t.value for t in EventType]
+    bodies = []
+    for start in range(0, events, BATCH):
+        batch = []
+        for i in range(start, min(start + BATCH, events)):
+            event = {
+                "event_id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+                "hub_id": hub_ids[i % hubs],
+                "learner_id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+                "event_type": types[i % len(types)],
+                "occurred_at": (T0 + timedelta(seconds=i * hours * 3600 / events)).isoformat(),
+            }
+            if i % 5 == 0:
+                event["duration_seconds"] = 60.0 + i % 900
+                event["metadata"] = {"lesson": f"l-{i % 300}", "score": i % 10}
+            batch.append(event)
+        bodies.append(json.dumps({"events": batch}).encode())
+    return bodies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--hubs", type=int, default=5_000)
+    parser.add_argument("--hours", type=int, default=168)
+    args = parser.parse_args()
+
+    bodies = _bodies(args.events, args.hubs, args.hours, random.Random(7))
+    half = len(bodies) // 2
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "events.db")
+        store = EventStore(path)
+
+        adapter = TypeAdapter(EventBatch)
+        columns = [adapter.validate_python(json.loads(b)) for b in bodies[:half]]
+        start = time.perf_counter()
+        inserted = sum(store.append_sync(c).inserted for c in columns)
+        elapsed = time.perf_counter() - start
+        print(f"store only   {inserted:>9,} events  {inserted / elapsed:>9,.0f} events/s")
+
+        start = time.perf_counter()
+        inserted = 0
+        for body in bodies[half:]:
+            inserted += store.append_sync(adapter.validate_python(json.loads(body))).inserted
+        elapsed = time.perf_counter() - start
+        print(f"/aggregate   {inserted:>9,} events  {inserted / elapsed:>9,.0f} events/s")
+
+        retries = bodies[half : half + max(1, half // 5)]
+        start = time.perf_counter()
+        duplicates = 0
+        for body in retries:
+            duplicates += store.append_sync(adapter.validate_python(json.loads(body))).duplicates
+        elapsed = time.perf_counter() - start
+        print(f"retries      {duplicates:>9,} events  {duplicates / elapsed:>9,.0f} events/s")
+
+        store.close()
+        size = sum(os.path.getsize(p) for p in Path(tmp).iterdir())
+        stored = args.events
+        print(
+            f"on disk      {size / 1e6:,.0f} MB ({size / stored:.0f} B/event, {args.hours} partitions)"
+        )
+
+
+if __name__ == "__main__":
+    main()
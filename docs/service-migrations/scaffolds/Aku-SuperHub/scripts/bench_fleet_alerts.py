@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+bench_fleet_alerts.py — Fleet-wide threshold sweep for GET /api/v1/fleet/alerts
+
+Registers --hubs hubs over four regions, pushes one telemetry sample each
+(about --breaching percent of hubs above at least one threshold) and reports
+the mean latency of:
+
+  per-hub loop     a Python loop over every hub's latest sample (what N calls to
+                   /fleet/{id}/health amount to, minus HTTP)
+  sweep            TelemetryStore.breaches: one translate() pass per metric
+  endpoint         fleet_alerts() as the router runs it: sweep, registry lookup
+                   of the breaching hubs, grouping, and with a filter the count of
+                   matching hubs; unfiltered, by region, by tag
+
+Usage:
+  # Default run (50k hubs, ~3 % breaching):
+  python scripts/bench_fleet_alerts.py
+
+  # A bad day:
+  python scripts/bench_fleet_alerts.py --breaching 20
+
+Run from the Aku-SuperHub directory so ``app`` is importable.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.routers import fleet  # noqa: E402
+from app.schemas.fleet import EdgeHub, HubHealthMetrics, HubStatus  # noqa: E402
+from app.services.hub_registry import HubRegistry  # noqa: E402
+from app.services.telemetry import ALERT_THRESHOLDS, TelemetryStore  # noqa: E402
+
+REGIONS = ("af-south-1", "af-west-1", "af-east-1", "af-north-1")
+
+
+def _sample(rng: random.Random, breaching: bool) -> HubHealthMetrics:
+    high = rng.choice(list(ALERT_THRESHOLDS)) if breaching else None
+    values = {
+        name: rng.uniform(threshold + 0.5, 100) if name == high else rng.uniform(5, threshold)
+        for name, threshold in ALERT_THRESHOLDS.items()
+    }
+    return HubHealthMetrics(**values, active_learners=rng.randrange(100), uptime_seconds=86_400)
+
+
+async def _ms(call, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await call()
+    return (time.perf_counter() - start) / repeat * 1e3
+
+
+async def _run(args: argparse.Namespace, tmp: str) -> None:
+    rng = random.Random(4)
+    registry = HubRegistry(os.path.join(tmp, "fleet.db"))
+    telemetry = TelemetryStore()
+    hubs = [
+        EdgeHub(
+            hub_id=uuid.UUID(int=rng.getrandbits(128), version=4),
+            region=REGIONS[i % len(REGIONS)],
+            name=f"hub-{i:05d}",
+            status=HubStatus.ONLINE,
+            ip_address="10.0.0.1",
+            firmware_version="2.3.1",
+            registered_at=datetime(2025, 1, 1),
+            tags={"ring": "beta" if i % 10 == 0 else "stable"},
+        )
+        for i in range(args.hubs)
+    ]
+    registry.register_sync(hubs)
+    for hub in hubs:
+        telemetry.push(hub.hub_id, _sample(rng, rng.random() * 100 < args.breaching))
+    fleet.hub_registry, fleet.telemetry_store = registry, telemetry
+
+    async def per_hub_loop() -> None:
+        for hub in hubs:
+            latest = telemetry.latest(hub.hub_id)
+            [name for name, t in ALERT_THRESHOLDS.items() if getattr(latest, name) > t]
+
+    async def sweep() -> None:
+        telemetry.breaches()
+
+    result = await fleet.fleet_alerts(region=None, tag=[])
+    print(f"{args.hubs:,} hubs, {result.hubs_alerting:,} alerting\n")
+    print(f"{'per-hub loop':<28} {await _ms(per_hub_loop, 3):>9.2f} ms")
+    print(f"{'sweep':<28} {await _ms(sweep, 50):>9.2f} ms")
+    cases = {
+        "endpoint, unfiltered": {"region": None, "tag": []},
+        "endpoint, region": {"region": REGIONS[0], "tag": []},
+        "endpoint, tag ring:beta": {"region": None, "tag": ["ring:beta"]},
+    }
+    for label, params in cases.items():
+        elapsed = await _ms(lambda params=params: fleet.fleet_alerts(**params), 20)
+        print(f"{label:<28} {elapsed:>9.2f} ms")
+    registry.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--hubs", type=int, default=50_000)
+    parser.add_argument("--breaching", type=float, default=3.0, help="percent of hubs")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(_run(args, tmp))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+bench_hub_registry.py — Fleet listing latency for a large region, keyset vs offset pages
+
+Registers --hubs hubs (statuses ~70 % ONLINE, 15 % OFFLINE, 10 % DEGRADED,
+5 % MAINTENANCE) and reports the mean latency of HubRegistry.page_sync for
+pages of --page-size:
+
+  load all         what list_hubs used to do: every hub as an EdgeHub,
+                   filtered and sliced in Python
+  offset, first    page 1
+  offset, last     the deepest page (SQLite steps over the skipped entries)
+  cursor, any      one keyset page, averaged over a full walk of the fleet
+
+each unfiltered and with ?status=OFFLINE.  Totals come from maintained
+counters in every case.
+
+Usage:
+  # Default run (50k hubs, 20 per page):
+  python scripts/bench_hub_registry.py
+
+  # Bigger pages:
+  python scripts/bench_hub_registry.py --page-size 100
+
+Run from the Aku-SuperHub directory so ``app`` is importable.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.schemas.fleet import EdgeHub, HubStatus  # noqa: E402
+from app.services.hub_registry import HubRegistry  # noqa: E402
+
+STATUSES = [HubStatus.ONLINE] * 14 + [HubStatus.OFFLINE] * 3 + [HubStatus.DEGRADED] * 2
+STATUSES.append(HubStatus.MAINTENANCE)
+
+
+def _hubs(count: int, rng: random.Random) -> list[EdgeHub]:
+    t0 = datetime(2024, 1, 1)
+    return [
+        EdgeHub(
+            hub_id=uuid.UUID(int=rng.getrandbits(128), version=4),
+            region="af-south-1",
+            name=f"hub-{i:05d}",
+            status=rng.choice(STATUSES),
+            ip_address=f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}",
+            firmware_version="2.3.1",
+            registered_at=t0 + timedelta(minutes=rng.randrange(1_000_000)),
+            tags={"site": f"school-{i % 900}", "ring": "stable"},
+        )
+        for i in range(count)
+    ]
+
+
+def _ms(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--hubs", type=int, default=50_000)
+    parser.add_argument("--page-size", type=int, default=20)
+    args = parser.parse_args()
+    size = args.page_size
+
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = HubRegistry(os.path.join(tmp, "fleet.db"))
+        hubs = _hubs(args.hubs, random.Random(5))
+        start = time.perf_counter()
+        registry.register_sync(hubs)
+        elapsed = time.perf_counter() - start
+        print(f"registered {args.hubs:,} hubs in {elapsed:.2f} s\n")
+        print(f"{'case':<18} {'all hubs':>10} {'OFFLINE':>10}   (ms per page)")
+
+        def load_all(status):
+            # Offset 0 past the end would return nothing; take everything in one page.
+            every = registry.page_sync(limit=args.hubs).hubs
+            matching = [h for h in every if status is None or h.status == status]
+            return matching[:size]
+
+        for label, case in {
+            "load all": lambda s: _ms(lambda: load_all(s), 3),
+            "offset, first": lambda s: _ms(lambda: registry.page_sync(limit=size, status=s), 200),
+            "offset, last": lambda s: _ms(
+                lambda: registry.page_sync(
+                    limit=size,
+                    status=s,
+                    offset=(registry.count_sync(s) - 1) // size * size,
+                ),
+                50,
+            ),
+            "cursor, any": lambda s: _walk(registry, size, s),
+        }.items():
+            print(f"{label:<18} {case(None):>10.2f} {case(HubStatus.OFFLINE):>10.2f}")
+        registry.close()
+
+
+def _walk(registry: HubRegistry, size: int, status: HubStatus | None) -> float:
+    pages, cursor = 0, None
+    start = time.perf_counter()
+    while True:
+        page = registry.page_sync(limit=size, status=status, cursor=cursor)
+        pages += 1
+        if (cursor := page.next_cursor) is None:
+            break
+    return (time.perf_counter() - start) / pages * 1e3
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+bench_rollups.py — Regional summary latency from ingest-time rollups, as the event count grows
+
+Fills an event store in stages (--stages, cumulative event counts) with events
+from --hubs hubs and --learners learners.  Each stage is a backfill sweeping
+the last 720 hours in time order, in batches of 1,000.  After each stage it
+reports:
+
+  ingest         append throughput with rollups maintained (whole stage)
+  24h / 720h     EventStore.rollup latency, p50 / p99 / max over --calls calls;
+                 before each call one live event is ingested into the current
+                 hour, as under production traffic
+  720h cold      the same with every day cache dropped first (worst case: all
+                 720 hour buckets merged)
+
+Summary latency should not grow with the number of stored events.
+
+Usage:
+  # Default run (100k, 300k, 1M events):
+  python scripts/bench_rollups.py
+
+  # A 50k-hub fleet:
+  python scripts/bench_rollups.py --hubs 50000 --stages 200000,1000000
+
+Run from the Aku-SuperHub directory so ``app`` is importable.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.schemas.analytics import EventType  # noqa: E402
+from app.services.event_store import EventColumns, EventStore  # noqa: E402
+
+BATCH = 1_000
+WINDOW = 720
+
+
+def _batch(
+    rng: random.Random, times: list[float], hubs: list[bytes], learners: int
+) -> EventColumns:
+    columns = EventColumns()
+    types = len(EventType)
+    for occurred_at in times:
+        code = rng.randrange(types)
+        columns.event_id.append(rng.randbytes(16))
+        columns.hub_id.append(rng.choice(hubs))
+        columns.learner_id.append(rng.randrange(learners).to_bytes(16, "little"))
+        columns.event_type.append(code)
+        columns.occurred_at.append(occurred_at)
+        columns.content_id.append(None)
+        columns.session_id.append(None)
+        columns.duration_seconds.append(60.0 + rng.random() * 900 if code == 1 else None)
+        columns.metadata.append(None)
+    return columns
+
+
+def _latencies(store: EventStore, window: int, calls: int, live, cold: bool) -> list[float]:
+    last = int(time.time() // 3600)
+    samples = []
+    for _ in range(calls):
+        store.append_sync(live())
+        if cold:
+            store._rollups._days.clear()
+        start = time.perf_counter()
+        store.rollup_sync(last - window + 1, last)
+        samples.append((time.perf_counter() - start) * 1e3)
+    return samples
+
+
+def _row(label: str, samples: list[float]) -> str:
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(0.99 * len(samples)))]
+    return (
+        f"{label:<12} p50 {statistics.median(samples):>7.2f} ms  "
+        f"p99 {p99:>7.2f} ms  max {samples[-1]:>7.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--stages", default="100000,300000,1000000")
+    parser.add_argument("--hubs", type=int, default=5_000)
+    parser.add_argument("--learners", type=int, default=200_000)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    hubs = [rng.randbytes(16) for _ in range(args.hubs)]
+
+    def live() -> EventColumns:
+        return _batch(rng, [time.time()], hubs, args.learners)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = EventStore(os.path.join(tmp, "events.db"))
+        stored = 0
+        for target in map(int, args.stages.split(",")):
+            count = target - stored
+            origin = time.time() - WINDOW * 3600
+            step = WINDOW * 3600 / count
+            start = time.perf_counter()
+            fresh = 0
+            for first in range(0, count, BATCH):
+                times = [origin + i * step for i in range(first, min(first + BATCH, count))]
+                fresh += store.append_sync(_batch(rng, times, hubs, args.learners)).inserted
+            stored = target
+            elapsed = time.perf_counter() - start
+            print(f"--- {stored:,} events stored")
+            print(f"{'ingest':<12} {fresh / elapsed:>11,.0f} events/s")
+            for window in (24, WINDOW):
+                samples = _latencies(store, window, args.calls, live, cold=False)
+                print(_row(f"{window}h", samples))
+            print(_row(f"{WINDOW}h cold", _latencies(store, WINDOW, args.calls, live, True)))
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+bench_stream_ingest.py — Draining a hub's offline backlog, /aggregate batches vs one /stream
+
+Builds a backlog of --events events (a week offline) and drains it through the
+app in-process, each time into a fresh event store, reporting the drain time:
+
+  /aggregate     sequential requests of 1,000 events, each waiting
+                 --rtt-ms for its round trip (the previous way)
+  /stream        the whole backlog as one NDJSON request, sent in 64 KiB
+                 pieces; one round trip
+  /stream gzip   the same body gzip-compressed, inflated on the fly
+
+and the peak Python memory (tracemalloc) of a /stream ingest for a quarter of
+the backlog and for all of it: bounded by the pending chunks, it does not grow
+with the body.
+
+Usage:
+  # Default run (200k events, 50 ms round trips):
+  python scripts/bench_stream_ingest.py
+
+  # A slower uplink:
+  python scripts/bench_stream_ingest.py --events 500000 --rtt-ms 200
+
+Run from the Aku-SuperHub directory so ``app`` is importable.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.routers import analytics  # noqa: E402
+from app.schemas.analytics import EventType  # noqa: E402
+from app.services.event_store import EventStore  # noqa: E402
+from app.services.stream_ingest import ingest_ndjson  # noqa: E402
+
+BATCH = 1_000
+PIECE = 64 * 1024
+T0 = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def _events(count: int, rng: random.Random) -> list[dict]:
+    hub_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+    types = [t.value for t in EventType]
+    events = []
+    for i in range(count):
+        event = {
+            "event_id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            "hub_id": hub_id,
+            "learner_id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            "event_type": types[i % len(types)],
+            "occurred_at": (T0 + timedelta(seconds=i * 7 * 86_400 / count)).isoformat(),
+        }
+        if i % 5 == 0:
+            event["duration_seconds"] = 60.0 + i % 900
+            event["metadata"] = {"lesson": f"l-{i % 300}", "score": i % 10}
+        events.append(event)
+    return events
+
+
+async def _pieces(body: bytes):
+    for start in range(0, len(body), PIECE):
+        yield body[start : start + PIECE]
+
+
+async def _drain(events: list[dict], rtt_ms: float) -> dict[str, tuple[float, int]]:
+    transport = httpx.ASGITransport(app=app)
+    ndjson = "\n".join(map(json.dumps, events)).encode()
+    batches = [
+        json.dumps({"events": events[i : i + BATCH]}).encode() for i in range(0, len(events), BATCH)
+    ]
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for label in ("/aggregate", "/stream", "/stream gzip"):
+                analytics.event_store = EventStore(os.path.join(tmp, f"{len(results)}.db"))
+                inserted = 0
+                start = time.perf_counter()
+                if label == "/aggregate":
+                    for body in batches:
+                        await asyncio.sleep(rtt_ms / 1000)
+                        response = await client.post(
+                            "/api/v1/analytics/aggregate",
+                            content=body,
+                            headers={"Content-Type": "application/json"},
+                        )
+                        inserted += response.json()["inserted"]
+                else:
+                    body, headers = ndjson, {"Content-Type": "application/x-ndjson"}
+                    if label.endswith("gzip"):
+                        body = gzip.compress(ndjson, 1)
+                        headers["Content-Encoding"] = "gzip"
+                    await asyncio.sleep(rtt_ms / 1000)
+                    response = await client.post(
+                        "/api/v1/analytics/stream", content=_pieces(body), headers=headers
+                    )
+                    inserted = response.json()["inserted"]
+                results[label] = (time.perf_counter() - start, inserted)
+                analytics.event_store.close()
+    return results
+
+
+async def _stream_peak(events: list[dict]) -> int:
+    """Peak traced memory of one /stream ingest, Bloom filters kept to one hour."""
+    ndjson = "\n".join(map(json.dumps, events)).encode()
+    with tempfile.TemporaryDirectory() as tmp:
+        store = EventStore(os.path.join(tmp, "peak.db"), bloom_partitions=1)
+        tracemalloc.start()
+        await ingest_ndjson(_pieces(ndjson), store)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        store.close()
+    return peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--rtt-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    events = _events(args.events, random.Random(5))
+    results = asyncio.run(_drain(events, args.rtt_ms))
+    baseline = results["/aggregate"][0]
+    print(f"{'path':<14} {'seconds':>8} {'events/s':>10} {'vs /aggregate':>14}")
+    for label, (seconds, inserted) in results.items():
+        assert inserted == args.events, (label, inserted)
+        print(
+            f"{label:<14} {seconds:>8.2f} {inserted / seconds:>10,.0f} "
+            f"{baseline / seconds:>13.1f}×"
+        )
+    for share in (4, 1):
+        sample = events[: len(events) // share]
+        body = sum(len(json.dumps(event)) + 1 for event in sample)
+        peak = asyncio.run(_stream_peak(sample))
+        print(f"/stream peak memory: {peak / 2**20:5.1f} MiB for a {body / 2**20:5.1f} MiB body")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+bench_telemetry.py — Hub telemetry ring buffers: memory per hub and per-call cost
+
+Fills a TelemetryStore with --samples samples for each of --hubs hubs and
+reports:
+
+  memory         slab bytes and id→slot dict bytes, total and per hub
+  push           TelemetryStore.push, one validated HubHealthMetrics sample
+  health         latest + rolling + alerts for one hub (what /health adds)
+
+Usage:
+  # Default run (50k hubs, full 60-sample windows):
+  python scripts/bench_telemetry.py
+
+  # Longer windows:
+  python scripts/bench_telemetry.py --capacity 240 --hubs 20000
+
+Run from the Aku-SuperHub directory so ``app`` is importable.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.schemas.fleet import HubHealthMetrics  # noqa: E402
+from app.services.telemetry import TelemetryStore  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--hubs", type=int, default=50_000)
+    parser.add_argument("--capacity", type=int, default=60)
+    parser.add_argument("--samples", type=int, default=None, help="default: --capacity")
+    args = parser.parse_args()
+
+    rng = random.Random(9)
+    hubs = [uuid.UUID(int=rng.getrandbits(128), version=4) for _ in range(args.hubs)]
+    metrics = [
+        HubHealthMetrics(
+            cpu_percent=rng.uniform(5, 99),
+            memory_percent=rng.uniform(20, 95),
+            disk_percent=rng.uniform(10, 90),
+            active_learners=rng.randrange(200),
+            uptime_seconds=rng.randrange(10**7),
+        )
+        for _ in range(1_000)
+    ]
+    store = TelemetryStore(capacity=args.capacity)
+
+    pushes = args.hubs * (args.samples or args.capacity)
+    start = time.perf_counter()
+    for i in range(pushes):
+        store.push(hubs[i % args.hubs], metrics[i % len(metrics)])
+    push_us = (time.perf_counter() - start) / pushes * 1e6
+
+    slots = sys.getsizeof(store._slots) + sum(sys.getsizeof(key) for key in store._slots)
+    total = store.nbytes + slots
+    print(
+        f"memory   {total / 1e6:>8.1f} MB for {args.hubs:,} hubs "
+        f"({total / args.hubs:,.0f} B/hub: slab {store.nbytes / args.hubs:,.0f}, "
+        f"index {slots / args.hubs:,.0f})"
+    )
+    print(f"push     {push_us:>8.2f} µs")
+
+    calls = min(args.hubs, 20_000)
+    start = time.perf_counter()
+    for hub in hubs[:calls]:
+        store.latest(hub)
+        store.rolling(hub)
+        store.alerts(hub)
+    print(f"health   {(time.perf_counter() - start) / calls * 1e6:>8.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
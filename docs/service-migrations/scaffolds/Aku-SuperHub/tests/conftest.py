@@ -2,10 +2,18 @@
 
 from __future__ import annotations
 
+import os
+import tempfile
+
 import pytest
 from httpx import ASGITransport, AsyncClient
 
-from app.main import app
+# Keep the SQLite databases out of the working tree; must be set before app import.
+_DB_DIR = tempfile.mkdtemp(prefix="superhub-test-")
+os.environ.setdefault("ANALYTICS_DB_PATH", os.path.join(_DB_DIR, "analytics.db"))
+os.environ.setdefault("FLEET_DB_PATH", os.path.join(_DB_DIR, "fleet.db"))
+
+from app.main import app  # noqa: E402
 
 
 @pytest.fixture
@@ -1,13 +1,18 @@
 """Comprehensive API tests for Aku-SuperHub endpoints.
 
-Note: fleet and analytics routers raise NotImplementedError for their
-data-access stubs, so those tests confirm the expected HTTP 500 error
-until a real data layer is wired in. The models/finetune endpoint is
-fully implemented and is the main focus of the positive-path tests.
+Fleet listings are backed by the SQLite hub registry (see
+tests/test_hub_registry.py); analytics ingest and the regional summary by the
+SQLite event store and its hourly rollups (see tests/test_event_store.py and
+tests/test_rollups.py).
 """
 
 from __future__ import annotations
 
+import gzip
+import json
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
 from httpx import AsyncClient
 
 # ---------------------------------------------------------------------------
@@ -93,59 +98,406 @@ async def test_finetune_rejects_window_over_limit(client: AsyncClient) -> None:
 
 
 # ---------------------------------------------------------------------------
-# GET /api/v1/fleet — stub raises NotImplementedError (propagates in tests)
+# GET /api/v1/fleet, POST /api/v1/fleet
 # ---------------------------------------------------------------------------
 
 
-async def test_list_hubs_stub_raises_not_implemented(client: AsyncClient) -> None:
-    """The fleet data-access stub raises NotImplementedError until a real
-    database layer is wired in."""
-    import pytest
+def _hub_payload(region: str, **overrides) -> dict:
+    return {
+        "hub_id": str(uuid4()),
+        "region": region,
+        "name": "hub",
+        "status": "ONLINE",
+        "ip_address": "10.0.0.1",
+        "firmware_version": "1.4.2",
+        "registered_at": "2026-01-01T00:00:00",
+    } | overrides
+
+
+async def test_register_hub_then_refresh(client: AsyncClient) -> None:
+    hub = _hub_payload("test-register")
+    created = await client.post("/api/v1/fleet", json=hub)
+    assert created.status_code == 201
+    assert created.json()["hub_id"] == hub["hub_id"]
+
+    refreshed = await client.post(
+        "/api/v1/fleet", json=hub | {"status": "DEGRADED", "registered_at": "2026-06-01T00:00:00"}
+    )
+    assert refreshed.status_code == 200
+    assert refreshed.json()["status"] == "DEGRADED"
+    assert refreshed.json()["registered_at"] == "2026-01-01T00:00:00"  # original kept
+
+
+async def test_list_hubs_offset_and_cursor_pages_agree(client: AsyncClient) -> None:
+    region = "test-pages"
+    for day in range(1, 8):
+        status = "OFFLINE" if day % 3 == 0 else "ONLINE"
+        hub = _hub_payload(region, status=status, registered_at=f"2026-02-{day:02d}T00:00:00")
+        assert (await client.post("/api/v1/fleet", json=hub)).status_code == 201
+
+    first = (await client.get(f"/api/v1/fleet?region={region}&page_size=3")).json()
+    assert (first["total"], first["pages"]) == (7, 3)
+    assert first["items"][0]["registered_at"] == "2026-02-07T00:00:00"  # newest first
+
+    offset_ids, cursor_ids, cursor = [], [], None
+    for page in (1, 2, 3):
+        data = (await client.get(f"/api/v1/fleet?region={region}&page_size=3&page={page}")).json()
+        offset_ids += [item["hub_id"] for item in data["items"]]
+    while True:
+        query = f"/api/v1/fleet?region={region}&page_size=3" + (
+            f"&cursor={cursor}" if cursor else ""
+        )
+        data = (await client.get(query)).json()
+        cursor_ids += [item["hub_id"] for item in data["items"]]
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+    assert cursor_ids == offset_ids and len(set(cursor_ids)) == 7
+
+    offline = (await client.get(f"/api/v1/fleet?region={region}&status=OFFLINE")).json()
+    assert offline["total"] == 2 and {i["status"] for i in offline["items"]} == {"OFFLINE"}
+
+
+async def test_list_hubs_rejects_foreign_cursor(client: AsyncClient) -> None:
+    region = "test-cursor"
+    for _ in range(2):
+        await client.post("/api/v1/fleet", json=_hub_payload(region))
+    cursor = (await client.get(f"/api/v1/fleet?region={region}&page_size=1")).json()["next_cursor"]
+
+    mismatched = await client.get(f"/api/v1/fleet?region={region}&status=ONLINE&cursor={cursor}")
+    assert mismatched.status_code == 400
+    assert (await client.get("/api/v1/fleet?cursor=not-a-cursor")).status_code == 400
+
+
+# POST /api/v1/fleet/{hub_id}/metrics, GET /api/v1/fleet/{hub_id}/health
+# ---------------------------------------------------------------------------
+
 
-    with pytest.raises(NotImplementedError, match="data-access layer"):
-        await client.get("/api/v1/fleet")
+async def test_hub_health_reports_rolling_metrics(client: AsyncClient) -> None:
+    hub = _hub_payload("test-health")
+    await client.post("/api/v1/fleet", json=hub)
+    health_url = f"/api/v1/fleet/{hub['hub_id']}/health"
+    assert (await client.get(health_url)).status_code == 404  # no telemetry yet
+
+    for cpu in (10.0, 20.0, 95.0):
+        sample = {
+            "cpu_percent": cpu,
+            "memory_percent": 40.0,
+            "disk_percent": 30.0,
+            "active_learners": 7,
+            "uptime_seconds": 86_400,
+        }
+        pushed = await client.post(f"/api/v1/fleet/{hub['hub_id']}/metrics", json=sample)
+        assert pushed.status_code == 204
+
+    data = (await client.get(health_url)).json()
+    assert data["metrics"]["cpu_percent"] == 95.0
+    assert data["rolling"]["samples"] == 3
+    assert data["rolling"]["cpu_percent"] == {"p50": 20.0, "p95": 95.0, "max": 95.0}
+    assert data["alerts"] == ["High CPU utilisation: 95.0%"]
+
+
+async def test_fleet_alerts_groups_breaching_hubs(client: AsyncClient) -> None:
+    region = "test-alerts"
+    samples = {
+        "hot": {"cpu_percent": 97.0, "memory_percent": 88.0, "disk_percent": 10.0},
+        "warm": {"cpu_percent": 92.0, "memory_percent": 50.0, "disk_percent": 10.0},
+        "calm": {"cpu_percent": 20.0, "memory_percent": 50.0, "disk_percent": 10.0},
+    }
+    for name, sample in samples.items():
+        hub = _hub_payload(region, name=name, tags={"ring": "beta" if name == "hot" else "stable"})
+        await client.post("/api/v1/fleet", json=hub)
+        await client.post(
+            f"/api/v1/fleet/{hub['hub_id']}/metrics",
+            json=sample | {"active_learners": 3, "uptime_seconds": 3_600},
+        )
+
+    data = (await client.get(f"/api/v1/fleet/alerts?region={region}")).json()
+    assert [hub["name"] for hub in data["alerts"]["HIGH_CPU"]] == ["hot", "warm"]
+    assert [hub["name"] for hub in data["alerts"]["HIGH_MEMORY"]] == ["hot"]
+    assert data["alerts"]["HIGH_DISK"] == []
+    assert data["hubs_alerting"] == 2 and data["thresholds"]["HIGH_CPU"] == 90.0
+    assert data["hubs_checked"] == 3  # calm was checked too; other regions were not
+
+    stable = (await client.get(f"/api/v1/fleet/alerts?region={region}&tag=ring:stable")).json()
+    assert [hub["name"] for hub in stable["alerts"]["HIGH_CPU"]] == ["warm"]
+    assert stable["hubs_checked"] == 2
+    assert (await client.get("/api/v1/fleet/alerts?tag=ring")).status_code == 400
+
+
+async def test_push_metrics_for_unknown_hub_is_404(client: AsyncClient) -> None:
+    sample = {
+        "cpu_percent": 1.0,
+        "memory_percent": 1.0,
+        "disk_percent": 1.0,
+        "active_learners": 0,
+        "uptime_seconds": 1,
+    }
+    response = await client.post(f"/api/v1/fleet/{uuid4()}/metrics", json=sample)
+    assert response.status_code == 404
 
 
 # ---------------------------------------------------------------------------
-# POST /api/v1/analytics/aggregate — stub raises NotImplementedError
+# POST /api/v1/analytics/aggregate
 # ---------------------------------------------------------------------------
 
 
-async def test_aggregate_analytics_stub_raises_not_implemented(
+async def test_aggregate_analytics_skips_duplicate_event_ids(
     client: AsyncClient,
 ) -> None:
-    from datetime import datetime, timezone
-    from uuid import uuid4
+    event = {
+        "event_id": str(uuid4()),
+        "hub_id": str(uuid4()),
+        "learner_id": str(uuid4()),
+        "event_type": "SESSION_START",
+        "occurred_at": datetime.now(timezone.utc).isoformat(),
+    }
+    response = await client.post("/api/v1/analytics/aggregate", json={"events": [event]})
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["received"], data["inserted"], data["duplicates"], data["errors"]) == (1, 1, 0, 0)
 
-    import pytest
+    retry = {"events": [event, dict(event, event_id=str(uuid4()))]}
+    data = (await client.post("/api/v1/analytics/aggregate", json=retry)).json()
+    assert (data["received"], data["inserted"], data["duplicates"]) == (2, 1, 1)
 
-    payload = {
-        "events": [
+
+async def test_aggregate_analytics_validation_matches_model(client: AsyncClient) -> None:
+    """Off the fast path, bodies are accepted or rejected exactly as AnalyticsBatch does."""
+    event = {
+        "event_id": uuid4().hex,  # hyphenless: valid, but not on the fast path
+        "hub_id": str(uuid4()),
+        "learner_id": str(uuid4()),
+        "event_type": "CONTENT_VIEW",
+        "occurred_at": datetime.now(timezone.utc).isoformat(),
+    }
+    response = await client.post("/api/v1/analytics/aggregate", json={"events": [event]})
+    assert response.status_code == 200 and response.json()["inserted"] == 1
+
+    invalid = {"events": [dict(event, event_id=str(uuid4())), dict(event, event_id="nope")]}
+    response = await client.post("/api/v1/analytics/aggregate", json=invalid)
+    assert response.status_code == 422
+    assert [error["loc"] for error in response.json()["detail"]] == [
+        ["body", "events", 1, "event_id"]
+    ]
+
+
+async def test_aggregate_analytics_lists_events_outside_the_window(client: AsyncClient) -> None:
+    """Out-of-window events are not stored; their ids come back so the hub keeps them."""
+    now = datetime.now(timezone.utc)
+    events = [
+        {
+            "event_id": str(uuid4()),
+            "hub_id": str(uuid4()),
+            "learner_id": str(uuid4()),
+            "event_type": "CONTENT_VIEW",
+            "occurred_at": (now + offset).isoformat(),
+        }
+        for offset in (timedelta(0), timedelta(days=40), -timedelta(days=40))
+    ]
+    response = await client.post("/api/v1/analytics/aggregate", json={"events": events})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["inserted"], body["errors"]) == (1, 2)
+    assert body["rejected_event_ids"] == [events[1]["event_id"], events[2]["event_id"]]
+
+    ndjson = "\n".join(json.dumps(event) for event in events)
+    response = await client.post(
+        "/api/v1/analytics/stream",
+        content=ndjson,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.json()["duplicates"] == 1
+    assert response.json()["rejected_event_ids"] == body["rejected_event_ids"]
+
+
+async def test_aggregate_analytics_accepts_gzip_body(client: AsyncClient) -> None:
+    """Edge Hubs upload gzipped batches; the body reaches validation inflated."""
+    event = {
+        "event_id": str(uuid4()),
+        "hub_id": str(uuid4()),
+        "learner_id": str(uuid4()),
+        "event_type": "CONTENT_VIEW",
+        "occurred_at": datetime.now(timezone.utc).isoformat(),
+    }
+    headers = {"Content-Encoding": "gzip", "Content-Type": "application/json"}
+    response = await client.post(
+        "/api/v1/analytics/aggregate",
+        content=gzip.compress(json.dumps({"events": [event]}).encode()),
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["inserted"] == 1
+
+    invalid = await client.post(
+        "/api/v1/analytics/aggregate",
+        content=gzip.compress(b'{"events": []}'),
+        headers=headers,
+    )
+    assert invalid.status_code == 422
+
+    corrupt = await client.post("/api/v1/analytics/aggregate", content=b"not gzip", headers=headers)
+    assert corrupt.status_code == 400
+
+
+async def test_aggregate_analytics_inflates_every_gzip_member(client: AsyncClient) -> None:
+    """A multi-member body is inflated whole, never cut at the first member."""
+    payload = json.dumps(
+        {
+            "events": [
+                {
+                    "event_id": str(uuid4()),
+                    "hub_id": str(uuid4()),
+                    "learner_id": str(uuid4()),
+                    "event_type": "CONTENT_VIEW",
+                    "occurred_at": datetime.now(timezone.utc).isoformat(),
+                }
+                for _ in range(2)
+            ]
+        }
+    ).encode()
+    half = len(payload) // 2
+    headers = {"Content-Encoding": "gzip", "Content-Type": "application/json"}
+    response = await client.post(
+        "/api/v1/analytics/aggregate",
+        content=gzip.compress(payload[:half]) + gzip.compress(payload[half:]),
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["inserted"] == 2
+
+    trailing = await client.post(
+        "/api/v1/analytics/aggregate",
+        content=gzip.compress(payload) + b"not gzip",
+        headers=headers,
+    )
+    assert trailing.status_code == 400
+
+
+# ---------------------------------------------------------------------------
+# POST /api/v1/analytics/stream
+# ---------------------------------------------------------------------------
+
+
+async def test_stream_analytics_ingests_ndjson_backlog(client: AsyncClient) -> None:
+    lines = [
+        json.dumps(
             {
                 "event_id": str(uuid4()),
                 "hub_id": str(uuid4()),
                 "learner_id": str(uuid4()),
-                "event_type": "SESSION_START",
+                "event_type": "CONTENT_VIEW",
                 "occurred_at": datetime.now(timezone.utc).isoformat(),
             }
-        ]
-    }
-    with pytest.raises(NotImplementedError, match="data-access layer"):
-        await client.post("/api/v1/analytics/aggregate", json=payload)
+        ).encode()
+        + b"\n"
+        for _ in range(2_500)
+    ]
+
+    async def body():
+        for i in range(0, len(lines), 300):
+            yield b"".join(lines[i : i + 300])
+
+    response = await client.post(
+        "/api/v1/analytics/stream", content=body(), headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["received"], data["inserted"], data["chunks"], data["errors"]) == (
+        2500,
+        2500,
+        3,
+        0,
+    )
+
+    headers = {"Content-Encoding": "gzip", "Content-Type": "application/x-ndjson"}
+    resent = gzip.compress(b"".join(lines[:10]) + b"[]\n")
+    data = (await client.post("/api/v1/analytics/stream", content=resent, headers=headers)).json()
+    assert (data["duplicates"], data["errors"]) == (10, 1)
+    assert [sample["line"] for sample in data["error_samples"]] == [11]  # "[]" is not an event
+
+    corrupt = await client.post(
+        "/api/v1/analytics/stream", content=gzip.compress(lines[0])[:-4], headers=headers
+    )
+    assert corrupt.status_code == 400
+
+
+async def test_stream_analytics_inflates_every_gzip_member(client: AsyncClient) -> None:
+    """``cat a.gz b.gz`` is one valid gzip body; no member may be dropped."""
+    lines = [
+        json.dumps(
+            {
+                "event_id": str(uuid4()),
+                "hub_id": str(uuid4()),
+                "learner_id": str(uuid4()),
+                "event_type": "CONTENT_VIEW",
+                "occurred_at": datetime.now(timezone.utc).isoformat(),
+            }
+        ).encode()
+        + b"\n"
+        for _ in range(3)
+    ]
+    members = [gzip.compress(line) for line in lines]
+
+    async def body():
+        yield members[0] + members[1][:7]  # a member boundary inside a chunk
+        yield members[1][7:]
+        yield members[2]  # and one on a chunk boundary
+
+    response = await client.post(
+        "/api/v1/analytics/stream",
+        content=body(),
+        headers={"Content-Encoding": "gzip", "Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    assert (response.json()["received"], response.json()["inserted"]) == (3, 3)
+
+    trailing = await client.post(
+        "/api/v1/analytics/stream",
+        content=members[0] + b"not gzip",
+        headers={"Content-Encoding": "gzip", "Content-Type": "application/x-ndjson"},
+    )
+    assert trailing.status_code == 400
 
 
 # ---------------------------------------------------------------------------
-# GET /api/v1/analytics/summary — stub raises NotImplementedError
+# GET /api/v1/analytics/summary
 # ---------------------------------------------------------------------------
 
 
-async def test_analytics_summary_stub_raises_not_implemented(
-    client: AsyncClient,
-) -> None:
-    import pytest
+async def test_analytics_summary_counts_ingested_events(client: AsyncClient) -> None:
+    before = (await client.get("/api/v1/analytics/summary?window_hours=2")).json()
+    hub, learner, now = str(uuid4()), str(uuid4()), datetime.now(timezone.utc).isoformat()
+    events = [
+        {
+            "event_id": str(uuid4()),
+            "hub_id": hub,
+            "learner_id": learner,
+            "event_type": event_type,
+            "occurred_at": now,
+            "duration_seconds": duration,
+        }
+        for event_type, duration in [
+            ("SESSION_START", None),
+            ("CONTENT_VIEW", None),
+            ("CONTENT_VIEW", None),
+            ("ASSESSMENT_SUBMIT", None),
+            ("SESSION_END", 600.0),
+        ]
+    ]
+    await client.post("/api/v1/analytics/aggregate", json={"events": events})
 
-    with pytest.raises(NotImplementedError, match="aggregation query"):
-        await client.get("/api/v1/analytics/summary")
+    response = await client.get("/api/v1/analytics/summary?window_hours=2")
+    assert response.status_code == 200
+    after = response.json()
+    assert after["region"] == "global"
+    assert after["total_sessions"] - before["total_sessions"] == 1
+    assert after["total_content_views"] - before["total_content_views"] == 2
+    assert after["total_assessments"] - before["total_assessments"] == 1
+    assert after["active_hubs"] - before["active_hubs"] == 1
+    assert after["total_learners"] >= max(1, before["total_learners"])  # HyperLogLog estimate
+    assert after["average_session_duration_seconds"] is not None
+    assert after["window_start"].endswith(":00:00")
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,92 @@
+"""Tests for the fast-path /aggregate body decoder."""
+
+from __future__ import annotations
+
+import uuid
+
+import pytest
+from pydantic import TypeAdapter, ValidationError
+
+from app.schemas.analytics import AnalyticsBatch
+from app.services.batch_decoder import EventBatch, decode_batch
+from app.services.event_store import EventColumns
+
+ID = "0f8e5e9a-3c1d-4b7e-9a52-6d0c1f2b3a4e"
+
+
+def _event(**overrides) -> dict:
+    fields = {
+        "event_id": str(uuid.uuid4()),
+        "hub_id": ID,
+        "learner_id": str(uuid.uuid4()),
+        "event_type": "SESSION_END",
+        "occurred_at": "2026-03-01T09:30:00.250+01:00",
+        "session_id": str(uuid.uuid4()),
+        "duration_seconds": 600,
+        "metadata": {"lesson": "l-1", "score": 7, "passed": True, "ratio": 0.5},
+    }
+    return fields | overrides
+
+
+def _reference(body: dict) -> EventColumns | None:
+    try:
+        return EventColumns.from_events(AnalyticsBatch.model_validate(body).events)
+    except ValidationError:
+        return None
+
+
+def test_well_formed_batch_decodes_like_the_models() -> None:
+    body = {"events": [_event(), _event(occurred_at="2026-03-01T09:30:00"), _event(metadata={})]}
+    body["events"].append(
+        {k: v for k, v in _event().items() if k not in ("session_id", "metadata")}
+    )
+    columns = decode_batch(body)
+    assert columns is not None and columns == _reference(body)
+    assert columns.metadata[2] is None and columns.session_id[3] is None
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"hub_id": ID.replace("-", "")},  # lax forms pydantic accepts
+        {"hub_id": ID.upper()},
+        {"hub_id": "urn:uuid:" + ID},
+        {"hub_id": ID[:8] + " " + ID[9:]},
+        {"hub_id": ID[:-1] + "g"},
+        {"event_type": "session_end"},
+        {"occurred_at": "2026-03-01"},
+        {"occurred_at": "2026-03-01 09:30:00"},
+        {"occurred_at": "2026-03-01T09:30:00.1234567Z"},
+        {"occurred_at": "2026-03-01T09:30:00+05:75"},
+        {"occurred_at": "2026-02-30T09:30:00Z"},
+        {"occurred_at": 1_772_357_400},
+        {"duration_seconds": -1},
+        {"duration_seconds": True},
+        {"duration_seconds": float("inf")},
+        {"duration_seconds": "60"},
+        {"metadata": None},
+        {"metadata": {"nested": {"a": 1}}},
+        {"metadata": {"missing": None}},
+        {"metadata": {"ratio": float("nan")}},
+        {"content_id": ""},
+    ],
+)
+def test_fast_path_never_accepts_more_than_the_models(overrides: dict) -> None:
+    body = {"events": [_event(), _event(**overrides)]}
+    columns = decode_batch(body)
+    assert columns is None or columns == _reference(body)
+
+
+def test_event_batch_falls_back_to_model_validation() -> None:
+    adapter = TypeAdapter(EventBatch)
+    lax = {"events": [_event(hub_id=ID.replace("-", ""))]}
+    assert decode_batch(lax) is None
+    assert adapter.validate_python(lax).hub_id == [uuid.UUID(ID).bytes]
+
+    invalid = {"events": [_event(), _event(event_type="UNKNOWN")]}
+    with pytest.raises(ValidationError) as fast:
+        adapter.validate_python(invalid)
+    with pytest.raises(ValidationError) as model:
+        AnalyticsBatch.model_validate(invalid)
+    assert fast.value.errors() == model.value.errors()
+    assert decode_batch({"events": [_event()] * 1001}) is None
@@ -0,0 +1,102 @@
+"""Tests for the hour-partitioned analytics event store."""
+
+from __future__ import annotations
+
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.schemas.analytics import AnalyticsEvent, EventType
+from app.services.event_store import BloomFilter, EventColumns, EventStore
+
+T0 = datetime(2026, 3, 1, 9, 30, tzinfo=timezone.utc)
+
+
+def _event(minutes: float = 0, **overrides) -> AnalyticsEvent:
+    fields = {
+        "event_id": uuid.uuid4(),
+        "hub_id": uuid.uuid4(),
+        "learner_id": uuid.uuid4(),
+        "event_type": EventType.CONTENT_VIEW,
+        "occurred_at": T0 + timedelta(minutes=minutes),
+    }
+    return AnalyticsEvent(**(fields | overrides))
+
+
+@pytest.fixture
+def store(tmp_path) -> EventStore:
+    store = EventStore(str(tmp_path / "events.db"), bloom_capacity=1_000, bloom_partitions=2)
+    yield store
+    store.close()
+
+
+def test_bloom_filter_has_no_false_negatives() -> None:
+    bloom = BloomFilter(10_000, 0.01)
+    keys = [os.urandom(16) for _ in range(10_000)]
+    maybe_present = sum(bloom.add(key) for key in keys[:5_000])  # false positives while filling
+    assert all(key in bloom for key in keys[:5_000])
+    false_positives = sum(key in bloom for key in keys[5_000:])
+    assert maybe_present < 100 and false_positives < 150  # ~1 % expected at capacity
+
+
+def test_events_are_partitioned_by_hour_and_deduplicated(store: EventStore) -> None:
+    events = [_event(minutes) for minutes in (0, 10, 45, 95)]  # 09:30 … 11:05 → 3 hours
+    result = store.append_sync(EventColumns.from_events(events))
+    assert (result.inserted, result.duplicates, result.new) == (4, 0, [0, 1, 2, 3])
+    tables = [row[0] for row in store._db().execute("SELECT table_name FROM event_partitions")]
+    assert tables == ["events_2026030109", "events_2026030110", "events_2026030111"]
+
+    retry = [events[1], _event(20), events[1], events[3]]
+    result = store.append_sync(EventColumns.from_events(retry))
+    assert (result.inserted, result.duplicates, result.new) == (1, 3, [1])
+    assert store.count_sync() == 5
+
+
+def test_dedup_survives_filter_eviction_and_reopen(store: EventStore) -> None:
+    old = [_event(0) for _ in range(50)]
+    store.append_sync(EventColumns.from_events(old))
+    for hour in range(1, 4):  # pushes the 09:00 filter out of the 2-partition cache
+        store.append_sync(EventColumns.from_events([_event(60 * hour)]))
+    assert int(T0.timestamp() // 3600) not in store._blooms
+
+    store.close()
+    result = store.append_sync(EventColumns.from_events([*old[:10], _event(5)]))
+    assert (result.inserted, result.duplicates) == (1, 10)
+
+
+def test_events_outside_the_window_are_rejected(tmp_path) -> None:
+    store = EventStore(
+        str(tmp_path / "events.db"),
+        max_event_age_seconds=24 * 3600,
+        max_event_skew_seconds=300,
+        clock=lambda: T0.timestamp(),
+    )
+    # One batch spread over 1000 hours would otherwise open 1000 partition tables.
+    events = [_event(60 * hours) for hours in range(-1000, 1000)]
+    events += [_event(-24 * 60), _event(5)]
+    try:
+        result = store.append_sync(EventColumns.from_events(events))
+        assert (result.inserted, len(result.rejected)) == (27, 1975)  # hours -24 … 0, both edges
+        assert len(store._tables) == 25
+        assert result.rejected[:2] == [0, 1] and result.rejected[-1] == 1999
+    finally:
+        store.close()
+
+
+def test_columns_store_compact_values(store: EventStore) -> None:
+    event = _event(
+        event_type=EventType.SESSION_END,
+        session_id=uuid.uuid4(),
+        duration_seconds=12.5,
+        metadata={"lesson": "fractions", "score": 3},
+        occurred_at=(T0 + timedelta(minutes=1)).replace(tzinfo=None),  # naive → UTC
+    )
+    store.append_sync(EventColumns.from_events([event]))
+    row = store._db().execute("SELECT * FROM events_2026030109").fetchone()
+    assert row[0] == event.event_id.bytes and len(row[1]) == 16
+    assert row[3] == list(EventType).index(EventType.SESSION_END)
+    assert row[4] == (T0 + timedelta(minutes=1)).timestamp()
+    assert (row[5], row[6], row[7]) == (None, event.session_id.bytes, 12.5)
+    assert row[8] == '{"lesson":"fractions","score":3}'
@@ -0,0 +1,89 @@
+"""Tests for the SQLite Edge Hub registry behind the fleet listing."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.schemas.fleet import EdgeHub, HubStatus
+from app.services.hub_registry import HubRegistry, InvalidCursor
+
+T0 = datetime(2026, 1, 1)
+
+
+def _hub(minutes: int = 0, **overrides) -> EdgeHub:
+    fields = {
+        "hub_id": uuid.uuid4(),
+        "region": "eu-west-1",
+        "name": "hub",
+        "status": HubStatus.ONLINE,
+        "ip_address": "10.0.0.1",
+        "firmware_version": "1.0.0",
+        "registered_at": T0 + timedelta(minutes=minutes),
+        "tags": {"site": "school-1"},
+    }
+    return EdgeHub(**(fields | overrides))
+
+
+@pytest.fixture
+def registry(tmp_path) -> HubRegistry:
+    registry = HubRegistry(str(tmp_path / "fleet.db"))
+    yield registry
+    registry.close()
+
+
+def test_counters_follow_inserts_and_status_changes(registry: HubRegistry) -> None:
+    hubs = [_hub(i) for i in range(5)] + [_hub(9, region="eu-north-1")]
+    assert registry.register_sync(hubs) == 6
+    moved = hubs[0].model_copy(update={"status": HubStatus.OFFLINE, "name": "renamed"})
+    assert registry.register_sync([moved]) == 0
+
+    assert registry.count_sync() == 6
+    assert registry.count_sync(HubStatus.ONLINE) == 5
+    assert registry.count_sync(HubStatus.OFFLINE, "eu-west-1") == 1
+    assert registry.count_sync(region="eu-north-1") == 1
+    stored = registry.get_sync(hubs[0].hub_id)
+    assert (stored.name, stored.status, stored.tags) == ("renamed", HubStatus.OFFLINE, hubs[0].tags)
+    assert registry.get_sync(uuid.uuid4()) is None
+
+
+def test_keyset_pages_cover_ties_in_registration_time(registry: HubRegistry) -> None:
+    registry.register_sync([_hub(i // 4) for i in range(23)])  # four hubs per timestamp
+    expected = [hub.hub_id for hub in registry.page_sync(limit=100).hubs]
+
+    seen, cursor = [], None
+    while True:
+        page = registry.page_sync(limit=5, cursor=cursor)
+        seen += [hub.hub_id for hub in page.hubs]
+        assert page.total == 23
+        if (cursor := page.next_cursor) is None:
+            break
+    assert seen == expected and len(set(seen)) == 23
+    assert registry.page_sync(limit=5, offset=20).hubs == registry.page_sync(limit=100).hubs[20:]
+
+
+def test_cursor_is_bound_to_its_filters(registry: HubRegistry) -> None:
+    registry.register_sync([_hub(i) for i in range(3)])
+    cursor = registry.page_sync(limit=1, status=HubStatus.ONLINE).next_cursor
+    assert len(registry.page_sync(limit=5, status=HubStatus.ONLINE, cursor=cursor).hubs) == 2
+    with pytest.raises(InvalidCursor):
+        registry.page_sync(limit=5, cursor=cursor)
+    with pytest.raises(InvalidCursor):
+        registry.page_sync(limit=5, cursor="e30")
+
+
+def test_matching_filters_by_region_and_every_tag(registry: HubRegistry) -> None:
+    beta = _hub(tags={"site": "school-1", "ring": "beta"})
+    north = _hub(region="eu-north-1", tags={"site": "school-1", "ring": "beta"})
+    plain = _hub()
+    registry.register_sync([beta, north, plain])
+
+    assert registry.matching_sync() == {beta.hub_id.bytes, north.hub_id.bytes, plain.hub_id.bytes}
+    assert registry.matching_sync("eu-west-1") == {beta.hub_id.bytes, plain.hub_id.bytes}
+    assert registry.matching_sync(tags={"ring": "beta"}) == {beta.hub_id.bytes, north.hub_id.bytes}
+    assert registry.matching_sync("eu-west-1", {"ring": "beta", "site": "school-1"}) == {
+        beta.hub_id.bytes
+    }
+    assert registry.matching_sync(tags={"ring": "beta", "site": "school-2"}) == set()
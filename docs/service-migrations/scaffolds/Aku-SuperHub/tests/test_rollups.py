@@ -0,0 +1,140 @@
+"""Tests for the ingest-time hourly rollups behind the regional summary."""
+
+from __future__ import annotations
+
+import os
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.schemas.analytics import AnalyticsEvent, EventType
+from app.services.event_store import EventColumns, EventStore
+from app.services.rollups import (
+    HLL_REGISTERS,
+    RollupIndex,
+    estimate_cardinality,
+    learner_rank,
+    merge_registers,
+)
+
+T0 = datetime(2026, 3, 1, 0, 0, tzinfo=timezone.utc)
+H0 = int(T0.timestamp()) // 3600
+
+
+def _event(hours: float, **overrides) -> AnalyticsEvent:
+    fields = {
+        "event_id": uuid.uuid4(),
+        "hub_id": uuid.uuid4(),
+        "learner_id": uuid.uuid4(),
+        "event_type": EventType.CONTENT_VIEW,
+        "occurred_at": T0 + timedelta(hours=hours),
+    }
+    return AnalyticsEvent(**(fields | overrides))
+
+
+@pytest.fixture
+def store(tmp_path) -> EventStore:
+    store = EventStore(str(tmp_path / "events.db"))
+    # Keep T0's month in memory, as if it were the present.
+    store._rollups = RollupIndex(clock=lambda: T0.timestamp() + 10 * 86400)
+    yield store
+    store.close()
+
+
+def test_register_merge_is_lane_wise_max() -> None:
+    rng = random.Random(3)
+    a = bytes(rng.randrange(54) for _ in range(HLL_REGISTERS))
+    b = bytes(rng.randrange(54) for _ in range(HLL_REGISTERS))
+    merged = merge_registers(int.from_bytes(a, "little"), int.from_bytes(b, "little"))
+    assert merged.to_bytes(HLL_REGISTERS, "little") == bytes(map(max, a, b))
+
+
+@pytest.mark.parametrize("distinct", [10, 1_000, 50_000])
+def test_hyperloglog_estimate_is_close(distinct: int) -> None:
+    registers = bytearray(HLL_REGISTERS)
+    for _ in range(distinct):
+        index, rank = learner_rank(os.urandom(16))
+        registers[index] = max(registers[index], rank)
+    assert abs(estimate_cardinality(bytes(registers)) - distinct) <= max(1, 0.06 * distinct)
+
+
+def test_summary_counts_and_hubs_across_hours_and_days(store: EventStore) -> None:
+    hub_a, hub_b, learner = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    events = [
+        _event(1, hub_id=hub_a, learner_id=learner, event_type=EventType.SESSION_START),
+        _event(
+            2,
+            hub_id=hub_a,
+            learner_id=learner,
+            event_type=EventType.SESSION_END,
+            duration_seconds=300.0,
+        ),
+        _event(30, hub_id=hub_b, event_type=EventType.SESSION_END, duration_seconds=100.0),
+        _event(30.5, hub_id=hub_b, event_type=EventType.SESSION_END),  # no duration
+        _event(49, hub_id=hub_b, event_type=EventType.ASSESSMENT_SUBMIT),
+    ]
+    store.append_sync(EventColumns.from_events(events))
+    store.append_sync(EventColumns.from_events(events[:2]))  # retries change nothing
+
+    totals = store.rollup_sync(H0, H0 + 71)  # three whole days
+    assert totals.count(EventType.SESSION_END) == 3
+    assert totals.count(EventType.ASSESSMENT_SUBMIT) == 1
+    assert totals.average_session_duration == 200.0
+    assert (totals.active_hubs, totals.distinct_learners) == (2, 4)
+
+    first_day = store.rollup_sync(H0, H0 + 23)
+    assert (first_day.active_hubs, first_day.distinct_learners) == (1, 1)
+    assert store.rollup_sync(H0 + 3, H0 + 29).active_hubs == 0
+
+    # A write to a cached day invalidates it.
+    store.append_sync(EventColumns.from_events([_event(5, hub_id=hub_b)]))
+    assert store.rollup_sync(H0, H0 + 23).active_hubs == 2
+
+
+def test_rollups_survive_reopen_and_late_events(store: EventStore) -> None:
+    hub = uuid.uuid4()
+    store.append_sync(EventColumns.from_events([_event(h, hub_id=hub) for h in range(6)]))
+    store.close()
+    store._rollups = RollupIndex(clock=lambda: T0.timestamp() + 60 * 86400)  # T0 left memory
+    store.append_sync(EventColumns.from_events([_event(3, hub_id=hub), _event(4)]))
+
+    totals = store.rollup_sync(H0, H0 + 23)
+    assert totals.count(EventType.CONTENT_VIEW) == 8
+    assert (totals.active_hubs, totals.distinct_learners) == (2, 8)
+
+
+def test_unflushed_rollups_are_rebuilt_from_partitions(store: EventStore) -> None:
+    store._rollups.flush_seconds = 3600
+    store.append_sync(EventColumns.from_events([_event(1), _event(2), _event(30)]))
+    store.append_sync(EventColumns.from_events([_event(2)]))
+    assert store._db().execute("SELECT COUNT(*) FROM event_rollups").fetchone() == (0,)
+
+    # Crash: the connection goes away without a final flush, and memory is lost.
+    clock = store._rollups._clock
+    store._conn.close()
+    store._conn = None
+    store._rollups = RollupIndex(clock=clock)
+
+    totals = store.rollup_sync(H0, H0 + 47)
+    assert (totals.count(EventType.CONTENT_VIEW), totals.distinct_learners) == (4, 4)
+    assert store._db().execute("SELECT SUM(events) FROM event_rollups").fetchone() == (4,)
+
+
+def test_rolled_back_batch_leaves_rollups_untouched(store: EventStore, monkeypatch) -> None:
+    store.append_sync(EventColumns.from_events([_event(1)]))
+
+    apply = store._rollups.apply
+
+    def apply_then_fail(*args) -> None:
+        apply(*args)  # buckets updated in memory, then the transaction fails
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(store._rollups, "apply", apply_then_fail)
+    with pytest.raises(RuntimeError):
+        store.append_sync(EventColumns.from_events([_event(1), _event(2)]))
+    monkeypatch.undo()
+
+    assert store.rollup_sync(H0, H0 + 23).count(EventType.CONTENT_VIEW) == 1
+    assert store.count_sync() == 1
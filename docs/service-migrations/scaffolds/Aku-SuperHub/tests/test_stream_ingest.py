@@ -0,0 +1,117 @@
+"""Tests for streaming NDJSON ingest into the event store."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import uuid
+
+import pytest
+
+from app.services.event_store import EventStore
+from app.services.stream_ingest import ingest_ndjson
+
+
+def _line(**overrides) -> bytes:
+    event = {
+        "event_id": str(uuid.uuid4()),
+        "hub_id": str(uuid.uuid4()),
+        "learner_id": str(uuid.uuid4()),
+        "event_type": "CONTENT_VIEW",
+        "occurred_at": "2026-03-01T09:30:00Z",
+    }
+    return json.dumps(event | overrides).encode() + b"\n"
+
+
+async def _body(*pieces: bytes):
+    for piece in pieces:
+        yield piece
+
+
+class _GatedStore:
+    """Holds every append until ``gate`` is set, like a store that fell behind."""
+
+    def __init__(self, store: EventStore) -> None:
+        self.store = store
+        self.gate = asyncio.Event()
+
+    async def append(self, columns):
+        await self.gate.wait()
+        return await self.store.append(columns)
+
+
+@pytest.fixture
+def store(tmp_path) -> EventStore:
+    store = EventStore(str(tmp_path / "events.db"), bloom_capacity=1_000, bloom_partitions=2)
+    yield store
+    store.close()
+
+
+async def test_lines_split_across_pieces_commit_in_chunks(store: EventStore) -> None:
+    lines = b"".join(_line() for _ in range(25))
+    body = _body(*(lines[i : i + 97] for i in range(0, len(lines), 97)))  # splits mid-line
+    result = await ingest_ndjson(body, store, chunk_events=10)
+    assert (result.received, result.inserted, result.chunks, result.errors) == (25, 25, 3, 0)
+
+    retry = await ingest_ndjson(_body(lines.rstrip(b"\n")), store, chunk_events=10)
+    assert (retry.inserted, retry.duplicates) == (0, 25)
+
+
+async def test_invalid_lines_are_counted_and_skipped(store: EventStore) -> None:
+    body = _body(
+        _line(),
+        b"\n",  # blank: skipped, still numbered
+        b"{not json\n",
+        _line(event_type="UNKNOWN"),
+        b'{"padding": "' + b"x" * 2_000,
+        b'"}\n' + _line(),
+        b"\xff\n",
+    )
+    result = await ingest_ndjson(body, store, max_line_bytes=1_024)
+    assert (result.received, result.inserted, result.errors) == (6, 2, 4)
+    assert [(e.line, e.error.split(":")[0]) for e in result.error_samples] == [
+        (3, "Invalid JSON"),
+        (4, "event_type"),
+        (5, "Line longer than 1024 bytes"),
+        (7, "Invalid UTF-8"),
+    ]
+
+
+async def test_body_reads_pause_while_the_store_is_behind(store: EventStore) -> None:
+    gated = _GatedStore(store)
+    pulled = 0
+
+    async def body():
+        nonlocal pulled
+        for _ in range(20):
+            pulled += 1
+            yield b"".join(_line() for _ in range(10))
+
+    task = asyncio.create_task(ingest_ndjson(body(), gated, chunk_events=10, max_pending_chunks=2))
+    for _ in range(50):
+        await asyncio.sleep(0)
+    # One chunk held by the writer, two queued, one waiting to be queued.
+    assert pulled == 4 and not task.done()
+
+    gated.gate.set()
+    result = await task
+    assert pulled == 20 and result.inserted == 200 and result.chunks == 20
+
+
+async def test_store_failure_stops_reading_and_raises(store: EventStore) -> None:
+    pulled = 0
+
+    class _FailingStore:
+        async def append(self, columns):
+            raise sqlite3.OperationalError("disk I/O error")
+
+    async def body():
+        nonlocal pulled
+        for _ in range(100):
+            pulled += 1
+            yield _line()
+
+    with pytest.raises(sqlite3.OperationalError):
+        await ingest_ndjson(body(), _FailingStore(), chunk_events=1)
+    assert pulled < 10
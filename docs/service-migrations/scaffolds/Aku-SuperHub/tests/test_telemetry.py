@@ -0,0 +1,123 @@
+"""Tests for the per-hub telemetry ring buffers behind hub health."""
+
+from __future__ import annotations
+
+import uuid
+
+import pytest
+
+from app.schemas.fleet import HubHealthMetrics
+from app.services.telemetry import TelemetryStore
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _metrics(cpu: float = 20.0, memory: float = 40.0, disk: float = 30.0, **overrides):
+    fields = {
+        "cpu_percent": cpu,
+        "memory_percent": memory,
+        "disk_percent": disk,
+        "active_learners": 12,
+        "uptime_seconds": 10**6,
+    }
+    return HubHealthMetrics(**(fields | overrides))
+
+
+@pytest.fixture
+def clock() -> Clock:
+    return Clock()
+
+
+@pytest.fixture
+def store(clock: Clock) -> TelemetryStore:
+    return TelemetryStore(capacity=10, trend_horizon_hours=6, trend_min_samples=5, clock=clock)
+
+
+def _push(store: TelemetryStore, clock: Clock, hub: uuid.UUID, samples, step: float = 60.0):
+    for metrics in samples:
+        store.push(hub, metrics)
+        clock.now += step
+
+
+def test_ring_keeps_the_last_capacity_samples(store: TelemetryStore, clock: Clock) -> None:
+    hub = uuid.uuid4()
+    _push(store, clock, hub, [_metrics(cpu=float(i)) for i in range(25)])
+
+    assert store.latest(hub).cpu_percent == 24.0
+    rolling = store.rolling(hub)
+    assert (rolling.samples, rolling.window_seconds) == (10, 540.0)
+    assert (rolling.cpu_percent.p50, rolling.cpu_percent.p95, rolling.cpu_percent.max) == (
+        19.0,
+        24.0,
+        24.0,
+    )
+    assert store.latest(uuid.uuid4()) is None and store.rolling(uuid.uuid4()) is None
+
+
+def test_memory_is_bounded_per_hub(store: TelemetryStore, clock: Clock) -> None:
+    for _ in range(40):
+        _push(store, clock, uuid.uuid4(), [_metrics()] * 30)
+    assert len(store) == 40
+    per_hub = 24 * store.capacity + 31
+    assert 40 * per_hub <= store.nbytes <= 2 * 40 * per_hub  # doubling headroom
+
+
+def test_alerts_cover_threshold_sustained_trend_and_restart(
+    store: TelemetryStore, clock: Clock
+) -> None:
+    quiet = uuid.uuid4()
+    _push(store, clock, quiet, [_metrics()] * 8)
+    assert store.alerts(quiet) == []
+
+    busy = uuid.uuid4()
+    _push(store, clock, busy, [_metrics(cpu=95.0)] * 6 + [_metrics(cpu=50.0)])
+    assert store.alerts(busy) == [
+        "Sustained high CPU utilisation: median 95.0% over the last 7 samples"
+    ]
+
+    filling = uuid.uuid4()  # +10 %/h of disk, 60 % now: 80 % in ~2 h
+    _push(store, clock, filling, [_metrics(disk=50.0 + i) for i in range(11)], step=360.0)
+    assert store.alerts(filling) == ["Disk rising 10.0 %/h: 80% in ~2.0 h"]
+
+    restarted = uuid.uuid4()
+    _push(store, clock, restarted, [_metrics()] * 5 + [_metrics(cpu=99.0, uptime_seconds=120)])
+    assert store.alerts(restarted) == ["High CPU utilisation: 99.0%", "Hub restarted 2 min ago"]
+
+
+def test_breaches_sweep_latest_values_only(store: TelemetryStore, clock: Clock) -> None:
+    hot, full, recovered = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    _push(store, clock, hot, [_metrics(cpu=97.5, memory=90.0)])
+    _push(store, clock, full, [_metrics(disk=85.0)])
+    _push(store, clock, recovered, [_metrics(cpu=99.0), _metrics(cpu=10.0)])
+    _push(store, clock, uuid.uuid4(), [_metrics()])
+    _push(store, clock, uuid.uuid4(), [_metrics(cpu=90.0)])  # at, not above
+    edge = uuid.uuid4()
+    _push(store, clock, edge, [_metrics(cpu=90.2)])  # same coarse step as 90.0
+
+    assert store.breaches() == {
+        "cpu_percent": [(hot.bytes, 97.5), (edge.bytes, 90.2)],
+        "memory_percent": [(hot.bytes, 90.0)],
+        "disk_percent": [(full.bytes, 85.0)],
+    }
+
+
+def test_breaches_skip_hubs_with_stale_samples(clock: Clock) -> None:
+    store = TelemetryStore(capacity=3, max_sample_age_seconds=600, clock=clock)
+    quiet, live = uuid.uuid4(), uuid.uuid4()
+    _push(store, clock, quiet, [_metrics(cpu=99.0)] * 4, step=0)  # wraps the ring
+    clock.now += 600
+    _push(store, clock, live, [_metrics(cpu=95.0)], step=0)
+    assert store.breaches()["cpu_percent"] == [(quiet.bytes, 99.0), (live.bytes, 95.0)]
+
+    assert store.fresh() == [quiet.bytes, live.bytes]
+
+    clock.now += 1
+    assert store.breaches()["cpu_percent"] == [(live.bytes, 95.0)]
+    assert store.fresh() == [live.bytes]
+    assert store.latest(quiet).cpu_percent == 99.0  # still reported per hub